@@ -58,6 +58,7 @@ setup(
     install_requires=requirements,
     extras_require={
         "dns": ["dnspython>=2.0.0,<3.0.0"],
+        "fast": ["orjson>=3.6.0", "lxml>=4.6.0"],
         "dev": [
             "black>=23.0.0,<24.0.0",
             "isort>=5.12.0,<6.0.0",
@@ -4,6 +4,54 @@ from unittest.mock import MagicMock
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def stdlib_codecs(monkeypatch):
+    """
+    Run tests with the stdlib JSON/XML codecs.
+
+    Most tests mock ``requests`` responses (``response.json()``, ``ET.fromstring``);
+    accelerated backends are covered by the codec parity tests instead.
+    """
+    from wapi.utils import codec
+
+    monkeypatch.setenv(codec.CODEC_ENV_VAR, "stdlib")
+    codec.reset_codecs()
+    yield
+    codec.reset_codecs()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(monkeypatch, tmp_path):
+    """Keep the portfolio index and other local state out of the user's cache."""
+    from wapi import constants
+
+    monkeypatch.setenv(constants.CACHE_DIR_ENV_VAR, str(tmp_path / "wapi-cache"))
+    monkeypatch.delenv(constants.INDEX_FILE_ENV_VAR, raising=False)
+    yield tmp_path / "wapi-cache"
+
+
+@pytest.fixture(autouse=True)
+def no_retry_backoff(monkeypatch):
+    """Retry failed reads without sleeping between attempts."""
+    from wapi.api import resilience
+
+    monkeypatch.setattr(resilience, "DEFAULT_RETRY_BASE_DELAY", 0)
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiters(monkeypatch):
+    """Give every test its own shared adaptive rate limiters."""
+    from wapi.api import resilience
+
+    monkeypatch.setattr(resilience, "_shared_limiters", {})
+
+
+@pytest.fixture(autouse=True)
+def no_rdap(monkeypatch):
+    """Keep search on the (mocked) WHOIS path; RDAP tests install their own client."""
+    monkeypatch.setattr("wapi.commands.search.get_rdap_client", lambda: None)
+
+
 @pytest.fixture
 def poll_success():
     """Return a side-effect function for poll_until_complete that yields success code."""
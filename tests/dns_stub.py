@@ -0,0 +1,86 @@
+"""
+Local UDP DNS stub servers shared by the DNS tests
+"""
+
+import socket
+import struct
+import threading
+
+from wapi.utils.dns_wire import RDTYPES, _read_name
+
+
+def encode_name(name):
+    """Uncompressed wire form of a domain name"""
+    out = b''
+    for label in name.rstrip('.').split('.') if name.rstrip('.') else []:
+        out += bytes([len(label)]) + label.encode('ascii')
+    return out + b'\x00'
+
+
+def encode_rdata(rdtype, value):
+    """Wire form of a record value in presentation format"""
+    if rdtype == 'A':
+        return socket.inet_aton(value)
+    if rdtype == 'AAAA':
+        return socket.inet_pton(socket.AF_INET6, value)
+    if rdtype in ('NS', 'CNAME'):
+        return encode_name(value)
+    if rdtype == 'TXT':
+        data = value.encode('utf-8')
+        return bytes([len(data)]) + data
+    if rdtype == 'SOA':
+        mname, rname, *numbers = value.split()
+        return encode_name(mname) + encode_name(rname) + struct.pack('!IIIII', *map(int, numbers))
+    raise ValueError(rdtype)
+
+
+class DNSStub:
+    """UDP nameserver answering from a mutable {(name, type): [rdata]} zone"""
+
+    def __init__(self, address='127.0.0.1', port=0, zone=None):
+        self.zone = dict(zone or {})
+        self.authoritative = True
+        self.referrals = {}
+        self.queries = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((address, port))
+        self.address, self.port = self.sock.getsockname()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def set_serial(self, zone, serial):
+        self.zone[(zone, 'SOA')] = [f"ns1.{zone} hostmaster.{zone} {serial} 3600 900 604800 300"]
+
+    def _serve(self):
+        while True:
+            try:
+                data, peer = self.sock.recvfrom(4096)
+            except OSError:
+                return
+            qname, offset = _read_name(data, 12)
+            qtype = struct.unpack('!H', data[offset:offset + 2])[0]
+            rdtype = next(k for k, v in RDTYPES.items() if v == qtype)
+            self.queries.append((qname, rdtype))
+            answers = [(qname, rdtype, value) for value in self.zone.get((qname, rdtype), [])]
+            authority, additional = [], []
+            for suffix, servers in self.referrals.items():
+                if not answers and (qname == suffix or qname.endswith('.' + suffix)):
+                    authority = [(suffix, 'NS', host) for host, _address in servers]
+                    additional = [(host, 'AAAA' if ':' in address else 'A', address)
+                                  for host, address in servers if address]
+            flags = 0x8400 if self.authoritative and not authority else 0x8000
+            header = struct.pack('!HHHHHH', struct.unpack('!H', data[:2])[0], flags, 1,
+                                 len(answers), len(authority), len(additional))
+            body = data[12:offset + 4]
+            for owner, record_type, value in answers + authority + additional:
+                rdata = encode_rdata(record_type, value)
+                fixed = struct.pack('!HHIH', RDTYPES[record_type], 1, 300, len(rdata))
+                body += encode_name(owner) + fixed + rdata
+            self.sock.sendto(header + body, peer)
+
+    def serve_zone(self, zone, serial, nameservers=('ns1.example.net', 'ns2.example.net')):
+        self.set_serial(zone, serial)
+        self.zone[(zone, 'NS')] = list(nameservers)
+
+    def close(self):
+        self.sock.close()
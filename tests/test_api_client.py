@@ -47,7 +47,7 @@ class TestAPIClientErrorHandling(unittest.TestCase):
         """Set up test client"""
         self.client = WedosAPIClient("user@example.com", "password")
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     def test_connection_error_raises_wapi_connection_error(self, mock_post):
         """Test that connection errors raise WAPIConnectionError"""
         mock_post.side_effect = requests.exceptions.ConnectionError("Connection failed")
@@ -57,7 +57,7 @@ class TestAPIClientErrorHandling(unittest.TestCase):
         
         self.assertIn("Connection error", str(context.exception))
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     def test_timeout_error_raises_wapi_timeout_error(self, mock_post):
         """Test that timeout errors raise WAPITimeoutError"""
         mock_post.side_effect = requests.exceptions.Timeout("Request timeout")
@@ -67,7 +67,7 @@ class TestAPIClientErrorHandling(unittest.TestCase):
         
         self.assertIn("timeout", str(context.exception).lower())
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     def test_request_exception_raises_wapi_request_error(self, mock_post):
         """Test that request exceptions raise WAPIRequestError"""
         mock_post.side_effect = requests.exceptions.RequestException("Request failed")
@@ -77,7 +77,7 @@ class TestAPIClientErrorHandling(unittest.TestCase):
         
         self.assertIn("Request failed", str(context.exception))
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     def test_http_error_raises_wapi_request_error(self, mock_post):
         """Test that HTTP errors raise WAPIRequestError"""
         mock_response = Mock()
@@ -87,7 +87,7 @@ class TestAPIClientErrorHandling(unittest.TestCase):
         with self.assertRaises(WAPIRequestError):
             self.client.call("ping", {})
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     @patch('wapi.api.client.ET.fromstring')
     def test_xml_parse_error_raises_wapi_request_error(self, mock_fromstring, mock_post):
         """Test that XML parse errors raise WAPIRequestError"""
@@ -367,6 +367,46 @@ class TestAPIClientMethods(unittest.TestCase):
         mock_call.assert_called_once_with("domains-availability", {"name": "example.com"})
         self.assertEqual(result["response"]["code"], "1000")
 
+    @patch.object(WedosAPIClient, 'call')
+    def test_domains_availability_packs_and_splits(self, mock_call):
+        """Test batched domains_availability: one call per batch, results split per name"""
+        def _answer(command, data):
+            names = data["name"] if isinstance(data["name"], list) else [data["name"]]
+            if "bad.cz" in names and len(names) > 1:
+                return {"response": {"code": "2100", "result": "Invalid name"}}
+            return {"response": {"code": "1000", "result": "OK", "data": {"domain": [
+                {"name": name.upper(),
+                 "status": "available" if name.startswith("free") else "registered"}
+                for name in names]}}}
+
+        mock_call.side_effect = _answer
+        names = [f"free{i}.cz" for i in range(5)] + ["taken.cz", "free0.cz"]
+        results = self.client.domains_availability(names, batch_size=4)
+        self.assertEqual([c[0][1]["name"] for c in mock_call.call_args_list],
+                         [["free0.cz", "free1.cz", "free2.cz", "free3.cz"],
+                          ["free4.cz", "taken.cz"]])
+        self.assertEqual(sorted(results), sorted(set(names)))
+        self.assertEqual(results["taken.cz"]["response"]["data"],
+                         {"domain": {"name": "TAKEN.CZ", "status": "registered"}})
+
+        # A rejected batch is bisected down to the offending name
+        mock_call.reset_mock()
+        results = self.client.domains_availability(
+            ["free1.cz", "bad.cz", "free2.cz", "free3.cz"], batch_size=4)
+        self.assertEqual(len(mock_call.call_args_list), 5)
+        self.assertEqual(results["free3.cz"]["response"]["code"], "1000")
+        self.assertEqual(results["bad.cz"]["response"]["code"], "1000")
+
+    @patch.object(WedosAPIClient, 'call')
+    def test_domains_availability_global_error_is_not_split(self, mock_call):
+        """An authentication-type error answers the whole batch with one call"""
+        mock_call.return_value = {"response": {"code": "2051", "result": "Access not allowed"}}
+        names = [f"name{i}.cz" for i in range(50)]
+        results = self.client.domains_availability(names)
+        self.assertEqual(mock_call.call_count, 1)
+        self.assertEqual(sorted(results), sorted(names))
+        self.assertEqual(results["name7.cz"]["response"]["code"], "2051")
+
 
 if __name__ == '__main__':
     unittest.main()
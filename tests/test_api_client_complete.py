@@ -213,7 +213,7 @@ class TestAPIClientCallMethod(unittest.TestCase):
         """Set up test client"""
         self.client = WedosAPIClient("user@example.com", "password", use_json=False)
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     def test_call_xml_format_success(self, mock_post):
         """Test call() with XML format successful response (lines 194-222)"""
         mock_response = Mock()
@@ -227,7 +227,7 @@ class TestAPIClientCallMethod(unittest.TestCase):
         self.assertIn("response", result)
         self.assertEqual(result["response"]["code"], 1000)
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     def test_call_json_format_success(self, mock_post):
         """Test call() with JSON format successful response (lines 165-193)"""
         client = WedosAPIClient("user@example.com", "password", use_json=True)
@@ -248,7 +248,7 @@ class TestAPIClientCallMethod(unittest.TestCase):
         self.assertIn("response", result)
         self.assertEqual(result["response"]["code"], "1000")
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     def test_call_json_format_timeout(self, mock_post):
         """Test call() with JSON format timeout (lines 178-180)"""
         client = WedosAPIClient("user@example.com", "password", use_json=True)
@@ -259,7 +259,7 @@ class TestAPIClientCallMethod(unittest.TestCase):
         with self.assertRaises(WAPITimeoutError):
             client.call("ping", {})
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     def test_call_json_format_connection_error(self, mock_post):
         """Test call() with JSON format connection error (lines 181-183)"""
         client = WedosAPIClient("user@example.com", "password", use_json=True)
@@ -270,7 +270,7 @@ class TestAPIClientCallMethod(unittest.TestCase):
         with self.assertRaises(WAPIConnectionError):
             client.call("ping", {})
 
-    @patch('wapi.api.client.requests.post')
+    @patch('wapi.api.client.requests.Session.post')
     def test_call_json_format_request_exception(self, mock_post):
         """Test call() with JSON format request exception (lines 184-186)"""
         client = WedosAPIClient("user@example.com", "password", use_json=True)
@@ -3,6 +3,7 @@ Comprehensive tests for wapi/api/client.py
 """
 import pytest
 import json
+import re
 import xml.etree.ElementTree as ET
 from unittest.mock import MagicMock, patch, ANY
 from datetime import datetime
@@ -50,7 +51,7 @@ class TestRequestBuilding:
             assert req['user'] == "user@test.com"
             assert req['auth'] == "mock_auth_hash"
             assert req['command'] == "ping"
-            assert req['clTRID'] == "wapi-123456"
+            assert re.match(r"^wapi-123456-[0-9a-f]+-\d+$", req['clTRID'])
             assert req['data']['foo'] == "bar"
 
     def test_build_xml_request(self, client_xml):
@@ -71,7 +72,7 @@ class TestRequestBuilding:
 
 class TestCallMethod:
     def test_call_json_success(self, client):
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.json.return_value = {"response": {"code": "1000", "result": "OK"}}
@@ -86,7 +87,7 @@ class TestCallMethod:
             assert "application/x-www-form-urlencoded" in kwargs['headers']['Content-Type']
 
     def test_call_xml_success(self, client_xml):
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_response = MagicMock()
             mock_response.status_code = 200
             xml_resp = """
@@ -104,15 +105,17 @@ class TestCallMethod:
             assert result['response']['result'] == "OK"
 
     def test_network_errors(self, client):
-        with patch('requests.post', side_effect=requests.exceptions.ConnectionError("Fail")):
+        with patch('requests.Session.post',
+                   side_effect=requests.exceptions.ConnectionError("Fail")):
             with pytest.raises(WAPIConnectionError):
                 client.call("ping")
 
-        with patch('requests.post', side_effect=requests.exceptions.Timeout("Time")):
+        with patch('requests.Session.post', side_effect=requests.exceptions.Timeout("Time")):
             with pytest.raises(WAPITimeoutError):
                 client.call("ping")
 
-        with patch('requests.post', side_effect=requests.exceptions.RequestException("Generic")):
+        with patch('requests.Session.post',
+                   side_effect=requests.exceptions.RequestException("Generic")):
             with pytest.raises(WAPIRequestError):
                 client.call("ping")
 
@@ -0,0 +1,94 @@
+"""
+Byte-for-byte parity tests for the template-based XML request serializer
+"""
+
+import random
+import unittest
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+from wapi.api.client import WedosAPIClient
+
+
+def reference_xml_request(client, command, data, auth, cl_trid):
+    """Build the request the way the client did before (full ElementTree)"""
+    root = ET.Element("request")
+    ET.SubElement(root, "user").text = client.username
+    ET.SubElement(root, "auth").text = auth
+    ET.SubElement(root, "command").text = command
+    ET.SubElement(root, "clTRID").text = cl_trid
+    if data:
+        data_elem = ET.SubElement(root, "data")
+        client._build_xml_data(data_elem, data)
+    return ET.tostring(root, encoding='unicode')
+
+
+def random_value(rng, depth=0):
+    choice = rng.randrange(7 if depth < 3 else 4)
+    if choice == 0:
+        return rng.choice(["", "plain", "a&b", "<tag>", "x > y", "ünïcode", "quote\"'",
+                           "line\r\nbreak"])
+    if choice == 1:
+        return rng.randrange(-5, 100000)
+    if choice == 2:
+        return rng.choice([None, True, False, 3.5])
+    if choice == 3:
+        return rng.choice(["ns1.example.com", "192.0.2.1", "2001:db8::1"])
+    if choice == 4:
+        return {f"k{i}": random_value(rng, depth + 1) for i in range(rng.randrange(4))}
+    if choice == 5:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return [{"name": random_value(rng, depth + 2)} for _ in range(rng.randrange(3))]
+
+
+class TestXMLSerializerParity(unittest.TestCase):
+    """The template serializer must match ET.tostring output exactly"""
+
+    def setUp(self):
+        self.client = WedosAPIClient("user@example.com", "password")
+
+    def assert_parity(self, command, data):
+        with patch('wapi.api.client.calculate_auth', return_value="a" * 40):
+            fast = self.client._build_xml_request(command, data, "wapi-1700000000")
+        expected = reference_xml_request(self.client, command, data, "a" * 40, "wapi-1700000000")
+        self.assertEqual(fast, expected)
+
+    def test_no_data(self):
+        self.assert_parity("ping", None)
+        self.assert_parity("ping", {})
+
+    def test_nameserver_payload(self):
+        self.assert_parity("nsset-create", {
+            "tld": "cz",
+            "name": "NS-EXAMPLE",
+            "dns": {"server": [
+                {"name": "ns1.example.com", "addr_ipv4": "192.0.2.1", "addr_ipv6": ""},
+                {"name": "ns2.example.com", "addr_ipv4": "192.0.2.2", "addr_ipv6": "2001:db8::2"},
+            ]},
+            "tech_c": None,
+        })
+
+    def test_escaping_and_empty_elements(self):
+        self.assert_parity("dns-row-add", {
+            "domain": "example.com",
+            "rdata": "v=spf1 include:<a&b> -all",
+            "empty": "",
+            "nested_empty": {},
+            "only_empty_list": {"server": []},
+            "list": [1, "", None, "x<y"],
+        })
+
+    def test_username_changes_are_picked_up(self):
+        self.assert_parity("ping", {"a": 1})
+        self.client.username = "other&user@example.com"
+        self.assert_parity("ping", {"a": 1})
+
+    def test_randomized_structures(self):
+        rng = random.Random(1234)
+        for _ in range(300):
+            data = {f"field{i}": random_value(rng) for i in range(rng.randrange(6))}
+            self.assert_parity("dns-row-add", data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Unit tests for cached availability results
+"""
+
+import json
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from wapi.commands.search import cmd_search
+from wapi.constants import EXIT_SUCCESS
+from wapi.exceptions import WAPIValidationError
+from wapi.utils.availability_cache import AvailabilityCache, normalize_domain
+from wapi.utils.validators import validate_age_seconds
+
+WHOIS_TEXT = "domain:       example.cz\nregistrar:    REG-WEDOS\n" + "% padding\n" * 200
+
+
+class TestAvailabilityCache(unittest.TestCase):
+    """Test TTLs, keys and storage"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "availability.sqlite3"
+        self.cache = AvailabilityCache(self.path, registered_ttl=3600, available_ttl=60)
+        self.addCleanup(self.cache.close)
+
+    def _age(self, domain, seconds):
+        self.cache.connect().execute("UPDATE results SET checked_at = ? WHERE domain = ?",
+                                     (time.time() - seconds, normalize_domain(domain)))
+
+    def test_round_trip_with_compressed_whois(self):
+        self.cache.put({"domain": "Example.CZ.", "available": False, "source": "wapi",
+                        "registrar": "REG-WEDOS", "whois": WHOIS_TEXT})
+        result = self.cache.get("example.cz")
+        self.assertEqual(result, {"domain": "Example.CZ.", "available": False, "source": "wapi",
+                                  "registrar": "REG-WEDOS", "whois": WHOIS_TEXT, "cached_age": 0})
+        stored = self.cache.connect().execute("SELECT length(whois) FROM results").fetchone()[0]
+        self.assertLess(stored, len(WHOIS_TEXT) / 5)
+
+    def test_idn_key(self):
+        self.assertEqual(normalize_domain("Příklad.CZ"), "xn--pklad-zsa96e.cz")
+
+    def test_positive_and_negative_ttls(self):
+        self.cache.put({"domain": "taken.cz", "available": False, "source": "wapi"})
+        self.cache.put({"domain": "free.cz", "available": True, "source": "wapi"})
+        self._age("taken.cz", 120)
+        self._age("free.cz", 120)
+        self.assertIsNotNone(self.cache.get("taken.cz"))
+        self.assertIsNone(self.cache.get("free.cz"))
+        self.assertIsNone(self.cache.get("taken.cz", max_age=60))
+
+    def test_expired_rows_are_dropped(self):
+        self.cache.put({"domain": "taken.cz", "available": False, "source": "wapi"})
+        self._age("taken.cz", 7200)
+        self.cache.connect().commit()
+        self.cache.close()
+        count = self.cache.connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_age_validator(self):
+        self.assertEqual(validate_age_seconds("15min"), (True, 900, None))
+        self.assertEqual(validate_age_seconds("7d")[1], 7 * 86400)
+        self.assertEqual(validate_age_seconds("45")[1], 45)
+        self.assertFalse(validate_age_seconds("3m")[0])
+
+
+class TestSearchCache(unittest.TestCase):
+    """cmd_search answers repeated searches from the cache"""
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.domain_availability.return_value = {
+            "response": {"code": "1000",
+                         "data": {"domain": {"name": "example.cz", "status": "registered"}}}}
+
+    def _search(self, **options):
+        args = SimpleNamespace(domain="example.cz", format="json", whois_server=None,
+                               whois_timeout=5, **options)
+        with patch("wapi.commands.search.perform_whois_lookup", return_value=WHOIS_TEXT) as whois, \
+                patch("builtins.print") as mock_print:
+            self.assertEqual(cmd_search(args, self.client), EXIT_SUCCESS)
+        return json.loads(mock_print.call_args[0][0]), whois
+
+    def test_second_search_is_cached(self):
+        first, _ = self._search()
+        second, whois = self._search()
+        whois.assert_not_called()
+        self.assertEqual(self.client.domain_availability.call_count, 1)
+        self.assertEqual(second.pop("cached_age"), 0)
+        self.assertEqual(second, first)
+
+    def test_refresh_and_max_age(self):
+        self._search()
+        _, whois = self._search(refresh=True)
+        whois.assert_called_once()
+        self._search(max_age="0")
+        self.assertEqual(self.client.domain_availability.call_count, 3)
+        self._search(max_age="1h")
+        self.assertEqual(self.client.domain_availability.call_count, 3)
+        with self.assertRaises(WAPIValidationError), patch("sys.stderr"):
+            self._search(max_age="soon")
+
+    def test_unusable_cache_does_not_break_search(self):
+        locked = sqlite3.OperationalError("locked")
+        with patch("wapi.commands.search.AvailabilityCache.get", side_effect=locked), \
+                patch("wapi.commands.search.AvailabilityCache.put", side_effect=locked):
+            payload, _ = self._search()
+        self.assertFalse(payload["available"])
+
+
+if __name__ == '__main__':
+    unittest.main()
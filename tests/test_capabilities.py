@@ -0,0 +1,128 @@
+"""
+Unit tests for per-command XML/JSON endpoint capabilities
+"""
+
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from wapi.api.capabilities import FormatCapabilities
+from wapi.api.client import WedosAPIClient
+from wapi.commands.search import cmd_search
+from wapi.constants import CAPABILITY_TTL, EXIT_SUCCESS
+from wapi.utils import metrics
+
+
+def _http_response(code):
+    response = MagicMock()
+    response.status_code = 200
+    response.raise_for_status.return_value = None
+    response.json.return_value = {"response": {"code": code, "result": "r"}}
+    response.text = f"<response><code>{code}</code><result>r</result></response>"
+    return response
+
+
+class TestFormatCapabilities(unittest.TestCase):
+    """Test format selection and persistence"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = f"{self.tmp.name}/capabilities.json"
+
+    def test_preferred_format(self):
+        caps = FormatCapabilities()
+        self.assertEqual(caps.preferred('ping', 'xml'), 'xml')
+        caps.mark_unsupported('domains-availability', 'xml')
+        self.assertEqual(caps.preferred('domains-availability', 'xml'), 'json')
+        # Both work: the faster one wins
+        caps.record_latency('domain-info', 'xml', 0.9)
+        caps.record_latency('domain-info', 'json', 0.3)
+        self.assertEqual(caps.preferred('domain-info', 'xml'), 'json')
+        # Neither works: keep the default
+        caps.mark_unsupported('bogus', 'xml')
+        caps.mark_unsupported('bogus', 'json')
+        self.assertEqual(caps.preferred('bogus', 'xml'), 'xml')
+
+    @patch('wapi.api.capabilities.LATENCY_SAMPLE_EVERY', 4)
+    def test_slower_format_is_sampled_and_can_win_again(self):
+        caps = FormatCapabilities()
+        caps.record_latency('domain-info', 'xml', 0.9)
+        caps.record_latency('domain-info', 'json', 0.3)
+        self.assertEqual([caps.preferred('domain-info', 'xml') for _ in range(8)],
+                         ['json', 'json', 'json', 'xml'] * 2)
+        # The JSON endpoint slowed down: the next XML sample shows it
+        for _ in range(5):
+            caps.record_latency('domain-info', 'json', 2.0)
+        caps.record_latency('domain-info', 'xml', 0.2)
+        self.assertEqual(caps.preferred('domain-info', 'xml'), 'xml')
+
+    def test_unsupported_marks_persist_and_expire(self):
+        caps = FormatCapabilities(self.path)
+        caps.mark_unsupported('domains-availability', 'xml')
+        self.assertTrue(FormatCapabilities(self.path).is_unsupported('domains-availability', 'xml'))
+        expired = time.time() + CAPABILITY_TTL + 1
+        with patch('wapi.api.capabilities.time.time', return_value=expired):
+            caps = FormatCapabilities(self.path)
+            self.assertFalse(caps.is_unsupported('domains-availability', 'xml'))
+
+    def test_success_clears_unsupported_mark(self):
+        caps = FormatCapabilities()
+        caps.mark_unsupported('ping', 'xml')
+        caps.record_latency('ping', 'xml', 0.1)
+        self.assertFalse(caps.is_unsupported('ping', 'xml'))
+
+
+class TestClientFormatFallback(unittest.TestCase):
+    """Test 2010 fallback and routing in WedosAPIClient"""
+
+    def setUp(self):
+        metrics.reset_metrics()
+        self.addCleanup(metrics.reset_metrics)
+        self.client = WedosAPIClient("user@example.com", "password",
+                                     base_url="https://api.test/wapi")
+
+    def _post(self, codes):
+        def fake_post(url, **kwargs):
+            return _http_response(codes[url.rsplit('/', 1)[1]])
+        return patch('requests.Session.post', side_effect=fake_post)
+
+    def test_unknown_command_falls_back_once_then_routes_directly(self):
+        with self._post({'xml': '2010', 'json': '1000'}) as mock_post:
+            first = self.client.call('domains-availability', {'name': 'example.cz'})
+            second = self.client.call('domains-availability', {'name': 'example.org'})
+        self.assertEqual((first['response']['code'], second['response']['code']), ('1000', '1000'))
+        urls = [c[0][0] for c in mock_post.call_args_list]
+        self.assertEqual(urls, ['https://api.test/wapi/xml', 'https://api.test/wapi/json',
+                                'https://api.test/wapi/json'])
+        self.assertEqual(metrics.get_counter('wapi.client.format_fallbacks'), 1)
+
+    def test_command_unknown_everywhere_costs_one_request_later(self):
+        with self._post({'xml': '2010', 'json': '2010'}) as mock_post:
+            self.client.call('domains-availability', {'name': 'example.cz'})
+            result = self.client.call('domains-availability', {'name': 'example.org'})
+        self.assertEqual(str(result['response']['code']), '2010')
+        self.assertEqual(mock_post.call_count, 3)
+
+
+class TestSearchUsesClientFallback(unittest.TestCase):
+    """cmd_search no longer builds a JSON client for 2010"""
+
+    def test_unknown_command_uses_domain_info(self):
+        client = MagicMock()
+        client.domain_availability.return_value = {
+            "response": {"code": "2010", "result": "Unknown command"}}
+        client.domain_info.return_value = {"response": {"code": "2303"}}
+        args = SimpleNamespace(domain="example.cz", format="json", whois_server=None,
+                               whois_timeout=1)
+        with patch('wapi.commands.search.WedosAPIClient') as client_cls, \
+                patch('wapi.commands.search.perform_whois_lookup') as whois:
+            self.assertEqual(cmd_search(args, client=client), EXIT_SUCCESS)
+        client_cls.assert_not_called()
+        whois.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+Tests for pluggable codec backends (stdlib, orjson, lxml) and their parity
+"""
+
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from wapi.api.client import WedosAPIClient
+from wapi.exceptions import WAPIRequestError
+from wapi.utils import codec
+from wapi.utils.formatters import format_json
+
+
+DOMAINS_XML = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<response><code>1000</code><result>OK</result><!-- listing -->'
+    '<data>'
+    + ''.join(
+        f'<domain><name>dom{i}.cz</name><status>ok</status>'
+        f'<expiration>2026-0{i % 9 + 1}-01</expiration><nsset>NS-{i}</nsset>'
+        f'<note>Příliš &amp; žluťoučký</note><empty/></domain>'
+        for i in range(200)
+    )
+    + '</data></response>'
+)
+
+WAPI_LIKE_DATA = {
+    "response": {
+        "code": 1000,
+        "result": "OK",
+        "data": {
+            "domain": [
+                {"name": f"dom{i}.cz", "status": "ok", "note": "Příliš žluťoučký \"kůň\"",
+                 "dns": {"server": [{"name": "ns1.example.com", "addr_ipv4": "192.0.2.1"}]},
+                 "empty": "", "nested": {}, "items": []}
+                for i in range(50)
+            ]
+        },
+    }
+}
+
+
+class TestCodecSelection(unittest.TestCase):
+    """WAPI_CODEC parsing and fallbacks"""
+
+    def tearDown(self):
+        codec.reset_codecs()
+
+    def test_stdlib_spec(self):
+        json_codec, xml_codec = codec.set_codecs("stdlib")
+        self.assertEqual(json_codec.name, "json")
+        self.assertEqual(xml_codec.name, "etree")
+
+    def test_auto_prefers_orjson_and_keeps_etree(self):
+        with patch.object(codec, 'ORJSON_AVAILABLE', True), \
+                patch.object(codec, 'LXML_AVAILABLE', True):
+            json_codec, xml_codec = codec.set_codecs("auto")
+        self.assertEqual(json_codec.name, "orjson")
+        self.assertEqual(xml_codec.name, "etree")
+
+    def test_missing_backend_falls_back(self):
+        with patch.object(codec, 'ORJSON_AVAILABLE', False), \
+                patch.object(codec, 'LXML_AVAILABLE', False):
+            json_codec, xml_codec = codec.set_codecs("orjson,lxml")
+        self.assertEqual(json_codec.name, "json")
+        self.assertEqual(xml_codec.name, "etree")
+
+    def test_unknown_token_ignored(self):
+        json_codec, xml_codec = codec.set_codecs("json, bogus")
+        self.assertEqual(json_codec.name, "json")
+        self.assertEqual(xml_codec.name, "etree")
+
+    def test_environment_override(self):
+        with patch.dict('os.environ', {codec.CODEC_ENV_VAR: "json"}):
+            codec.reset_codecs()
+            self.assertEqual(codec.get_json_codec().name, "json")
+
+
+@unittest.skipUnless(codec.ORJSON_AVAILABLE, "orjson not installed")
+class TestOrjsonParity(unittest.TestCase):
+    """orjson must produce the same data as the stdlib codec"""
+
+    def setUp(self):
+        self.fast = codec.OrjsonCodec()
+        self.std = codec.StdlibJSONCodec()
+
+    def tearDown(self):
+        codec.reset_codecs()
+
+    def test_dumps_round_trip(self):
+        self.assertEqual(json.loads(self.fast.dumps(WAPI_LIKE_DATA)), WAPI_LIKE_DATA)
+
+    def test_pretty_output_identical(self):
+        self.assertEqual(self.fast.dumps_pretty(WAPI_LIKE_DATA),
+                         self.std.dumps_pretty(WAPI_LIKE_DATA))
+
+    def test_unsupported_input_falls_back(self):
+        data = {1: "int key", "big": 2 ** 70}
+        self.assertEqual(self.fast.dumps_pretty(data), self.std.dumps_pretty(data))
+        self.assertEqual(self.fast.dumps(data), self.std.dumps(data))
+
+    def test_loads_identical(self):
+        text = self.std.dumps(WAPI_LIKE_DATA)
+        self.assertEqual(self.fast.loads(text), self.std.loads(text))
+        self.assertEqual(self.fast.loads(text.encode('utf-8')), self.std.loads(text))
+
+    def test_format_json_uses_selected_codec(self):
+        codec.set_codecs("orjson")
+        fast_output = format_json(WAPI_LIKE_DATA)
+        codec.set_codecs("stdlib")
+        self.assertEqual(fast_output, format_json(WAPI_LIKE_DATA))
+
+    @patch('wapi.api.client.calculate_auth', return_value="hash")
+    @patch('wapi.api.client.requests.Session.post')
+    def test_client_json_call(self, mock_post, _auth):
+        codec.set_codecs("orjson")
+        body = {"response": {"code": "1000", "result": "OK", "data": {"x": "ž"}}}
+        mock_response = MagicMock(status_code=200)
+        mock_response.content = json.dumps(body).encode('utf-8')
+        mock_post.return_value = mock_response
+
+        client = WedosAPIClient("user@example.com", "pw", use_json=True)
+        self.assertEqual(client.call("ping"), body)
+        request = json.loads(mock_post.call_args[1]['data']['request'])
+        self.assertEqual(request['command'], "ping")
+
+    @patch('wapi.api.client.calculate_auth', return_value="hash")
+    @patch('wapi.api.client.requests.Session.post')
+    def test_client_invalid_json(self, mock_post, _auth):
+        codec.set_codecs("orjson")
+        mock_response = MagicMock(status_code=200)
+        mock_response.content = b"<html>"
+        mock_post.return_value = mock_response
+
+        client = WedosAPIClient("user@example.com", "pw", use_json=True)
+        with self.assertRaises(WAPIRequestError):
+            client.call("ping")
+
+
+@unittest.skipUnless(codec.LXML_AVAILABLE, "lxml not installed")
+class TestLxmlParity(unittest.TestCase):
+    """lxml must produce the same dicts as ElementTree"""
+
+    def setUp(self):
+        self.client = WedosAPIClient("user@example.com", "pw")
+
+    def tearDown(self):
+        codec.reset_codecs()
+
+    def parse_with(self, spec, text):
+        codec.set_codecs(spec)
+        return self.client._parse_xml_response(text)
+
+    def test_domains_list_identical(self):
+        self.assertEqual(self.parse_with("lxml", DOMAINS_XML),
+                         self.parse_with("etree", DOMAINS_XML))
+
+    def test_wrapped_response_identical(self):
+        text = ('<wapi><response><code>2303</code>'
+                '<result>Object does not exist</result></response></wapi>')
+        self.assertEqual(self.parse_with("lxml", text), self.parse_with("etree", text))
+
+    def test_bytes_input(self):
+        codec.set_codecs("lxml")
+        root = codec.get_xml_codec().fromstring(DOMAINS_XML.encode('utf-8'))
+        self.assertEqual(root.tag, "response")
+
+    def test_parse_error(self):
+        codec.set_codecs("lxml")
+        with self.assertRaises(WAPIRequestError):
+            self.client._parse_xml_response("<response><code>")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -63,7 +63,7 @@ class TestDomainCommandsOperations(unittest.TestCase):
         self.mock_client.domain_info.assert_called_once_with('example.com')
         mock_format_output.assert_called_once()
 
-    @patch('wapi.commands.domain.format_output')
+    @patch('wapi.commands.domain.print_output')
     @patch('wapi.commands.domain.get_logger')
     def test_cmd_domain_list_success(self, mock_get_logger, mock_format_output):
         """Test successful domain list command"""
@@ -438,7 +438,7 @@ class TestCommandsOutputFormatting(unittest.TestCase):
         call_args = mock_format_output.call_args[0]
         self.assertEqual(call_args[1], 'json')
 
-    @patch('wapi.commands.dns.format_output')
+    @patch('wapi.commands.dns.print_output')
     @patch('wapi.commands.dns.get_logger')
     @patch('wapi.commands.dns.validate_domain')
     def test_dns_list_yaml_format(self, mock_validate, mock_get_logger, mock_format_output):
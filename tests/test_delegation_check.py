@@ -0,0 +1,91 @@
+"""
+Tests for the delegation check after domain update-ns, run against local root,
+TLD and child DNS stub servers
+"""
+
+import io
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from tests.dns_stub import DNSStub
+from wapi.commands.domain import cmd_domain_update_ns
+from wapi.constants import EXIT_SUCCESS
+from wapi.utils.dns_check import check_delegation, find_parent_servers
+
+
+class TestDelegationCheck(unittest.TestCase):
+    """Test the parent/child delegation check with a root, TLD and child stub"""
+
+    def setUp(self):
+        self.root = DNSStub()
+        try:
+            self.tld = DNSStub('127.0.0.2', self.root.port)
+            self.child = DNSStub('127.0.0.3', self.root.port)
+        except OSError:
+            self.root.close()
+            self.skipTest('127.0.0.2/127.0.0.3 are not available')
+        for stub in (self.root, self.tld, self.child):
+            self.addCleanup(stub.close)
+        self.root.referrals['cz'] = [('a.ns.nic.cz', '127.0.0.2')]
+        self.tld.referrals['example.cz'] = [('ns1.example.cz', '127.0.0.3')]
+        self.child.zone[('example.cz', 'NS')] = ['ns1.example.cz']
+        self.child.zone[('ns1.example.cz', 'A')] = ['127.0.0.3']
+        self.expected = [{'host': 'ns1.example.cz', 'ipv4': '127.0.0.3', 'ipv6': ''}]
+
+    def _check(self, expected):
+        return check_delegation('example.cz', expected, timeout=0.3, port=self.root.port,
+                                roots=['127.0.0.1'])
+
+    def test_walks_referrals_to_the_parent(self):
+        parents = find_parent_servers('example.cz', port=self.root.port, roots=['127.0.0.1'])
+        self.assertEqual(parents, [{'nameserver': 'a.ns.nic.cz', 'address': '127.0.0.2'}])
+
+    def test_consistent_delegation(self):
+        rows = self._check(self.expected)
+        self.assertEqual([(r['source'], r['server'], r['status']) for r in rows],
+                         [('parent', 'a.ns.nic.cz', 'ok'), ('child', 'ns1.example.cz', 'ok')])
+
+    def test_reports_stale_parent_and_wrong_glue(self):
+        # Submitted a second nameserver and a new address the parent does not publish yet
+        expected = [{'host': 'ns1.example.cz', 'ipv4': '127.0.0.9', 'ipv6': ''},
+                    {'host': 'ns2.example.net', 'ipv4': '127.0.0.3', 'ipv6': ''}]
+        rows = self._check(expected)
+        parent = rows[0]
+        self.assertEqual(parent['status'], 'mismatch')
+        self.assertIn('NS missing ns2.example.net', parent['detail'])
+        self.assertIn('glue ns1.example.cz A 127.0.0.3 (expected 127.0.0.9)', parent['detail'])
+        self.assertEqual([r['status'] for r in rows[1:]], ['error', 'mismatch'])
+
+    def test_update_ns_runs_check(self):
+        client = MagicMock()
+        client.domain_update_ns.return_value = {'response': {'code': '1000', 'result': 'OK'}}
+        args = SimpleNamespace(domain='example.cz', nsset=None,
+                               nameserver=['ns1.example.cz:127.0.0.3'], source_domain=None,
+                               wait=False, no_ipv6_discovery=True, check_delegation=True,
+                               format='json')
+        out = io.StringIO()
+        with patch('wapi.commands.domain.DNS_ROOT_SERVERS', ['127.0.0.1']), \
+                patch('wapi.commands.domain.DEFAULT_DNS_PORT', self.root.port), \
+                patch('wapi.commands.domain.refresh_index_domain'), redirect_stdout(out):
+            self.assertEqual(cmd_domain_update_ns(args, client), EXIT_SUCCESS)
+        self.assertIn('Delegation consistent', out.getvalue())
+
+    def test_update_ns_skips_check_while_pending(self):
+        client = MagicMock()
+        client.domain_update_ns.return_value = {'response': {'code': '1001', 'result': 'Pending'}}
+        args = SimpleNamespace(domain='example.cz', nsset='NSS-1', nameserver=None,
+                               source_domain=None, wait=False, no_ipv6_discovery=True,
+                               check_delegation=True, format='json')
+        err = io.StringIO()
+        with patch('wapi.commands.domain.check_delegation') as check, \
+                patch('wapi.commands.domain.refresh_index_domain'), \
+                redirect_stdout(io.StringIO()), redirect_stderr(err):
+            self.assertEqual(cmd_domain_update_ns(args, client), EXIT_SUCCESS)
+        check.assert_not_called()
+        self.assertIn('wapi dns health example.cz', err.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,7 +26,7 @@ class TestDNSListEdgeCases(unittest.TestCase):
         self.mock_client = Mock()
         self.mock_args = Mock()
 
-    @patch('wapi.commands.dns.format_output')
+    @patch('wapi.commands.dns.print_output')
     @patch('wapi.commands.dns.get_logger')
     @patch('wapi.commands.dns.validate_domain')
     def test_dns_list_servers_not_list(self, mock_validate, mock_get_logger, mock_format):
@@ -57,7 +57,7 @@ class TestDNSListEdgeCases(unittest.TestCase):
         self.assertEqual(result, EXIT_SUCCESS)
         mock_format.assert_called_once()
 
-    @patch('wapi.commands.dns.format_output')
+    @patch('wapi.commands.dns.print_output')
     @patch('wapi.commands.dns.get_logger')
     @patch('wapi.commands.dns.validate_domain')
     def test_dns_list_server_not_dict(self, mock_validate, mock_get_logger, mock_format):
@@ -186,7 +186,7 @@ class TestDNSRecordListEdgeCases(unittest.TestCase):
         self.mock_client = Mock()
         self.mock_args = Mock()
 
-    @patch('wapi.commands.dns.format_output')
+    @patch('wapi.commands.dns.print_output')
     @patch('wapi.commands.dns.get_logger')
     @patch('wapi.commands.dns.validate_domain')
     def test_dns_record_list_rows_not_list(self, mock_validate, mock_get_logger, mock_format):
@@ -0,0 +1,128 @@
+"""
+Tests for the portfolio DNS health scan (wapi dns health), run against local
+DNS stub servers
+"""
+
+import io
+import json
+import socket
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from tests.dns_stub import DNSStub
+from wapi.commands.health import cmd_dns_health
+from wapi.constants import EXIT_SUCCESS
+from wapi.utils.dns_check import ResolverCache, nameserver_summary, scan_health
+
+
+class TestDNSHealth(unittest.TestCase):
+    """Test the portfolio health scan"""
+
+    NAMESERVERS = [{'host': 'ns1.example.net', 'ipv4': '127.0.0.1', 'ipv6': ''},
+                   {'host': 'ns2.example.net', 'ipv4': '127.0.0.2', 'ipv6': ''}]
+
+    def setUp(self):
+        self.first = DNSStub()
+        try:
+            self.second = DNSStub('127.0.0.2', self.first.port)
+        except OSError:
+            self.first.close()
+            self.skipTest('127.0.0.2 is not available')
+        self.addCleanup(self.first.close)
+        self.addCleanup(self.second.close)
+
+    def _scan(self, domains, **kwargs):
+        rows = {}
+        for domain_rows in scan_health(domains, timeout=0.3, port=self.first.port, **kwargs):
+            rows[domain_rows[0]['domain']] = domain_rows
+        return rows
+
+    def test_detects_inconsistencies(self):
+        for stub in (self.first, self.second):
+            stub.serve_zone('good.cz', 5)
+            stub.serve_zone('drift.cz', 5 if stub is self.first else 4)
+            stub.serve_zone('mismatch.cz', 5, nameservers=['ns1.example.net', 'ns.old-provider.cz'])
+        self.first.serve_zone('lame.cz', 5)
+        rows = self._scan([(name, self.NAMESERVERS) for name in
+                           ('good.cz', 'drift.cz', 'lame.cz', 'mismatch.cz')] + [('empty.cz', [])])
+        self.assertEqual(rows['good.cz'][0]['issues'], '')
+        self.assertEqual([r['serial'] for r in rows['good.cz']], [5, 5])
+        self.assertIsNotNone(rows['good.cz'][0]['latency_ms'])
+        self.assertEqual(rows['drift.cz'][0]['issues'], 'serial-drift')
+        self.assertEqual(rows['lame.cz'][0]['issues'], 'lame')
+        self.assertEqual([r['status'] for r in rows['lame.cz']], ['ok', 'lame'])
+        self.assertEqual(rows['mismatch.cz'][0]['issues'], 'ns-mismatch')
+        self.assertEqual(rows['empty.cz'][0]['issues'], 'no-nameservers')
+
+    def test_non_authoritative_and_unreachable(self):
+        self.second.authoritative = False
+        for stub in (self.first, self.second):
+            stub.serve_zone('example.cz', 1,
+                            nameservers=[f"ns{i}.example.net" for i in range(1, 5)])
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(('127.0.0.3', self.first.port))
+        self.addCleanup(silent.close)
+        nameservers = self.NAMESERVERS + [
+            {'host': 'ns3.example.net', 'ipv4': '127.0.0.3', 'ipv6': ''},
+            {'host': 'ns4.example.net', 'ipv4': '', 'ipv6': ''},
+        ]
+        rows = self._scan([('example.cz', nameservers)], resolver=ResolverCache(lambda host: []))
+        self.assertEqual([r['status'] for r in rows['example.cz']],
+                         ['ok', 'lame', 'timeout', 'unresolved'])
+        self.assertEqual(rows['example.cz'][1]['detail'], 'not authoritative')
+        self.assertEqual(rows['example.cz'][0]['issues'], 'lame, unreachable')
+
+    def test_shared_resolver_and_per_server_cap(self):
+        lookups = []
+        resolver = ResolverCache(lambda host: lookups.append(host) or ['127.0.0.1'])
+        active = {'now': 0, 'max': 0}
+        lock = threading.Lock()
+
+        def fake_probe(address, zone, timeout, port):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.01)
+            with lock:
+                active['now'] -= 1
+            return {'status': 'ok', 'serial': 1, 'latency_ms': 10.0, 'ns': {'ns.example.net'},
+                    'detail': ''}
+
+        nameserver = {'host': 'ns.example.net', 'ipv4': '', 'ipv6': ''}
+        domains = [(f"d{i}.cz", [nameserver]) for i in range(40)]
+        with patch('wapi.utils.dns_check.probe_nameserver', side_effect=fake_probe):
+            batches = scan_health(domains, workers=16, per_server=3, resolver=resolver)
+            rows = [row for batch in batches for row in batch]
+        self.assertEqual(len(rows), 40)
+        self.assertEqual(lookups, ['ns.example.net'])
+        self.assertLessEqual(active['max'], 3)
+        summary = nameserver_summary(rows)
+        self.assertEqual(summary, [{'address': '127.0.0.1', 'nameserver': 'ns.example.net',
+                                    'probes': 40, 'failures': 0, 'avg_ms': 10.0, 'p95_ms': 10.0,
+                                    'max_ms': 10.0}])
+
+    def test_command_streams_rows(self):
+        self.first.serve_zone('example.cz', 3, nameservers=['ns1.example.net'])
+        client = MagicMock()
+        client.call.return_value = {'response': {'code': '1000', 'data': {'domain': [
+            {'name': 'example.cz'}, {'name': 'example.com'}]}}}
+        client.domain_info.return_value = {'response': {'code': '1000', 'data': {'domain': {
+            'dns': {'server': [{'name': 'ns1.example.net', 'addr_ipv4': '127.0.0.1'}]}}}}}
+        args = SimpleNamespace(domains=[], file=None, tld='cz', issues_only=False, workers=4,
+                               per_server=2, timeout=0.5, format='ndjson', quiet=True)
+        out = io.StringIO()
+        with patch('wapi.commands.health.DEFAULT_DNS_PORT', self.first.port), redirect_stdout(out):
+            self.assertEqual(cmd_dns_health(args, client), EXIT_SUCCESS)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(rows, [{'domain': 'example.cz', 'nameserver': 'ns1.example.net',
+                                 'address': '127.0.0.1', 'status': 'ok', 'serial': 3,
+                                 'latency_ms': rows[0]['latency_ms'], 'issues': '', 'detail': ''}])
+        client.domain_info.assert_called_once_with('example.cz')
+
+
+if __name__ == '__main__':
+    unittest.main()
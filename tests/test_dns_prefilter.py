@@ -0,0 +1,70 @@
+"""
+Tests for the DNS delegation pre-filter of availability checks, run against
+local root and TLD DNS stub servers
+"""
+
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from tests.dns_stub import DNSStub
+from wapi.commands.search import cmd_search
+from wapi.constants import EXIT_SUCCESS
+from wapi.utils.dns_check import prefilter_delegations, zone_servers
+
+
+class TestPrefilter(unittest.TestCase):
+    """Test the delegation pre-filter with a root and a TLD stub"""
+
+    def setUp(self):
+        self.root = DNSStub()
+        try:
+            self.tld = DNSStub('127.0.0.2', self.root.port)
+        except OSError:
+            self.root.close()
+            self.skipTest('127.0.0.2 is not available')
+        for stub in (self.root, self.tld):
+            self.addCleanup(stub.close)
+        self.root.referrals['cz'] = [('a.ns.nic.cz', '127.0.0.2')]
+        self.tld.referrals['taken.cz'] = [('ns1.hosting.net', ''), ('ns2.hosting.net', '')]
+        self.tld.referrals['other.cz'] = [('ns.other.cz', '127.0.0.9')]
+
+    def _prefilter(self, domains, **kwargs):
+        kwargs.update(timeout=0.3, port=self.root.port, roots=['127.0.0.1'])
+        return prefilter_delegations(domains, **kwargs)
+
+    def test_zone_servers(self):
+        self.assertEqual(zone_servers('cz', port=self.root.port, roots=['127.0.0.1']),
+                         [{'nameserver': 'a.ns.nic.cz', 'address': '127.0.0.2'}])
+
+    def test_delegated_names_are_registered(self):
+        results = self._prefilter(['taken.cz', 'free.cz', 'Other.CZ'])
+        self.assertEqual(results, [('taken.cz', ['ns1.hosting.net', 'ns2.hosting.net']),
+                                   ('free.cz', None), ('Other.CZ', ['ns.other.cz'])])
+        # The TLD servers are looked up once for all candidates
+        self.assertEqual(self.root.queries.count(('cz', 'NS')), 2)
+
+    def test_unreachable_parent_leaves_names_undetermined(self):
+        self.assertEqual(self._prefilter(['taken.sk', 'free.sk']),
+                         [('taken.sk', None), ('free.sk', None)])
+
+    def test_search_skips_lookups_for_delegated_names(self):
+        client = MagicMock()
+        out = io.StringIO()
+        args = SimpleNamespace(domain='taken.cz', format='json', whois_server=None, whois_timeout=5,
+                               dns_prefilter=True)
+        with patch('wapi.commands.search.prefilter_delegations', side_effect=self._prefilter), \
+                patch('wapi.commands.search.perform_whois_lookup') as whois, redirect_stdout(out):
+            self.assertEqual(cmd_search(args, client), EXIT_SUCCESS)
+        self.assertEqual(json.loads(out.getvalue()),
+                         {'domain': 'taken.cz', 'available': False, 'source': 'dns',
+                          'nameservers': ['ns1.hosting.net', 'ns2.hosting.net']})
+        client.domain_availability.assert_not_called()
+        whois.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Tests for the DNS wire client, authoritative verification and --verify-dns,
+run against local DNS stub servers
+"""
+
+import socket
+import struct
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from tests.dns_stub import DNSStub, encode_name
+from wapi.commands.dns import cmd_dns_record_add, cmd_dns_record_delete
+from wapi.constants import EXIT_SUCCESS
+from wapi.exceptions import WAPITimeoutError
+from wapi.utils.dns_check import record_owner, server_targets, soa_serials, verify_rrset
+from wapi.utils.dns_wire import (
+    build_query,
+    normalize_rdata,
+    parse_response,
+    query,
+    serial_newer,
+    soa_serial,
+)
+
+
+class TestDNSWire(unittest.TestCase):
+    """Test message encoding and decoding"""
+
+    def setUp(self):
+        self.stub = DNSStub(zone={
+            ('example.cz', 'A'): ['192.0.2.1'],
+            ('example.cz', 'TXT'): ['v=spf1 -all'],
+            ('www.example.cz', 'AAAA'): ['2001:db8::1'],
+        })
+        self.stub.set_serial('example.cz', 2026010101)
+        self.addCleanup(self.stub.close)
+
+    def test_query_against_stub(self):
+        response = query('127.0.0.1', 'Example.CZ.', 'A', timeout=1, port=self.stub.port)
+        self.assertTrue(response.authoritative)
+        self.assertEqual(response.rdatas('A', 'example.cz'), ['192.0.2.1'])
+        self.assertEqual(query('127.0.0.1', 'example.cz', 'TXT', port=self.stub.port).rdatas('TXT'),
+                         ['"v=spf1 -all"'])
+        aaaa = query('127.0.0.1', 'www.example.cz', 'AAAA', port=self.stub.port)
+        self.assertEqual(aaaa.rdatas('AAAA'), ['2001:db8::1'])
+        soa = query('127.0.0.1', 'example.cz', 'SOA', port=self.stub.port)
+        self.assertEqual(soa_serial(soa), 2026010101)
+        # Queries are non-recursive
+        self.assertEqual(struct.unpack('!H', build_query('example.cz', 'A', 1)[2:4])[0] & 0x0100, 0)
+
+    def test_compressed_names(self):
+        question = encode_name('example.cz') + struct.pack('!HH', 15, 1)
+        # MX rdata: preference + "mail" label + pointer to example.cz at offset 12
+        rdata = struct.pack('!H', 10) + b'\x04mail\xc0\x0c'
+        answer = b'\xc0\x0c' + struct.pack('!HHIH', 15, 1, 300, len(rdata)) + rdata
+        message = struct.pack('!HHHHHH', 7, 0x8400, 1, 1, 0, 0) + question + answer
+        self.assertEqual(parse_response(message).rdatas('MX', 'example.cz'), ['10 mail.example.cz'])
+
+    def test_timeout(self):
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(('127.0.0.1', 0))
+        self.addCleanup(silent.close)
+        with self.assertRaises(WAPITimeoutError):
+            query('127.0.0.1', 'example.cz', 'A', timeout=0.1, port=silent.getsockname()[1])
+
+    def test_normalization_and_serials(self):
+        self.assertEqual(normalize_rdata('TXT', '"v=spf1 " "-all"'),
+                         normalize_rdata('TXT', 'v=spf1 -all'))
+        self.assertEqual(normalize_rdata('AAAA', '2001:DB8:0::1'), '2001:db8::1')
+        self.assertEqual(normalize_rdata('MX', '10 Mail.Example.cz.'), '10 mail.example.cz')
+        self.assertTrue(serial_newer(2, 1))
+        self.assertTrue(serial_newer(1, 2 ** 32 - 1))
+        self.assertFalse(serial_newer(5, 5))
+        self.assertEqual(record_owner('example.cz', '@'), 'example.cz')
+        self.assertEqual(record_owner('example.cz', 'www'), 'www.example.cz')
+
+
+class TestVerifyRRset(unittest.TestCase):
+    """Test concurrent verification against several stub servers"""
+
+    def setUp(self):
+        self.first = DNSStub()
+        try:
+            self.second = DNSStub('127.0.0.2', self.first.port)
+        except OSError:
+            self.first.close()
+            self.skipTest('127.0.0.2 is not available')
+        for stub in (self.first, self.second):
+            stub.set_serial('example.cz', 100)
+            self.addCleanup(stub.close)
+        self.targets = [{'nameserver': 'ns1.example.cz', 'address': '127.0.0.1'},
+                        {'nameserver': 'ns2.example.cz', 'address': '127.0.0.2'}]
+
+    def _publish(self, stub, serial=101):
+        stub.zone[('www.example.cz', 'A')] = ['192.0.2.7']
+        stub.set_serial('example.cz', serial)
+
+    def test_returns_when_all_servers_serve_the_change(self):
+        baseline = soa_serials(self.targets, 'example.cz', port=self.first.port)
+        self.assertEqual(baseline, {'127.0.0.1': 100, '127.0.0.2': 100})
+        self._publish(self.first)
+        timer = threading.Timer(0.2, self._publish, args=(self.second,))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        results = verify_rrset(self.targets, 'example.cz', 'www.example.cz', 'A', '192.0.2.7',
+                               min_serials=baseline, timeout=5, interval=0.05, port=self.first.port)
+        self.assertEqual([r['status'] for r in results], ['ok', 'ok'])
+        self.assertEqual([r['serial'] for r in results], [101, 101])
+
+    def test_record_without_serial_bump_is_not_accepted(self):
+        self.first.zone[('www.example.cz', 'A')] = ['192.0.2.7']
+        self._publish(self.second)
+        results = verify_rrset(self.targets, 'example.cz', 'www.example.cz', 'A', '192.0.2.7',
+                               min_serials={'127.0.0.1': 100, '127.0.0.2': 100},
+                               timeout=0.3, interval=0.05, port=self.first.port)
+        self.assertEqual([r['status'] for r in results], ['pending', 'ok'])
+        self.assertIn('not newer', results[0]['detail'])
+
+    def test_removal(self):
+        results = verify_rrset(self.targets, 'example.cz', 'www.example.cz', 'A', '192.0.2.7',
+                               present=False, timeout=1, interval=0.05, port=self.first.port)
+        self.assertEqual([r['status'] for r in results], ['ok', 'ok'])
+
+
+class TestVerifyDNSCommand(unittest.TestCase):
+    """Test --verify-dns on dns record add/delete"""
+
+    def setUp(self):
+        self.stub = DNSStub()
+        self.stub.set_serial('example.cz', 7)
+        self.addCleanup(self.stub.close)
+        patcher = patch('wapi.commands.dns.DEFAULT_DNS_PORT', self.stub.port)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = MagicMock()
+        self.client.domain_info.return_value = {'response': {'code': '1000', 'data': {'domain': {
+            'dns': {'server': [{'name': 'ns1.example.cz', 'addr_ipv4': '127.0.0.1'}]}}}}}
+
+    def _args(self, **kwargs):
+        defaults = dict(domain='example.cz', name='www', type='a', value='192.0.2.9', ttl=300,
+                        wait=False, verify_dns=True, verify_timeout=2, format='json', id='5')
+        defaults.update(kwargs)
+        return SimpleNamespace(**defaults)
+
+    def test_add_waits_for_authoritative_servers(self):
+        def apply_write(command, data):
+            # WEDOS accepts the row asynchronously; the nameserver picks it up a bit later
+            def publish():
+                self.stub.zone[('www.example.cz', 'A')] = ['192.0.2.9']
+                self.stub.set_serial('example.cz', 8)
+
+            threading.Timer(0.1, publish).start()
+            return {'response': {'code': '1001', 'result': 'Started'}}
+
+        self.client.call.side_effect = apply_write
+        with patch('wapi.utils.dns_check.time.sleep',
+                   side_effect=lambda s: threading.Event().wait(0.05)):
+            result = cmd_dns_record_add(self._args(verify_timeout=10), self.client)
+        self.assertEqual(result, EXIT_SUCCESS)
+        # dns-rows-list is never polled through WAPI
+        self.assertEqual([c[0][0] for c in self.client.call.call_args_list], ['dns-row-add'])
+
+    def test_delete_timeout_names_lagging_servers(self):
+        self.stub.zone[('www.example.cz', 'A')] = ['192.0.2.9']
+
+        def call(command, data):
+            if command == 'dns-rows-list':
+                return {'response': {'code': '1000', 'data': {'row': [
+                    {'ID': '5', 'name': 'www', 'rdtype': 'A', 'rdata': '192.0.2.9'}]}}}
+            return {'response': {'code': '1000', 'result': 'OK'}}
+
+        self.client.call.side_effect = call
+        with patch('wapi.utils.dns_check.time.sleep'):
+            with self.assertRaises(WAPITimeoutError) as ctx:
+                cmd_dns_record_delete(self._args(verify_timeout=0.01), self.client)
+        self.assertIn('ns1.example.cz', str(ctx.exception))
+
+    def test_unresolvable_nameserver(self):
+        with patch('wapi.utils.dns_check.socket.getaddrinfo', side_effect=socket.gaierror('nope')):
+            self.assertEqual(server_targets([{'host': 'ns.invalid', 'ipv4': '', 'ipv6': ''}]),
+                             [{'nameserver': 'ns.invalid', 'address': ''}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -64,7 +64,7 @@ class TestDomainListComprehensive(unittest.TestCase):
         self.mock_client = Mock()
         self.mock_args = Mock()
 
-    @patch('wapi.commands.domain.format_output')
+    @patch('wapi.commands.domain.print_output')
     @patch('wapi.commands.domain.get_logger')
     def test_domain_list_single_domain(self, mock_get_logger, mock_format_output):
         """Test domain list with single domain (not a list)"""
@@ -91,7 +91,7 @@ class TestDomainListComprehensive(unittest.TestCase):
         self.assertEqual(result, EXIT_SUCCESS)
         mock_format_output.assert_called_once()
 
-    @patch('wapi.commands.domain.format_output')
+    @patch('wapi.commands.domain.print_output')
     @patch('wapi.commands.domain.get_logger')
     def test_domain_list_with_tld_filter(self, mock_get_logger, mock_format_output):
         """Test domain list with TLD filter"""
@@ -124,7 +124,7 @@ class TestDomainListComprehensive(unittest.TestCase):
         # Should only contain .cz domains
         self.assertTrue(all(d['name'].endswith('.cz') for d in filtered_domains))
 
-    @patch('wapi.commands.domain.format_output')
+    @patch('wapi.commands.domain.print_output')
     @patch('wapi.commands.domain.get_logger')
     def test_domain_list_with_status_filter(self, mock_get_logger, mock_format_output):
         """Test domain list with status filter"""
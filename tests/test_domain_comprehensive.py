@@ -59,7 +59,7 @@ class TestDomainListComprehensive(unittest.TestCase):
         self.mock_client = Mock()
         self.mock_args = Mock()
 
-    @patch('wapi.commands.domain.format_output')
+    @patch('wapi.commands.domain.print_output')
     @patch('wapi.commands.domain.get_logger')
     def test_domain_list_single_domain_dict(self, mock_get_logger, mock_format_output):
         """Test domain list with single domain dict (not a list)"""
@@ -86,7 +86,7 @@ class TestDomainListComprehensive(unittest.TestCase):
         self.assertEqual(result, EXIT_SUCCESS)
         mock_format_output.assert_called_once()
 
-    @patch('wapi.commands.domain.format_output')
+    @patch('wapi.commands.domain.print_output')
     @patch('wapi.commands.domain.get_logger')
     def test_domain_list_non_dict_domain(self, mock_get_logger, mock_format_output):
         """Test domain list with non-dict domain entries"""
@@ -51,7 +51,7 @@ class TestFinal100PercentCoverage(unittest.TestCase):
 
     # --- wapi/commands/contact.py (Missing: 85) ---
 
-    @patch('wapi.commands.contact.format_output', return_value="formatted output")
+    @patch('wapi.commands.contact.print_output', return_value="formatted output")
     def test_contact_list_contacts_not_list(self, mock_format_output):
         """Test cmd_contact_list when API returns contact as non-list (line 85)"""
         client = Mock()
@@ -69,7 +69,7 @@ class TestFinal100PercentCoverage(unittest.TestCase):
 
     # --- wapi/commands/nsset.py (Missing: 219) ---
 
-    @patch('wapi.commands.nsset.format_output', return_value="formatted output")
+    @patch('wapi.commands.nsset.print_output', return_value="formatted output")
     def test_nsset_list_nssets_not_list(self, mock_format_output):
         """Test cmd_nsset_list when API returns nsset as non-list (line 219)"""
         client = Mock()
@@ -62,9 +62,10 @@ class TestFormatters100(unittest.TestCase):
             'items': ['item1', 'item2']  # List value triggers line 97
         }
         result = format_xml(data)
-        # Should show ... for list values
-        self.assertIn('items', result)
-        self.assertIn('...', result)
+        # List values become <items_list> with one <items> per element
+        self.assertIn('<items_list>', result)
+        self.assertIn('<items>item1</items>', result)
+        self.assertNotIn('<!--', result)
 
     def test_format_xml_dict_with_dict_value(self):
         """Test format_xml with dict containing nested dict value (line 97)"""
@@ -73,9 +74,10 @@ class TestFormatters100(unittest.TestCase):
             'nested': {'key': 'value'}  # Nested dict triggers line 97
         }
         result = format_xml(data)
-        # Should show ... for nested dict
-        self.assertIn('nested', result)
-        self.assertIn('...', result)
+        # Nested dicts become child elements
+        self.assertIn('<nested>', result)
+        self.assertIn('<key>value</key>', result)
+        self.assertNotIn('<!--', result)
 
     def test_format_output_value_error(self):
         """Test format_output with ValueError (line 150-155)"""
@@ -0,0 +1,171 @@
+"""
+Unit tests for streaming output formatters (ndjson, csv, fixed)
+"""
+
+import csv
+import io
+import json
+import unittest
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from wapi.commands.domain import cmd_domain_list
+from wapi.utils.formatters import (
+    format_output,
+    is_streaming_format,
+    iter_csv,
+    iter_fixed_table,
+    iter_format,
+    iter_ndjson,
+    iter_xml,
+    print_output,
+    write_output,
+)
+
+
+def _records(count):
+    for i in range(count):
+        yield {'name': f'domain{i}.cz', 'status': 'active', 'nsset': None}
+
+
+class TestNDJSON(unittest.TestCase):
+    """Test NDJSON output"""
+
+    def test_one_line_per_record(self):
+        lines = list(iter_ndjson(_records(3)))
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0]),
+                         {'name': 'domain0.cz', 'status': 'active', 'nsset': None})
+        self.assertTrue(all(line.endswith('\n') for line in lines))
+
+    def test_single_dict_is_one_record(self):
+        self.assertEqual(format_output({'a': 1}, 'ndjson'), '{"a": 1}')
+
+    def test_consumes_generator_lazily(self):
+        consumed = []
+
+        def produce():
+            for record in _records(5):
+                consumed.append(record)
+                yield record
+
+        chunks = iter_format(produce(), 'ndjson')
+        next(chunks)
+        self.assertEqual(len(consumed), 1)
+
+
+class TestCSV(unittest.TestCase):
+    """Test CSV output"""
+
+    def test_headers_and_quoting(self):
+        data = [{'name': 'a,b.cz', 'status': 'ok', 'extra': 'x'}]
+        output = format_output(data, 'csv', headers=['name', 'status'])
+        rows = list(csv.reader(io.StringIO(output)))
+        self.assertEqual(rows, [['name', 'status'], ['a,b.cz', 'ok']])
+
+    def test_headers_from_first_record(self):
+        lines = list(iter_csv(_records(2)))
+        self.assertEqual(lines[0], 'name,status,nsset\n')
+        self.assertEqual(lines[1], 'domain0.cz,active,\n')
+
+    def test_nested_values_are_json(self):
+        output = format_output([{'dns': {'server': ['ns1']}}], 'csv')
+        rows = list(csv.reader(io.StringIO(output)))
+        self.assertEqual(json.loads(rows[1][0]), {'server': ['ns1']})
+
+    def test_empty_without_headers(self):
+        self.assertEqual(list(iter_csv([])), [])
+
+
+class TestFixedTable(unittest.TestCase):
+    """Test fixed-width table output"""
+
+    def test_columns_aligned(self):
+        lines = list(iter_fixed_table([{'a': 'x', 'b': 'y'}, {'a': 'long', 'b': 'z'}]))
+        self.assertEqual(lines, ['a     b\n', '----  -\n', 'x     y\n', 'long  z\n'])
+
+    def test_widths_from_sample_only(self):
+        data = [{'name': 'ab'}, {'name': 'abcdefgh'}]
+        lines = list(iter_fixed_table(data, sample_size=1))
+        self.assertEqual(lines[0], 'name\n')
+        self.assertEqual(lines[3], 'abc…\n')
+
+    def test_max_width(self):
+        lines = list(iter_fixed_table([{'v': 'x' * 100}], max_width=10))
+        self.assertEqual(lines[2], 'x' * 9 + '…\n')
+
+    def test_empty(self):
+        self.assertEqual(list(iter_fixed_table([])), [])
+        self.assertEqual(list(iter_fixed_table([], headers=['a'])), ['a\n', '-\n'])
+
+
+class TestXML(unittest.TestCase):
+    """Test incremental XML output"""
+
+    def test_escaped_and_well_formed(self):
+        data = {'name': 'a<b>&"c"', 'dns': {'server': [{'name': 'ns1'}, {'name': 'ns2'}]},
+                'note': None, 'bad key': 1}
+        root = ET.fromstring(format_output(data, 'xml').encode('utf-8'))
+        self.assertEqual(root.find('name').text, 'a<b>&"c"')
+        self.assertEqual([e.text for e in root.iter('name')][1:], ['ns1', 'ns2'])
+        self.assertIsNotNone(root.find('note'))
+        self.assertEqual(root.find('bad_key').text, '1')
+
+    def test_generator_records(self):
+        stream = io.StringIO()
+        write_output(_records(3), 'xml', stream=stream)
+        root = ET.fromstring(stream.getvalue().encode('utf-8'))
+        self.assertEqual([item.find('name').text for item in root.findall('item')],
+                         ['domain0.cz', 'domain1.cz', 'domain2.cz'])
+
+    def test_deep_nesting_without_recursion(self):
+        data = {}
+        node = data
+        for _ in range(5000):
+            node['n'] = {}
+            node = node['n']
+        lines = list(iter_xml(data))
+        self.assertEqual(len(lines), 2 + 2 * 5000 + 1)
+
+
+class TestWriteOutput(unittest.TestCase):
+    """Test write_output and format routing"""
+
+    def test_streaming_format_detection(self):
+        self.assertTrue(is_streaming_format('NDJSON'))
+        self.assertTrue(is_streaming_format('fixed'))
+        self.assertFalse(is_streaming_format('table'))
+        self.assertFalse(is_streaming_format(None))
+
+    def test_buffered_formats_accept_generators(self):
+        stream = io.StringIO()
+        write_output(_records(2), 'json', stream=stream)
+        self.assertEqual(len(json.loads(stream.getvalue())), 2)
+
+    def test_print_output(self):
+        stream = io.StringIO()
+        with patch('sys.stdout', stream):
+            print_output(_records(2), 'ndjson')
+        self.assertEqual(len(stream.getvalue().splitlines()), 2)
+        with patch('builtins.print') as mock_print:
+            print_output(_records(2), 'json')
+        self.assertEqual(len(json.loads(mock_print.call_args[0][0])), 2)
+
+    def test_domain_list_streams(self):
+        client = Mock()
+        client.call.return_value = {'response': {'code': '1000', 'data': {'domain': [
+            {'name': 'a.cz', 'status': 'active', 'expiration': '2030-01-01', 'nsset': 'NS1'},
+            {'name': 'b.com', 'status': 'active', 'expiration': '2030-01-01', 'nsset': 'NS2'},
+        ]}}}
+        args = SimpleNamespace(format='ndjson', tld='cz', status=None)
+        stream = io.StringIO()
+        with patch('sys.stdout', stream):
+            self.assertEqual(cmd_domain_list(args, client), 0)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['name'], 'a.cz')
+
+
+if __name__ == '__main__':
+    unittest.main()
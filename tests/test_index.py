@@ -0,0 +1,217 @@
+"""
+Unit tests for the local portfolio index (wapi index sync, --from-index)
+"""
+
+import io
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from wapi.commands.contact import cmd_contact_list
+from wapi.commands.dns import cmd_dns_record_list
+from wapi.commands.domain import cmd_domain_info, cmd_domain_list
+from wapi.commands.helpers import open_index
+from wapi.commands.index import cmd_index_status, cmd_index_sync, sync_index
+from wapi.config import get_index_path
+from wapi.constants import EXIT_SUCCESS
+from wapi.exceptions import WAPIRequestError
+from wapi.utils.index import PortfolioIndex, domain_list_hash
+
+
+def _ok(data):
+    return {'response': {'code': '1000', 'result': 'OK', 'data': data}}
+
+
+class FakeClient:
+    """Minimal WAPI client serving a mutable portfolio"""
+
+    def __init__(self, domains):
+        self.domains = domains
+        self.calls = []
+        self.failing = {}
+
+    def call(self, command, data):
+        self.calls.append((command, data.get('domain')))
+        if command == 'domains-list':
+            return _ok({'domain': list(self.domains)})
+        if command == 'dns-rows-list':
+            if data['domain'] in self.failing:
+                return {'response': {'code': self.failing[data['domain']], 'result': 'Error'}}
+            return _ok({'row': [{'ID': '1', 'name': 'www', 'ttl': '300', 'rdtype': 'A',
+                                 'rdata': f"192.0.2.{len(data['domain'])}"}]})
+        if command == 'nsset-list':
+            return _ok({'nsset': {'name': 'NS-A', 'tld': 'cz'}})
+        if command == 'contact-list':
+            return _ok({'contact': [{'handle': 'C1', 'email': 'a@example.com'}]})
+        return {'response': {'code': '2000', 'result': 'Unknown command'}}
+
+    def domain_info(self, name):
+        self.calls.append(('domain-info', name))
+        if self.failing.get(name) == 'info':
+            raise WAPIRequestError("Connection reset")
+        record = next(d for d in self.domains if d['name'] == name)
+        return _ok({'domain': dict(record, own_email='owner@example.com',
+                                   dns={'server': [{'name': 'ns1.example.net'}]})})
+
+    def detail_calls(self):
+        return sorted(name for command, name in self.calls if command == 'domain-info')
+
+
+def _domains():
+    return [
+        {'name': 'alpha.cz', 'status': 'active', 'expiration': '2030-01-01', 'nsset': 'NS-A'},
+        {'name': 'beta.com', 'status': 'active', 'expiration': '2027-05-01', 'nsset': 'NS-B'},
+        {'name': 'gamma.cz', 'status': 'expired', 'expiration': '2024-01-01', 'nsset': 'NS-A'},
+    ]
+
+
+class TestSyncIndex(unittest.TestCase):
+    """Test incremental sync"""
+
+    def setUp(self):
+        self.client = FakeClient(_domains())
+        self.index = open_index(create=True)
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_first_sync_fetches_everything(self):
+        stats = sync_index(self.client, self.index, workers=2)
+        self.assertEqual(stats['domains'], 3)
+        self.assertEqual(stats['refetched'], 3)
+        self.assertEqual(stats['nssets'], 1)
+        self.assertEqual(stats['contacts'], 1)
+        self.assertEqual(self.client.detail_calls(), ['alpha.cz', 'beta.com', 'gamma.cz'])
+        info = self.index.get_domain_info('alpha.cz')
+        self.assertEqual(info['own_email'], '[HIDDEN]')
+        self.assertEqual(self.index.get_dns_rows('beta.com')[0]['type'], 'A')
+        self.assertEqual(list(self.index.iter_contacts())[0]['email'], '[HIDDEN]')
+
+    def test_resync_refetches_only_changed(self):
+        sync_index(self.client, self.index)
+        self.client.calls.clear()
+        self.client.domains[1]['expiration'] = '2028-05-01'
+        del self.client.domains[2]
+
+        stats = sync_index(self.client, self.index)
+        self.assertEqual(self.client.detail_calls(), ['beta.com'])
+        self.assertEqual(stats['unchanged'], 1)
+        self.assertEqual(stats['removed'], 1)
+        self.assertEqual([d['name'] for d in self.index.iter_domains()], ['alpha.cz', 'beta.com'])
+        self.assertEqual(self.index.get_dns_rows('gamma.cz'), [])
+
+    def test_failed_detail_fetch_keeps_data_and_is_retried(self):
+        sync_index(self.client, self.index)
+        self.client.domains[0]['status'] = 'locked'
+        self.client.domains[1]['status'] = 'locked'
+        self.client.failing = {'alpha.cz': 'info', 'beta.com': '2051'}
+        self.client.calls.clear()
+
+        stats = sync_index(self.client, self.index)
+        self.assertEqual(stats['refetched'], 1)
+        self.assertEqual(self.index.get_domain_info('alpha.cz')['status'], 'active')
+        self.assertEqual(len(self.index.get_dns_rows('beta.com')), 1)
+
+        self.client.failing = {}
+        self.client.calls.clear()
+        sync_index(self.client, self.index)
+        self.assertEqual(self.client.detail_calls(), ['alpha.cz', 'beta.com'])
+        self.assertEqual(self.index.get_domain_info('alpha.cz')['status'], 'locked')
+
+    def test_domain_without_dns_zone_has_no_rows(self):
+        sync_index(self.client, self.index)
+        self.client.domains[0]['status'] = 'locked'
+        self.client.failing = {'alpha.cz': '2303'}
+        sync_index(self.client, self.index)
+        self.assertEqual(self.index.get_dns_rows('alpha.cz'), [])
+        self.client.calls.clear()
+        sync_index(self.client, self.index)
+        self.assertEqual(self.client.detail_calls(), [])
+
+    def test_full_sync(self):
+        sync_index(self.client, self.index)
+        self.client.calls.clear()
+        sync_index(self.client, self.index, full=True)
+        self.assertEqual(len(self.client.detail_calls()), 3)
+
+    def test_domains_list_failure(self):
+        client = Mock()
+        client.call.return_value = {'response': {'code': '2000', 'result': 'Error'}}
+        with self.assertRaises(WAPIRequestError):
+            sync_index(client, self.index)
+
+    def test_list_hash_tracks_list_fields(self):
+        record = _domains()[0]
+        changed = dict(record, status='expired')
+        self.assertNotEqual(domain_list_hash(record), domain_list_hash(changed))
+        self.assertEqual(domain_list_hash(record), domain_list_hash(dict(record, extra='x')))
+
+
+class TestFromIndexCommands(unittest.TestCase):
+    """Test list commands answering from the index"""
+
+    def setUp(self):
+        with open_index(create=True) as index:
+            sync_index(FakeClient(_domains()), index)
+
+    def _run(self, func, **kwargs):
+        kwargs.setdefault('format', 'json')
+        args = SimpleNamespace(from_index=True, **kwargs)
+        stream = io.StringIO()
+        with patch('sys.stdout', stream):
+            self.assertEqual(func(args, None), EXIT_SUCCESS)
+        return stream.getvalue()
+
+    def test_domain_list_filters(self):
+        output = self._run(cmd_domain_list, tld='cz', status='active')
+        self.assertIn('alpha.cz', output)
+        self.assertNotIn('gamma.cz', output)
+        self.assertNotIn('beta.com', output)
+
+    def test_lists_stream_from_the_open_index(self):
+        names = []
+
+        def consume(records, format_type, headers=None):
+            # Records are consumed lazily, while the index is still open
+            self.assertNotIsInstance(records, list)
+            names.extend(record['name'] for record in records)
+
+        with patch('wapi.commands.domain.print_output', side_effect=consume):
+            self._run(cmd_domain_list)
+        self.assertEqual(names, ['alpha.cz', 'beta.com', 'gamma.cz'])
+        lines = self._run(cmd_domain_list, format='ndjson').splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], names)
+
+    def test_domain_info_and_dns_records(self):
+        self.assertIn('ns1.example.net', self._run(cmd_domain_info, domain='alpha.cz'))
+        self.assertIn('www', self._run(cmd_dns_record_list, domain='beta.com'))
+
+    def test_contact_list(self):
+        self.assertIn('C1', self._run(cmd_contact_list))
+
+    def test_unknown_domain(self):
+        with self.assertRaises(WAPIRequestError):
+            self._run(cmd_domain_info, domain='missing.cz')
+
+    def test_index_status(self):
+        self.assertIn('"domains": 3', self._run(cmd_index_status))
+
+
+def test_missing_index_raises(isolated_cache_dir):
+    assert get_index_path().parent == isolated_cache_dir
+    with pytest.raises(WAPIRequestError):
+        cmd_domain_list(SimpleNamespace(format='table', from_index=True), None)
+
+
+def test_cmd_index_sync_prints_stats(capsys):
+    args = SimpleNamespace(format='json', workers=2, full=False, quiet=True)
+    assert cmd_index_sync(args, FakeClient(_domains())) == EXIT_SUCCESS
+    assert '"refetched": 3' in capsys.readouterr().out
+    assert PortfolioIndex(get_index_path()).exists()
+
+
+if __name__ == '__main__':
+    unittest.main()
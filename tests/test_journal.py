@@ -0,0 +1,285 @@
+"""
+Unit tests for clTRID generation, the request journal and reconciliation
+"""
+
+import json
+import re
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from wapi.api.client import WedosAPIClient, next_cltrid
+from wapi.api.journal import (
+    STATE_APPLIED,
+    STATE_DONE,
+    STATE_NOT_APPLIED,
+    STATE_UNKNOWN,
+    RequestJournal,
+    reconcile,
+)
+from wapi.api.resilience import CircuitBreaker
+from wapi.commands.journal import cmd_journal_list, cmd_journal_resolve
+from wapi.config import get_journal_path
+from wapi.exceptions import (
+    WAPICircuitOpenError,
+    WAPIRejectedError,
+    WAPIRequestError,
+    WAPITimeoutError,
+    WAPIValidationError,
+)
+
+
+class FakeAPI:
+    """Scripted _call replacement: writes time out, reads return current state"""
+
+    def __init__(self):
+        self.rows = [{'ID': '1', 'name': 'www', 'rdtype': 'A', 'rdata': '192.0.2.1', 'ttl': '300'}]
+        self.expiration = '2026-01-01'
+        self.timeout = set()
+        self.sent = []
+
+    def __call__(self, command, data=None, cl_trid=None):
+        self.sent.append((command, cl_trid))
+        if command in self.timeout:
+            raise WAPITimeoutError("Request timeout: read timed out")
+        if command == 'dns-rows-list':
+            return {'response': {'code': '1000', 'data': {'row': list(self.rows)}}}
+        if command == 'domain-info':
+            return {'response': {'code': '1000', 'data': {'domain': {
+                'name': data['name'], 'expiration': self.expiration}}}}
+        return {'response': {'code': '1000', 'result': 'OK'}}
+
+    def writes(self, command):
+        return [c for c in self.sent if c[0] == command]
+
+
+class TestClTRID(unittest.TestCase):
+    """Test the clTRID generator"""
+
+    def test_format_and_uniqueness_across_threads(self):
+        ids = []
+        lock = threading.Lock()
+
+        def worker():
+            local = [next_cltrid() for _ in range(500)]
+            with lock:
+                ids.extend(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(ids)), 4000)
+        self.assertTrue(all(re.match(r'^wapi-\d+-[0-9a-f]+-\d+$', i) for i in ids))
+
+    def test_sequence_is_monotonic(self):
+        first, second = next_cltrid(), next_cltrid()
+        self.assertLess(int(first.rsplit('-', 1)[1]), int(second.rsplit('-', 1)[1]))
+
+
+class TestRequestJournal(unittest.TestCase):
+    """Test journal storage"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = f"{self.tmp.name}/journal.jsonl"
+
+    def test_append_only_with_masked_data(self):
+        journal = RequestJournal(self.path)
+        journal.record_sent('t-1', 'domain-transfer', {'name': 'a.cz', 'auth_info': 'secret'})
+        journal.record_state('t-1', STATE_DONE, code=1000)
+        with open(self.path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 2)
+        self.assertNotIn('secret', json.dumps(lines))
+        # A fresh reader folds the records into the current state
+        entry = RequestJournal(self.path).get('t-1')
+        self.assertEqual((entry['state'], entry['code'], entry['command']),
+                         (STATE_DONE, '1000', 'domain-transfer'))
+
+    def test_unresolved_lookup(self):
+        journal = RequestJournal(self.path)
+        journal.record_sent('t-1', 'domain-renew', {'name': 'a.cz', 'period': 1})
+        # In flight in this process: not unresolved
+        self.assertIsNone(journal.unresolved('domain-renew', {'period': 1, 'name': 'a.cz'}))
+        journal.record_state('t-1', STATE_UNKNOWN)
+        entry = journal.unresolved('domain-renew', {'period': 1, 'name': 'a.cz'})
+        self.assertEqual(entry['cltrid'], 't-1')
+        self.assertIsNone(journal.unresolved('domain-renew', {'period': 2, 'name': 'a.cz'}))
+        journal.record_state('t-1', STATE_NOT_APPLIED)
+        self.assertIsNone(journal.unresolved('domain-renew', {'period': 1, 'name': 'a.cz'}))
+
+    def test_sent_entries_of_other_processes_are_unresolved(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'cltrid': 't-9', 'ts': 9e9, 'pid': -1, 'command': 'nsset-create',
+                                'key': 'x', 'state': 'sent'}) + '\n')
+            f.write('not json\n')
+        journal = RequestJournal(self.path)
+        self.assertEqual([e['cltrid'] for e in journal.list(unresolved_only=True)], ['t-9'])
+
+
+class TestJournaledClient(unittest.TestCase):
+    """Test reconciliation in WedosAPIClient.call"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.journal = RequestJournal(f"{self.tmp.name}/journal.jsonl")
+        self.client = WedosAPIClient("user@example.com", "password", journal=self.journal)
+        self.api = FakeAPI()
+        patcher = patch.object(self.client, '_call', side_effect=self.api)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_successful_write_is_journaled(self):
+        self.client.call('dns-row-delete', {'domain': 'a.cz', 'row_id': '1'})
+        (entry,) = self.journal.list()
+        self.assertEqual(entry['state'], STATE_DONE)
+        self.assertEqual(entry['cltrid'], self.api.sent[0][1])
+
+    def test_reads_are_not_journaled(self):
+        self.client.call('domain-info', {'name': 'a.cz'})
+        self.assertEqual(self.journal.list(), [])
+
+    def test_timed_out_write_that_applied_is_reconciled(self):
+        self.api.timeout.add('dns-row-add')
+        self.api.rows.append({'ID': '2', 'name': '', 'rdtype': 'TXT', 'rdata': 'hello',
+                              'ttl': '300'})
+        result = self.client.call('dns-row-add', {'domain': 'a.cz', 'name': '@', 'ttl': 300,
+                                                  'rdtype': 'TXT', 'rdata': 'hello'})
+        self.assertEqual(result['response']['code'], '1000')
+        self.assertTrue(result['response']['reconciled'])
+        self.assertEqual(self.journal.list()[0]['state'], STATE_APPLIED)
+
+    def test_timed_out_write_that_did_not_apply_can_be_retried(self):
+        self.api.timeout.add('dns-row-add')
+        data = {'domain': 'a.cz', 'name': 'mail', 'ttl': 300, 'rdtype': 'A', 'rdata': '192.0.2.9'}
+        with self.assertRaises(WAPITimeoutError):
+            self.client.call('dns-row-add', data)
+        self.assertEqual(self.journal.list()[0]['state'], STATE_NOT_APPLIED)
+        self.api.timeout.clear()
+        self.client.call('dns-row-add', data)
+        self.assertEqual(len(self.api.writes('dns-row-add')), 2)
+
+    def test_unknown_renewal_blocks_blind_retry(self):
+        self.api.timeout.add('domain-renew')
+        with self.assertRaises(WAPITimeoutError):
+            self.client.domain_renew('a.cz')
+        self.api.timeout.clear()
+        with self.assertRaises(WAPIRequestError) as ctx:
+            self.client.domain_renew('a.cz')
+        self.assertIn('wapi journal resolve', str(ctx.exception))
+        self.assertEqual(len(self.api.writes('domain-renew')), 1)
+
+        cltrid = self.journal.list()[0]['cltrid']
+        self.journal.record_state(cltrid, STATE_NOT_APPLIED)
+        self.client.domain_renew('a.cz')
+        self.assertEqual(len(self.api.writes('domain-renew')), 2)
+
+    def test_renewal_with_known_expiration_is_reconciled(self):
+        self.api.timeout.add('domain-renew')
+        with self.assertRaises(WAPITimeoutError):
+            self.client.domain_renew('a.cz', expiration='2026-01-01')
+        # The renewal went through after all; the retry must not renew again
+        self.api.timeout.clear()
+        self.api.expiration = '2027-01-01'
+        result = self.client.domain_renew('a.cz', expiration='2026-01-01')
+        self.assertTrue(result['response']['reconciled'])
+        self.assertEqual(len(self.api.writes('domain-renew')), 1)
+
+    def test_reconcile_unknown_command(self):
+        self.assertIsNone(reconcile(self.client, 'domain-delete', {'name': 'a.cz'}))
+
+
+def _http_response(status, payload=None):
+    response = MagicMock(status_code=status)
+    response.json.return_value = payload
+    if status >= 400:
+        error = requests.exceptions.HTTPError(str(status), response=response)
+        response.raise_for_status.side_effect = error
+    else:
+        response.raise_for_status.return_value = None
+    return response
+
+
+class TestJournaledTransport(unittest.TestCase):
+    """Test journal states for HTTP-level failures of writes"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.journal = RequestJournal(f"{self.tmp.name}/journal.jsonl")
+
+    def _client(self, **options):
+        return WedosAPIClient("user@example.com", "password", use_json=True, journal=self.journal,
+                              **options)
+
+    def test_http_rejection_is_not_applied(self):
+        client = self._client()
+        with patch('requests.Session.post', return_value=_http_response(403)) as mock_post:
+            with self.assertRaises(WAPIRejectedError):
+                client.domain_renew('a.cz')
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(self.journal.list()[0]['state'], STATE_NOT_APPLIED)
+        # Nothing to reconcile: the same write is simply sent again
+        ok = _http_response(200, {'response': {'code': '1000', 'result': 'OK'}})
+        with patch('requests.Session.post', return_value=ok) as mock_post:
+            client.domain_renew('a.cz')
+        self.assertEqual(mock_post.call_count, 1)
+
+    def test_open_circuit_leaves_no_unresolved_entry(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        client = self._client(circuit_breaker=breaker)
+        with patch('requests.Session.post') as mock_post:
+            with self.assertRaises(WAPICircuitOpenError):
+                client.domain_renew('a.cz')
+        mock_post.assert_not_called()
+        self.assertEqual(self.journal.list()[0]['state'], STATE_NOT_APPLIED)
+        self.assertIsNone(self.journal.unresolved('domain-renew', {'name': 'a.cz', 'period': 1}))
+
+    def test_server_error_stays_unknown(self):
+        client = self._client()
+        with patch('requests.Session.post', return_value=_http_response(502)):
+            with self.assertRaises(WAPIRequestError):
+                client.domain_renew('a.cz')
+        self.assertEqual(self.journal.list()[0]['state'], STATE_UNKNOWN)
+
+
+class TestJournalCommands:
+    """Test journal list and resolve"""
+
+    def test_list_and_resolve(self, capsys):
+        journal = RequestJournal(get_journal_path())
+        journal.record_sent('t-1', 'domain-renew', {'name': 'a.cz', 'period': 1})
+        journal.record_state('t-1', STATE_UNKNOWN)
+        journal.record_sent('t-2', 'dns-row-delete', {'domain': 'a.cz', 'row_id': '7'})
+        journal.record_state('t-2', STATE_DONE, code='1000')
+
+        cmd_journal_list(SimpleNamespace(format='json', pending=True, limit=None))
+        rows = json.loads(capsys.readouterr().out)
+        assert [(r['cltrid'], r['target']) for r in rows] == [('t-1', 'a.cz')]
+
+        cmd_journal_resolve(SimpleNamespace(cltrid='t-1', applied=True, quiet=True))
+        assert RequestJournal(get_journal_path()).get('t-1')['state'] == STATE_APPLIED
+        with pytest.raises(WAPIValidationError):
+            cmd_journal_resolve(SimpleNamespace(cltrid='t-1', applied=True, quiet=True))
+
+    def test_disabled_journal(self, monkeypatch):
+        monkeypatch.setenv('WAPI_JOURNAL_FILE', 'off')
+        assert get_journal_path() is None
+        with pytest.raises(WAPIValidationError):
+            cmd_journal_list(SimpleNamespace(format='json', pending=False, limit=None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -763,7 +763,7 @@ class TestNSSETList(unittest.TestCase):
         self.mock_args = Mock()
         self.mock_args.format = 'table'
 
-    @patch('wapi.commands.nsset.format_output')
+    @patch('wapi.commands.nsset.print_output')
     @patch('wapi.commands.nsset.get_logger')
     def test_nsset_list_success_single_item(self, mock_get_logger, mock_format):
         mock_logger = Mock()
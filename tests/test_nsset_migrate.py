@@ -0,0 +1,202 @@
+"""
+Unit tests for bulk NSSET migration
+"""
+
+import json
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from wapi.commands.migration import (
+    canonical_nsset_name,
+    cmd_nsset_migrate,
+    find_matching_nsset,
+    nameserver_signature,
+)
+from wapi.constants import EXIT_SUCCESS
+from wapi.exceptions import WAPIRequestError, WAPIValidationError
+from wapi.utils.index import PortfolioIndex
+from wapi.config import get_index_path
+
+TARGET = ['ns1.example.net:192.0.2.1:2001:db8::1', 'ns2.example.net:192.0.2.2:2001:db8::2']
+TARGET_DNS = {'server': [
+    {'name': 'ns2.example.net', 'addr_ipv4': '192.0.2.2', 'addr_ipv6': '2001:db8::2'},
+    {'name': 'NS1.example.net.', 'addr_ipv4': '192.0.2.1', 'addr_ipv6': '2001:DB8::1'},
+]}
+
+
+class MigrateClient:
+    """Fake client recording every API call"""
+
+    def __init__(self, nssets=(), owners=None, current=None, create_code='1000', fail=()):
+        self.nssets = {n['name']: n for n in nssets}
+        self.owners = owners or {}
+        self.current = dict(current or {})
+        self.create_code = create_code
+        self.fail = set(fail)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, command, data):
+        with self._lock:
+            self.calls.append((command, data))
+
+    def count(self, command):
+        return len([c for c in self.calls if c[0] == command])
+
+    def call(self, command, data):
+        self._record(command, data)
+        if command == 'nsset-list':
+            return {'response': {'code': '1000', 'data': {'nsset': list(self.nssets.values())}}}
+        if command == 'nsset-info':
+            if data['name'] in self.nssets:
+                return {'response': {'code': '1000', 'data': {'nsset': self.nssets[data['name']]}}}
+            return {'response': {'code': '2303', 'result': 'Object does not exist'}}
+        if command == 'nsset-create':
+            self.nssets[data['name']] = data
+            return {'response': {'code': self.create_code, 'result': 'OK'}}
+        raise AssertionError(command)
+
+    def domain_info(self, name):
+        self._record('domain-info', {'name': name})
+        return {'response': {'code': '1000', 'data': {'domain': {
+            'name': name, 'owner_c': self.owners.get(name, 'OWNER-A'),
+            'nsset': self.current.get(name, 'OLD-NSSET')}}}}
+
+    def domain_update_ns(self, name, nsset_name=None, nameservers=None):
+        self._record('domain-update-ns', {'name': name, 'nsset': nsset_name})
+        assert nameservers is None
+        if name in self.fail:
+            return {'response': {'code': '2100', 'result': 'Refused'}}
+        self.current[name] = nsset_name
+        return {'response': {'code': '1000', 'result': 'OK'}}
+
+
+def _args(**kwargs):
+    defaults = dict(format='json', nameserver=list(TARGET), domain=None, file=None,
+                    from_nsset=None, from_ns=None, tech_c=None, nsset_prefix='NS',
+                    dry_run=False, rate=0, workers=4, wait=False, no_ipv6_discovery=True,
+                    quiet=True)
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+def _rows(mock_print):
+    return json.loads(mock_print.call_args_list[-1][0][0])
+
+
+class TestMigrationHelpers(unittest.TestCase):
+    """Test signatures, canonical names and NSSET matching"""
+
+    def test_signature_is_order_and_case_independent(self):
+        parsed = [{'name': 'ns1.example.net', 'addr_ipv4': '192.0.2.1', 'addr_ipv6': '2001:db8::1'},
+                  {'name': 'ns2.example.net', 'addr_ipv4': '192.0.2.2', 'addr_ipv6': '2001:db8::2'}]
+        self.assertEqual(nameserver_signature(parsed), nameserver_signature(TARGET_DNS))
+
+    def test_canonical_name_is_deterministic(self):
+        sig = nameserver_signature(TARGET_DNS)
+        name = canonical_nsset_name('NS', 'cz', 'OWNER-A', sig)
+        self.assertEqual(name, canonical_nsset_name('ns', 'CZ', 'owner-a', sig))
+        self.assertTrue(name.startswith('NS-CZ-'))
+        self.assertNotEqual(name, canonical_nsset_name('NS', 'cz', 'OWNER-B', sig))
+        self.assertNotEqual(name, canonical_nsset_name('NS', 'sk', 'OWNER-A', sig))
+
+    def test_find_matching_nsset(self):
+        sig = nameserver_signature(TARGET_DNS)
+        nssets = [
+            {'name': 'OTHER', 'dns': {'server': [{'name': 'ns9.example.net'}]}},
+            {'name': 'WRONG-TLD', 'tld': 'sk', 'dns': TARGET_DNS},
+            {'name': 'WRONG-TECH', 'tech_c': 'OWNER-B', 'dns': TARGET_DNS},
+            {'name': 'SHARED', 'tld': 'cz', 'tech_c': 'OWNER-A', 'dns': TARGET_DNS},
+        ]
+        self.assertEqual(find_matching_nsset(nssets, 'cz', 'OWNER-A', sig), 'SHARED')
+        self.assertIsNone(find_matching_nsset(nssets[:3], 'cz', 'OWNER-A', sig))
+
+
+class TestNssetMigrate(unittest.TestCase):
+    """Test the nsset migrate command"""
+
+    def test_creates_one_nsset_per_group(self):
+        client = MigrateClient(owners={'c.cz': 'OWNER-B'})
+        args = _args(domain=['a.cz', 'b.cz', 'c.cz', 'd.sk'])
+        with patch('builtins.print') as mock_print:
+            self.assertEqual(cmd_nsset_migrate(args, client), EXIT_SUCCESS)
+        self.assertEqual(client.count('nsset-create'), 3)
+        self.assertEqual(client.count('domain-update-ns'), 4)
+        rows = {r['domain']: r for r in _rows(mock_print)}
+        self.assertEqual(rows['a.cz']['nsset'], rows['b.cz']['nsset'])
+        self.assertNotEqual(rows['a.cz']['nsset'], rows['c.cz']['nsset'])
+        self.assertTrue(rows['d.sk']['nsset'].startswith('NS-SK-'))
+        self.assertTrue(all(r['result'] == 'migrated' for r in rows.values()))
+
+    def test_reuses_existing_nsset_and_skips_assigned_domains(self):
+        client = MigrateClient(nssets=[{'name': 'SHARED', 'tld': 'cz', 'dns': TARGET_DNS}],
+                               current={'b.cz': 'SHARED'})
+        args = _args(domain=['a.cz', 'b.cz'])
+        with patch('builtins.print') as mock_print:
+            cmd_nsset_migrate(args, client)
+        self.assertEqual(client.count('nsset-create'), 0)
+        updated = [c[1]['name'] for c in client.calls if c[0] == 'domain-update-ns']
+        self.assertEqual(updated, ['a.cz'])
+        rows = {r['domain']: r['result'] for r in _rows(mock_print)}
+        self.assertEqual(rows, {'a.cz': 'migrated', 'b.cz': 'unchanged'})
+
+    def test_second_run_reuses_canonical_name(self):
+        client = MigrateClient()
+        with patch('builtins.print'):
+            cmd_nsset_migrate(_args(domain=['a.cz']), client)
+        client.nssets = {}  # nsset-list does not show it yet; nsset-info does
+        created = [c[1]['name'] for c in client.calls if c[0] == 'nsset-create']
+        client.nssets[created[0]] = {'name': created[0]}
+        with patch('builtins.print'):
+            cmd_nsset_migrate(_args(domain=['b.cz']), client)
+        self.assertEqual(client.count('nsset-create'), 1)
+
+    def test_tech_c_avoids_domain_info(self):
+        client = MigrateClient()
+        with patch('builtins.print'):
+            cmd_nsset_migrate(_args(domain=['a.cz', 'b.cz'], tech_c='TECH-1'), client)
+        self.assertEqual(client.count('domain-info'), 0)
+        create = [c[1] for c in client.calls if c[0] == 'nsset-create'][0]
+        self.assertEqual(create['tech_c'], 'TECH-1')
+
+    def test_dry_run_makes_no_changes(self):
+        client = MigrateClient()
+        with patch('builtins.print') as mock_print:
+            cmd_nsset_migrate(_args(domain=['a.cz'], dry_run=True), client)
+        self.assertEqual(client.count('nsset-create'), 0)
+        self.assertEqual(client.count('domain-update-ns'), 0)
+        self.assertEqual(_rows(mock_print)[0]['result'], 'planned')
+
+    def test_failures_raise(self):
+        client = MigrateClient(fail={'bad.cz'})
+        with patch('builtins.print'), self.assertRaises(WAPIRequestError):
+            cmd_nsset_migrate(_args(domain=['bad.cz', 'ok.cz']), client)
+        self.assertEqual(client.current['ok.cz'][:6], 'NS-CZ-')
+
+    def test_requires_domains(self):
+        with patch('builtins.print'), self.assertRaises(WAPIValidationError):
+            cmd_nsset_migrate(_args(), MigrateClient())
+
+    def test_domains_from_file_and_index(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/domains.txt"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("a.cz\n# comment\n\nA.cz\n")
+            with PortfolioIndex(get_index_path()) as index:
+                with index.transaction():
+                    index.upsert_domain({'name': 'old.cz', 'status': 'active', 'nsset': 'LEGACY'})
+                    index.set_domain_details('old.cz', {'name': 'old.cz', 'owner_c': 'OWNER-A',
+                                                        'nsset': 'LEGACY'}, [])
+            client = MigrateClient()
+            with patch('builtins.print') as mock_print:
+                cmd_nsset_migrate(_args(file=path, from_nsset='LEGACY'), client)
+        self.assertEqual(sorted(r['domain'] for r in _rows(mock_print)), ['a.cz', 'old.cz'])
+        # old.cz details come from the index
+        self.assertEqual([c[1]['name'] for c in client.calls if c[0] == 'domain-info'], ['a.cz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
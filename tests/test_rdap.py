@@ -0,0 +1,212 @@
+"""
+Unit tests for RDAP lookups
+"""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from wapi.commands.search import cmd_search
+from wapi.constants import EXIT_SUCCESS
+from wapi.exceptions import WAPIRequestError
+from wapi.utils.rdap import RDAPBootstrap, RDAPClient, parse_rdap, services_from_registry
+
+EXAMPLE_COM = {
+    "objectClassName": "domain",
+    "ldhName": "EXAMPLE.COM",
+    "status": ["client delete prohibited", "client transfer prohibited"],
+    "entities": [
+        {"objectClassName": "entity", "roles": ["technical"], "handle": "T1"},
+        {"objectClassName": "entity", "roles": ["registrar"], "handle": "376",
+         "vcardArray": ["vcard", [
+             ["version", {}, "text", "4.0"],
+             ["fn", {}, "text", "RESERVED-Internet Assigned Numbers Authority"],
+         ]]},
+    ],
+    "events": [
+        {"eventAction": "registration", "eventDate": "1995-08-14T04:00:00Z"},
+        {"eventAction": "expiration", "eventDate": "2025-08-13T04:00:00Z"},
+        {"eventAction": "last changed", "eventDate": "2024-08-14T07:01:34Z"},
+        {"eventAction": "last update of RDAP database", "eventDate": "2024-09-01T00:00:00Z"},
+    ],
+    "nameservers": [
+        {"objectClassName": "nameserver", "ldhName": "A.IANA-SERVERS.NET"},
+        {"objectClassName": "nameserver", "ldhName": "B.IANA-SERVERS.NET."},
+    ],
+}
+
+IANA_REGISTRY = {
+    "version": "1.0",
+    "services": [
+        [["example", "test"], ["http://rdap.example/", "https://rdap.example/v1"]],
+        [["sk"], ["https://rdap.sk-nic.sk/"]],
+    ],
+}
+
+
+def _response(status, payload=None):
+    response = MagicMock()
+    response.status_code = status
+    response.json.return_value = payload
+    return response
+
+
+class TestParseRdap(unittest.TestCase):
+    """Test RDAP JSON -> parse_whois fields"""
+
+    def test_domain_object(self):
+        self.assertEqual(parse_rdap(EXAMPLE_COM), {
+            "available": False, "grammar": "rdap", "domain": "example.com",
+            "registrar": "RESERVED-Internet Assigned Numbers Authority",
+            "registered": "1995-08-14", "expires": "2025-08-13", "updated": "2024-08-14",
+            "status": ["client delete prohibited", "client transfer prohibited"],
+            "nameservers": ["a.iana-servers.net", "b.iana-servers.net"],
+        })
+
+    def test_cznic_nsset_extension(self):
+        record = parse_rdap({"ldhName": "example.cz", "fred_nsset": {"handle": "NSS:EXAMPLE:1"},
+                             "entities": [{"roles": ["registrar"], "handle": "REG-WEDOS"}]})
+        self.assertEqual((record["nsset"], record["registrar"]), ("NSS:EXAMPLE:1", "REG-WEDOS"))
+
+
+class TestBootstrap(unittest.TestCase):
+    """Test TLD -> RDAP server resolution"""
+
+    def test_registry_services(self):
+        self.assertEqual(services_from_registry(IANA_REGISTRY), {
+            "example": "https://rdap.example/v1/", "test": "https://rdap.example/v1/",
+            "sk": "https://rdap.sk-nic.sk/"})
+
+    def test_bundled_without_download(self):
+        session = MagicMock()
+        bootstrap = RDAPBootstrap(bundled={"com": "https://rdap.verisign.com/com/v1/"})
+        self.assertEqual(bootstrap.server_for("Example.COM.", session=session),
+                         "https://rdap.verisign.com/com/v1/")
+        self.assertIsNone(bootstrap.server_for("example.sk", session=session))
+        session.get.assert_not_called()
+
+    def test_unknown_tld_fetches_and_caches_registry_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rdap-bootstrap.json")
+            session = MagicMock()
+            session.get.return_value = _response(200, IANA_REGISTRY)
+            bootstrap = RDAPBootstrap(path, bundled={})
+            self.assertEqual(bootstrap.server_for("example.sk", session=session),
+                             "https://rdap.sk-nic.sk/")
+            self.assertIsNone(bootstrap.server_for("example.zz", session=session))
+            self.assertEqual(session.get.call_count, 1)
+
+            # A fresh cache is used as-is by the next process
+            cached = RDAPBootstrap(path, bundled={})
+            self.assertEqual(cached.server_for("example.sk", session=MagicMock()),
+                             "https://rdap.sk-nic.sk/")
+            self.assertIsNone(cached.server_for("example.zz", session=session))
+            self.assertEqual(session.get.call_count, 1)
+
+            # A stale one is refreshed for unknown TLDs
+            old = time.time() - 30 * 24 * 3600
+            os.utime(path, (old, old))
+            RDAPBootstrap(path, bundled={}).server_for("example.zz", session=session)
+            self.assertEqual(session.get.call_count, 2)
+
+    def test_failed_download_is_not_retried(self):
+        session = MagicMock()
+        session.get.side_effect = requests.ConnectionError("offline")
+        with tempfile.TemporaryDirectory() as tmp:
+            bootstrap = RDAPBootstrap(os.path.join(tmp, "rdap.json"), bundled={})
+            self.assertIsNone(bootstrap.server_for("example.sk", session=session))
+            self.assertIsNone(bootstrap.server_for("example.sk", session=session))
+        self.assertEqual(session.get.call_count, 1)
+
+
+class TestRDAPClient(unittest.TestCase):
+    """Test pooled RDAP lookups"""
+
+    def setUp(self):
+        bootstrap = RDAPBootstrap(bundled={"com": "https://rdap.verisign.com/com/v1/"})
+        self.client = RDAPClient(bootstrap)
+        self.session = MagicMock()
+        self.client._sessions["https://rdap.verisign.com/com/v1/"] = self.session
+
+    def test_registered(self):
+        self.session.get.return_value = _response(200, EXAMPLE_COM)
+        record = self.client.lookup("Example.com")
+        self.assertFalse(record["available"])
+        self.session.get.assert_called_once_with(
+            "https://rdap.verisign.com/com/v1/domain/example.com", timeout=self.client.timeout)
+
+    def test_not_found_means_available(self):
+        self.session.get.return_value = _response(404)
+        self.assertEqual(self.client.lookup("nope.com", timeout=3),
+                         {"available": True, "grammar": "rdap"})
+        self.assertEqual(self.session.get.call_args[1]["timeout"], 3)
+
+    def test_errors(self):
+        self.assertIsNone(self.client.lookup("example.zz"))
+        self.session.get.return_value = _response(503)
+        with self.assertRaises(WAPIRequestError):
+            self.client.lookup("example.com")
+        self.session.get.side_effect = requests.Timeout("slow")
+        with self.assertRaises(WAPIRequestError):
+            self.client.lookup("example.com")
+
+    def test_one_session_per_server(self):
+        client = RDAPClient(pool_size=4)
+        first = client.session_for("https://rdap.verisign.com/com/v1/")
+        self.assertIs(client.session_for("https://rdap.verisign.com/com/v1/"), first)
+        self.assertIsNot(client.session_for("https://rdap.nic.cz/"), first)
+        self.assertEqual(first.get_adapter("https://rdap.verisign.com/")._pool_maxsize, 4)
+        client.close()
+
+
+class TestSearchRdap(unittest.TestCase):
+    """cmd_search prefers RDAP and falls back to WHOIS"""
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.domain_availability.return_value = {"response": {"code": "2000"}}
+        self.args = SimpleNamespace(domain="example.com", format="json", whois_server=None,
+                                    whois_timeout=5)
+
+    def _search(self, rdap_client, whois_text="Domain Name: EXAMPLE.COM\n"):
+        with patch("wapi.commands.search.get_rdap_client", return_value=rdap_client), \
+                patch("wapi.commands.search.perform_whois_lookup",
+                      return_value=whois_text) as whois, \
+                patch("builtins.print") as mock_print:
+            self.assertEqual(cmd_search(self.args, self.client), EXIT_SUCCESS)
+        return json.loads(mock_print.call_args[0][0]), whois
+
+    def test_rdap_answer_skips_whois(self):
+        rdap = MagicMock()
+        rdap.lookup.return_value = parse_rdap(EXAMPLE_COM)
+        payload, whois = self._search(rdap)
+        whois.assert_not_called()
+        self.assertEqual((payload["available"], payload["source"]), (False, "rdap"))
+        self.assertEqual(payload["nameservers"], ["a.iana-servers.net", "b.iana-servers.net"])
+        self.assertNotIn("whois", payload)
+
+    def test_rdap_failure_falls_back_to_whois(self):
+        rdap = MagicMock()
+        rdap.lookup.side_effect = WAPIRequestError("RDAP lookup failed")
+        payload, whois = self._search(rdap)
+        whois.assert_called_once()
+        self.assertEqual((payload["source"], payload["whois"]),
+                         ("whois", "Domain Name: EXAMPLE.COM"))
+
+    def test_explicit_whois_server_and_no_rdap(self):
+        rdap = MagicMock()
+        self.args.whois_server = "whois.example"
+        self._search(rdap)
+        self.args.whois_server, self.args.no_rdap = None, True
+        self._search(rdap)
+        rdap.lookup.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
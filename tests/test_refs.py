@@ -0,0 +1,109 @@
+"""
+Unit tests for the reverse-reference graph (wapi refs)
+"""
+
+import io
+import json
+import sqlite3
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from wapi.commands.domain import refresh_index_domain
+from wapi.commands.helpers import open_index
+from wapi.commands.refs import cmd_refs_contact, cmd_refs_ns, cmd_refs_nsset
+from wapi.config import get_index_path
+from wapi.constants import EXIT_SUCCESS
+from wapi.utils.index import contact_handles
+
+NS_OLD = [{'name': 'ns1.oldhost.cz.', 'addr_ipv4': '192.0.2.1', 'addr_ipv6': ''},
+          {'name': 'ns2.oldhost.cz', 'addr_ipv4': '192.0.2.2', 'addr_ipv6': '2001:DB8::2'}]
+NS_NEW = [{'name': 'ns1.newhost.cz', 'addr_ipv4': '198.51.100.1', 'addr_ipv6': ''}]
+
+
+def _info(name, nsset, servers, owner='OWNER-1', admin='ADMIN-1, ADMIN-2'):
+    return {'name': name, 'nsset': nsset, 'owner_c': owner, 'admin_c': admin,
+            'dns': {'server': servers}, 'status': 'active', 'expiration': '2030-01-01'}
+
+
+def _populate():
+    with open_index(create=True) as index:
+        with index.transaction():
+            for name, nsset, servers in (('a.cz', 'NS-OLD', NS_OLD), ('b.cz', 'NS-OLD', NS_OLD),
+                                         ('c.cz', 'NS-NEW', NS_NEW)):
+                index.upsert_domain({'name': name, 'status': 'active', 'expiration': '2030-01-01',
+                                     'nsset': nsset})
+                index.set_domain_details(name, _info(name, nsset, servers), [])
+            index.replace_nssets([{'name': 'NS-SPARE', 'dns': {'server': NS_OLD[:1]}}])
+
+
+class TestRefs(unittest.TestCase):
+    """Test refs queries"""
+
+    def setUp(self):
+        _populate()
+
+    def _run(self, func, **kwargs):
+        args = SimpleNamespace(format='json', quiet=True, **kwargs)
+        stream = io.StringIO()
+        with patch('sys.stdout', stream):
+            self.assertEqual(func(args, None), EXIT_SUCCESS)
+        return json.loads(stream.getvalue()) if stream.getvalue() else []
+
+    def test_refs_ns_by_host(self):
+        rows = self._run(cmd_refs_ns, host='NS1.OLDHOST.CZ.')
+        self.assertEqual([(r['nsset'], r['domain']) for r in rows],
+                         [('NS-OLD', 'a.cz'), ('NS-OLD', 'b.cz'), ('NS-SPARE', '')])
+
+    def test_refs_ns_by_ip(self):
+        rows = self._run(cmd_refs_ns, host='2001:db8::2')
+        self.assertEqual(sorted(r['domain'] for r in rows), ['a.cz', 'b.cz'])
+        self.assertEqual(self._run(cmd_refs_ns, host='203.0.113.9'), [])
+
+    def test_refs_contact(self):
+        rows = self._run(cmd_refs_contact, handle='admin-2')
+        self.assertEqual([(r['domain'], r['role']) for r in rows],
+                         [('a.cz', 'admin'), ('b.cz', 'admin'), ('c.cz', 'admin')])
+
+    def test_refs_nsset(self):
+        rows = self._run(cmd_refs_nsset, name='NS-OLD')
+        self.assertEqual([r['domain'] for r in rows], ['a.cz', 'b.cz'])
+        with open_index() as index:
+            self.assertEqual([ns['host'] for ns in index.nsset_nameservers('NS-OLD')],
+                             ['ns1.oldhost.cz', 'ns2.oldhost.cz'])
+
+    def test_refresh_after_update(self):
+        client = Mock()
+        client.domain_info.return_value = {'response': {'code': '1000', 'data': {
+            'domain': _info('a.cz', 'NS-NEW', NS_NEW, owner='OWNER-2')}}}
+        refresh_index_domain(client, 'a.cz')
+        self.assertEqual([r['domain'] for r in self._run(cmd_refs_ns, host='ns1.oldhost.cz')
+                          if r['domain']], ['b.cz'])
+        self.assertEqual([r['domain'] for r in self._run(cmd_refs_nsset, name='NS-NEW')],
+                         ['a.cz', 'c.cz'])
+        rows = self._run(cmd_refs_contact, handle='OWNER-2')
+        self.assertEqual([r['domain'] for r in rows], ['a.cz'])
+
+    def test_pending_update_marks_stale(self):
+        refresh_index_domain(Mock(), 'b.cz', completed=False)
+        with open_index() as index:
+            self.assertEqual(index.domain_hashes()['b.cz']['list_hash'], '')
+
+    def test_schema_upgrade_builds_refs(self):
+        conn = sqlite3.connect(str(get_index_path()))
+        conn.execute("DELETE FROM ref_nameservers")
+        conn.execute("DELETE FROM ref_contacts")
+        conn.execute("UPDATE meta SET value = '1' WHERE key = 'schema_version'")
+        conn.commit()
+        conn.close()
+        self.assertEqual(len(self._run(cmd_refs_contact, handle='OWNER-1')), 3)
+
+
+def test_contact_handles():
+    assert contact_handles('A, B') == ['A', 'B']
+    assert contact_handles(['A', {'handle': 'B'}, '[HIDDEN]']) == ['A', 'B']
+    assert contact_handles(None) == []
+
+
+if __name__ == '__main__':
+    unittest.main()
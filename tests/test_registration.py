@@ -0,0 +1,221 @@
+"""
+Unit tests for bulk domain registration from an order file
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from wapi.commands.domain import cmd_domain_create
+from wapi.commands.registration import load_orders, load_results
+from wapi.constants import EXIT_SUCCESS
+from wapi.exceptions import (
+    WAPIConnectionError,
+    WAPIRejectedError,
+    WAPIRequestError,
+    WAPITimeoutError,
+    WAPIValidationError,
+)
+
+ORDERS = """domain,period,owner-c,nsset
+new.cz,2,OWNER-1,NSS:ONE
+taken.cz,,OWNER-1,
+async.cz,1,OWNER-2,
+# disabled.cz,,,
+"""
+
+
+class CreateClient:
+    """Fake client: 'taken*' domains are registered, 'async*' ones create asynchronously"""
+
+    def __init__(self, fail=(), never_done=(), missing=(), error=WAPIConnectionError):
+        self.fail = set(fail)
+        self.never_done = set(never_done)
+        self.missing = set(missing)
+        self.error = error
+        self.infos = []
+        self.checked = []
+        self.created = []
+        self._lock = threading.Lock()
+
+    def domains_availability(self, names):
+        self.checked.append(list(names))
+        return {name: {'response': {'code': '1000', 'data': {'domain': {
+            'name': name, 'status': 'registered' if name.startswith('taken') else 'available'}}}}
+            for name in names}
+
+    def domain_create(self, name, **options):
+        with self._lock:
+            self.created.append((name, options))
+        if name in self.fail:
+            raise self.error("Connection reset")
+        if name.startswith('async'):
+            return {'response': {'code': '1001', 'result': 'Pending'}}
+        return {'response': {'code': '1000', 'result': 'OK'}}
+
+    def call(self, command, data):
+        assert command == 'domain-info', command
+        self.infos.append(data['name'])
+        if data['name'] in self.missing:
+            return {'response': {'code': '3201', 'result': 'Domain not found'}}
+        if data['name'] in self.never_done:
+            return {'response': {'code': '1001', 'result': 'Pending'}}
+        return {'response': {'code': '1000', 'data': {
+            'domain': {'name': data['name'], 'status': 'active'}}}}
+
+
+class TestOrderFile(unittest.TestCase):
+    """Test order validation and the results file"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _file(self, content, name='orders.csv'):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_orders(self):
+        orders = load_orders(self._file(ORDERS), default_period=3)
+        self.assertEqual(orders, [
+            {'domain': 'new.cz', 'period': 2, 'owner_c': 'OWNER-1', 'nsset': 'NSS:ONE'},
+            {'domain': 'taken.cz', 'period': 3, 'owner_c': 'OWNER-1'},
+            {'domain': 'async.cz', 'period': 1, 'owner_c': 'OWNER-2'},
+        ])
+
+    def test_every_invalid_row_is_reported(self):
+        path = self._file("domain,period\nbad_name,1\nok.cz,0\nok.cz,1\nok.cz,1\n")
+        with patch('sys.stderr') as stderr, self.assertRaises(WAPIValidationError) as ctx:
+            load_orders(path)
+        self.assertIn("4 invalid row(s)", str(ctx.exception))
+        printed = "".join(call[0][0] for call in stderr.write.call_args_list)
+        self.assertIn("line 2", printed)
+        self.assertIn("line 3", printed)
+        self.assertIn("line 4: duplicate", printed)
+
+    def test_unknown_column(self):
+        with patch('sys.stderr'), self.assertRaises(WAPIValidationError):
+            load_orders(self._file("domain,ownr_c\nok.cz,X\n"))
+
+    def test_results_keep_last_record_and_skip_torn_lines(self):
+        path = self._file('{"domain": "a.cz", "result": "failed"}\n'
+                          '{"domain": "a.cz", "result": "created"}\n'
+                          '{"domain": "b.cz", "res', 'r.jsonl')
+        self.assertEqual(load_results(path), {'a.cz': {'domain': 'a.cz', 'result': 'created'}})
+        self.assertEqual(load_results(os.path.join(self.tmp.name, 'missing.jsonl')), {})
+
+
+@patch('wapi.commands.registration.DEFAULT_POLL_INTERVAL', 0)
+class TestBulkCreate(unittest.TestCase):
+    """Test domain create --from-file"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.orders = os.path.join(self.tmp.name, 'orders.csv')
+        with open(self.orders, 'w', encoding='utf-8') as f:
+            f.write(ORDERS)
+
+    def _args(self, **options):
+        values = dict(domain=None, from_file=self.orders, period=1, format='json',
+                      force=True, wait=False, rate=0, workers=4, quiet=True)
+        values.update(options)
+        return SimpleNamespace(**values)
+
+    def _create(self, client, **options):
+        with patch('builtins.print') as mock_print:
+            self.assertEqual(cmd_domain_create(self._args(**options), client), EXIT_SUCCESS)
+        return json.loads(mock_print.call_args[0][0])
+
+    def _results(self):
+        return load_results(self.orders + '.results.jsonl')
+
+    def test_availability_precheck_create_and_wait(self):
+        client = CreateClient()
+        with patch('builtins.print') as mock_print, patch('sys.stderr'), \
+                self.assertRaises(WAPIRequestError):
+            cmd_domain_create(self._args(wait=True), client)
+        rows = json.loads(mock_print.call_args[0][0])
+        self.assertEqual([(r['domain'], r['result']) for r in rows],
+                         [('new.cz', 'created'), ('taken.cz', 'unavailable'),
+                          ('async.cz', 'created')])
+        self.assertEqual(client.checked, [['new.cz', 'taken.cz', 'async.cz']])
+        self.assertEqual(sorted(name for name, _ in client.created), ['async.cz', 'new.cz'])
+        new_options = dict(client.created)['new.cz']
+        self.assertEqual((new_options['period'], new_options['owner_c'], new_options['nsset']),
+                         (2, 'OWNER-1', 'NSS:ONE'))
+        self.assertEqual({d: r['result'] for d, r in self._results().items()},
+                         {'new.cz': 'created', 'taken.cz': 'unavailable', 'async.cz': 'created'})
+
+    def test_rerun_skips_submitted_orders(self):
+        client = CreateClient(fail={'new.cz'})
+        with patch('builtins.print'), patch('sys.stderr'), self.assertRaises(WAPIRequestError):
+            cmd_domain_create(self._args(), client)
+        self.assertEqual({d: r['result'] for d, r in self._results().items()},
+                         {'new.cz': 'unknown', 'taken.cz': 'unavailable', 'async.cz': 'pending'})
+
+        retry = CreateClient()
+        with patch('builtins.print'), patch('sys.stderr'), self.assertRaises(WAPIRequestError):
+            cmd_domain_create(self._args(wait=True), retry)
+        # new.cz failed in transit but was applied, async.cz was submitted: neither is created again
+        self.assertEqual(retry.created, [])
+        self.assertEqual(retry.checked, [['taken.cz']])
+        self.assertEqual({d: r['result'] for d, r in self._results().items()},
+                         {'new.cz': 'created', 'taken.cz': 'unavailable', 'async.cz': 'created'})
+
+    def test_unknown_outcome_is_never_resubmitted(self):
+        with open(self.orders, 'w', encoding='utf-8') as f:
+            f.write("domain\nnew.cz\n")
+        with patch('builtins.print'), patch('sys.stderr'), self.assertRaises(WAPIRequestError):
+            cmd_domain_create(self._args(), CreateClient(fail={'new.cz'}, error=WAPITimeoutError))
+
+        retry = CreateClient(missing={'new.cz'})
+        with patch('builtins.print') as mock_print, patch('sys.stderr'), \
+                self.assertRaises(WAPIRequestError):
+            cmd_domain_create(self._args(force=False), retry)
+        self.assertEqual((retry.infos, retry.checked, retry.created), (['new.cz'], [], []))
+        rows = json.loads(next(c[0][0] for c in mock_print.call_args_list if 'file' not in c[1]))
+        self.assertEqual(rows, [{'domain': 'new.cz', 'result': 'unknown',
+                                 'detail': 'Connection reset'}])
+
+    def test_rejected_create_is_retried(self):
+        with open(self.orders, 'w', encoding='utf-8') as f:
+            f.write("domain\nnew.cz\n")
+        with patch('builtins.print'), patch('sys.stderr'), self.assertRaises(WAPIRequestError):
+            cmd_domain_create(self._args(), CreateClient(fail={'new.cz'}, error=WAPIRejectedError))
+        self.assertEqual(self._results()['new.cz']['result'], 'failed')
+        retry = CreateClient()
+        self.assertEqual(self._create(retry)[0]['result'], 'created')
+        self.assertEqual([name for name, _ in retry.created], ['new.cz'])
+
+    @patch('wapi.commands.registration.DEFAULT_MAX_POLL_ATTEMPTS', 2)
+    def test_poll_timeout_stays_resumable(self):
+        with open(self.orders, 'w', encoding='utf-8') as f:
+            f.write("domain\nasync.cz\n")
+        with patch('builtins.print'), patch('sys.stderr'), self.assertRaises(WAPITimeoutError):
+            cmd_domain_create(self._args(wait=True), CreateClient(never_done={'async.cz'}))
+        self.assertEqual(self._results()['async.cz']['result'], 'pending')
+        rows = self._create(CreateClient(), force=False)
+        self.assertEqual(rows, [{'domain': 'async.cz', 'result': 'pending', 'detail': 'Pending'}])
+
+    def test_requires_force_and_validates_before_any_call(self):
+        client = CreateClient()
+        with patch('sys.stderr'), self.assertRaises(WAPIValidationError):
+            cmd_domain_create(self._args(force=False), client)
+        with open(self.orders, 'a', encoding='utf-8') as f:
+            f.write("-bad.cz,1\n")
+        with patch('sys.stderr'), self.assertRaises(WAPIValidationError):
+            cmd_domain_create(self._args(), client)
+        with patch('sys.stderr'), self.assertRaises(WAPIValidationError):
+            cmd_domain_create(self._args(domain='new.cz'), client)
+        self.assertEqual((client.checked, client.created), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
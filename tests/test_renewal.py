@@ -0,0 +1,222 @@
+"""
+Unit tests for expiration reports and bulk renewals
+"""
+
+import json
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from wapi.commands.renewal import (
+    build_expiration_report,
+    build_renew_plan,
+    cmd_domain_expiring,
+    cmd_domain_renew_apply,
+    cmd_domain_renew_plan,
+    days_until,
+    expiration_bucket,
+)
+from wapi.constants import EXIT_SUCCESS
+from wapi.exceptions import WAPIRequestError, WAPITimeoutError, WAPIValidationError
+from wapi.utils.batch import RateLimiter, poll_many, run_concurrently
+from wapi.utils.validators import validate_duration_days
+
+TODAY = date.today()
+
+
+def _exp(days):
+    return (TODAY + timedelta(days=days)).isoformat()
+
+
+def _domains():
+    return [
+        {'name': 'soon.cz', 'status': 'active', 'expiration': _exp(5)},
+        {'name': 'month.cz', 'status': 'active', 'expiration': _exp(25)},
+        {'name': 'late.com', 'status': 'active', 'expiration': _exp(200)},
+        {'name': 'gone.cz', 'status': 'expired', 'expiration': _exp(-3)},
+        {'name': 'odd.cz', 'status': 'active', 'expiration': 'n/a'},
+    ]
+
+
+class RenewClient:
+    """Fake client: 'async-*' domains renew asynchronously"""
+
+    def __init__(self, fail=(), never_done=()):
+        self.fail = set(fail)
+        self.never_done = set(never_done)
+        self.renewed = []
+        self.info_calls = 0
+        self._lock = threading.Lock()
+
+    def call(self, command, data):
+        if command == 'domains-list':
+            return {'response': {'code': '1000', 'data': {'domain': _domains()}}}
+        if command == 'domain-info':
+            with self._lock:
+                self.info_calls += 1
+            name = data['name']
+            expiration = _exp(5) if name in self.never_done else _exp(370)
+            domain = {'name': name, 'expiration': expiration}
+            return {'response': {'code': '1000', 'data': {'domain': domain}}}
+        raise AssertionError(command)
+
+    def domain_renew(self, name, period=1, expiration=None):
+        with self._lock:
+            self.renewed.append((name, period))
+        if name in self.fail:
+            return {'response': {'code': '2100', 'result': 'Renewal refused'}}
+        if name.startswith('async'):
+            return {'response': {'code': '1001', 'result': 'Pending'}}
+        return {'response': {'code': '1000', 'result': 'OK'}}
+
+
+def _plan_file(tmp_dir, names):
+    plan = {'period': 2, 'domains': [{'name': n, 'expiration': _exp(5)} for n in names]}
+    path = f"{tmp_dir}/plan.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f)
+    return path
+
+
+class TestExpirationReport(unittest.TestCase):
+    """Test bucketing and plan computation"""
+
+    def test_days_and_buckets(self):
+        self.assertEqual(days_until(_exp(10)), 10)
+        self.assertIsNone(days_until('garbage'))
+        self.assertEqual(expiration_bucket(-1), 'expired')
+        self.assertEqual(expiration_bucket(0), '7d')
+        self.assertEqual(expiration_bucket(45), '60d')
+        self.assertEqual(expiration_bucket(1000), 'later')
+
+    def test_report_window(self):
+        rows = build_expiration_report(_domains(), 30)
+        self.assertEqual([r['name'] for r in rows], ['gone.cz', 'soon.cz', 'month.cz'])
+        self.assertEqual(rows[0]['bucket'], 'expired')
+
+    def test_plan(self):
+        plan = build_renew_plan(_domains(), 7, period=2)
+        self.assertEqual([d['name'] for d in plan['domains']], ['gone.cz', 'soon.cz'])
+        self.assertTrue(all(d['period'] == 2 for d in plan['domains']))
+
+    def test_duration_parsing(self):
+        self.assertEqual(validate_duration_days('60d'), (True, 60, None))
+        self.assertEqual(validate_duration_days('8w')[1], 56)
+        self.assertEqual(validate_duration_days('1y')[1], 365)
+        self.assertEqual(validate_duration_days('15')[1], 15)
+        self.assertFalse(validate_duration_days('soon')[0])
+
+
+class TestRenewalCommands(unittest.TestCase):
+    """Test expiring, renew-plan and renew-apply"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_expiring_command(self):
+        args = SimpleNamespace(format='json', within='30d', tld='cz', quiet=True)
+        with patch('builtins.print') as mock_print:
+            self.assertEqual(cmd_domain_expiring(args, RenewClient()), EXIT_SUCCESS)
+        output = mock_print.call_args_list[0][0][0]
+        self.assertIn('month.cz', output)
+        self.assertNotIn('late.com', output)
+
+    def test_invalid_window(self):
+        args = SimpleNamespace(format='json', within='soon', tld=None, quiet=True)
+        with self.assertRaises(WAPIValidationError):
+            cmd_domain_expiring(args, RenewClient())
+
+    def test_plan_roundtrip_and_apply(self):
+        path = f"{self.tmp.name}/out.json"
+        args = SimpleNamespace(format='json', within='10d', period=1, tld=None, output=path,
+                               quiet=True)
+        with patch('builtins.print'):
+            cmd_domain_renew_plan(args, RenewClient())
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['domains']), 2)
+
+        client = RenewClient()
+        apply_args = SimpleNamespace(format='json', plan=path, force=True, rate=0, workers=2,
+                                     wait=False, quiet=True)
+        with patch('builtins.print'):
+            self.assertEqual(cmd_domain_renew_apply(apply_args, client), EXIT_SUCCESS)
+        self.assertEqual(sorted(client.renewed), [('gone.cz', 1), ('soon.cz', 1)])
+
+    def test_apply_requires_force(self):
+        path = _plan_file(self.tmp.name, ['a.cz'])
+        args = SimpleNamespace(format='json', plan=path, force=False)
+        client = RenewClient()
+        with patch('builtins.print'), self.assertRaises(WAPIValidationError):
+            cmd_domain_renew_apply(args, client)
+        self.assertEqual(client.renewed, [])
+
+    @patch('wapi.commands.renewal.DEFAULT_POLL_INTERVAL', 0)
+    def test_apply_waits_in_one_poll_phase(self):
+        names = [f'async{i}.cz' for i in range(6)] + ['sync.cz']
+        client = RenewClient()
+        args = SimpleNamespace(format='json', plan=_plan_file(self.tmp.name, names), force=True,
+                               rate=0, workers=4, wait=True, quiet=True)
+        with patch('builtins.print') as mock_print:
+            self.assertEqual(cmd_domain_renew_apply(args, client), EXIT_SUCCESS)
+        self.assertEqual(len(client.renewed), 7)
+        self.assertTrue(all(period == 2 for _, period in client.renewed))
+        self.assertEqual(client.info_calls, 6)
+        rows = json.loads(mock_print.call_args_list[-1][0][0])
+        self.assertTrue(all(r['result'] == 'renewed' for r in rows))
+
+    @patch('wapi.commands.renewal.DEFAULT_MAX_POLL_ATTEMPTS', 2)
+    @patch('wapi.commands.renewal.DEFAULT_POLL_INTERVAL', 0)
+    def test_apply_reports_failures_and_timeouts(self):
+        path = _plan_file(self.tmp.name, ['bad.cz', 'ok.cz'])
+        args = SimpleNamespace(format='json', plan=path, force=True, rate=0, workers=2,
+                               wait=True, quiet=True)
+        with patch('builtins.print'), self.assertRaises(WAPIRequestError):
+            cmd_domain_renew_apply(args, RenewClient(fail={'bad.cz'}))
+
+        path = _plan_file(self.tmp.name, ['async-stuck.cz'])
+        args.plan = path
+        with patch('builtins.print'), self.assertRaises(WAPITimeoutError):
+            cmd_domain_renew_apply(args, RenewClient(never_done={'async-stuck.cz'}))
+
+
+class TestConcurrencyHelpers(unittest.TestCase):
+    """Test RateLimiter, run_concurrently and poll_many"""
+
+    def test_rate_limiter_spacing(self):
+        limiter = RateLimiter(rate=50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 50 * 0.9)
+
+    def test_run_concurrently_keeps_order_and_errors(self):
+        def op(x):
+            if x == 3:
+                raise ValueError("boom")
+            return x * 2
+        results = run_concurrently(range(5), op, workers=3)
+        self.assertEqual([r[1] for r in results], [0, 2, 4, None, 8])
+        self.assertIsInstance(results[3][2], ValueError)
+
+    def test_run_concurrently_quiet_logs_failures_at_debug(self):
+        def op(x):
+            raise ValueError("not yet")
+        with self.assertLogs('wapi.batch', level='DEBUG') as logs:
+            run_concurrently([1], op, quiet=True)
+        self.assertEqual([record.levelname for record in logs.records], ['DEBUG'])
+
+    def test_poll_many_timeout(self):
+        class Client:
+            def call(self, command, data):
+                return {'response': {'code': '1001'}}
+        results = poll_many(Client(), {'a': ('domain-info', {}, None)}, max_attempts=2, interval=0)
+        self.assertEqual(results['a']['response']['code'], '9998')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,404 @@
+"""
+Unit tests for the retry policy, the circuit breaker and their use in WedosAPIClient
+"""
+
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from wapi.api.client import WedosAPIClient
+from wapi.api.resilience import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    AdaptiveRateLimiter,
+    CircuitBreaker,
+    HedgePolicy,
+    RetryPolicy,
+    is_throttled_response,
+    shared_rate_limiter,
+)
+from wapi.config import get_network_config
+from wapi.exceptions import (
+    WAPICircuitOpenError,
+    WAPIConnectionError,
+    WAPIRequestError,
+    WAPIThrottledError,
+    WAPITimeoutError,
+)
+from wapi.utils import metrics
+
+
+def _ok_response(code="1000", result="OK"):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"response": {"code": code, "result": result}}
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test retry decisions and backoff"""
+
+    def test_only_transport_errors_of_reads_are_retryable(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable('domain-info', WAPITimeoutError('t')))
+        self.assertTrue(policy.is_retryable('domain-info', WAPIConnectionError('c')))
+        self.assertFalse(policy.is_retryable('domain-info', WAPIRequestError('r')))
+        self.assertFalse(policy.is_retryable('domain-info', WAPICircuitOpenError('o')))
+        self.assertFalse(policy.is_retryable('domain-renew', WAPITimeoutError('t')))
+        writes = RetryPolicy(retry_writes=True)
+        self.assertTrue(writes.is_retryable('domain-renew', WAPITimeoutError('t')))
+        # Throttled requests were rejected unprocessed, so even writes may be repeated
+        self.assertTrue(policy.is_retryable('domain-renew', WAPIThrottledError('limit')))
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        with patch('wapi.api.resilience.random.uniform', side_effect=lambda lo, hi: hi):
+            self.assertEqual([policy.backoff(n) for n in range(1, 6)], [1.0, 2.0, 4.0, 4.0, 4.0])
+        for _ in range(50):
+            self.assertTrue(0 <= policy.backoff(2) <= 2.0)
+
+    def test_attempts_are_at_least_one(self):
+        self.assertEqual(RetryPolicy(max_attempts=0).max_attempts, 1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test breaker state transitions"""
+
+    def setUp(self):
+        metrics.reset_metrics()
+        self.addCleanup(metrics.reset_metrics)
+        self.now = [100.0]
+        patcher = patch('wapi.api.resilience.time.monotonic', side_effect=lambda: self.now[0])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        breaker = CircuitBreaker(threshold=3, reset_timeout=30)
+        for _ in range(3):
+            breaker.before_request()
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+        with self.assertRaises(WAPICircuitOpenError):
+            breaker.before_request()
+        self.assertEqual(metrics.get_counter('wapi.circuit_opened'), 1)
+        self.assertEqual(metrics.get_counter('wapi.circuit_rejected'), 1)
+        self.assertEqual(metrics.get_gauge('wapi.circuit_state'), CIRCUIT_OPEN)
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker(threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        self.now[0] += 31
+        breaker.before_request()
+        self.assertEqual(breaker.state, CIRCUIT_HALF_OPEN)
+        # Only one probe at a time
+        with self.assertRaises(WAPICircuitOpenError):
+            breaker.before_request()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+
+        self.now[0] += 31
+        breaker.before_request()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+        breaker.before_request()
+
+    def test_release_lets_the_next_probe_through(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        self.now[0] += 31
+        breaker.before_request()
+        breaker.release()
+        breaker.before_request()
+        self.assertEqual(breaker.state, CIRCUIT_HALF_OPEN)
+
+    def test_zero_threshold_disables_the_breaker(self):
+        breaker = CircuitBreaker(threshold=0)
+        for _ in range(100):
+            breaker.record_failure()
+        breaker.before_request()
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+
+class TestClientResilience(unittest.TestCase):
+    """Test retries, timeouts and the breaker in WedosAPIClient"""
+
+    def setUp(self):
+        metrics.reset_metrics()
+        self.addCleanup(metrics.reset_metrics)
+
+    def test_reads_are_retried_after_transport_errors(self):
+        client = WedosAPIClient("user@example.com", "password", use_json=True)
+        errors = [requests.exceptions.ConnectionError('reset'),
+                  requests.exceptions.Timeout('slow'), _ok_response()]
+        with patch('requests.Session.post', side_effect=errors) as mock_post:
+            result = client.call('domain-info', {'name': 'example.cz'})
+        self.assertEqual(result['response']['code'], '1000')
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(metrics.get_counter('wapi.client.retries'), 2)
+
+    def test_writes_are_not_retried(self):
+        client = WedosAPIClient("user@example.com", "password", use_json=True)
+        with patch('requests.Session.post',
+                   side_effect=requests.exceptions.Timeout('slow')) as mock_post:
+            with self.assertRaises(WAPITimeoutError):
+                client.call('domain-renew', {'name': 'example.cz', 'period': 1})
+        self.assertEqual(mock_post.call_count, 1)
+
+    def test_open_circuit_fails_fast_without_http(self):
+        client = WedosAPIClient("user@example.com", "password", use_json=True,
+                                retry_policy=RetryPolicy(max_attempts=1),
+                                circuit_breaker=CircuitBreaker(threshold=2, reset_timeout=60))
+        down = requests.exceptions.ConnectionError('down')
+        with patch('requests.Session.post', side_effect=down) as mock_post:
+            for _ in range(2):
+                with self.assertRaises(WAPIConnectionError):
+                    client.call('ping')
+            with self.assertRaises(WAPICircuitOpenError):
+                client.call('ping')
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_interrupted_probe_is_released(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        client = WedosAPIClient("user@example.com", "password", use_json=True,
+                                retry_policy=RetryPolicy(max_attempts=1), circuit_breaker=breaker)
+        with patch('requests.Session.post', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                client.call('ping')
+        with patch('requests.Session.post', return_value=_ok_response()):
+            self.assertEqual(client.call('ping')['response']['code'], '1000')
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+    def test_client_errors_do_not_open_the_circuit(self):
+        breaker = CircuitBreaker(threshold=1)
+        client = WedosAPIClient("user@example.com", "password", use_json=True,
+                                circuit_breaker=breaker)
+        response = MagicMock(status_code=403)
+        error = requests.exceptions.HTTPError('403', response=response)
+        response.raise_for_status.side_effect = error
+        with patch('requests.Session.post', return_value=response):
+            with self.assertRaises(WAPIRequestError):
+                client.call('ping')
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+    def test_split_connect_and_read_timeouts(self):
+        client = WedosAPIClient("user@example.com", "password", use_json=True,
+                                connect_timeout=2, timeout=45)
+        with patch('requests.Session.post', return_value=_ok_response()) as mock_post:
+            client.call('ping')
+        self.assertEqual(mock_post.call_args[1]['timeout'], (2, 45))
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    """Test AIMD rate adaptation and persistence"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = f"{self.tmp.name}/ratelimit.json"
+        self.now = [100.0]
+        patcher = patch('wapi.api.resilience.time.monotonic', side_effect=lambda: self.now[0])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_additive_increase_multiplicative_decrease(self):
+        limiter = AdaptiveRateLimiter(initial_rate=2.0, min_rate=0.5, max_rate=3.0, increase=1.0)
+        limiter.on_success()
+        self.assertAlmostEqual(limiter.rate, 2.5)
+        for _ in range(10):
+            limiter.on_success()
+        self.assertEqual(limiter.rate, 3.0)
+        self.assertTrue(limiter.on_throttle())
+        self.assertEqual(limiter.rate, 1.5)
+        # Throttles from requests already in flight do not count again
+        self.assertFalse(limiter.on_throttle())
+        self.now[0] += 3
+        limiter.on_throttle()
+        self.now[0] += 3
+        limiter.on_throttle()
+        self.assertEqual(limiter.rate, 0.5)
+
+    def test_learned_rate_is_persisted_per_key(self):
+        first = AdaptiveRateLimiter(initial_rate=8.0, state_path=self.path, key='a')
+        first.on_throttle()
+        AdaptiveRateLimiter(initial_rate=6.0, state_path=self.path, key='b').on_throttle()
+        self.assertEqual(AdaptiveRateLimiter(state_path=self.path, key='a').rate, 4.0)
+        self.assertEqual(AdaptiveRateLimiter(state_path=self.path, key='b').rate, 3.0)
+        fresh = AdaptiveRateLimiter(initial_rate=7.0, state_path=self.path, key='c')
+        self.assertEqual(fresh.rate, 7.0)
+
+    def test_zero_max_rate_disables_limiting(self):
+        limiter = AdaptiveRateLimiter(max_rate=0)
+        limiter.on_throttle()
+        self.assertEqual(limiter.rate, 0)
+
+    def test_shared_per_username(self):
+        limiter = shared_rate_limiter('user@example.com')
+        self.assertIs(shared_rate_limiter('User@example.com'), limiter)
+        self.assertIsNot(shared_rate_limiter('other@example.com'), limiter)
+        client = WedosAPIClient("user@example.com", "password")
+        self.assertIs(client.rate_limiter, shared_rate_limiter('user@example.com'))
+
+    def test_throttled_response_detection(self):
+        def _response(code, result):
+            return {'response': {'code': code, 'result': result}}
+
+        self.assertTrue(is_throttled_response(_response('2200', 'Request limit exceeded')))
+        self.assertFalse(is_throttled_response(_response('1000', 'rate limit info')))
+        self.assertFalse(is_throttled_response(_response('2051', 'Access not allowed')))
+
+
+class TestClientThrottling(unittest.TestCase):
+    """Test throttling responses in WedosAPIClient"""
+
+    def setUp(self):
+        metrics.reset_metrics()
+        self.addCleanup(metrics.reset_metrics)
+        self.limiter = AdaptiveRateLimiter(initial_rate=100, max_rate=1000, burst=100)
+
+    def test_throttled_write_backs_off_and_is_retried(self):
+        client = WedosAPIClient("user@example.com", "password", use_json=True,
+                                rate_limiter=self.limiter)
+        throttled = MagicMock(status_code=429)
+        error = requests.exceptions.HTTPError('429', response=throttled)
+        throttled.raise_for_status.side_effect = error
+        with patch('requests.Session.post', side_effect=[throttled, _ok_response()]) as mock_post:
+            result = client.call('domain-renew', {'name': 'example.cz', 'period': 1})
+        self.assertEqual(result['response']['code'], '1000')
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertLess(self.limiter.rate, 100.0)
+        self.assertEqual(metrics.get_counter('wapi.client.throttled'), 1)
+
+    def test_limit_result_raises_throttled_error(self):
+        client = WedosAPIClient("user@example.com", "password", use_json=True,
+                                rate_limiter=self.limiter, retry_policy=RetryPolicy(max_attempts=1))
+        with patch('requests.Session.post', return_value=_ok_response('2200', 'Too many requests')):
+            with self.assertRaises(WAPIThrottledError):
+                client.call('domain-info', {'name': 'example.cz'})
+        self.assertEqual(self.limiter.rate, 50.0)
+
+
+class TestHedgePolicy(unittest.TestCase):
+    """Test hedge delay and budget"""
+
+    def test_delay_follows_the_latency_percentile(self):
+        policy = HedgePolicy(percentile=90, initial_delay=1.5, min_delay=0.1, min_samples=10)
+        self.assertEqual(policy.delay('domain-info'), 1.5)
+        for ms in range(1, 101):
+            policy.record_latency('domain-info', ms / 100)
+        self.assertAlmostEqual(policy.delay('domain-info'), 0.91)
+        self.assertEqual(policy.delay('dns-rows-list'), 1.5)
+
+    def test_budget_caps_hedges(self):
+        policy = HedgePolicy(budget=0.1)
+        for _ in range(20):
+            policy.start_call()
+        self.assertEqual(sum(policy.try_hedge() for _ in range(10)), 3)
+
+    def test_only_reads_by_default(self):
+        self.assertTrue(HedgePolicy().applies_to('domain-info'))
+        self.assertFalse(HedgePolicy().applies_to('domain-renew'))
+
+
+class TestClientHedging(unittest.TestCase):
+    """Test hedged reads in WedosAPIClient"""
+
+    def setUp(self):
+        metrics.reset_metrics()
+        self.addCleanup(metrics.reset_metrics)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.calls = []
+
+    def _client(self, responses, **policy):
+        """Client whose n-th request returns/raises responses[n]; 'slow' blocks until released"""
+        client = WedosAPIClient("user@example.com", "password", coalesce_reads=False,
+                                hedge_policy=HedgePolicy(initial_delay=0.05, min_delay=0, **policy))
+        lock = threading.Lock()
+
+        def fake_call(command, data=None):
+            with lock:
+                behaviour = responses[len(self.calls)]
+                self.calls.append(command)
+            if behaviour == 'slow':
+                self.release.wait(5)
+                return {'response': {'code': '1000', 'result': 'slow'}}
+            if isinstance(behaviour, Exception):
+                raise behaviour
+            return {'response': {'code': '1000', 'result': behaviour}}
+
+        patcher = patch.object(client, '_call', side_effect=fake_call)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return client
+
+    def test_slow_read_is_hedged_and_first_response_wins(self):
+        client = self._client(['slow', 'fast'])
+        result = client.call('domain-info', {'name': 'example.cz'})
+        self.assertEqual(result['response']['result'], 'fast')
+        self.assertEqual(metrics.get_counter('wapi.client.hedged'), 1)
+        self.assertEqual(metrics.get_counter('wapi.client.hedge_wins'), 1)
+
+    def test_abandoned_request_latency_is_not_learned(self):
+        client = self._client(['slow', 'fast'])
+        before = set(threading.enumerate())
+        client.call('domain-info', {'name': 'example.cz'})
+        self.release.set()
+        for thread in set(threading.enumerate()) - before:
+            thread.join(1)
+        self.assertEqual(len(client.hedge_policy._latencies['domain-info']), 1)
+
+    def test_fast_read_is_not_hedged(self):
+        client = self._client(['fast'])
+        result = client.call('domain-info', {'name': 'example.cz'})
+        self.assertEqual(result['response']['result'], 'fast')
+        self.assertEqual(self.calls, ['domain-info'])
+
+    def test_failed_hedge_waits_for_the_original(self):
+        client = self._client(['slow', WAPIConnectionError('reset')], budget=1)
+
+        def release_later():
+            while len(self.calls) < 2:
+                threading.Event().wait(0.01)
+            self.release.set()
+
+        threading.Thread(target=release_later, daemon=True).start()
+        result = client.call('domain-info', {'name': 'example.cz'})
+        self.assertEqual(result['response']['result'], 'slow')
+        self.assertEqual(metrics.get_counter('wapi.client.hedge_wins'), 0)
+
+    def test_writes_are_not_hedged(self):
+        client = self._client(['fast'])
+        client.call('domain-renew', {'name': 'example.cz', 'period': 1})
+        self.assertEqual(metrics.get_counter('wapi.client.hedged'), 0)
+
+
+class TestNetworkConfig:
+    """Test WAPI_RETRIES / WAPI_*TIMEOUT parsing"""
+
+    def test_values_and_fallbacks(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('WAPI_RETRIES', '0')
+        monkeypatch.setenv('WAPI_TIMEOUT', '60')
+        monkeypatch.setenv('WAPI_CONNECT_TIMEOUT', 'soon')
+        settings = get_network_config(str(tmp_path / 'missing.env'))
+        assert settings['retries'] == 0
+        assert settings['timeout'] == 60
+        assert settings['connect_timeout'] == 5
+        assert settings['max_rate'] == 20.0
+        assert settings['hedge_percentile'] == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,10 @@
 Tests for the `wapi search` command.
 """
 
+import json
+import os
 import sys
+import tempfile
 import unittest
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
@@ -243,5 +246,60 @@ class TestCmdSearchErrors(unittest.TestCase):
              patch("builtins.print"), \
              self.assertRaises(WAPIRequestError):
             cmd_search(args, client)
+
+
+class TestSearchFile(unittest.TestCase):
+    """`wapi search --file` uses batched availability calls"""
+
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+        self.tmp.write("# candidates\nfree.cz\ntaken.cz\nFree.cz\nunknown.cz\n")
+        self.tmp.close()
+        self.addCleanup(os.unlink, self.tmp.name)
+        self.client = MagicMock()
+        self.client.domains_availability.return_value = {
+            "free.cz": {"response": {"code": "1000", "data": {
+                "domain": {"name": "free.cz", "status": "available"}}}},
+            "taken.cz": {"response": {"code": "1000", "data": {
+                "domain": {"name": "taken.cz", "status": "registered"}}}},
+        }
+
+    def _args(self, **options):
+        return SimpleNamespace(domain=None, file=self.tmp.name, format="json", whois_server=None,
+                               whois_timeout=5, **options)
+
+    def test_batched_lookup(self):
+        whois = {"taken.cz": "domain: taken.cz\nregistrar: REG-X\n",
+                 "unknown.cz": "%ERROR:101: no entries found\n"}
+        self.client.domain_availability.return_value = {"response": {"code": "2000"}}
+        with patch("wapi.commands.search.perform_whois_lookup",
+                   side_effect=lambda d, **kw: whois[d]), \
+                patch("builtins.print") as mock_print:
+            self.assertEqual(cmd_search(self._args(), self.client), EXIT_SUCCESS)
+        self.client.domains_availability.assert_called_once_with(
+            ["free.cz", "taken.cz", "unknown.cz"])
+        rows = json.loads(mock_print.call_args[0][0])
+        self.assertEqual([(r["domain"], r["available"], r["source"]) for r in rows],
+                         [("free.cz", True, "wapi"), ("taken.cz", False, "wapi"),
+                          ("unknown.cz", True, "whois")])
+        self.assertEqual(rows[1]["registrar"], "REG-X")
+
+        # The second run is answered from the cache
+        self.client.reset_mock()
+        with patch("builtins.print"):
+            cmd_search(self._args(), self.client)
+        self.client.domains_availability.assert_not_called()
+
+    def test_undetermined_domains_fail_after_output(self):
+        self.client.domain_availability.return_value = {"response": {"code": "2000"}}
+        with patch("wapi.commands.search.perform_whois_lookup",
+                   side_effect=WAPIRequestError("down")), \
+                patch("builtins.print") as mock_print, patch("sys.stderr"), \
+                self.assertRaises(WAPIRequestError) as ctx:
+            cmd_search(self._args(), self.client)
+        self.assertIn("1 of 3", str(ctx.exception))
+        mock_print.assert_called_once()
+
+
 if __name__ == "__main__":
     unittest.main()
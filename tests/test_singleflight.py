@@ -0,0 +1,144 @@
+"""
+Unit tests for request coalescing (singleflight) and client metrics
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from wapi.api.client import WedosAPIClient
+from wapi.utils import metrics
+from wapi.utils.singleflight import SingleFlight
+
+
+def _wait_for_waiters(flights: SingleFlight, count: int, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with flights._lock:
+            if sum(f.waiters for f in flights._flights.values()) >= count:
+                return
+        time.sleep(0.001)
+    raise AssertionError(f"expected {count} waiter(s)")
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test the SingleFlight primitive"""
+
+    def test_concurrent_callers_share_one_execution(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait(2)
+            return 'value'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do('k', work)))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        _wait_for_waiters(flights, 4)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [('value', False)] + [('value', True)] * 4)
+        self.assertEqual(flights.in_flight(), 0)
+
+    def test_errors_propagate_to_waiters(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def work():
+            release.wait(2)
+            raise ValueError('boom')
+
+        def caller():
+            try:
+                flights.do('k', work)
+            except ValueError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=caller) for _ in range(3)]
+        for t in threads:
+            t.start()
+        _wait_for_waiters(flights, 2)
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, ['boom'] * 3)
+
+    def test_sequential_calls_are_not_shared(self):
+        flights = SingleFlight()
+        self.assertEqual(flights.do('k', lambda: 1), (1, False))
+        self.assertEqual(flights.do('k', lambda: 2), (2, False))
+
+
+class TestClientCoalescing(unittest.TestCase):
+    """Test coalescing in WedosAPIClient.call"""
+
+    def setUp(self):
+        metrics.reset_metrics()
+        self.addCleanup(metrics.reset_metrics)
+        self.client = WedosAPIClient("user@example.com", "password")
+        self.release = threading.Event()
+        self.requests = []
+
+        def fake_call(command, data=None):
+            self.requests.append((command, data))
+            self.release.wait(2)
+            return {'response': {'code': '1000', 'data': {'domain': {'name': 'example.cz'}}}}
+
+        patcher = patch.object(self.client, '_call', side_effect=fake_call)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run_parallel(self, calls, waiters):
+        results = [None] * len(calls)
+
+        def run(i, command, data):
+            results[i] = self.client.call(command, data)
+
+        threads = [threading.Thread(target=run, args=(i, c, d)) for i, (c, d) in enumerate(calls)]
+        for t in threads:
+            t.start()
+        if waiters:
+            _wait_for_waiters(self.client._singleflight, waiters)
+        else:
+            time.sleep(0.05)
+        self.release.set()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_identical_reads_are_coalesced(self):
+        # Key order in data does not matter
+        calls = [("domain-info", {"name": "example.cz"})] * 3 + \
+                [("dns-rows-list", {"domain": "example.cz", "b": 1, "a": 2}),
+                 ("dns-rows-list", {"a": 2, "b": 1, "domain": "example.cz"})]
+        results = self._run_parallel(calls, waiters=3)
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(metrics.get_counter("wapi.client.coalesced"), 3)
+        # Every caller gets its own copy of the response
+        results[1]['response']['data']['domain']['name'] = 'changed'
+        self.assertEqual(results[2]['response']['data']['domain']['name'], 'example.cz')
+
+    def test_writes_are_never_coalesced(self):
+        calls = [("domain-renew", {"name": "example.cz", "period": 1})] * 3
+        self._run_parallel(calls, waiters=0)
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(metrics.get_counter("wapi.client.coalesced"), 0)
+
+    def test_coalescing_can_be_disabled(self):
+        self.client.coalesce_reads = False
+        self._run_parallel([("domain-info", {"name": "example.cz"})] * 3, waiters=0)
+        self.assertEqual(len(self.requests), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
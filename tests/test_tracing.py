@@ -0,0 +1,182 @@
+"""
+Tests for opt-in tracing spans
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from wapi.api.client import WedosAPIClient
+from wapi.cli import main
+from wapi.utils import tracing
+from wapi.utils.tracing import (
+    NOOP_SPAN,
+    InMemorySpanExporter,
+    configure_tracing,
+    configure_tracing_from_spec,
+    disable_tracing,
+    start_span,
+    traced,
+)
+
+
+class TestTracingDisabled(unittest.TestCase):
+    """No-op fast path"""
+
+    def setUp(self):
+        disable_tracing()
+
+    def test_start_span_returns_noop(self):
+        span = start_span("anything", {"a": 1})
+        self.assertIs(span, NOOP_SPAN)
+        with span as s:
+            s.set_attribute("key", "value")
+        self.assertFalse(tracing.is_tracing_enabled())
+        self.assertIsNone(tracing.current_span())
+
+    def test_traced_decorator_passthrough(self):
+        @traced("op")
+        def op(x):
+            return x * 2
+        self.assertEqual(op(2), 4)
+
+    def test_spec_disables(self):
+        self.assertIsNone(configure_tracing_from_spec(None))
+        self.assertIsNone(configure_tracing_from_spec("off"))
+        self.assertFalse(tracing.is_tracing_enabled())
+
+
+class TestTracingEnabled(unittest.TestCase):
+    """Span recording and export"""
+
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        configure_tracing(self.exporter)
+
+    def tearDown(self):
+        disable_tracing()
+
+    def test_nested_spans_share_trace(self):
+        with start_span("root") as root:
+            with start_span("child", {"k": "v"}) as child:
+                pass
+        self.assertEqual([s.name for s in self.exporter.spans], ["child", "root"])
+        self.assertEqual(child.trace_id, root.trace_id)
+        self.assertEqual(child.parent_id, root.span_id)
+        self.assertIsNone(root.parent_id)
+        self.assertEqual(child.attributes, {"k": "v"})
+        self.assertGreaterEqual(root.duration, 0)
+
+    def test_exception_marks_span_error(self):
+        with self.assertRaises(ValueError):
+            with start_span("failing"):
+                raise ValueError("boom")
+        span = self.exporter.spans[0]
+        self.assertEqual(span.status, tracing.STATUS_ERROR)
+        self.assertEqual(span.events[0]['attributes']['exception.type'], 'ValueError')
+
+    def test_explicit_parent(self):
+        with start_span("root") as root:
+            pass
+        with start_span("worker", parent=root) as worker:
+            pass
+        self.assertEqual(worker.parent_id, root.span_id)
+
+    @patch('wapi.api.client.calculate_auth', return_value="hash")
+    @patch('wapi.api.client.requests.Session.post')
+    def test_client_call_span(self, mock_post, _auth):
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = {"response": {"code": "1000", "result": "OK"}}
+        mock_post.return_value = mock_response
+        client = WedosAPIClient("user@example.com", "pw", use_json=True)
+
+        with start_span("wapi auth ping") as root:
+            client.ping()
+
+        call_span = self.exporter.spans[0]
+        self.assertEqual(call_span.name, "wapi.call")
+        self.assertEqual(call_span.attributes["wapi.command"], "ping")
+        self.assertEqual(call_span.attributes["wapi.response.code"], "1000")
+        self.assertEqual(call_span.parent_id, root.span_id)
+
+    @patch('wapi.api.client.time.sleep')
+    def test_poll_attempt_spans(self, _sleep):
+        client = WedosAPIClient("user@example.com", "pw")
+        responses = [
+            {"response": {"code": "1001"}},
+            {"response": {"code": "1000"}},
+        ]
+        with patch.object(client, 'call', side_effect=responses):
+            client.poll_until_complete("domain-info", {"name": "example.com"},
+                                       max_attempts=3, interval=0)
+
+        names = [s.name for s in self.exporter.spans]
+        self.assertEqual(names, ["wapi.poll.attempt", "wapi.poll.attempt", "wapi.poll"])
+        poll_span = self.exporter.spans[-1]
+        self.assertEqual(poll_span.attributes["wapi.poll.attempts"], 2)
+        self.assertFalse(self.exporter.spans[0].attributes["wapi.poll.complete"])
+        self.assertTrue(self.exporter.spans[1].attributes["wapi.poll.complete"])
+
+    def test_whois_query_span(self):
+        with patch('wapi.commands.search.socket.socket') as mock_socket_cls:
+            sock = mock_socket_cls.return_value
+            sock.recv.side_effect = [b"Domain: example.cz\n", b""]
+            from wapi.commands.search import _query_whois
+            _query_whois("whois.nic.cz", "example.cz", 5)
+        span = self.exporter.spans[0]
+        self.assertEqual(span.name, "whois.query")
+        self.assertEqual(span.attributes["whois.server"], "whois.nic.cz")
+        self.assertEqual(span.attributes["whois.response.bytes"], 19)
+
+
+class TestFileExporter(unittest.TestCase):
+    """Offline file export"""
+
+    def tearDown(self):
+        disable_tracing()
+
+    def test_file_exporter_writes_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces", "spans.jsonl")
+            configure_tracing_from_spec(path)
+            with start_span("root", {"wapi.command": "ping"}):
+                with start_span("child"):
+                    pass
+            disable_tracing()
+
+            with open(path, encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual([line["name"] for line in lines], ["child", "root"])
+        self.assertEqual(lines[0]["parentSpanId"], lines[1]["spanId"])
+        self.assertEqual(lines[1]["attributes"]["wapi.command"], "ping")
+        self.assertIn("startTimeUnixNano", lines[0])
+
+
+@patch('wapi.cli.setup_logging')
+@patch('wapi.cli.get_client')
+class TestTraceOptions(unittest.TestCase):
+    """Global --trace / --trace-file parsing"""
+
+    def _main(self, argv):
+        with patch('sys.argv', argv), \
+                patch('wapi.cli.configure_tracing_from_spec') as configure, \
+                patch('wapi.cli.run_command', return_value=0) as run:
+            self.assertEqual(main(), 0)
+        return configure, run.call_args[0][0]
+
+    def test_bare_trace_before_subcommand(self, _client, _logging):
+        configure, args = self._main(['wapi', '--trace', 'domain', 'list'])
+        configure.assert_called_once_with('console')
+        self.assertEqual((args.module, args.command), ('domain', 'list'))
+
+    def test_trace_file(self, _client, _logging):
+        configure, args = self._main(['wapi', '--trace-file', 'spans.jsonl', 'domain', 'list'])
+        configure.assert_called_once_with('spans.jsonl')
+        self.assertEqual(args.module, 'domain')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Unit tests for look-alike generation and `wapi search variants`
+"""
+
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from wapi.commands.search import cmd_search, scan_variants
+from wapi.constants import EXIT_SUCCESS
+from wapi.exceptions import WAPIValidationError
+from wapi.utils.variants import generate_variants, split_brand
+
+
+class TestGenerateVariants(unittest.TestCase):
+    """Test permutation kinds and deduplication"""
+
+    def test_kinds(self):
+        variants = dict(generate_variants('acme', ['cz', 'com']))
+        self.assertEqual(variants['acme.com'], 'tld-swap')
+        self.assertEqual(variants['acm.cz'], 'omission')
+        self.assertEqual(variants['came.cz'], 'transposition')
+        self.assertEqual(variants['acrne.cz'], 'homoglyph')
+        self.assertEqual(variants['ac-me.com'], 'hyphenation')
+        self.assertNotIn('acme.cz', variants)
+        self.assertNotIn('-acme.cz', variants)
+
+    def test_each_domain_once_and_valid(self):
+        variants = [domain for domain, _kind in generate_variants('wedos', ['cz', 'sk', 'com'])]
+        self.assertEqual(len(variants), len(set(variants)))
+        self.assertTrue(all(domain.count('.') == 1 and not domain.startswith('-')
+                            for domain in variants))
+        self.assertEqual(list(generate_variants('aa', ['cz'], kinds=['transposition'])), [])
+
+    def test_lazy(self):
+        variants = generate_variants('brandprotection', ['cz', 'com'])
+        self.assertEqual(next(variants), ('brandprotection.com', 'tld-swap'))
+
+    def test_split_brand(self):
+        self.assertEqual(split_brand('ACME.cz.'), ('acme', 'cz'))
+        self.assertEqual(split_brand('acme'), ('acme', ''))
+
+
+class TestSearchVariants(unittest.TestCase):
+    """Test the DNS -> WAPI -> WHOIS pipeline"""
+
+    def setUp(self):
+        self.client = MagicMock()
+
+        def _availability(names):
+            return {name: {"response": {"code": "1000", "data": {"domain": {
+                "name": name, "status": "registered" if name.startswith("acm.") else "available"}}}}
+                for name in names if name != "acme.com"}
+
+        self.client.domains_availability.side_effect = _availability
+        self.client.domain_availability.return_value = {"response": {"code": "2000"}}
+
+    def _run(self, **options):
+        args = SimpleNamespace(domain="variants", name="acme.cz", tld=["com"], format="json",
+                               whois_server=None, whois_timeout=5, **options)
+        whois = {"acme.com": "No match for \"ACME.COM\".\n",
+                 "acm.cz": "domain: acm.cz\nregistrar: REG-A\n"}
+
+        def _delegation(domains, **kw):
+            return [(d, ["ns.squatter.net"] if d == "acne.cz" else None) for d in domains]
+
+        def _whois(domain, **kw):
+            return whois.get(domain, "domain: %s\nregistrar: REG-Q\n" % domain)
+
+        with patch("wapi.commands.search.prefilter_delegations", side_effect=_delegation), \
+                patch("wapi.commands.search.generate_variants",
+                      return_value=iter([("acme.com", "tld-swap"), ("acm.cz", "omission"),
+                                         ("acne.cz", "homoglyph"), ("ac-me.cz", "hyphenation")])), \
+                patch("wapi.commands.search.perform_whois_lookup",
+                      side_effect=_whois) as lookup, \
+                patch("builtins.print") as mock_print:
+            self.assertEqual(cmd_search(args, self.client), EXIT_SUCCESS)
+        rows = json.loads(mock_print.call_args_list[0][0][0])
+        return sorted(rows, key=lambda r: r["domain"]), lookup, mock_print
+
+    def test_registered_variants_with_details(self):
+        rows, lookup, mock_print = self._run()
+        self.assertEqual([(r["domain"], r["kind"], r["source"], r["registrar"]) for r in rows],
+                         [("acm.cz", "omission", "wapi", "REG-A"),
+                          ("acne.cz", "homoglyph", "dns", "REG-Q")])
+        self.assertEqual(rows[1]["nameservers"], "")
+        # Only the delegated name, the WAPI-registered name and the undetermined one reach WHOIS
+        self.assertEqual(sorted(c[0][0] for c in lookup.call_args_list),
+                         ["acm.cz", "acme.com", "acne.cz"])
+        self.client.domains_availability.assert_called_once_with(["acme.com", "acm.cz", "ac-me.cz"])
+        self.assertIn("4 variant(s) checked, 2 registered", mock_print.call_args_list[-1][0][0])
+
+        # A rerun comes from the cache
+        self.client.reset_mock()
+        rows_again, lookup, _ = self._run()
+        self.assertEqual([r["domain"] for r in rows_again], ["acm.cz", "acne.cz"])
+        lookup.assert_not_called()
+        self.client.domains_availability.assert_not_called()
+
+    def test_variants_are_consumed_in_chunks(self):
+        produced = []
+
+        def _variants():
+            for i in range(120):
+                produced.append(i)
+                yield "acme%d.cz" % i, "omission"
+
+        seen = []
+        self.client.domains_availability.side_effect = \
+            lambda names: seen.append((len(names), len(produced))) or {}
+        args = SimpleNamespace(whois_server=None, whois_timeout=5, refresh=True)
+
+        def _undelegated(domains, **kw):
+            return [(d, None) for d in domains]
+
+        with patch("wapi.commands.search.prefilter_delegations", side_effect=_undelegated), \
+                patch("wapi.commands.search.lookup_availability", return_value={"available": True}):
+            self.assertEqual(list(scan_variants(_variants(), args, self.client)), [])
+        # Each availability request only pulled its own names from the generator
+        self.assertEqual(seen, [(50, 50), (50, 100), (20, 120)])
+
+    def test_brand_needs_tld(self):
+        args = SimpleNamespace(domain="variants", name="acme", tld=None, format="json")
+        with self.assertRaises(WAPIValidationError), patch("sys.stderr"):
+            cmd_search(args, self.client)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Unit tests for structured WHOIS parsing
+"""
+
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from wapi.commands.search import cmd_search, infer_availability_from_whois
+from wapi.constants import EXIT_SUCCESS
+from wapi.utils.whois import GENERIC_GRAMMAR, grammar_for, normalize_date, parse_whois
+
+CZNIC_REGISTERED = """%  (c) 2006-2024 CZ.NIC, z.s.p.o.
+%
+% Intended use of supplied data and information
+
+domain:       example.cz
+registrant:   SB:EXAMPLE
+admin-c:      SB:ADMIN
+nsset:        NSS:EXAMPLE:1
+registrar:    REG-WEDOS
+status:       Sponsoring registrar change forbidden
+registered:   15.03.2001 10:20:00
+changed:      12.04.2024 11:00:00
+expire:       15.03.2027
+
+contact:      SB:EXAMPLE
+registrar:    REG-OTHER
+created:      01.01.2010 00:00:00
+
+nsset:        NSS:EXAMPLE:1
+nserver:      ns.wedos.com (46.28.104.66, 2a02:2b88:1:4::16)
+nserver:      ns.wedos.net (46.28.104.67)
+registrar:    REG-WEDOS
+"""
+
+VERISIGN_REGISTERED = """   Domain Name: EXAMPLE.COM
+   Registry Domain ID: 2336799_DOMAIN_COM-VRSN
+   Updated Date: 2024-08-14T07:01:34Z
+   Creation Date: 1995-08-14T04:00:00Z
+   Registry Expiry Date: 2025-08-13T04:00:00Z
+   Registrar: RESERVED-Internet Assigned Numbers Authority
+   Domain Status: clientDeleteProhibited https://icann.org/epp#clientDeleteProhibited
+   Domain Status: clientTransferProhibited https://icann.org/epp#clientTransferProhibited
+   Name Server: A.IANA-SERVERS.NET
+   Name Server: B.IANA-SERVERS.NET
+>>> Last update of whois database: 2024-09-01T00:00:00Z <<<
+
+NOTICE: The expiration date displayed in this record is the date the
+registrar's sponsorship of the domain name registration in the registry is
+currently set to expire.
+"""
+
+
+class TestParseWhois(unittest.TestCase):
+    """Test per-registry grammars"""
+
+    def test_cznic(self):
+        record = parse_whois(CZNIC_REGISTERED, 'whois.nic.cz')
+        self.assertEqual(record, {
+            'available': False, 'grammar': 'cznic', 'domain': 'example.cz',
+            'nsset': 'NSS:EXAMPLE:1', 'registrar': 'REG-WEDOS',
+            'status': ['Sponsoring registrar change forbidden'],
+            'registered': '2001-03-15', 'updated': '2024-04-12', 'expires': '2027-03-15',
+            'nameservers': ['ns.wedos.com', 'ns.wedos.net'],
+        })
+
+    def test_verisign(self):
+        record = parse_whois(VERISIGN_REGISTERED, 'whois.verisign-grs.com')
+        self.assertFalse(record['available'])
+        self.assertEqual(record['registrar'], 'RESERVED-Internet Assigned Numbers Authority')
+        self.assertEqual((record['registered'], record['expires']), ('1995-08-14', '2025-08-13'))
+        self.assertEqual(record['status'], ['clientDeleteProhibited', 'clientTransferProhibited'])
+        self.assertEqual(record['nameservers'], ['a.iana-servers.net', 'b.iana-servers.net'])
+
+    def test_not_found_answers(self):
+        verisign = parse_whois('No match for "NOPE.COM".\r\n>>> Last update',
+                               'whois.verisign-grs.com')
+        self.assertTrue(verisign['available'])
+        self.assertTrue(parse_whois('%ERROR:101: no entries found\n', 'whois.nic.cz')['available'])
+        self.assertTrue(parse_whois('NOT FOUND\n', 'whois.pir.org')['available'])
+        # DENIC echoes the queried name even when it is free
+        denic = parse_whois('Domain: nope.de\nStatus: free\n', 'whois.denic.de')
+        self.assertTrue(denic['available'])
+        self.assertIsNone(parse_whois('nondescriptive output', 'whois.nic.cz')['available'])
+        self.assertIsNone(parse_whois('', None)['available'])
+
+    def test_generic_grammar(self):
+        self.assertIs(grammar_for('whois.unknown.example'), GENERIC_GRAMMAR)
+        self.assertEqual(grammar_for('WHOIS.NIC.CZ.').name, 'cznic')
+        record = parse_whois("domain: example.io\nexpires: 2030-01-02\nnserver: NS1.EXAMPLE.IO.\n")
+        self.assertEqual((record['available'], record['expires'], record['nameservers']),
+                         (False, '2030-01-02', ['ns1.example.io']))
+        self.assertTrue(infer_availability_from_whois("Status: AVAILABLE"))
+
+    def test_normalize_date(self):
+        self.assertEqual(normalize_date('2025-08-13T04:00:00Z'), '2025-08-13')
+        self.assertEqual(normalize_date('1.2.2030'), '2030-02-01')
+        self.assertEqual(normalize_date('soon'), 'soon')
+
+
+class TestSearchStructuredWhois(unittest.TestCase):
+    """cmd_search reports parsed WHOIS fields"""
+
+    def test_registered_domain_fields(self):
+        client = MagicMock()
+        client.domain_availability.return_value = {
+            "response": {"code": "1000",
+                         "data": {"domain": {"name": "example.cz", "status": "registered"}}}}
+        args = SimpleNamespace(domain="example.cz", format="json", whois_server=None,
+                               whois_timeout=5)
+        with patch("wapi.commands.search.perform_whois_lookup", return_value=CZNIC_REGISTERED), \
+                patch("builtins.print") as mock_print:
+            self.assertEqual(cmd_search(args, client), EXIT_SUCCESS)
+        payload = json.loads(mock_print.call_args[0][0])
+        self.assertEqual(payload["registrar"], "REG-WEDOS")
+        self.assertEqual(payload["expires"], "2027-03-15")
+        self.assertEqual(payload["nameservers"], ["ns.wedos.com", "ns.wedos.net"])
+        self.assertIn("whois", payload)
+
+
+if __name__ == '__main__':
+    unittest.main()
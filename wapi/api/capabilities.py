@@ -0,0 +1,149 @@
+"""
+Per-command endpoint format capabilities
+
+WAPI serves commands on an XML and a JSON endpoint, but a command is not
+necessarily enabled on both: the other endpoint answers 2010 (unknown
+command). ``FormatCapabilities`` remembers, per command, which formats
+answered that way and how fast each working format responds, so
+``WedosAPIClient`` sends later calls straight to a format that works (the
+faster one when both do) instead of failing over on every call. Every
+``LATENCY_SAMPLE_EVERY``-th call of a command that works on both formats
+goes to the other one, so a change in latency is noticed. The cache
+can be persisted as a small JSON file; "unsupported" marks expire so a
+command enabled later is picked up again.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from ..constants import CAPABILITY_TTL
+from ..utils.logger import get_logger
+
+FORMATS = ('xml', 'json')
+
+# Weight of the newest sample in the per-format latency average
+LATENCY_SMOOTHING = 0.3
+
+# Share of calls (one in N) sent to the format that is not preferred
+LATENCY_SAMPLE_EVERY = 20
+
+
+def other_format(fmt: str) -> str:
+    """Return the other endpoint format"""
+    return 'xml' if fmt == 'json' else 'json'
+
+
+class FormatCapabilities:
+    """Which endpoint format each command works on, and how fast"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            path: JSON file to load from and save to (in memory only if None)
+        """
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._logger = get_logger('api.capabilities')
+        self._commands: Dict[str, Dict[str, Any]] = self._load()
+        self._calls: Dict[str, int] = {}
+        self._dirty = False
+        if self.path is not None:
+            atexit.register(self.save)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                commands = json.load(f).get('commands', {})
+            return commands if isinstance(commands, dict) else {}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _unsupported(self, entry: Dict[str, Any], fmt: str) -> bool:
+        marked = entry.get('unsupported', {}).get(fmt)
+        return marked is not None and time.time() - marked < CAPABILITY_TTL
+
+    def is_unsupported(self, command: str, fmt: str) -> bool:
+        """Return True if ``fmt`` recently answered ``command`` with unknown command"""
+        with self._lock:
+            return self._unsupported(self._commands.get(command, {}), fmt)
+
+    def preferred(self, command: str, default: str) -> str:
+        """
+        Format to send ``command`` with.
+
+        When both formats work, every ``LATENCY_SAMPLE_EVERY``-th call
+        returns the other format so its latency keeps being learned.
+
+        Args:
+            command: WAPI command
+            default: Format used when nothing better is known
+        """
+        with self._lock:
+            entry = self._commands.get(command)
+            if not entry:
+                return default
+            working = [f for f in FORMATS if not self._unsupported(entry, f)]
+            if len(working) == 1:
+                return working[0]
+            if len(working) < 2:
+                return default
+            latency = entry.get('latency', {})
+            best = default
+            if all(f in latency for f in working):
+                best = min(working, key=lambda f: latency[f])
+            calls = self._calls.get(command, 0) + 1
+            self._calls[command] = calls
+            if calls % LATENCY_SAMPLE_EVERY == 0:
+                return other_format(best)
+            return best
+
+    def mark_unsupported(self, command: str, fmt: str):
+        """Record that ``fmt`` does not know ``command``"""
+        with self._lock:
+            entry = self._commands.setdefault(command, {})
+            entry.setdefault('unsupported', {})[fmt] = int(time.time())
+            entry.get('latency', {}).pop(fmt, None)
+            self._dirty = True
+        self._logger.info(f"{command} is not available on the {fmt.upper()} endpoint")
+        self.save()
+
+    def record_latency(self, command: str, fmt: str, seconds: float):
+        """Record a successful round trip of ``command`` over ``fmt``"""
+        with self._lock:
+            entry = self._commands.setdefault(command, {})
+            entry.get('unsupported', {}).pop(fmt, None)
+            latency = entry.setdefault('latency', {})
+            previous = latency.get(fmt)
+            latency[fmt] = round(seconds if previous is None else
+                                 previous + LATENCY_SMOOTHING * (seconds - previous), 4)
+            self._dirty = True
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the cache (command -> {unsupported, latency})"""
+        with self._lock:
+            return json.loads(json.dumps(self._commands))
+
+    def save(self):
+        """Write the cache to ``path`` if it changed"""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({'commands': self._commands}, indent=2, sort_keys=True)
+            self._dirty = False
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self._logger.debug(f"Cannot save format capabilities to {self.path}: {e}")
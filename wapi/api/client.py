@@ -5,29 +5,153 @@ Core API client for communicating with WEDOS WAPI.
 Supports both XML and JSON formats.
 """
 
+import copy
 import hashlib
+import itertools
 import json
+import os
+import queue
+import threading
 import time
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from .auth import calculate_auth
-from ..constants import DEFAULT_MAX_POLL_ATTEMPTS, DEFAULT_POLL_INTERVAL
+from .capabilities import FormatCapabilities, other_format
+from .resilience import (
+    AdaptiveRateLimiter,
+    CircuitBreaker,
+    HedgePolicy,
+    RetryPolicy,
+    is_throttled_response,
+    shared_rate_limiter,
+)
+from .journal import (
+    STATE_APPLIED,
+    STATE_DONE,
+    STATE_NOT_APPLIED,
+    STATE_UNKNOWN,
+    RequestJournal,
+    reconcile,
+)
+from ..constants import (
+    API_UNKNOWN_COMMAND,
+    AVAILABILITY_SPLIT_CODES,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_HTTP_POOL_SIZE,
+    DEFAULT_MAX_POLL_ATTEMPTS,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_TIMEOUT,
+    MAX_AVAILABILITY_NAMES,
+    READ_ONLY_COMMANDS,
+    THROTTLE_HTTP_STATUSES,
+)
 from ..exceptions import (
+    WAPICircuitOpenError,
     WAPIConnectionError,
+    WAPIRejectedError,
     WAPIRequestError,
+    WAPIThrottledError,
     WAPITimeoutError,
 )
+from ..utils.codec import get_json_codec, get_xml_codec
 from ..utils.logger import get_logger
+from ..utils.metrics import increment
+from ..utils.singleflight import SingleFlight
+from ..utils.tracing import start_span, traced
+
+
+def _escape_xml_text(text: str) -> str:
+    """Escape XML character data exactly like ElementTree does"""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _serialize_xml_text(out: List[str], tag: str, text: str):
+    """Append a leaf element (self-closing when empty, as ElementTree does)"""
+    if text:
+        out.append(f"<{tag}>{_escape_xml_text(text)}</{tag}>")
+    else:
+        out.append(f"<{tag} />")
+
+
+def _serialize_xml_element(out: List[str], tag: str, data: Dict[str, Any]):
+    """Append an element with child elements built from ``data``"""
+    mark = len(out)
+    out.append(f"<{tag}>")
+    _serialize_xml_data(out, data)
+    if len(out) == mark + 1:
+        # No children were produced - ElementTree emits an empty element
+        out[mark] = f"<{tag} />"
+    else:
+        out.append(f"</{tag}>")
+
+
+def _serialize_xml_data(out: List[str], data: Dict[str, Any]):
+    """
+    Serialize request data into XML fragments.
+    
+    Produces the same output as building the tree with ``_build_xml_data``
+    and serializing it with ``ET.tostring``, without creating any elements.
+    """
+    for key, value in data.items():
+        if isinstance(value, dict):
+            _serialize_xml_element(out, key, value)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    _serialize_xml_element(out, key, item)
+                else:
+                    _serialize_xml_text(out, key, str(item))
+        else:
+            _serialize_xml_text(out, key, str(value) if value is not None else "")
+
+
+_cltrid_lock = threading.Lock()
+_cltrid_counter = itertools.count(1)
+_cltrid_instance = None
+
+
+def next_cltrid() -> str:
+    """
+    Return a new client transaction ID.
+    
+    Format ``wapi-<unix time>-<instance>-<sequence>``: the instance part (PID
+    plus random bits, renewed after fork) separates processes and hosts, and
+    the sequence increases monotonically within a process, so IDs never
+    collide even for many requests in the same second.
+    """
+    global _cltrid_instance
+    with _cltrid_lock:
+        pid = os.getpid()
+        if _cltrid_instance is None or _cltrid_instance[0] != pid:
+            _cltrid_instance = (pid, f"{pid:x}{os.urandom(2).hex()}")
+        seq = next(_cltrid_counter)
+    return f"wapi-{int(datetime.now().timestamp())}-{_cltrid_instance[1]}-{seq}"
 
 
 class WedosAPIClient:
     """WEDOS WAPI client supporting XML and JSON formats"""
     
-    def __init__(self, username: str, password: str, base_url: str = "https://api.wedos.com/wapi", use_json: bool = False):
+    def __init__(self, username: str, password: str, base_url: str = "https://api.wedos.com/wapi",
+                 use_json: bool = False,
+                 coalesce_reads: bool = True, journal: Optional[RequestJournal] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 hedge_policy: Optional[HedgePolicy] = None,
+                 capabilities: Optional[FormatCapabilities] = None):
         """
         Initialize WEDOS API client
         
@@ -36,38 +160,97 @@ class WedosAPIClient:
             password: WAPI password
             base_url: Base URL for API (default: https://api.wedos.com/wapi)
             use_json: Use JSON format instead of XML (default: False)
+            coalesce_reads: Share one HTTP request between concurrent identical
+                            read-only calls (default: True)
+            journal: Journal for mutating calls; enables reconciliation of
+                     writes with an unknown outcome (default: None)
+            retry_policy: Retry policy (default: RetryPolicy() - read-only
+                          commands, 3 attempts, jittered exponential backoff)
+            circuit_breaker: Circuit breaker (default: CircuitBreaker())
+            connect_timeout: HTTP connect timeout in seconds
+            timeout: HTTP read timeout in seconds
+            rate_limiter: Adaptive request pacing (default: the limiter shared
+                          by all clients with the same username)
+            hedge_policy: Send a duplicate of slow read-only calls; the first
+                          response wins (default: None - no hedging)
+            capabilities: Learned per-command endpoint formats; commands the
+                          default format does not know (code 2010) are sent
+                          to the other endpoint (default: in-memory cache)
         """
         self.username = username
         self.password = password
         self.use_json = use_json
         self.base_url = f"{base_url}/json" if use_json else f"{base_url}/xml"
+        self._api_root = base_url
         self.logger = get_logger('api.client')
+        self._xml_prefix_cache = None
+        self.coalesce_reads = coalesce_reads
+        self._singleflight = SingleFlight()
+        self.journal = journal
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        if rate_limiter is None:
+            rate_limiter = shared_rate_limiter(username)
+        self.rate_limiter = rate_limiter
+        self.hedge_policy = hedge_policy
+        self.capabilities = capabilities if capabilities is not None else FormatCapabilities()
+        # Keep-alive connections shared by all threads (workers and hedges) of this client
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=DEFAULT_HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
         self.logger.debug(f"Initialized WedosAPIClient (format: {'JSON' if use_json else 'XML'})")
     
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
+    
     def _calculate_auth(self) -> str:
         """Calculate authentication hash based on current hour in Europe/Prague timezone"""
         return calculate_auth(self.username, self.password)
     
-    def _build_xml_request(self, command: str, data: Optional[Dict[str, Any]] = None) -> str:
-        """Build XML request body"""
+    def _xml_envelope_prefix(self) -> str:
+        """Return the precompiled ``<request><user>...</user>`` envelope prefix"""
+        cached = self._xml_prefix_cache
+        if cached is None or cached[0] != self.username:
+            out: List[str] = ["<request>"]
+            _serialize_xml_text(out, "user", self.username or "")
+            cached = (self.username, "".join(out))
+            self._xml_prefix_cache = cached
+        return cached[1]
+    
+    def _build_xml_request(self, command: str, data: Optional[Dict[str, Any]] = None,
+                           cl_trid: Optional[str] = None) -> str:
+        """
+        Build XML request body
+        
+        Uses a precompiled envelope and a string serializer for ``data``;
+        the output is identical to serializing the equivalent ElementTree.
+        """
         auth = self._calculate_auth()
-        cl_trid = f"wapi-{int(datetime.now().timestamp())}"
+        cl_trid = cl_trid or next_cltrid()
         
-        root = ET.Element("request")
-        ET.SubElement(root, "user").text = self.username
-        ET.SubElement(root, "auth").text = auth
-        ET.SubElement(root, "command").text = command
-        ET.SubElement(root, "clTRID").text = cl_trid
+        out: List[str] = [self._xml_envelope_prefix()]
+        _serialize_xml_text(out, "auth", auth)
+        _serialize_xml_text(out, "command", command)
+        _serialize_xml_text(out, "clTRID", cl_trid)
         
         if data:
-            data_elem = ET.SubElement(root, "data")
-            self._build_xml_data(data_elem, data)
+            _serialize_xml_element(out, "data", data)
         
-        return ET.tostring(root, encoding='unicode')
+        out.append("</request>")
+        return "".join(out)
     
     def _build_xml_data(self, parent: ET.Element, data: Dict[str, Any]):
-        """Recursively build XML data structure"""
+        """
+        Recursively build XML data structure as ElementTree elements.
+        
+        Reference implementation of the request serializer; ``_build_xml_request``
+        produces the same markup without building a tree.
+        """
         for key, value in data.items():
             if isinstance(value, dict):
                 child = ET.SubElement(parent, key)
@@ -82,10 +265,11 @@ class WedosAPIClient:
             else:
                 ET.SubElement(parent, key).text = str(value) if value is not None else ""
     
-    def _build_json_request(self, command: str, data: Optional[Dict[str, Any]] = None) -> str:
+    def _build_json_request(self, command: str, data: Optional[Dict[str, Any]] = None,
+                            cl_trid: Optional[str] = None) -> str:
         """Build JSON request body"""
         auth = self._calculate_auth()
-        cl_trid = f"wapi-{int(datetime.now().timestamp())}"
+        cl_trid = cl_trid or next_cltrid()
         
         request = {
             "user": self.username,
@@ -97,12 +281,13 @@ class WedosAPIClient:
         if data:
             request["data"] = data
         
-        return json.dumps(request)
+        return get_json_codec().dumps(request)
     
     def _parse_xml_response(self, response_text: str) -> Dict[str, Any]:
         """Parse XML response to dictionary"""
+        xml_codec = get_xml_codec()
         try:
-            root = ET.fromstring(response_text)
+            root = xml_codec.fromstring(response_text)
             result = {}
             
             # WAPI XML response structure: <response> is the root or a child
@@ -118,7 +303,7 @@ class WedosAPIClient:
                     result["response"] = self._parse_xml_element(root)
             
             return result
-        except ET.ParseError as e:
+        except xml_codec.parse_errors as e:
             self.logger.error(f"XML parse error: {e}")
             from ..exceptions import WAPIRequestError
             raise WAPIRequestError(f"XML parse error: {e}") from e
@@ -148,79 +333,300 @@ class WedosAPIClient:
         
         return result
     
-    def call(self, command: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def call(self, command: str, data: Optional[Dict[str, Any]] = None,
+             journal_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Call WEDOS WAPI command
         
         Args:
             command: API command name (e.g., "ping", "domain-info", "nsset-create")
             data: Optional dictionary with command data
+            journal_context: State captured before a write that helps reconcile
+                             it later (e.g. ``{"expiration": ...}`` for domain-renew)
             
         Returns:
             Dictionary with API response
+        
+        Identical read-only calls (same command and data) issued while one is
+        in flight share its HTTP request; writes are never coalesced. With a
+        journal, writes are recorded and reconciled instead of re-issued when
+        their outcome is unknown (see ``wapi.api.journal``). Transport failures
+        are retried according to ``retry_policy`` (read-only commands by default);
+        requests rejected by WAPI request limits are retried for every command
+        after ``rate_limiter`` has slowed down.
+        """
+        with start_span("wapi.call", {
+            "wapi.command": command,
+            "wapi.format": "json" if self.use_json else "xml",
+        }) as span:
+            policy = self.retry_policy
+            attempt = 1
+            while True:
+                try:
+                    result = self._dispatch(command, data, journal_context, span)
+                    break
+                except (WAPITimeoutError, WAPIConnectionError, WAPIThrottledError) as e:
+                    if attempt >= policy.max_attempts or not policy.is_retryable(command, e):
+                        raise
+                    delay = policy.backoff(attempt)
+                    self.logger.warning(f"{command} attempt {attempt} failed ({e}); "
+                                        f"retrying in {delay:.1f}s")
+                    increment("wapi.client.retries")
+                    attempt += 1
+                    span.set_attribute("wapi.attempts", attempt)
+                    time.sleep(delay)
+            response = result.get('response', {}) if isinstance(result, dict) else {}
+            span.set_attribute("wapi.response.code", str(response.get('code')))
+            return result
+    
+    def _dispatch(self, command: str, data: Optional[Dict[str, Any]],
+                  journal_context: Optional[Dict[str, Any]], span) -> Dict[str, Any]:
+        """One attempt of ``call``: coalesced read, journaled write or plain request"""
+        if self.coalesce_reads and command in READ_ONLY_COMMANDS:
+            key = (command, json.dumps(data or {}, sort_keys=True, default=str))
+            result, shared = self._singleflight.do(key, lambda: self._send(command, data, span))
+            if shared:
+                # Callers may modify responses; give each waiter its own copy
+                result = copy.deepcopy(result)
+                increment("wapi.client.coalesced")
+                span.set_attribute("wapi.coalesced", True)
+            return result
+        if self.journal is not None and command not in READ_ONLY_COMMANDS:
+            return self._call_journaled(command, data, journal_context, span)
+        return self._send(command, data, span)
+    
+    def _send(self, command: str, data: Optional[Dict[str, Any]], span) -> Dict[str, Any]:
+        """Perform a request, hedged if ``hedge_policy`` covers the command"""
+        if self.hedge_policy is not None and self.hedge_policy.applies_to(command):
+            return self._call_hedged(command, data, span)
+        return self._call(command, data)
+    
+    def _call_hedged(self, command: str, data: Optional[Dict[str, Any]], span) -> Dict[str, Any]:
         """
+        Send a duplicate request when the first one is slower than the hedge
+        delay; the first successful response wins and the other is abandoned.
+
+        An HTTP request cannot be cancelled, so the abandoned one still runs
+        to completion in its thread: a hedge costs a rate-limiter token and,
+        while the circuit is half-open, is rejected like any other request.
+        Only latencies of requests that finish before the call is decided
+        are learned, so a slow loser does not inflate the hedge delay.
+        """
+        policy = self.hedge_policy
+        policy.start_call()
+        outcomes: queue.Queue = queue.Queue()
+        decided = threading.Event()
+        
+        def attempt(hedge: bool):
+            started = time.monotonic()
+            try:
+                result = self._call(command, data)
+            except Exception as e:
+                outcomes.put((hedge, None, e))
+                return
+            if not decided.is_set():
+                policy.record_latency(command, time.monotonic() - started)
+            outcomes.put((hedge, result, None))
+        
+        threading.Thread(target=attempt, args=(False,), daemon=True).start()
+        pending = 1
+        try:
+            outcome = outcomes.get(timeout=policy.delay(command))
+        except queue.Empty:
+            if policy.try_hedge():
+                self.logger.debug(f"{command} is slow, sending a hedged request")
+                threading.Thread(target=attempt, args=(True,), daemon=True).start()
+                pending += 1
+                increment("wapi.client.hedged")
+                span.set_attribute("wapi.hedged", True)
+            outcome = outcomes.get()
+        pending -= 1
+        first_error = outcome[2]
+        # Wait for the other request only if this one failed
+        while outcome[2] is not None and pending:
+            outcome = outcomes.get()
+            pending -= 1
+        decided.set()
+        hedge, result, error = outcome
+        if error is not None:
+            raise first_error
+        if hedge:
+            increment("wapi.client.hedge_wins")
+        return result
+    
+    def _reconciled_response(self, command: str, cl_trid: str) -> Dict[str, Any]:
+        return {
+            "response": {
+                "code": "1000",
+                "result": f"{command} already applied (reconciled, clTRID {cl_trid})",
+                "clTRID": cl_trid,
+                "reconciled": True,
+            }
+        }
+    
+    def _call_journaled(self, command: str, data: Optional[Dict[str, Any]],
+                        context: Optional[Dict[str, Any]], span) -> Dict[str, Any]:
+        """Perform a write with journaling and reconciliation"""
+        journal = self.journal
+        previous = journal.unresolved(command, data)
+        if previous is not None:
+            prev_id = previous['cltrid']
+            outcome = reconcile(self, command, data, previous.get('context') or context)
+            if outcome is True:
+                self.logger.info(f"{command} with clTRID {prev_id} was already applied, "
+                                 "not re-sending")
+                journal.record_state(prev_id, STATE_APPLIED)
+                increment("wapi.client.reconciled")
+                span.set_attribute("wapi.reconciled", True)
+                return self._reconciled_response(command, prev_id)
+            if outcome is None:
+                raise WAPIRequestError(
+                    f"Previous {command} (clTRID {prev_id}) has an unknown outcome; "
+                    f"verify it and run 'wapi journal resolve {prev_id} --applied' "
+                    f"or '--not-applied' before retrying"
+                )
+            journal.record_state(prev_id, STATE_NOT_APPLIED)
+        
+        cl_trid = next_cltrid()
+        span.set_attribute("wapi.cltrid", cl_trid)
+        journal.record_sent(cl_trid, command, data, context)
+        try:
+            result = self._call(command, data, cl_trid=cl_trid)
+        except (WAPIThrottledError, WAPIRejectedError, WAPICircuitOpenError) as e:
+            # Refused by WAPI, or never sent because the circuit is open: not applied
+            journal.record_state(cl_trid, STATE_NOT_APPLIED, detail=str(e))
+            raise
+        except (WAPITimeoutError, WAPIConnectionError, WAPIRequestError) as e:
+            journal.record_state(cl_trid, STATE_UNKNOWN, detail=str(e))
+            outcome = reconcile(self, command, data, context)
+            if outcome is True:
+                self.logger.info(f"{command} (clTRID {cl_trid}) failed in transit but was applied")
+                journal.record_state(cl_trid, STATE_APPLIED)
+                increment("wapi.client.reconciled")
+                span.set_attribute("wapi.reconciled", True)
+                return self._reconciled_response(command, cl_trid)
+            if outcome is False:
+                journal.record_state(cl_trid, STATE_NOT_APPLIED)
+            raise
+        response = result.get('response', {}) if isinstance(result, dict) else {}
+        journal.record_state(cl_trid, STATE_DONE, code=response.get('code'))
+        return result
+    
+    def _throttled(self):
+        increment("wapi.client.throttled")
+        if self.rate_limiter is not None:
+            self.rate_limiter.on_throttle()
+    
+    def _post(self, request_body: str, url: Optional[str] = None) -> requests.Response:
+        """POST a request body, applying pacing, timeouts and the circuit breaker"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.before_request()
+        try:
+            response = self.session.post(
+                url or self.base_url,
+                data={"request": request_body},
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                timeout=(self.connect_timeout, self.timeout)
+            )
+            self.logger.debug(f"HTTP Response status: {response.status_code}")
+            response.raise_for_status()
+        except requests.exceptions.Timeout as e:
+            if breaker is not None:
+                breaker.record_failure()
+            self.logger.error(f"HTTP request timeout: {e}")
+            raise WAPITimeoutError(f"Request timeout: {e}") from e
+        except requests.exceptions.ConnectionError as e:
+            if breaker is not None:
+                breaker.record_failure()
+            self.logger.error(f"HTTP connection error: {e}")
+            raise WAPIConnectionError(f"Connection error: {e}") from e
+        except requests.exceptions.RequestException as e:
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            http_error = isinstance(e, requests.exceptions.HTTPError)
+            if breaker is not None:
+                if http_error and not (isinstance(status, int) and status >= 500):
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+            self.logger.error(f"HTTP request failed: {e}")
+            if http_error and status in THROTTLE_HTTP_STATUSES:
+                self._throttled()
+                raise WAPIThrottledError(f"Request failed: {e}") from e
+            if http_error and isinstance(status, int) and 400 <= status < 500:
+                raise WAPIRejectedError(f"Request failed: {e}") from e
+            raise WAPIRequestError(f"Request failed: {e}") from e
+        except BaseException:
+            # Anything else (a bug, KeyboardInterrupt) must not leave a half-open probe pending
+            if breaker is not None:
+                breaker.release()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return response
+    
+    def _call(self, command: str, data: Optional[Dict[str, Any]] = None,
+              cl_trid: Optional[str] = None) -> Dict[str, Any]:
+        """Perform a single HTTP round trip for ``call``"""
         from ..utils.logger import log_api_request, log_api_response
         
         log_api_request(self.logger, command, data)
         
-        if self.use_json:
-            request_body = self._build_json_request(command, data)
-            headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        default = 'json' if self.use_json else 'xml'
+        fmt = self.capabilities.preferred(command, default)
+        result = self._request(command, data, cl_trid, fmt)
+        if self._unknown_command(result):
+            # Not enabled on this endpoint (nothing was executed): learn it and
+            # use the other format, now and for later calls
+            self.capabilities.mark_unsupported(command, fmt)
+            fallback = other_format(fmt)
+            if not self.capabilities.is_unsupported(command, fallback):
+                self.logger.info(f"Retrying {command} via the {fallback.upper()} endpoint")
+                increment("wapi.client.format_fallbacks")
+                result = self._request(command, data, cl_trid, fallback)
+                if self._unknown_command(result):
+                    self.capabilities.mark_unsupported(command, fallback)
+        
+        # Log response
+        resp_code = result.get('response', {}).get('code')
+        resp_result = result.get('response', {}).get('result', '')
+        log_api_response(self.logger, command, resp_code, resp_result)
+        
+        if is_throttled_response(result):
+            self._throttled()
+            raise WAPIThrottledError(f"{command} rejected by WAPI request limits: {resp_result} "
+                                     f"(code: {resp_code})")
+        if self.rate_limiter is not None:
+            self.rate_limiter.on_success()
+        return result
+    
+    @staticmethod
+    def _unknown_command(result: Dict[str, Any]) -> bool:
+        response = result.get('response', {}) if isinstance(result, dict) else {}
+        return str(response.get('code')) == API_UNKNOWN_COMMAND
+    
+    def _request(self, command: str, data: Optional[Dict[str, Any]],
+                 cl_trid: Optional[str], fmt: str) -> Dict[str, Any]:
+        """One HTTP round trip using the ``fmt`` endpoint"""
+        increment("wapi.client.requests")
+        native = 'json' if self.use_json else 'xml'
+        url = self.base_url if fmt == native else f"{self._api_root}/{fmt}"
+        started = time.monotonic()
+        if fmt == 'json':
+            response = self._post(self._build_json_request(command, data, cl_trid), url)
             try:
-                response = requests.post(
-                    self.base_url,
-                    data={"request": request_body},
-                    headers=headers,
-                    timeout=30
-                )
-                self.logger.debug(f"HTTP Response status: {response.status_code}")
-                response.raise_for_status()
-                result = response.json()
-            except requests.exceptions.Timeout as e:
-                self.logger.error(f"HTTP request timeout: {e}")
-                raise WAPITimeoutError(f"Request timeout: {e}") from e
-            except requests.exceptions.ConnectionError as e:
-                self.logger.error(f"HTTP connection error: {e}")
-                raise WAPIConnectionError(f"Connection error: {e}") from e
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"HTTP request failed: {e}")
-                raise WAPIRequestError(f"Request failed: {e}") from e
-            
-            # Log response
-            resp_code = result.get('response', {}).get('code')
-            resp_result = result.get('response', {}).get('result', '')
-            log_api_response(self.logger, command, resp_code, resp_result)
-            
-            return result
+                result = get_json_codec().loads_response(response)
+            except ValueError as e:
+                self.logger.error(f"Invalid JSON response: {e}")
+                raise WAPIRequestError(f"Invalid JSON response: {e}") from e
         else:
-            request_body = self._build_xml_request(command, data)
-            headers = {"Content-Type": "application/x-www-form-urlencoded"}
-            try:
-                response = requests.post(
-                    self.base_url,
-                    data={"request": request_body},
-                    headers=headers,
-                    timeout=30
-                )
-                self.logger.debug(f"HTTP Response status: {response.status_code}")
-                response.raise_for_status()
-                result = self._parse_xml_response(response.text)
-            except requests.exceptions.Timeout as e:
-                self.logger.error(f"HTTP request timeout: {e}")
-                raise WAPITimeoutError(f"Request timeout: {e}") from e
-            except requests.exceptions.ConnectionError as e:
-                self.logger.error(f"HTTP connection error: {e}")
-                raise WAPIConnectionError(f"Connection error: {e}") from e
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"HTTP request failed: {e}")
-                raise WAPIRequestError(f"Request failed: {e}") from e
-            
-            # Log response
-            resp_code = result.get('response', {}).get('code')
-            resp_result = result.get('response', {}).get('result', '')
-            log_api_response(self.logger, command, resp_code, resp_result)
-            
-            return result
+            response = self._post(self._build_xml_request(command, data, cl_trid), url)
+            result = self._parse_xml_response(response.text)
+        if not self._unknown_command(result):
+            self.capabilities.record_latency(command, fmt, time.monotonic() - started)
+        return result
     
     def domain_info(self, domain_name: str) -> Dict[str, Any]:
         """
@@ -245,7 +651,69 @@ class WedosAPIClient:
             Dictionary with availability information
         """
         return self.call("domains-availability", {"name": domain_name})
+
+    @staticmethod
+    def _split_availability(response: Dict[str, Any],
+                            names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Per-name single-domain responses from one multi-name domains-availability response"""
+        data = response.get('data', {}) or {}
+        entries = data.get('domain', data.get('domains', []))
+        entries = entries if isinstance(entries, list) else [entries]
+        wanted = {name.lower(): name for name in names}
+        split = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            key = entry.get('name') or entry.get('domain') or entry.get('fqdn') or ''
+            key = str(key).lower().rstrip('.')
+            if key in wanted:
+                split[wanted[key]] = {'response': dict(response, data={'domain': entry})}
+        return split
+
+    def domains_availability(self, domain_names: List[str],
+                             batch_size: int = MAX_AVAILABILITY_NAMES) -> Dict[str, Dict[str, Any]]:
+        """
+        Check the availability of many domains, packing up to ``batch_size``
+        names into each ``domains-availability`` request.
+
+        A batch that WAPI rejects as invalid (``AVAILABILITY_SPLIT_CODES``) is
+        split in half and retried, down to single names, so one invalid name
+        (or a lower server-side limit) does not fail its neighbours. Any other
+        error (authentication, IP not allowed, request limit) is not retried:
+        every name of the batch gets that error response.
+
+        Args:
+            domain_names: Domain names to check
+            batch_size: Names per request
+
+        Returns:
+            Name -> response shaped like ``domain_availability`` returns for
+            that name alone; names missing from every answer are left out
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        names = list(dict.fromkeys(domain_names))
+        pending = [names[i:i + batch_size] for i in range(0, len(names), max(1, batch_size))]
+        while pending:
+            batch = pending.pop(0)
+            if len(batch) == 1:
+                results[batch[0]] = self.domain_availability(batch[0])
+                continue
+            result = self.call("domains-availability", {"name": batch})
+            response = result.get('response', {})
+            code = str(response.get('code'))
+            if code not in AVAILABILITY_SPLIT_CODES and code != '1000':
+                results.update((name, result) for name in batch)
+                continue
+            if code != '1000':
+                self.logger.info(f"domains-availability rejected {len(batch)} names "
+                                 f"({code}), splitting the batch")
+                middle = len(batch) // 2
+                pending[:0] = [batch[:middle], batch[middle:]]
+                continue
+            results.update(self._split_availability(response, batch))
+        return results
     
+    @traced("wapi.domain_update_ns")
     def domain_update_ns(self, domain_name: str, nsset_name: Optional[str] = None, 
                         nameservers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
@@ -367,13 +835,16 @@ class WedosAPIClient:
         }
         return self.call("domain-transfer", data)
     
-    def domain_renew(self, domain_name: str, period: int = 1) -> Dict[str, Any]:
+    def domain_renew(self, domain_name: str, period: int = 1,
+                     expiration: Optional[str] = None) -> Dict[str, Any]:
         """
         Renew domain registration
         
         Args:
             domain_name: Domain name to renew
             period: Renewal period in years (default: 1)
+            expiration: Current expiration date, if known; lets the journal
+                        tell whether a timed-out renewal went through
             
         Returns:
             Dictionary with API response
@@ -382,6 +853,8 @@ class WedosAPIClient:
             "name": domain_name,
             "period": period
         }
+        if expiration:
+            return self.call("domain-renew", data, journal_context={"expiration": expiration})
         return self.call("domain-renew", data)
     
     def domain_delete(self, domain_name: str, 
@@ -480,49 +953,57 @@ class WedosAPIClient:
         """
         self.logger.info(f"Starting polling for {check_command} (max {max_attempts} attempts, interval {interval}s)")
         
-        for attempt in range(1, max_attempts + 1):
-            self.logger.debug(f"Polling attempt {attempt}/{max_attempts} for {check_command}")
-            
-            if verbose:
-                print(f"  Polling attempt {attempt}/{max_attempts}...", end='', flush=True)
-            
-            result = self.call(check_command, check_data)
-            response = result.get('response', {})
-            code = response.get('code')
-            
-            # Check if complete
-            if is_complete:
-                if is_complete(result):
+        with start_span("wapi.poll", {
+            "wapi.command": check_command,
+            "wapi.poll.max_attempts": max_attempts,
+            "wapi.poll.interval": interval,
+        }) as poll_span:
+            for attempt in range(1, max_attempts + 1):
+                self.logger.debug(f"Polling attempt {attempt}/{max_attempts} for {check_command}")
+                poll_span.set_attribute("wapi.poll.attempts", attempt)
+                
+                if verbose:
+                    print(f"  Polling attempt {attempt}/{max_attempts}...", end='', flush=True)
+                
+                attributes = {"wapi.poll.attempt": attempt}
+                with start_span("wapi.poll.attempt", attributes) as attempt_span:
+                    result = self.call(check_command, check_data)
+                    response = result.get('response', {})
+                    code = response.get('code')
+                    
+                    # Check if complete
+                    if is_complete:
+                        done = is_complete(result)
+                    else:
+                        # Default: check for code 1000 (success)
+                        done = code == '1000' or code == 1000
+                    attempt_span.set_attribute("wapi.poll.complete", bool(done))
+                
+                if done:
                     self.logger.info(f"Polling completed successfully after {attempt} attempts")
                     if verbose:
                         print(" ✅ Complete!")
                     return result
-            else:
-                # Default: check for code 1000 (success)
-                if code == '1000' or code == 1000:
-                    self.logger.info(f"Polling completed successfully after {attempt} attempts")
+                
+                # Check for error (not async, but actual error)
+                if code and str(code).startswith('2'):
+                    # Error code (2xxx), not async
+                    error_msg = response.get('result', 'Unknown error')
+                    self.logger.warning(f"Polling encountered error: {error_msg} (code: {code})")
                     if verbose:
-                        print(" ✅ Complete!")
+                        print(f" ❌ Error: {error_msg}")
                     return result
-            
-            # Check for error (not async, but actual error)
-            if code and str(code).startswith('2'):
-                # Error code (2xxx), not async
-                error_msg = response.get('result', 'Unknown error')
-                self.logger.warning(f"Polling encountered error: {error_msg} (code: {code})")
+                
                 if verbose:
-                    print(f" ❌ Error: {error_msg}")
-                return result
-            
-            if verbose:
-                print(" ⏳ Still processing...")
+                    print(" ⏳ Still processing...")
+                
+                # Wait before next attempt
+                if attempt < max_attempts:
+                    self.logger.debug(f"Waiting {interval}s before next polling attempt")
+                    time.sleep(interval)
             
-            # Wait before next attempt
-            if attempt < max_attempts:
-                self.logger.debug(f"Waiting {interval}s before next polling attempt")
-                time.sleep(interval)
-        
-        # Timeout
-        timeout_msg = f"Polling timeout after {max_attempts} attempts ({max_attempts * interval} seconds)"
-        self.logger.error(timeout_msg)
-        raise WAPITimeoutError(timeout_msg)
+            # Timeout
+            timeout_msg = (f"Polling timeout after {max_attempts} attempts "
+                           f"({max_attempts * interval} seconds)")
+            self.logger.error(timeout_msg)
+            raise WAPITimeoutError(timeout_msg)
@@ -0,0 +1,290 @@
+"""
+Journal of mutating WAPI calls
+
+Every write (anything not in ``READ_ONLY_COMMANDS``) is appended to a local
+JSON-lines journal keyed by its clTRID before the request is sent, and again
+when its outcome is known. When a write times out or fails in transit, the
+outcome is unknown: the client then reconciles - it reads the affected object
+back to decide whether the write took effect - instead of re-issuing it. An
+identical write whose previous attempt is still unresolved is reconciled first
+as well, so retries cannot double-apply paid or destructive operations.
+
+Entries are never rewritten; the latest record for a clTRID is its state.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from ..utils.logger import get_logger
+
+STATE_SENT = 'sent'
+STATE_DONE = 'done'
+STATE_UNKNOWN = 'unknown'
+STATE_APPLIED = 'applied'
+STATE_NOT_APPLIED = 'not_applied'
+
+# States that still need reconciliation before an identical write is sent
+UNRESOLVED_STATES = (STATE_SENT, STATE_UNKNOWN)
+
+# Unresolved entries older than this are not reconciled automatically
+RECONCILE_WINDOW = 7 * 24 * 3600
+
+SENSITIVE_KEYS = ('auth_info', 'password')
+
+
+def request_fingerprint(command: str, data: Optional[Dict[str, Any]]) -> str:
+    """Stable identity of a request (command plus canonical data)"""
+    payload = json.dumps([command, data or {}], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _mask(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {k: ('[HIDDEN]' if k in SENSITIVE_KEYS else _mask(v)) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_mask(v) for v in data]
+    return data
+
+
+class RequestJournal:
+    """Append-only journal of mutating calls stored as JSON lines"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._latest: Optional[Dict[str, Dict[str, Any]]] = None
+        self._logger = get_logger('api.journal')
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._latest is None:
+            latest: Dict[str, Dict[str, Any]] = {}
+            for entry in self.entries():
+                if entry.get('cltrid'):
+                    latest[entry['cltrid']] = dict(latest.get(entry['cltrid'], {}), **entry)
+            self._latest = latest
+        return self._latest
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Yield raw journal records in file order (corrupt lines are skipped)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            return
+
+    def _append(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            latest = self._load()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+            except OSError as e:
+                # The journal must never break the request itself
+                self._logger.warning(f"Cannot write request journal {self.path}: {e}")
+            latest[entry['cltrid']] = dict(latest.get(entry['cltrid'], {}), **entry)
+
+    def record_sent(self, cltrid: str, command: str, data: Optional[Dict[str, Any]],
+                    context: Optional[Dict[str, Any]] = None):
+        """Record a write about to be sent"""
+        entry = {
+            'cltrid': cltrid,
+            'ts': time.time(),
+            'pid': os.getpid(),
+            'command': command,
+            'key': request_fingerprint(command, data),
+            'data': _mask(data or {}),
+            'state': STATE_SENT,
+        }
+        if context:
+            entry['context'] = context
+        self._append(entry)
+
+    def record_state(self, cltrid: str, state: str, code: Any = None, detail: str = ''):
+        """Record the outcome of a write"""
+        entry = {'cltrid': cltrid, 'ts': time.time(), 'state': state}
+        if code is not None:
+            entry['code'] = str(code)
+        if detail:
+            entry['detail'] = detail
+        self._append(entry)
+
+    def get(self, cltrid: str) -> Optional[Dict[str, Any]]:
+        """Return the current state of an entry"""
+        with self._lock:
+            entry = self._load().get(cltrid)
+            return dict(entry) if entry else None
+
+    def list(self, unresolved_only: bool = False) -> List[Dict[str, Any]]:
+        """Return entries (current state), oldest first"""
+        with self._lock:
+            entries = [dict(e) for e in self._load().values()]
+        if unresolved_only:
+            entries = [e for e in entries if e.get('state') in UNRESOLVED_STATES]
+        return sorted(entries, key=lambda e: e.get('ts', 0))
+
+    def unresolved(self, command: str, data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Latest unresolved attempt of the same write, if any.
+
+        Attempts still in flight in this process are not returned.
+        """
+        key = request_fingerprint(command, data)
+        cutoff = time.time() - RECONCILE_WINDOW
+        pid = os.getpid()
+        found = None
+        for entry in self.list():
+            if entry.get('key') != key or entry.get('ts', 0) < cutoff:
+                continue
+            if entry.get('state') == STATE_UNKNOWN or \
+                    (entry.get('state') == STATE_SENT and entry.get('pid') != pid):
+                found = entry
+        return found
+
+
+# Reconcilers: read the object back and return True (write applied),
+# False (not applied) or None (cannot tell)
+
+def _response(result: Dict[str, Any]) -> Dict[str, Any]:
+    return result.get('response', {}) if isinstance(result, dict) else {}
+
+
+def _ok(response: Dict[str, Any]) -> bool:
+    return response.get('code') in ('1000', 1000)
+
+
+def _domain(client, name: str) -> Optional[Dict[str, Any]]:
+    response = _response(client.call("domain-info", {"name": name}))
+    if not _ok(response):
+        return None
+    return response.get('data', {}).get('domain', {}) or {}
+
+
+def _dns_rows(client, domain: str) -> Optional[List[Dict[str, Any]]]:
+    response = _response(client.call("dns-rows-list", {"domain": domain}))
+    if not _ok(response):
+        return None
+    rows = response.get('data', {}).get('row', [])
+    rows = rows if isinstance(rows, list) else [rows]
+    return [r for r in rows if isinstance(r, dict)]
+
+
+def _same(a: Any, b: Any) -> bool:
+    return str(a if a is not None else '').strip().rstrip('.').lower() == \
+        str(b if b is not None else '').strip().rstrip('.').lower()
+
+
+def _row_name(name: Any) -> str:
+    return '' if str(name or '') == '@' else str(name or '')
+
+
+# Paid operations may be processed asynchronously, so a read-back that does
+# not show them yet is inconclusive rather than proof they were not applied
+
+def _reconcile_domain_create(client, data, context):
+    return True if _domain(client, data['name']) is not None else None
+
+
+def _reconcile_domain_renew(client, data, context):
+    before = (context or {}).get('expiration')
+    if not before:
+        return None
+    domain = _domain(client, data['name'])
+    if domain is None or not domain.get('expiration'):
+        return None
+    return True if str(domain['expiration'])[:10] != str(before)[:10] else None
+
+
+def _reconcile_domain_update(client, data, context):
+    fields = [k for k in ('owner_c', 'admin_c', 'tech_c', 'nsset', 'keyset') if data.get(k)]
+    if not fields:
+        return None
+    domain = _domain(client, data['name'])
+    if domain is None:
+        return None
+    return all(_same(domain.get(k), data[k]) for k in fields)
+
+
+def _reconcile_nsset_create(client, data, context):
+    query = {"name": data['name'], "tld": data.get('tld', 'cz')}
+    response = _response(client.call("nsset-info", query))
+    return _ok(response)
+
+
+def _reconcile_dns_row_add(client, data, context):
+    rows = _dns_rows(client, data['domain'])
+    if rows is None:
+        return None
+    return any(_same(_row_name(r.get('name')), _row_name(data.get('name')))
+               and _same(r.get('rdtype'), data.get('rdtype'))
+               and _same(r.get('rdata'), data.get('rdata')) for r in rows)
+
+
+def _reconcile_dns_row_update(client, data, context):
+    rows = _dns_rows(client, data['domain'])
+    if rows is None:
+        return None
+    for row in rows:
+        if str(row.get('ID', '')) == str(data['row_id']):
+            fields = [k for k in ('rdtype', 'rdata', 'ttl') if k in data]
+            return all(_same(row.get(k), data[k]) for k in fields) and \
+                ('name' not in data or _same(_row_name(row.get('name')), _row_name(data['name'])))
+    return None
+
+
+def _reconcile_dns_row_delete(client, data, context):
+    rows = _dns_rows(client, data['domain'])
+    if rows is None:
+        return None
+    return all(str(row.get('ID', '')) != str(data['row_id']) for row in rows)
+
+
+Reconciler = Callable[[Any, Dict[str, Any], Optional[Dict[str, Any]]], Optional[bool]]
+
+RECONCILERS: Dict[str, Reconciler] = {
+    "domain-create": _reconcile_domain_create,
+    "domain-renew": _reconcile_domain_renew,
+    "domain-update": _reconcile_domain_update,
+    "domain-update-ns": _reconcile_domain_update,
+    "nsset-create": _reconcile_nsset_create,
+    "dns-row-add": _reconcile_dns_row_add,
+    "dns-row-update": _reconcile_dns_row_update,
+    "dns-row-delete": _reconcile_dns_row_delete,
+}
+
+
+def reconcile(client, command: str, data: Optional[Dict[str, Any]],
+              context: Optional[Dict[str, Any]] = None) -> Optional[bool]:
+    """
+    Decide whether a write with an unknown outcome took effect.
+
+    Args:
+        client: WedosAPIClient used for the read-back
+        command: Write command
+        data: Write data
+        context: State captured before the write (e.g. previous expiration)
+
+    Returns:
+        True if applied, False if not applied, None if it cannot be determined
+    """
+    reconciler = RECONCILERS.get(command)
+    if reconciler is None or not data:
+        return None
+    try:
+        return reconciler(client, data, context)
+    except Exception as e:
+        get_logger('api.journal').warning(f"Reconciliation of {command} failed: {e}")
+        return None
@@ -0,0 +1,435 @@
+"""
+Retry policy and circuit breaker for WAPI calls
+
+``RetryPolicy`` decides which failed calls are retried and how long to back
+off (exponential with full jitter). By default only read-only commands are
+retried; writes are left to the request journal's reconciliation.
+
+``CircuitBreaker`` counts consecutive HTTP attempts that failed in transport
+(timeouts, connection errors, HTTP 5xx). After ``threshold`` failures it opens
+and calls fail fast with ``WAPICircuitOpenError``; once ``reset_timeout`` has
+passed a single probe request is let through (half-open) and its outcome
+closes or re-opens the circuit. The state is published to ``wapi.utils.metrics``.
+
+``AdaptiveRateLimiter`` paces requests with an AIMD rate: it speeds up while
+responses are healthy and halves on throttling (HTTP 429/503 or a WAPI result
+reporting a request limit). One limiter is shared by all clients using the
+same username, and the learned rate can be persisted for the next run.
+
+``HedgePolicy`` decides when a slow read-only call gets a duplicate request:
+after the configured percentile of its recent latencies, as long as the hedge
+budget (a fraction of hedgeable calls) is not spent.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Optional, Union
+
+from ..constants import (
+    DEFAULT_BREAKER_RESET,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_HEDGE_BUDGET,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_HEDGE_MIN_DELAY,
+    DEFAULT_HEDGE_MIN_SAMPLES,
+    DEFAULT_HEDGE_PERCENTILE,
+    DEFAULT_HEDGE_WINDOW,
+    DEFAULT_INITIAL_RATE,
+    DEFAULT_MAX_RATE,
+    DEFAULT_MIN_RATE,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_DECREASE,
+    DEFAULT_RATE_INCREASE,
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_DELAY,
+    READ_ONLY_COMMANDS,
+)
+from ..exceptions import (
+    WAPICircuitOpenError,
+    WAPIConnectionError,
+    WAPIThrottledError,
+    WAPITimeoutError,
+)
+from ..utils.batch import RateLimiter
+from ..utils.logger import get_logger
+from ..utils.metrics import increment, set_gauge
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class RetryPolicy:
+    """Which calls to retry and how long to wait between attempts"""
+
+    def __init__(self, max_attempts: Optional[int] = None,
+                 base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None,
+                 retry_commands: Optional[Iterable[str]] = None,
+                 retry_writes: bool = False):
+        """
+        Args:
+            max_attempts: Total attempts per call, 1 disables retries
+                          (default: DEFAULT_RETRY_ATTEMPTS)
+            base_delay: Backoff before the first retry, doubled each attempt
+                        (default: DEFAULT_RETRY_BASE_DELAY)
+            max_delay: Upper bound of a single backoff (default: DEFAULT_RETRY_MAX_DELAY)
+            retry_commands: Commands to retry (default: READ_ONLY_COMMANDS)
+            retry_writes: Also retry every other command (use with a request
+                          journal so timed-out writes are reconciled, not repeated)
+        """
+        self.max_attempts = max(1, DEFAULT_RETRY_ATTEMPTS if max_attempts is None else max_attempts)
+        self.base_delay = DEFAULT_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = DEFAULT_RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.retry_commands = (frozenset(retry_commands) if retry_commands is not None
+                               else READ_ONLY_COMMANDS)
+        self.retry_writes = retry_writes
+
+    def is_retryable(self, command: str, error: BaseException) -> bool:
+        """Return True if a failed call may be attempted again"""
+        if isinstance(error, WAPICircuitOpenError):
+            return False
+        if isinstance(error, WAPIThrottledError):
+            # Rejected before processing, so safe to repeat even for writes
+            return True
+        if not isinstance(error, (WAPITimeoutError, WAPIConnectionError)):
+            return False
+        return self.retry_writes or command in self.retry_commands
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number ``attempt`` (1-based), with full jitter"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Fail fast while the API is unreachable, probing periodically for recovery"""
+
+    def __init__(self, threshold: int = DEFAULT_BREAKER_THRESHOLD,
+                 reset_timeout: float = DEFAULT_BREAKER_RESET,
+                 name: str = 'wapi'):
+        """
+        Args:
+            threshold: Consecutive failures that open the circuit (0 disables it)
+            reset_timeout: Seconds the circuit stays open before a probe
+            name: Metric name prefix
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._logger = get_logger('api.resilience')
+        set_gauge(f"{self.name}.circuit_state", self.state)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            self._logger.info(f"Circuit {self.state} -> {state}")
+            self.state = state
+            set_gauge(f"{self.name}.circuit_state", state)
+            if state == CIRCUIT_OPEN:
+                increment(f"{self.name}.circuit_opened")
+
+    def before_request(self):
+        """
+        Admit a request or fail fast.
+
+        Raises:
+            WAPICircuitOpenError: While open, or while a half-open probe is running
+        """
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return
+            if self.state == CIRCUIT_OPEN:
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    increment(f"{self.name}.circuit_rejected")
+                    raise WAPICircuitOpenError(
+                        f"WAPI unavailable after {self.failures} consecutive failures; "
+                        f"failing fast for another {remaining:.0f}s"
+                    )
+                self._set_state(CIRCUIT_HALF_OPEN)
+                self._probing = False
+            if self._probing:
+                increment(f"{self.name}.circuit_rejected")
+                raise WAPICircuitOpenError("WAPI unavailable; recovery probe in progress")
+            self._probing = True
+
+    def release(self):
+        """A request admitted by before_request ended without an outcome (e.g. interrupted)"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        """A request reached the API and got an HTTP response"""
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._set_state(CIRCUIT_CLOSED)
+
+    def record_failure(self):
+        """A request failed in transport (timeout, connection error, HTTP 5xx)"""
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(CIRCUIT_OPEN)
+
+
+# WAPI has no dedicated throttling code; request-limit rejections are
+# recognised by their result text (English or Czech)
+THROTTLE_RESULT_PATTERN = re.compile(
+    r'too many requests|rate limit|request limit|limit (?:of )?requests|limit po[zž]adavk',
+    re.IGNORECASE,
+)
+
+
+def is_throttled_response(result: Dict[str, Any]) -> bool:
+    """Return True if a parsed WAPI response rejects the request because of request limits"""
+    response = result.get('response', {}) if isinstance(result, dict) else {}
+    if not str(response.get('code', '')).startswith('2'):
+        return False
+    return bool(THROTTLE_RESULT_PATTERN.search(str(response.get('result', ''))))
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Token bucket with an AIMD rate: additive increase, multiplicative decrease.
+
+    Each healthy response adds ``increase / rate`` to the rate - about
+    ``increase`` requests per second for every second of traffic. A throttled
+    response multiplies the rate by ``decrease``; further throttles within
+    ``cooldown`` seconds come from requests already in flight and are ignored.
+    """
+
+    def __init__(self, initial_rate: Optional[float] = None,
+                 min_rate: Optional[float] = None,
+                 max_rate: Optional[float] = None,
+                 increase: Optional[float] = None,
+                 decrease: Optional[float] = None,
+                 burst: Optional[int] = None,
+                 state_path: Optional[Union[str, Path]] = None,
+                 key: str = 'default',
+                 cooldown: float = 2.0):
+        """
+        Args:
+            initial_rate: Starting requests per second when no rate was saved
+                          (default: DEFAULT_INITIAL_RATE)
+            min_rate: Lower bound of the rate (default: DEFAULT_MIN_RATE)
+            max_rate: Upper bound of the rate, 0 disables limiting (default: DEFAULT_MAX_RATE)
+            increase: Additive increase (default: DEFAULT_RATE_INCREASE)
+            decrease: Multiplicative decrease (default: DEFAULT_RATE_DECREASE)
+            burst: Requests allowed back to back (default: DEFAULT_RATE_BURST)
+            state_path: JSON file the learned rate is loaded from and saved to
+            key: Entry in ``state_path`` (one per set of credentials)
+            cooldown: Seconds after a decrease during which throttles are not counted
+        """
+        self.min_rate = DEFAULT_MIN_RATE if min_rate is None else min_rate
+        self.max_rate = DEFAULT_MAX_RATE if max_rate is None else max_rate
+        self.increase = DEFAULT_RATE_INCREASE if increase is None else increase
+        self.decrease = DEFAULT_RATE_DECREASE if decrease is None else decrease
+        self.state_path = Path(state_path) if state_path is not None else None
+        self.key = key
+        self.cooldown = cooldown
+        self._logger = get_logger('api.resilience')
+        self._save_lock = threading.Lock()
+        self._last_decrease = float('-inf')
+
+        rate = DEFAULT_INITIAL_RATE if initial_rate is None else initial_rate
+        saved = self._load()
+        if saved is not None:
+            self._logger.debug(f"Using learned request rate {saved:.2f}/s")
+            rate = saved
+        super().__init__(self._clamp(rate), DEFAULT_RATE_BURST if burst is None else burst)
+        self._saved_rate = self.rate
+        set_gauge("wapi.rate_limit", round(self.rate, 3))
+
+    def _clamp(self, rate: float) -> float:
+        if self.max_rate <= 0:
+            return 0.0
+        return min(self.max_rate, max(self.min_rate, rate))
+
+    def _load(self) -> Optional[float]:
+        if self.state_path is None:
+            return None
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                rate = json.load(f).get(self.key, {}).get('rate')
+            return float(rate) if rate else None
+        except (OSError, ValueError, AttributeError, TypeError):
+            return None
+
+    def on_success(self):
+        """Record a response that was not throttled"""
+        if self.max_rate <= 0:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+            rate = self.rate
+        set_gauge("wapi.rate_limit", round(rate, 3))
+
+    def on_throttle(self) -> bool:
+        """
+        Record a throttled response.
+
+        Returns:
+            True if the rate was decreased, False if within the cooldown
+        """
+        if self.max_rate <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return False
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # Spend the burst too: requests queued behind this one must slow down now
+            self._tokens = min(self._tokens, 0.0)
+            rate = self.rate
+        self._logger.warning(f"WAPI request limit reached; slowing down to {rate:.2f} requests/s")
+        increment("wapi.rate_decreased")
+        set_gauge("wapi.rate_limit", round(rate, 3))
+        self.save()
+        return True
+
+    def save(self):
+        """Persist the current rate to ``state_path`` (if set and changed)"""
+        if self.state_path is None or self.rate <= 0:
+            return
+        with self._save_lock:
+            rate = self.rate
+            if rate == self._saved_rate:
+                return
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if not isinstance(state, dict):
+                    state = {}
+            except (OSError, ValueError):
+                state = {}
+            state[self.key] = {'rate': round(rate, 3), 'updated': int(time.time())}
+            tmp_path = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+            try:
+                self.state_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.state_path)
+                self._saved_rate = rate
+            except OSError as e:
+                self._logger.debug(f"Cannot save learned request rate to {self.state_path}: {e}")
+
+
+_shared_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def rate_limit_key(username: str) -> str:
+    """Key identifying a set of credentials without storing the username"""
+    return hashlib.sha1(username.strip().lower().encode('utf-8')).hexdigest()[:16]
+
+
+def shared_rate_limiter(username: str, state_path: Optional[Union[str, Path]] = None,
+                        max_rate: Optional[float] = None) -> AdaptiveRateLimiter:
+    """
+    Return the adaptive limiter shared by every client using ``username``.
+
+    The first call creates it (later arguments are ignored); with
+    ``state_path`` the learned rate is also saved when the process exits.
+    """
+    key = rate_limit_key(username)
+    with _shared_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(max_rate=max_rate, state_path=state_path, key=key)
+            _shared_limiters[key] = limiter
+            if state_path is not None:
+                atexit.register(limiter.save)
+        return limiter
+
+
+class HedgePolicy:
+    """When to send a duplicate of a slow read-only call, within a budget"""
+
+    def __init__(self, percentile: Optional[float] = None,
+                 budget: Optional[float] = None,
+                 commands: Optional[Iterable[str]] = None,
+                 initial_delay: Optional[float] = None,
+                 min_delay: Optional[float] = None,
+                 min_samples: Optional[int] = None,
+                 window: Optional[int] = None):
+        """
+        Args:
+            percentile: Latency percentile after which a hedge is sent
+                        (default: DEFAULT_HEDGE_PERCENTILE)
+            budget: Hedges allowed as a fraction of hedgeable calls
+                    (default: DEFAULT_HEDGE_BUDGET)
+            commands: Commands that may be hedged (default: READ_ONLY_COMMANDS)
+            initial_delay: Delay used until ``min_samples`` latencies of a
+                           command were seen (default: DEFAULT_HEDGE_DELAY)
+            min_delay: Lower bound of the delay (default: DEFAULT_HEDGE_MIN_DELAY)
+            min_samples: Samples needed before the percentile is used
+                         (default: DEFAULT_HEDGE_MIN_SAMPLES)
+            window: Recent latencies kept per command (default: DEFAULT_HEDGE_WINDOW)
+        """
+        self.percentile = DEFAULT_HEDGE_PERCENTILE if percentile is None else percentile
+        self.budget = DEFAULT_HEDGE_BUDGET if budget is None else budget
+        self.commands = frozenset(commands) if commands is not None else READ_ONLY_COMMANDS
+        self.initial_delay = DEFAULT_HEDGE_DELAY if initial_delay is None else initial_delay
+        self.min_delay = DEFAULT_HEDGE_MIN_DELAY if min_delay is None else min_delay
+        self.min_samples = DEFAULT_HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self.window = DEFAULT_HEDGE_WINDOW if window is None else window
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._calls = 0
+        self._hedges = 0
+        self._lock = threading.Lock()
+
+    def applies_to(self, command: str) -> bool:
+        """Return True if calls of ``command`` may be hedged"""
+        return command in self.commands
+
+    def record_latency(self, command: str, seconds: float):
+        """Record how long a successful request took"""
+        with self._lock:
+            samples = self._latencies.get(command)
+            if samples is None:
+                samples = self._latencies[command] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def delay(self, command: str) -> float:
+        """Seconds to wait for the first response before hedging"""
+        with self._lock:
+            samples = sorted(self._latencies.get(command, ()))
+        if len(samples) < self.min_samples:
+            return max(self.min_delay, self.initial_delay)
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return max(self.min_delay, samples[index])
+
+    def start_call(self):
+        """Count a hedgeable call (earns budget)"""
+        with self._lock:
+            self._calls += 1
+
+    def try_hedge(self) -> bool:
+        """Spend budget on a hedge; False when the budget is exhausted"""
+        with self._lock:
+            if self._hedges + 1 > self.budget * self._calls + 1:
+                return False
+            self._hedges += 1
+            return True
@@ -5,11 +5,23 @@ Handles command-line argument parsing and routes to appropriate command modules.
 """
 
 import argparse
+import os
 import sys
 from typing import Optional
 
 from .api.client import WedosAPIClient
-from .config import get_config, load_config, validate_config
+from .api.journal import RequestJournal
+from .api.capabilities import FormatCapabilities
+from .api.resilience import HedgePolicy, RetryPolicy, shared_rate_limiter
+from .config import (
+    get_capabilities_path,
+    get_config,
+    get_journal_path,
+    get_network_config,
+    get_rate_state_path,
+    load_config,
+    validate_config,
+)
 from .constants import (
     EXIT_ERROR,
     EXIT_SUCCESS,
@@ -17,6 +29,18 @@ from .constants import (
     EXIT_AUTH_ERROR,
     EXIT_CONNECTION_ERROR,
     EXIT_TIMEOUT_ERROR,
+    DEFAULT_DNS_QUERY_TIMEOUT,
+    DEFAULT_DNS_VERIFY_TIMEOUT,
+    DEFAULT_HEALTH_PER_SERVER,
+    DEFAULT_HEALTH_WORKERS,
+    DEFAULT_INDEX_WORKERS,
+    DEFAULT_RENEW_RATE,
+    DEFAULT_RENEW_WORKERS,
+    DEFAULT_CREATE_RATE,
+    DEFAULT_CREATE_WORKERS,
+    DEFAULT_MIGRATE_RATE,
+    DEFAULT_MIGRATE_WORKERS,
+    DEFAULT_NSSET_PREFIX,
 )
 from .exceptions import (
     WAPIConfigurationError,
@@ -29,6 +53,7 @@ from .exceptions import (
 )
 from .utils.formatters import format_output
 from .utils.logger import get_logger, setup_logging
+from .utils.tracing import TRACE_ENV_VAR, configure_tracing_from_spec, start_span
 from .utils.aliases import expand_alias, list_aliases
 from .utils.interactive import start_interactive_mode
 from .utils.config_wizard import run_config_wizard
@@ -67,7 +92,20 @@ def get_client(config_file: str = "config.env") -> Optional[WedosAPIClient]:
         return None
     
     logger.debug("API client credentials loaded successfully")
-    return WedosAPIClient(username, password, use_json=False)
+    journal_path = get_journal_path()
+    journal = RequestJournal(journal_path) if journal_path is not None else None
+    network = get_network_config(config_file)
+    return WedosAPIClient(
+        username, password, use_json=False, journal=journal,
+        retry_policy=RetryPolicy(max_attempts=int(network['retries']) + 1),
+        connect_timeout=network['connect_timeout'],
+        timeout=network['timeout'],
+        rate_limiter=shared_rate_limiter(username, state_path=get_rate_state_path(),
+                                         max_rate=network['max_rate']),
+        hedge_policy=HedgePolicy(percentile=min(99.9, network['hedge_percentile']))
+        if network['hedge_percentile'] > 0 else None,
+        capabilities=FormatCapabilities(get_capabilities_path()),
+    )
 
 
 def cmd_ping(args, client: WedosAPIClient):
@@ -95,6 +133,27 @@ def cmd_ping(args, client: WedosAPIClient):
         return EXIT_ERROR
 
 
+def run_command(args, *func_args) -> int:
+    """
+    Run the selected command handler inside a root tracing span.
+    
+    Args:
+        args: Parsed CLI arguments (``args.func`` is the handler)
+        *func_args: Positional arguments passed to the handler
+        
+    Returns:
+        Handler exit code
+    """
+    module = getattr(args, 'module', None) or 'wapi'
+    command = getattr(args, 'command', None)
+    span_name = f"wapi {module} {command}" if command and command != module else f"wapi {module}"
+    attributes = {"wapi.cli.module": module, "wapi.cli.command": command or ""}
+    with start_span(span_name, attributes) as span:
+        exit_code = args.func(args, *func_args)
+        span.set_attribute("wapi.cli.exit_code", exit_code)
+        return exit_code
+
+
 # Import auth command handlers
 from .commands.auth import cmd_auth_login, cmd_auth_logout, cmd_auth_status
 
@@ -119,7 +178,8 @@ def main():
     
     # Global options
     parser.add_argument('--config', default='config.env', help='Configuration file')
-    parser.add_argument('--format', choices=['table', 'json', 'xml', 'yaml'], 
+    parser.add_argument('--format',
+                       choices=['table', 'json', 'xml', 'yaml', 'ndjson', 'csv', 'fixed'],
                        default='table', help='Output format')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
     parser.add_argument('--quiet', '-q', action='store_true', help='Quiet mode')
@@ -130,6 +190,11 @@ def main():
                        help='Start interactive mode (REPL)')
     parser.add_argument('--aliases', action='store_true',
                        help='Show available command aliases')
+    parser.add_argument('--trace', action='store_true',
+                       help=f'Record tracing spans to stderr '
+                            f'(also via {TRACE_ENV_VAR}=console|otel|FILE)')
+    parser.add_argument('--trace-file', metavar='PATH',
+                       help='Record tracing spans to PATH (JSON lines) instead of stderr')
     parser.add_argument('--wizard', action='store_true',
                        help='Run configuration wizard for first-time setup')
     parser.add_argument('-s', '--search', dest='search_domain',
@@ -165,11 +230,15 @@ def main():
     
     info_parser = domain_subparsers.add_parser('info', help='Get domain information')
     info_parser.add_argument('domain', help='Domain name')
+    info_parser.add_argument('--from-index', action='store_true',
+                             help='Answer from the local index (see: wapi index sync)')
     info_parser.set_defaults(func=cmd_domain_info)
     
     list_parser = domain_subparsers.add_parser('list', aliases=['-l'], help='List domains')
     list_parser.add_argument('--tld', help='Filter by TLD (e.g., cz, com)')
     list_parser.add_argument('--status', help='Filter by status (e.g., ok, expired)')
+    list_parser.add_argument('--from-index', action='store_true',
+                             help='Answer from the local index (see: wapi index sync)')
     list_parser.set_defaults(func=cmd_domain_list)
     
     update_ns_parser = domain_subparsers.add_parser('update-ns', help='Update domain nameservers')
@@ -180,10 +249,17 @@ def main():
     update_ns_parser.add_argument('--wait', action='store_true', help='Wait for async completion')
     update_ns_parser.add_argument('--no-ipv6-discovery', action='store_true', 
                                  help='Disable automatic IPv6 address discovery for nameservers')
+    update_ns_parser.add_argument('--check-delegation', action='store_true',
+                                 help='Once the update completes (with --wait for asynchronous '
+                                      'updates), compare the parent zone and the new nameservers '
+                                      'with the submitted set')
     update_ns_parser.set_defaults(func=cmd_domain_update_ns)
     
     create_parser = domain_subparsers.add_parser('create', help='Register new domain')
-    create_parser.add_argument('domain', help='Domain name to register')
+    create_parser.add_argument('domain', nargs='?', help='Domain name to register')
+    create_parser.add_argument('--from-file', dest='from_file',
+                               help='Register every order in a CSV file '
+                                    '(domain, period, owner_c, admin_c, nsset, keyset, auth_info)')
     create_parser.add_argument('--period', type=int, default=1, help='Registration period in years (default: 1)')
     create_parser.add_argument('--owner-c', dest='owner_c', help='Owner contact handle')
     create_parser.add_argument('--admin-c', dest='admin_c', help='Admin contact handle')
@@ -191,6 +267,17 @@ def main():
     create_parser.add_argument('--keyset', help='KEYSET name to assign (for DNSSEC)')
     create_parser.add_argument('--auth-info', dest='auth_info', help='Authorization code (for some TLDs)')
     create_parser.add_argument('--wait', action='store_true', help='Wait for async completion')
+    create_parser.add_argument('--results',
+                               help='Results file of --from-file, resumed on rerun '
+                                    '(default: <file>.results.jsonl)')
+    create_parser.add_argument('--rate', type=float, default=DEFAULT_CREATE_RATE,
+                               help='Maximum requests per second with --from-file '
+                                    f'(default: {DEFAULT_CREATE_RATE})')
+    create_parser.add_argument('--workers', type=int, default=DEFAULT_CREATE_WORKERS,
+                               help='Concurrent requests with --from-file '
+                                    f'(default: {DEFAULT_CREATE_WORKERS})')
+    create_parser.add_argument('--force', action='store_true',
+                               help='Confirm a --from-file registration (required)')
     create_parser.set_defaults(func=cmd_domain_create)
     
     transfer_parser = domain_subparsers.add_parser('transfer', help='Transfer domain from another registrar')
@@ -206,6 +293,49 @@ def main():
     renew_parser.add_argument('--wait', action='store_true', help='Wait for async completion')
     renew_parser.set_defaults(func=cmd_domain_renew)
     
+    from .commands.renewal import cmd_domain_expiring, cmd_domain_renew_plan, cmd_domain_renew_apply
+    
+    expiring_parser = domain_subparsers.add_parser('expiring', help='List domains expiring soon')
+    expiring_parser.add_argument('--within', default='60d',
+                                 help='Window, e.g. 30d, 8w, 3m, 1y (default: 60d)')
+    expiring_parser.add_argument('--tld', help='Filter by TLD (e.g., cz, com)')
+    expiring_parser.add_argument('--from-index', action='store_true',
+                                 help='Answer from the local index (see: wapi index sync)')
+    expiring_parser.set_defaults(func=cmd_domain_expiring)
+    
+    renew_plan_parser = domain_subparsers.add_parser('renew-plan',
+                                                     help='Compute the set of domains to renew')
+    renew_plan_parser.add_argument('--within', default='60d',
+                                   help='Renew domains expiring within this window (default: 60d)')
+    renew_plan_parser.add_argument('--period', type=int, default=1,
+                                   help='Renewal period in years (default: 1)')
+    renew_plan_parser.add_argument('--tld', help='Filter by TLD (e.g., cz, com)')
+    renew_plan_parser.add_argument('--output', '-o', help='Write the plan as JSON to this file')
+    renew_plan_parser.add_argument('--from-index', action='store_true',
+                                   help='Answer from the local index (see: wapi index sync)')
+    renew_plan_parser.set_defaults(func=cmd_domain_renew_plan)
+    
+    renew_apply_parser = domain_subparsers.add_parser('renew-apply',
+                                                      help='Renew domains from a plan concurrently')
+    renew_apply_parser.add_argument('--plan',
+                                    help='Plan file from renew-plan --output '
+                                         '(default: compute from --within)')
+    renew_apply_parser.add_argument('--within', default='60d',
+                                    help='Window used when no --plan is given (default: 60d)')
+    renew_apply_parser.add_argument('--period', type=int, default=1,
+                                    help='Renewal period when no --plan is given (default: 1)')
+    renew_apply_parser.add_argument('--tld', help='Filter by TLD when no --plan is given')
+    renew_apply_parser.add_argument('--rate', type=float, default=DEFAULT_RENEW_RATE,
+                                    help='Maximum requests per second '
+                                         f'(default: {DEFAULT_RENEW_RATE})')
+    renew_apply_parser.add_argument('--workers', type=int, default=DEFAULT_RENEW_WORKERS,
+                                    help=f'Concurrent requests (default: {DEFAULT_RENEW_WORKERS})')
+    renew_apply_parser.add_argument('--wait', action='store_true',
+                                    help='Wait for asynchronous renewals in one polling phase')
+    renew_apply_parser.add_argument('--force', action='store_true',
+                                    help='Confirm the renewals (required)')
+    renew_apply_parser.set_defaults(func=cmd_domain_renew_apply)
+    
     delete_parser = domain_subparsers.add_parser('delete', help='Delete domain registration')
     delete_parser.add_argument('domain', help='Domain name to delete')
     delete_parser.add_argument('--force', action='store_true', 
@@ -227,9 +357,28 @@ def main():
 
     # Search module (single command)
     search_parser = subparsers.add_parser('search', help='Search domain availability and WHOIS')
-    search_parser.add_argument('domain', help='Domain name to search')
+    search_parser.add_argument('domain', nargs='?',
+                              help="Domain name to search, "
+                                   "or 'variants' to scan look-alikes of a brand")
+    search_parser.add_argument('name', nargs='?', help='Brand name for variants (acme or acme.cz)')
+    search_parser.add_argument('--tld', nargs='+',
+                               help='TLDs to check variants under (e.g. --tld cz com sk)')
+    search_parser.add_argument('--file', help='Check every domain listed in a file (one per line)')
+    search_parser.add_argument('--workers', type=int,
+                               help='Concurrent RDAP/WHOIS lookups with --file or variants '
+                                    '(default: 8)')
     search_parser.add_argument('--whois-server', help='Override WHOIS server (optional)')
     search_parser.add_argument('--whois-timeout', type=int, default=10, help='WHOIS socket timeout in seconds')
+    search_parser.add_argument('--no-rdap', action='store_true',
+                              help='Query port-43 WHOIS only (skip the RDAP lookup)')
+    search_parser.add_argument('--dns-prefilter', action='store_true',
+                              help='Report names delegated in DNS as registered '
+                                   'without WAPI/WHOIS lookups')
+    search_parser.add_argument('--max-age',
+                              help='Reuse a cached result only if younger than this, '
+                                   'e.g. 90s, 15min, 12h, 7d')
+    search_parser.add_argument('--refresh', action='store_true',
+                              help='Ignore cached results and look the domain up again')
     search_parser.set_defaults(func=cmd_search)
     
     # NSSET module
@@ -256,8 +405,43 @@ def main():
     nsset_info_parser.set_defaults(func=cmd_nsset_info)
     
     nsset_list_parser = nsset_subparsers.add_parser('list', aliases=['-l'], help='List NSSETs')
+    nsset_list_parser.add_argument('--from-index', action='store_true',
+                                   help='Answer from the local index (see: wapi index sync)')
     nsset_list_parser.set_defaults(func=cmd_nsset_list)
     
+    from .commands.migration import cmd_nsset_migrate
+    
+    migrate_parser = nsset_subparsers.add_parser(
+        'migrate', help='Move domains to one canonical NSSET per TLD/tech-c')
+    migrate_parser.add_argument('--nameserver', action='append', required=True,
+                                help='Target nameserver (name:ipv4:ipv6 or name:ipv4) - '
+                                     'can be used multiple times')
+    migrate_parser.add_argument('--domain', action='append',
+                                help='Domain to migrate - can be used multiple times')
+    migrate_parser.add_argument('--file', help='File with domain names, one per line')
+    migrate_parser.add_argument('--from-nsset', dest='from_nsset',
+                                help='Migrate all domains using this NSSET (local index)')
+    migrate_parser.add_argument('--from-ns', dest='from_ns',
+                                help='Migrate all domains using this nameserver (local index)')
+    migrate_parser.add_argument('--tech-c', dest='tech_c',
+                                help='Technical contact for new NSSETs '
+                                     '(default: domain owner contact)')
+    migrate_parser.add_argument('--nsset-prefix', dest='nsset_prefix', default=DEFAULT_NSSET_PREFIX,
+                                help='Prefix for created NSSET names '
+                                     f'(default: {DEFAULT_NSSET_PREFIX})')
+    migrate_parser.add_argument('--dry-run', action='store_true',
+                                help='Show the migration plan without changes')
+    migrate_parser.add_argument('--rate', type=float, default=DEFAULT_MIGRATE_RATE,
+                                help='Maximum requests per second '
+                                     f'(default: {DEFAULT_MIGRATE_RATE})')
+    migrate_parser.add_argument('--workers', type=int, default=DEFAULT_MIGRATE_WORKERS,
+                                help=f'Concurrent requests (default: {DEFAULT_MIGRATE_WORKERS})')
+    migrate_parser.add_argument('--wait', action='store_true',
+                                help='Wait for asynchronous updates in one polling phase')
+    migrate_parser.add_argument('--no-ipv6-discovery', action='store_true',
+                                help='Disable automatic IPv6 address discovery for nameservers')
+    migrate_parser.set_defaults(func=cmd_nsset_migrate)
+    
     # Contact module
     from .commands.contact import cmd_contact_info, cmd_contact_list
     
@@ -270,6 +454,8 @@ def main():
     contact_info_parser.set_defaults(func=cmd_contact_info)
     
     contact_list_parser = contact_subparsers.add_parser('list', aliases=['-l'], help='List contacts')
+    contact_list_parser.add_argument('--from-index', action='store_true',
+                                     help='Answer from the local index (see: wapi index sync)')
     contact_list_parser.set_defaults(func=cmd_contact_list)
     
     # Config module
@@ -297,14 +483,20 @@ def main():
     
     dns_list_parser = dns_subparsers.add_parser('list', aliases=['-l'], help='List nameservers for domain')
     dns_list_parser.add_argument('domain', help='Domain name')
+    dns_list_parser.add_argument('--from-index', action='store_true',
+                                 help='Answer from the local index (see: wapi index sync)')
     dns_list_parser.set_defaults(func=cmd_dns_list)
     
     dns_record_list_parser = dns_subparsers.add_parser('records', help='List DNS records')
     dns_record_list_parser.add_argument('domain', help='Domain name')
+    dns_record_list_parser.add_argument('--from-index', action='store_true',
+                                        help='Answer from the local index (see: wapi index sync)')
     dns_record_list_parser.set_defaults(func=cmd_dns_record_list)
     
     dns_record_list_alias = dns_subparsers.add_parser('list-records', help='List DNS records (alias)')
     dns_record_list_alias.add_argument('domain', help='Domain name')
+    dns_record_list_alias.add_argument('--from-index', action='store_true',
+                                       help='Answer from the local index (see: wapi index sync)')
     dns_record_list_alias.set_defaults(func=cmd_dns_record_list)
     
     dns_record_add_parser = dns_subparsers.add_parser('add', help='Add DNS record')
@@ -314,6 +506,13 @@ def main():
     dns_record_add_parser.add_argument('--value', required=True, help='Record value/data')
     dns_record_add_parser.add_argument('--ttl', type=int, default=3600, help='TTL in seconds (default: 3600)')
     dns_record_add_parser.add_argument('--wait', action='store_true', help='Wait for async completion')
+    dns_record_add_parser.add_argument('--verify-dns', action='store_true',
+                                       help='Query the authoritative nameservers until all serve '
+                                            'the change')
+    dns_record_add_parser.add_argument('--verify-timeout', type=int,
+                                       default=DEFAULT_DNS_VERIFY_TIMEOUT,
+                                       help='Seconds to wait for --verify-dns '
+                                            f'(default: {DEFAULT_DNS_VERIFY_TIMEOUT})')
     dns_record_add_parser.set_defaults(func=cmd_dns_record_add)
     
     dns_record_update_parser = dns_subparsers.add_parser('update', help='Update DNS record')
@@ -324,14 +523,112 @@ def main():
     dns_record_update_parser.add_argument('--value', help='Record value/data')
     dns_record_update_parser.add_argument('--ttl', type=int, help='TTL in seconds')
     dns_record_update_parser.add_argument('--wait', action='store_true', help='Wait for async completion')
+    dns_record_update_parser.add_argument('--verify-dns', action='store_true',
+                                       help='Query the authoritative nameservers until all serve '
+                                            'the change')
+    dns_record_update_parser.add_argument('--verify-timeout', type=int,
+                                       default=DEFAULT_DNS_VERIFY_TIMEOUT,
+                                       help='Seconds to wait for --verify-dns '
+                                            f'(default: {DEFAULT_DNS_VERIFY_TIMEOUT})')
     dns_record_update_parser.set_defaults(func=cmd_dns_record_update)
     
     dns_record_delete_parser = dns_subparsers.add_parser('delete', help='Delete DNS record')
     dns_record_delete_parser.add_argument('domain', help='Domain name')
     dns_record_delete_parser.add_argument('--id', required=True, help='Record ID (from dns records list)')
     dns_record_delete_parser.add_argument('--wait', action='store_true', help='Wait for async completion')
+    dns_record_delete_parser.add_argument('--verify-dns', action='store_true',
+                                       help='Query the authoritative nameservers until all serve '
+                                            'the change')
+    dns_record_delete_parser.add_argument('--verify-timeout', type=int,
+                                       default=DEFAULT_DNS_VERIFY_TIMEOUT,
+                                       help='Seconds to wait for --verify-dns '
+                                            f'(default: {DEFAULT_DNS_VERIFY_TIMEOUT})')
     dns_record_delete_parser.set_defaults(func=cmd_dns_record_delete)
     
+    from .commands.health import cmd_dns_health
+    
+    dns_health_parser = dns_subparsers.add_parser(
+        'health', help='Check the nameservers of many domains for lame delegations and drift')
+    dns_health_parser.add_argument('domains', nargs='*',
+                                   help='Domains to check (default: all domains)')
+    dns_health_parser.add_argument('--file', help='File with domain names, one per line')
+    dns_health_parser.add_argument('--tld', help='Only check domains under this TLD')
+    dns_health_parser.add_argument('--issues-only', action='store_true',
+                                   help='Only show domains with issues')
+    dns_health_parser.add_argument('--workers', type=int, default=DEFAULT_HEALTH_WORKERS,
+                                   help='Concurrent nameserver probes '
+                                        f'(default: {DEFAULT_HEALTH_WORKERS})')
+    dns_health_parser.add_argument('--per-server', type=int, default=DEFAULT_HEALTH_PER_SERVER,
+                                   help='Concurrent probes per nameserver address '
+                                        f'(default: {DEFAULT_HEALTH_PER_SERVER})')
+    dns_health_parser.add_argument('--timeout', type=float, default=DEFAULT_DNS_QUERY_TIMEOUT,
+                                   help='Seconds per DNS query '
+                                        f'(default: {DEFAULT_DNS_QUERY_TIMEOUT})')
+    dns_health_parser.add_argument('--from-index', action='store_true',
+                                   help='Read nameservers from the local index '
+                                        '(see: wapi index sync)')
+    dns_health_parser.set_defaults(func=cmd_dns_health)
+    
+    # Index module
+    from .commands.index import cmd_index_status, cmd_index_sync
+    
+    index_parser = subparsers.add_parser('index', help='Local portfolio index')
+    index_subparsers = index_parser.add_subparsers(dest='command', help='Command')
+    
+    index_sync_parser = index_subparsers.add_parser(
+        'sync', help='Mirror domains, NSSETs, contacts and DNS rows locally')
+    index_sync_parser.add_argument('--workers', type=int, default=DEFAULT_INDEX_WORKERS,
+                                  help='Parallel detail requests '
+                                       f'(default: {DEFAULT_INDEX_WORKERS})')
+    index_sync_parser.add_argument('--full', action='store_true',
+                                  help='Refetch details of all domains, not only changed ones')
+    index_sync_parser.set_defaults(func=cmd_index_sync)
+    
+    index_status_parser = index_subparsers.add_parser('status', help='Show local index statistics')
+    index_status_parser.set_defaults(func=cmd_index_status)
+    
+    # Refs module (answers from the local index)
+    from .commands.refs import cmd_refs_contact, cmd_refs_ns, cmd_refs_nsset
+    
+    refs_parser = subparsers.add_parser(
+        'refs', help='Find domains using a nameserver, contact or NSSET (local index)')
+    refs_subparsers = refs_parser.add_subparsers(dest='command', help='Command')
+    
+    refs_ns_parser = refs_subparsers.add_parser('ns', help='NSSETs and domains using a nameserver')
+    refs_ns_parser.add_argument('host', help='Nameserver hostname, IPv4 or IPv6 address')
+    refs_ns_parser.set_defaults(func=cmd_refs_ns)
+    
+    refs_contact_parser = refs_subparsers.add_parser('contact',
+                                                     help='Domains referencing a contact handle')
+    refs_contact_parser.add_argument('handle', help='Contact handle')
+    refs_contact_parser.set_defaults(func=cmd_refs_contact)
+    
+    refs_nsset_parser = refs_subparsers.add_parser('nsset', help='Domains assigned to an NSSET')
+    refs_nsset_parser.add_argument('name', help='NSSET name')
+    refs_nsset_parser.set_defaults(func=cmd_refs_nsset)
+    
+    # Journal module (mutating calls and their outcomes)
+    from .commands.journal import cmd_journal_list, cmd_journal_resolve
+    
+    journal_parser = subparsers.add_parser('journal', help='Journal of mutating API calls')
+    journal_subparsers = journal_parser.add_subparsers(dest='command', help='Command')
+    
+    journal_list_parser = journal_subparsers.add_parser('list', help='List journaled writes')
+    journal_list_parser.add_argument('--pending', action='store_true',
+                                     help='Only writes whose outcome is still unknown')
+    journal_list_parser.add_argument('--limit', type=int, help='Show only the last N entries')
+    journal_list_parser.set_defaults(func=cmd_journal_list)
+    
+    journal_resolve_parser = journal_subparsers.add_parser(
+        'resolve', help='Record the verified outcome of a write')
+    journal_resolve_parser.add_argument(
+        'cltrid', help='clTRID of the write (see: wapi journal list --pending)')
+    resolve_group = journal_resolve_parser.add_mutually_exclusive_group(required=True)
+    resolve_group.add_argument('--applied', action='store_true', help='The write took effect')
+    resolve_group.add_argument('--not-applied', dest='not_applied', action='store_true',
+                               help='The write did not take effect (safe to retry)')
+    journal_resolve_parser.set_defaults(func=cmd_journal_resolve)
+    
     # Parse arguments
     args = parser.parse_args()
     
@@ -343,6 +640,14 @@ def main():
         log_level=getattr(args, 'log_level', None)
     )
     
+    # Opt-in tracing (no-op fast path when disabled)
+    trace_spec = getattr(args, 'trace_file', None)
+    if not isinstance(trace_spec, str):
+        trace_on = getattr(args, 'trace', False) is True
+        trace_spec = 'console' if trace_on else os.getenv(TRACE_ENV_VAR)
+    if isinstance(trace_spec, str) and trace_spec:
+        configure_tracing_from_spec(trace_spec)
+    
     logger.debug("WAPI CLI started")
     logger.debug(f"Arguments: {vars(args)}")
     
@@ -393,7 +698,17 @@ def main():
         # Config and auth commands do not require a client; handle them early.
         # Auth login/logout are used to SET credentials, so they shouldn't require existing ones.
         if args.func in [cmd_config_show, cmd_config_validate, cmd_config_set, cmd_auth_login, cmd_auth_logout]:
-            return args.func(args)
+            return run_command(args)
+
+        # Index-backed reads work offline without credentials
+        if getattr(args, 'from_index', False) is True or args.func is cmd_index_status \
+                or args.module in ('refs', 'journal'):
+            try:
+                return run_command(args, None)
+            except WAPIError as e:
+                logger.error(f"Index error: {e}")
+                print(f"Error: {e}", file=sys.stderr)
+                return EXIT_ERROR
 
         # Search command can work without full config (uses WHOIS fallback)
         # Check by function name or identity to handle both real and mocked functions
@@ -411,7 +726,7 @@ def main():
                 logger.warning(f"Could not get API client for search: {e}")
                 client = None
             try:
-                return args.func(args, client)
+                return run_command(args, client)
             except WAPIConfigurationError as e:
                 logger.error(f"Configuration error: {e}")
                 print(f"Error: {e}", file=sys.stderr)
@@ -440,7 +755,7 @@ def main():
             return EXIT_CONFIG_ERROR
 
         try:
-            return args.func(args, client)
+            return run_command(args, client)
         except WAPIConfigurationError as e:
             logger.error(f"Configuration error: {e}")
             print(f"Error: {e}", file=sys.stderr)
@@ -9,8 +9,9 @@ from typing import Dict, Any
 from ..api.client import WedosAPIClient
 from ..constants import EXIT_SUCCESS, EXIT_ERROR
 from ..exceptions import WAPIRequestError
-from ..utils.formatters import format_output
+from ..utils.formatters import format_output, print_output
 from ..utils.logger import get_logger
+from .helpers import CountingIterator, open_index, use_index
 
 
 def filter_sensitive_contact_data(contact: Dict[str, Any]) -> Dict[str, Any]:
@@ -75,6 +76,14 @@ def cmd_contact_info(args, client: WedosAPIClient) -> int:
 def cmd_contact_list(args, client: WedosAPIClient) -> int:
     """Handle contact list command"""
     logger = get_logger('commands.contact')
+    
+    if use_index(args):
+        with open_index() as index:
+            contacts = CountingIterator(index.iter_contacts())
+            print_output(contacts, args.format)
+        logger.info(f"Listed {contacts.count} contact(s) from local index")
+        return EXIT_SUCCESS
+    
     result = client.call("contact-list", {})
     response = result.get('response', {})
     code = response.get('code')
@@ -84,7 +93,7 @@ def cmd_contact_list(args, client: WedosAPIClient) -> int:
         if not isinstance(contacts, list):
             contacts = [contacts]
         filtered = [filter_sensitive_contact_data(c) for c in contacts if isinstance(c, dict)]
-        print(format_output(filtered, args.format))
+        print_output(filtered, args.format)
         logger.info(f"Listed {len(filtered)} contact(s)")
         return EXIT_SUCCESS
     
@@ -5,24 +5,106 @@ Handles DNS record operations.
 """
 
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from ..api.client import WedosAPIClient
 from ..constants import (
     EXIT_SUCCESS, EXIT_ERROR, EXIT_VALIDATION_ERROR,
-    DEFAULT_MAX_POLL_ATTEMPTS, DEFAULT_POLL_INTERVAL
+    DEFAULT_MAX_POLL_ATTEMPTS, DEFAULT_POLL_INTERVAL,
+    DEFAULT_DNS_PORT, DEFAULT_DNS_VERIFY_TIMEOUT
 )
 from ..exceptions import (
     WAPIValidationError,
     WAPIRequestError,
     WAPITimeoutError,
 )
-from ..utils.formatters import format_output
-from .helpers import poll_and_check
+from ..utils.formatters import format_output, print_output
+from .helpers import open_index, poll_and_check, use_index
+from ..utils.dns_check import (
+    VERIFY_HEADERS,
+    record_owner,
+    require_verified,
+    server_targets,
+    soa_serials,
+    verify_rrset,
+)
+from ..utils.index import nameservers_from_dns
 from ..utils.logger import get_logger
 from ..utils.validators import validate_domain
 
 
+def dns_records_from_rows(rows: List[Any]) -> List[Dict[str, Any]]:
+    """Normalize dns-rows-list rows to id/name/ttl/type/rdata records"""
+    records = []
+    for row in rows:
+        if isinstance(row, dict):
+            records.append({
+                'id': row.get('ID', ''),
+                'name': row.get('name', ''),
+                'ttl': row.get('ttl', ''),
+                'type': row.get('rdtype', ''),
+                'rdata': row.get('rdata', '')
+            })
+    return records
+
+
+def _find_row(client: WedosAPIClient, domain: str, row_id: Any) -> Dict[str, Any]:
+    """Current dns-rows-list row with the given ID"""
+    result = client.call("dns-rows-list", {"domain": domain})
+    response = result.get('response', {})
+    rows = response.get('data', {}).get('row', []) if response.get('code') in ('1000', 1000) else []
+    for row in rows if isinstance(rows, list) else [rows]:
+        if isinstance(row, dict) and str(row.get('ID', '')) == str(row_id):
+            return row
+    print(f"Error: DNS record {row_id} not found for {domain}", file=sys.stderr)
+    raise WAPIRequestError(f"DNS record {row_id} not found for {domain}")
+
+
+def verification_plan(client: WedosAPIClient, domain: str,
+                      row_id: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Prepare --verify-dns before a change: the domain's authoritative nameservers
+    (domain-info ``dns.server``), their current SOA serials and, for updates and
+    deletes, the row being changed.
+    """
+    result = client.domain_info(domain)
+    response = result.get('response', {})
+    if response.get('code') not in ('1000', 1000):
+        error_msg = response.get('result', 'Unknown error')
+        print(f"Error ({response.get('code')}): {error_msg}", file=sys.stderr)
+        raise WAPIRequestError(f"Cannot read nameservers of {domain}: {error_msg}")
+    nameservers = nameservers_from_dns(response.get('data', {}).get('domain', {}).get('dns', {}))
+    if not nameservers:
+        print(f"Error: No nameservers known for {domain}; cannot verify DNS", file=sys.stderr)
+        raise WAPIRequestError(f"No nameservers known for {domain}")
+    targets = server_targets(nameservers)
+    plan = {'targets': targets, 'serials': soa_serials(targets, domain, port=DEFAULT_DNS_PORT)}
+    if row_id is not None:
+        plan['row'] = _find_row(client, domain, row_id)
+    return plan
+
+
+def verify_served(args, plan: Dict[str, Any], domain: str, name: str, rdtype: str,
+                  rdata: str, present: bool = True) -> int:
+    """Query the authoritative nameservers until all of them serve the change (--verify-dns)"""
+    owner = record_owner(domain, name)
+    timeout = getattr(args, 'verify_timeout', None)
+    if not isinstance(timeout, (int, float)) or timeout <= 0:
+        timeout = DEFAULT_DNS_VERIFY_TIMEOUT
+    print(f"Verifying {owner} {rdtype} on {len(plan['targets'])} "
+          f"authoritative nameserver address(es)...")
+    results = verify_rrset(plan['targets'], domain, owner, rdtype, rdata, present=present,
+                           min_serials=plan['serials'], timeout=timeout, port=DEFAULT_DNS_PORT)
+    print_output(results, args.format, headers=VERIFY_HEADERS)
+    require_verified(results, owner, rdtype)
+    print("✅ Change served by all authoritative nameservers")
+    return EXIT_SUCCESS
+
+
+def _verify_dns(args) -> bool:
+    return getattr(args, 'verify_dns', False) is True
+
+
 def cmd_dns_list(args, client: WedosAPIClient) -> int:
     """Handle dns list command"""
     logger = get_logger('commands.dns')
@@ -33,9 +115,17 @@ def cmd_dns_list(args, client: WedosAPIClient) -> int:
         print(f"Error: Invalid domain name - {error}", file=sys.stderr)
         raise WAPIValidationError(f"Invalid domain name: {error}")
     
-    # Get domain info which contains DNS information
-    result = client.domain_info(args.domain)
-    response = result.get('response', {})
+    if use_index(args):
+        with open_index() as index:
+            domain = index.get_domain_info(args.domain)
+        if domain is None:
+            print(f"Error: {args.domain} not found in local index", file=sys.stderr)
+            raise WAPIRequestError(f"Domain not found in local index: {args.domain}")
+        response = {'code': '1000', 'data': {'domain': domain}}
+    else:
+        # Get domain info which contains DNS information
+        result = client.domain_info(args.domain)
+        response = result.get('response', {})
     code = response.get('code')
     
     if code == '1000' or code == 1000:
@@ -64,7 +154,8 @@ def cmd_dns_list(args, client: WedosAPIClient) -> int:
                 raise WAPIRequestError(f"No DNS information available for {args.domain}")
             
             logger.info(f"Listed {len(dns_data)} nameserver(s) for {args.domain}")
-            print(format_output(dns_data, args.format, headers=['name', 'ipv4', 'ipv6']))
+            headers = ['name', 'ipv4', 'ipv6']
+            print_output(dns_data, args.format, headers=headers)
             return EXIT_SUCCESS
         else:
             logger.warning(f"No DNS information available for {args.domain}")
@@ -87,6 +178,17 @@ def cmd_dns_record_list(args, client: WedosAPIClient) -> int:
         print(f"Error: Invalid domain name - {error}", file=sys.stderr)
         raise WAPIValidationError(f"Invalid domain name: {error}")
     
+    if use_index(args):
+        with open_index() as index:
+            if not index.has_domain(args.domain):
+                print(f"Error: {args.domain} not found in local index", file=sys.stderr)
+                raise WAPIRequestError(f"Domain not found in local index: {args.domain}")
+            records = index.get_dns_rows(args.domain)
+        logger.info(f"Listed {len(records)} DNS record(s) for {args.domain} from local index")
+        headers = ['id', 'name', 'ttl', 'type', 'rdata']
+        print_output(records, args.format, headers=headers)
+        return EXIT_SUCCESS
+    
     # Use dns-rows-list WAPI command
     result = client.call("dns-rows-list", {"domain": args.domain})
     response = result.get('response', {})
@@ -100,19 +202,11 @@ def cmd_dns_record_list(args, client: WedosAPIClient) -> int:
             rows = [rows]
         
         # Format DNS records
-        records = []
-        for row in rows:
-            if isinstance(row, dict):
-                records.append({
-                    'id': row.get('ID', ''),
-                    'name': row.get('name', ''),
-                    'ttl': row.get('ttl', ''),
-                    'type': row.get('rdtype', ''),
-                    'rdata': row.get('rdata', '')
-                })
+        records = dns_records_from_rows(rows)
         
         logger.info(f"Listed {len(records)} DNS record(s) for {args.domain}")
-        print(format_output(records, args.format, headers=['id', 'name', 'ttl', 'type', 'rdata']))
+        headers = ['id', 'name', 'ttl', 'type', 'rdata']
+        print_output(records, args.format, headers=headers)
         return EXIT_SUCCESS
     else:
         error_msg = response.get('result', 'Unknown error')
@@ -141,6 +235,7 @@ def cmd_dns_record_add(args, client: WedosAPIClient) -> int:
         "rdtype": args.type.upper(),
         "rdata": args.value
     }
+    plan = verification_plan(client, args.domain) if _verify_dns(args) else None
     
     # Call API
     result = client.call("dns-row-add", record_data)
@@ -151,10 +246,16 @@ def cmd_dns_record_add(args, client: WedosAPIClient) -> int:
         logger.info("DNS record added successfully")
         print("✅ DNS record added successfully")
         print(format_output(response.get('data', {}), args.format))
+        if plan is not None:
+            return verify_served(args, plan, args.domain, record_data['name'],
+                                 record_data['rdtype'], args.value)
         return EXIT_SUCCESS
     elif code == '1001' or code == 1001:
         logger.info("DNS record add started (asynchronous)")
         print("⚠️  Operation started (asynchronous)")
+        if plan is not None:
+            return verify_served(args, plan, args.domain, record_data['name'],
+                                 record_data['rdtype'], args.value)
         if args.wait:
             print("Waiting for completion...")
             # Poll dns-rows-list until record appears
@@ -242,6 +343,13 @@ def cmd_dns_record_update(args, client: WedosAPIClient) -> int:
         update_data["rdata"] = args.value
     if args.ttl:
         update_data["ttl"] = args.ttl
+    plan = verification_plan(client, args.domain, args.id) if _verify_dns(args) else None
+    
+    def _verify_update() -> int:
+        row = plan['row']
+        return verify_served(args, plan, args.domain, update_data.get('name', row.get('name', '')),
+                             update_data.get('rdtype', str(row.get('rdtype', '')).upper()),
+                             update_data.get('rdata', row.get('rdata', '')))
     
     # Call API
     result = client.call("dns-row-update", update_data)
@@ -252,10 +360,14 @@ def cmd_dns_record_update(args, client: WedosAPIClient) -> int:
         logger.info("DNS record updated successfully")
         print("✅ DNS record updated successfully")
         print(format_output(response.get('data', {}), args.format))
+        if plan is not None:
+            return _verify_update()
         return EXIT_SUCCESS
     elif code == '1001' or code == 1001:
         logger.info("DNS record update started (asynchronous)")
         print("⚠️  Operation started (asynchronous)")
+        if plan is not None:
+            return _verify_update()
         if args.wait:
             print("Waiting for completion...")
             # Poll dns-rows-list until record is updated
@@ -331,6 +443,13 @@ def cmd_dns_record_delete(args, client: WedosAPIClient) -> int:
         "domain": args.domain,
         "row_id": args.id
     }
+    plan = verification_plan(client, args.domain, args.id) if _verify_dns(args) else None
+    
+    def _verify_delete() -> int:
+        row = plan['row']
+        return verify_served(args, plan, args.domain, row.get('name', ''),
+                             str(row.get('rdtype', '')).upper(), row.get('rdata', ''),
+                             present=False)
     
     # Call API
     result = client.call("dns-row-delete", delete_data)
@@ -340,10 +459,14 @@ def cmd_dns_record_delete(args, client: WedosAPIClient) -> int:
     if code == '1000' or code == 1000:
         logger.info("DNS record deleted successfully")
         print("✅ DNS record deleted successfully")
+        if plan is not None:
+            return _verify_delete()
         return EXIT_SUCCESS
     elif code == '1001' or code == 1001:
         logger.info("DNS record delete started (asynchronous)")
         print("⚠️  Operation started (asynchronous)")
+        if plan is not None:
+            return _verify_delete()
         if args.wait:
             print("Waiting for completion...")
             # Poll dns-rows-list until record is deleted
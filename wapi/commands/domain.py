@@ -8,20 +8,25 @@ import sys
 from typing import Any, Dict, List, Optional
 
 from ..api.client import WedosAPIClient
+from ..config import get_index_path
 from ..constants import (
     EXIT_SUCCESS, EXIT_ERROR, EXIT_VALIDATION_ERROR,
-    DEFAULT_MAX_POLL_ATTEMPTS, DEFAULT_POLL_INTERVAL
+    DEFAULT_MAX_POLL_ATTEMPTS, DEFAULT_POLL_INTERVAL,
+    DEFAULT_DNS_PORT, DNS_ROOT_SERVERS
 )
 from ..exceptions import (
     WAPIValidationError,
     WAPIRequestError,
     WAPITimeoutError,
 )
+from ..utils.dns_check import DELEGATION_HEADERS, check_delegation
 from ..utils.dns_lookup import enhance_nameserver_with_ipv6
-from ..utils.formatters import format_output
+from ..utils.formatters import format_output, print_output
+from ..utils.index import PortfolioIndex, nameservers_from_dns
 from ..utils.logger import get_logger
 from ..utils.validators import validate_domain
-from .helpers import poll_and_check
+from .helpers import CountingIterator, open_index, poll_and_check, use_index
+from .registration import cmd_domain_create_bulk
 
 
 def filter_sensitive_domain_data(domain: Dict[str, Any]) -> Dict[str, Any]:
@@ -49,10 +54,57 @@ def filter_sensitive_domain_data(domain: Dict[str, Any]) -> Dict[str, Any]:
     return filtered
 
 
+def refresh_index_domain(client: WedosAPIClient, domain_name: str, completed: bool = True):
+    """
+    Keep the local index (if any) current after a domain change made via the CLI.
+    
+    Completed changes re-read domain-info and update the stored details and
+    reverse references; pending (asynchronous) changes mark the domain stale
+    so the next ``wapi index sync`` refetches it. Never raises.
+    
+    Args:
+        client: WEDOS API client
+        domain_name: Changed domain
+        completed: False when the change is still being processed
+    """
+    logger = get_logger('commands.domain')
+    index = PortfolioIndex(get_index_path())
+    if not index.exists():
+        return
+    try:
+        with index:
+            if not index.has_domain(domain_name):
+                return
+            if completed:
+                response = client.domain_info(domain_name).get('response', {})
+                if response.get('code') in ['1000', 1000]:
+                    domain = response.get('data', {}).get('domain', {}) or {}
+                    info = filter_sensitive_domain_data(domain)
+                    with index.transaction():
+                        index.set_domain_details(domain_name, info, None)
+                    logger.debug(f"Local index updated for {domain_name}")
+                    return
+            with index.transaction():
+                index.mark_stale(domain_name)
+    except Exception as e:
+        logger.warning(f"Could not update local index for {domain_name}: {e}")
+
+
 def cmd_domain_list(args, client: WedosAPIClient) -> int:
     """Handle domain list command"""
     logger = get_logger('commands.domain')
     logger.info("Listing domains")
+    headers = ['name', 'status', 'expiration', 'nsset']
+    
+    if use_index(args):
+        # Filters run as indexed SQL queries on the local mirror
+        with open_index() as index:
+            domain_list = CountingIterator(index.iter_domains(
+                tld=getattr(args, 'tld', None), status=getattr(args, 'status', None)
+            ))
+            print_output(domain_list, args.format, headers=headers)
+        logger.info(f"Listed {domain_list.count} domain(s) from local index")
+        return EXIT_SUCCESS
     
     # WAPI uses 'domains-list' command
     result = client.call("domains-list", {})
@@ -86,7 +138,7 @@ def cmd_domain_list(args, client: WedosAPIClient) -> int:
             domain_list = [d for d in domain_list if d['status'] == args.status]
         
         logger.info(f"Listed {len(domain_list)} domain(s)")
-        print(format_output(domain_list, args.format, headers=['name', 'status', 'expiration', 'nsset']))
+        print_output(domain_list, args.format, headers=headers)
         return EXIT_SUCCESS
     else: # pragma: no cover
         error_msg = response.get('result', 'Unknown error') # pragma: no cover
@@ -107,6 +159,16 @@ def cmd_domain_info(args, client: WedosAPIClient) -> int:
         print(f"Error: Invalid domain name - {error}", file=sys.stderr)
         raise WAPIValidationError(f"Invalid domain name: {error}")
     
+    if use_index(args):
+        with open_index() as index:
+            domain = index.get_domain_info(args.domain)
+        if domain is None:
+            logger.warning(f"Domain not in local index: {args.domain}")
+            print(f"Error: {args.domain} not found in local index", file=sys.stderr)
+            raise WAPIRequestError(f"Domain not found in local index: {args.domain}")
+        print(format_output(domain, args.format))
+        return EXIT_SUCCESS
+    
     # Get domain information
     result = client.domain_info(args.domain)
     response = result.get('response', {})
@@ -129,6 +191,47 @@ def cmd_domain_info(args, client: WedosAPIClient) -> int:
         raise WAPIRequestError(f"Failed to get domain information: {error_msg} (code: {code})") # pragma: no cover
 
 
+def _nsset_servers(client: WedosAPIClient, nsset_name: str, domain: str) -> List[Dict[str, Any]]:
+    """Nameservers of an NSSET from nsset-info (empty if it cannot be read)"""
+    tld = domain.rsplit('.', 1)[-1].lower()
+    response = client.call("nsset-info", {"name": nsset_name, "tld": tld}).get('response', {})
+    if response.get('code') not in ('1000', 1000):
+        return []
+    servers = response.get('data', {}).get('nsset', {}).get('dns', {})
+    return nameservers_from_dns(servers)
+
+
+def check_delegation_after_update(args, client: WedosAPIClient,
+                                  nameservers: Optional[List[Dict[str, Any]]],
+                                  nsset_name: Optional[str] = None):
+    """
+    Compare the parent zone's delegation and the new nameservers with what was
+    submitted (--check-delegation).
+
+    Inconsistencies are reported as a warning: right after an update the
+    parent zone may simply not be republished yet.
+    """
+    if getattr(args, 'check_delegation', False) is not True:
+        return
+    expected = nameservers_from_dns({'server': nameservers or []})
+    if not expected and nsset_name:
+        expected = _nsset_servers(client, nsset_name, args.domain)
+    if not expected:
+        print("⚠️  No nameserver addresses known; skipping delegation check", file=sys.stderr)
+        return
+
+    print(f"Checking delegation of {args.domain} at the parent zone "
+          f"and {len(expected)} nameserver(s)...")
+    rows = check_delegation(args.domain, expected, port=DEFAULT_DNS_PORT, roots=DNS_ROOT_SERVERS)
+    print_output(rows, args.format, headers=DELEGATION_HEADERS)
+    inconsistent = [row for row in rows if row['status'] != 'ok']
+    if inconsistent:
+        print(f"⚠️  Delegation not consistent on {len(inconsistent)} of {len(rows)} server(s)",
+              file=sys.stderr)
+    else:
+        print("✅ Delegation consistent at the parent zone and all nameservers")
+
+
 def cmd_domain_update_ns(args, client: WedosAPIClient) -> int:
     """Handle domain update-ns command"""
     from ..utils.validators import validate_nameserver
@@ -270,6 +373,8 @@ def cmd_domain_update_ns(args, client: WedosAPIClient) -> int:
         logger.info("Nameservers updated successfully")
         print("✅ Nameservers updated successfully")
         print(format_output(response, args.format))
+        refresh_index_domain(client, args.domain)
+        check_delegation_after_update(args, client, nameservers, nsset_name)
         return EXIT_SUCCESS
     elif code == '1001' or code == 1001:
         logger.info("Operation started (asynchronous)")
@@ -314,7 +419,7 @@ def cmd_domain_update_ns(args, client: WedosAPIClient) -> int:
                 return False
             
             # Poll domain-info
-            return poll_and_check(
+            exit_code = poll_and_check(
                 client,
                 "domain-info",
                 {"name": args.domain},
@@ -323,8 +428,16 @@ def cmd_domain_update_ns(args, client: WedosAPIClient) -> int:
                 "Nameservers updated successfully",
                 timeout_error_message="Polling timeout: nameserver update",
             )
+            refresh_index_domain(client, args.domain)
+            check_delegation_after_update(args, client, nameservers, nsset_name)
+            return exit_code
         else:
             print(format_output(response, args.format))
+            refresh_index_domain(client, args.domain, completed=False)
+            if getattr(args, 'check_delegation', False) is True:
+                # The parent zone cannot show a change that is still being processed
+                print("⚠️  Delegation not checked: the update is still in progress. Use --wait, "
+                      f"or check it later with 'wapi dns health {args.domain}'", file=sys.stderr)
             return EXIT_SUCCESS
     else:
         error_msg = response.get('result', 'Unknown error')
@@ -336,6 +449,15 @@ def cmd_domain_update_ns(args, client: WedosAPIClient) -> int:
 def cmd_domain_create(args, client: WedosAPIClient) -> int:
     """Handle domain create command"""
     logger = get_logger('commands.domain')
+    from_file = getattr(args, 'from_file', None)
+    if isinstance(from_file, str):
+        if getattr(args, 'domain', None):
+            print("Error: Give either a domain name or --from-file, not both", file=sys.stderr)
+            raise WAPIValidationError("Domain name and --from-file are mutually exclusive")
+        return cmd_domain_create_bulk(args, client)
+    if not getattr(args, 'domain', None):
+        print("Error: Domain name or --from-file is required", file=sys.stderr)
+        raise WAPIValidationError("Domain name or --from-file is required")
     logger.info(f"Creating domain: {args.domain}")
     
     # Validate domain name
@@ -596,6 +718,7 @@ def cmd_domain_update(args, client: WedosAPIClient) -> int:
         logger.info(f"Domain updated successfully: {args.domain}")
         print("✅ Domain updated successfully")
         print(format_output(response, args.format))
+        refresh_index_domain(client, args.domain)
         return EXIT_SUCCESS
     elif code == '1001' or code == 1001:
         logger.info("Domain update started (asynchronous)")
@@ -609,7 +732,7 @@ def cmd_domain_update(args, client: WedosAPIClient) -> int:
                 poll_code = poll_response.get('code')
                 return poll_code in ['1000', 1000]
             
-            return poll_and_check(
+            exit_code = poll_and_check(
                 client,
                 "domain-info",
                 {"name": args.domain},
@@ -618,8 +741,11 @@ def cmd_domain_update(args, client: WedosAPIClient) -> int:
                 "Domain updated successfully",
                 timeout_error_message="Polling timeout: domain update",
             )
+            refresh_index_domain(client, args.domain)
+            return exit_code
         else:
             print(format_output(response, args.format))
+            refresh_index_domain(client, args.domain, completed=False)
             return EXIT_SUCCESS
     else: # pragma: no cover
         error_msg = response.get('result', 'Unknown error') # pragma: no cover
@@ -0,0 +1,158 @@
+"""
+Portfolio DNS health command for WAPI CLI
+
+Handles ``wapi dns health``: read the delegated nameservers of many domains
+(from domain-info or the local index) and ask every nameserver directly for
+the zone's SOA and NS records, reporting lame delegations, unreachable
+servers, SOA serial drift, NS sets that differ from the delegation, and
+latency per nameserver.
+"""
+
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..api.client import WedosAPIClient
+from ..constants import (
+    DEFAULT_DNS_PORT,
+    DEFAULT_DNS_QUERY_TIMEOUT,
+    DEFAULT_HEALTH_API_WORKERS,
+    DEFAULT_HEALTH_PER_SERVER,
+    DEFAULT_HEALTH_WORKERS,
+    EXIT_SUCCESS,
+)
+from ..exceptions import WAPIRequestError, WAPIValidationError
+from ..utils.batch import read_domains_from_file, run_concurrently
+from ..utils.dns_check import (
+    HEALTH_HEADERS,
+    NAMESERVER_HEADERS,
+    ResolverCache,
+    nameserver_summary,
+    scan_health,
+)
+from ..utils.formatters import format_output, print_output
+from ..utils.index import nameservers_from_dns
+from ..utils.logger import get_logger
+from ..utils.validators import validate_domain
+from .helpers import open_index, use_index
+
+DomainNameservers = List[Tuple[str, List[Dict[str, str]]]]
+
+
+def _is_success(response: Dict[str, Any]) -> bool:
+    code = response.get('code')
+    return code == '1000' or code == 1000
+
+
+def _selected_domains(args, client: Optional[WedosAPIClient]) -> List[str]:
+    """Domains given as arguments or --file, otherwise the whole portfolio (optionally one --tld)"""
+    names = list(getattr(args, 'domains', None) or [])
+    domain_file = getattr(args, 'file', None)
+    if domain_file:
+        try:
+            names.extend(read_domains_from_file(domain_file))
+        except OSError as e:
+            print(f"Error: Cannot read domain list {domain_file} - {e}", file=sys.stderr)
+            raise WAPIValidationError(f"Cannot read domain list {domain_file}: {e}") from e
+
+    tld = getattr(args, 'tld', None)
+    if not names:
+        if use_index(args):
+            with open_index() as index:
+                names = [d['name'] for d in index.iter_domains(tld=tld)]
+        else:
+            response = client.call("domains-list", {}).get('response', {})
+            if not _is_success(response):
+                error_msg = response.get('result', 'Unknown error')
+                print(f"Error ({response.get('code')}): {error_msg}", file=sys.stderr)
+                raise WAPIRequestError(
+                    f"Failed to list domains: {error_msg} (code: {response.get('code')})")
+            domains = response.get('data', {}).get('domain', [])
+            domains = domains if isinstance(domains, list) else [domains]
+            names = [str(d.get('name', '')) for d in domains if isinstance(d, dict)]
+            if tld:
+                suffix = f".{tld.lower().lstrip('.')}"
+                names = [n for n in names if n.lower().endswith(suffix)]
+
+    result = []
+    seen = set()
+    for name in names:
+        name = name.strip().rstrip('.').lower()
+        if not name or name in seen:
+            continue
+        is_valid, error = validate_domain(name)
+        if not is_valid:
+            print(f"Error: Invalid domain name {name} - {error}", file=sys.stderr)
+            raise WAPIValidationError(f"Invalid domain name {name}: {error}")
+        seen.add(name)
+        result.append(name)
+    return result
+
+
+def load_nameservers(args, client: Optional[WedosAPIClient],
+                     domains: List[str]) -> DomainNameservers:
+    """
+    Delegated nameservers of each domain.
+
+    With --from-index they come from stored domain details; otherwise from
+    concurrent domain-info calls (paced by the client's rate limiter).
+    Domains whose details cannot be read are reported and skipped.
+    """
+    logger = get_logger('commands.health')
+    found: Dict[str, List[Dict[str, str]]] = {}
+    if use_index(args):
+        with open_index() as index:
+            for name in domains:
+                info = index.get_domain_info(name)
+                if info is not None:
+                    found[name] = nameservers_from_dns(info.get('dns'))
+    else:
+        for name, result, error in run_concurrently(domains, client.domain_info,
+                                                    workers=DEFAULT_HEALTH_API_WORKERS):
+            response = (result or {}).get('response', {})
+            if error is None and _is_success(response):
+                dns = response.get('data', {}).get('domain', {}).get('dns', {})
+                found[name] = nameservers_from_dns(dns)
+            else:
+                logger.warning(f"domain-info failed for {name}: {error or response.get('result')}")
+
+    missing = [name for name in domains if name not in found]
+    if missing:
+        print(f"Warning: No nameserver data for {len(missing)} domain(s): {', '.join(missing[:5])}"
+              f"{' ...' if len(missing) > 5 else ''}", file=sys.stderr)
+    return [(name, found[name]) for name in domains if name in found]
+
+
+def cmd_dns_health(args, client: Optional[WedosAPIClient] = None) -> int:
+    """Handle dns health command"""
+    logger = get_logger('commands.health')
+    domains = load_nameservers(args, client, _selected_domains(args, client))
+    logger.info(f"Scanning DNS health of {len(domains)} domain(s)")
+
+    resolver = ResolverCache()
+    all_rows: List[Dict[str, Any]] = []
+    problem_domains = set()
+
+    workers = getattr(args, 'workers', None) or DEFAULT_HEALTH_WORKERS
+    per_server = getattr(args, 'per_server', None) or DEFAULT_HEALTH_PER_SERVER
+    timeout = getattr(args, 'timeout', None) or DEFAULT_DNS_QUERY_TIMEOUT
+
+    def _rows():
+        for rows in scan_health(domains, workers=workers, per_server=per_server, timeout=timeout,
+                                port=DEFAULT_DNS_PORT, resolver=resolver):
+            all_rows.extend(rows)
+            for row in rows:
+                if row['issues']:
+                    problem_domains.add(row['domain'])
+                if getattr(args, 'issues_only', False) is True and not row['issues']:
+                    continue
+                yield {key: '' if row.get(key) is None else row[key] for key in HEALTH_HEADERS}
+
+    print_output(_rows(), args.format, headers=HEALTH_HEADERS)
+
+    if getattr(args, 'quiet', False) is not True:
+        print(f"{len(domains)} domain(s) scanned, {len(problem_domains)} with issues",
+              file=sys.stderr)
+        summary = nameserver_summary(all_rows)
+        if summary:
+            print(format_output(summary, 'table', headers=NAMESERVER_HEADERS), file=sys.stderr)
+    return EXIT_SUCCESS
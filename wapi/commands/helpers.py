@@ -1,9 +1,9 @@
 """
-Shared helpers for command implementations (polling, formatting).
+Shared helpers for command implementations (polling, formatting, local index).
 """
 
 import sys
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
 from ..constants import (
     DEFAULT_MAX_POLL_ATTEMPTS,
@@ -11,10 +11,45 @@ from ..constants import (
     EXIT_SUCCESS,
 )
 from ..exceptions import WAPITimeoutError, WAPIRequestError
+from ..config import get_index_path
 from ..utils.formatters import format_output
+from ..utils.index import PortfolioIndex
 from ..utils.logger import get_logger
 
 
+def use_index(args: Any) -> bool:
+    """Return True when the command should answer from the local index (--from-index)"""
+    return getattr(args, "from_index", False) is True
+
+
+class CountingIterator:
+    """Pass records through unchanged, counting them (for log lines after streamed output)"""
+
+    def __init__(self, records: Iterable[Any]):
+        self.records = records
+        self.count = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        for record in self.records:
+            self.count += 1
+            yield record
+
+
+def open_index(create: bool = False) -> PortfolioIndex:
+    """
+    Open the local portfolio index.
+
+    Args:
+        create: Create the database if it does not exist yet
+
+    Raises:
+        WAPIRequestError if the index does not exist and create is False
+    """
+    index = PortfolioIndex(get_index_path())
+    index.connect(create=create)
+    return index
+
+
 def poll_and_check(
     client,
     command: str,
@@ -0,0 +1,195 @@
+"""
+Local portfolio index commands for WAPI CLI
+
+Handles ``wapi index sync`` and ``wapi index status``.
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..api.client import WedosAPIClient
+from ..constants import API_OBJECT_NOT_FOUND, DEFAULT_INDEX_WORKERS, EXIT_SUCCESS
+from ..exceptions import WAPIRequestError
+from ..utils.formatters import format_output
+from ..utils.index import PortfolioIndex, domain_list_hash
+from ..utils.logger import get_logger
+from ..utils.tracing import current_span, start_span
+from .contact import filter_sensitive_contact_data
+from .dns import dns_records_from_rows
+from .domain import filter_sensitive_domain_data
+from .helpers import open_index
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _is_success(response: Dict[str, Any]) -> bool:
+    code = response.get('code')
+    return code == '1000' or code == 1000
+
+
+def _fetch_domain_details(client: WedosAPIClient, name: str, parent=None
+                          ) -> Tuple[str, Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+    """
+    Fetch domain-info and dns-rows-list for one domain (runs in a worker thread).
+
+    A part that could not be fetched is returned as None so the stored data
+    is kept; only a domain without a WEDOS DNS zone gets an empty row list.
+    """
+    logger = get_logger('commands.index')
+    info = None
+    dns_rows = None
+    with start_span("index.fetch_domain", {"wapi.domain": name}, parent=parent):
+        try:
+            response = client.domain_info(name).get('response', {})
+            if _is_success(response):
+                domain = response.get('data', {}).get('domain', {}) or {}
+                info = filter_sensitive_domain_data(domain)
+            else:
+                logger.warning(f"domain-info failed for {name}: {response.get('result')}")
+        except Exception as e:
+            logger.warning(f"domain-info failed for {name}: {e}")
+        try:
+            response = client.call("dns-rows-list", {"domain": name}).get('response', {})
+            if _is_success(response):
+                dns_rows = dns_records_from_rows(_as_list(response.get('data', {}).get('row')))
+            elif str(response.get('code')) == API_OBJECT_NOT_FOUND:
+                # Domains without WEDOS DNS hosting have no rows
+                dns_rows = []
+            else:
+                logger.warning(f"dns-rows-list failed for {name}: {response.get('result')} "
+                               f"(code: {response.get('code')})")
+        except Exception as e:
+            logger.warning(f"dns-rows-list failed for {name}: {e}")
+    return name, info, dns_rows
+
+
+def sync_index(client: WedosAPIClient, index: PortfolioIndex,
+               workers: int = DEFAULT_INDEX_WORKERS, full: bool = False) -> Dict[str, int]:
+    """
+    Mirror the account into the local index.
+
+    Only domains whose list-level fields (status, expiration, nsset) changed
+    since the last sync, that have no details yet, or whose last detail fetch
+    failed, get domain-info and dns-rows-list refetched. Detail requests run in parallel.
+
+    Args:
+        client: WEDOS API client
+        index: Open portfolio index
+        workers: Number of parallel detail requests
+        full: Refetch details for every domain
+
+    Returns:
+        Dictionary with sync statistics
+
+    Raises:
+        WAPIRequestError: If domains-list fails
+    """
+    logger = get_logger('commands.index')
+    started = time.time()
+
+    response = client.call("domains-list", {}).get('response', {})
+    if not _is_success(response):
+        error_msg = response.get('result', 'Unknown error')
+        raise WAPIRequestError(
+            f"Failed to list domains: {error_msg} (code: {response.get('code')})")
+    domains = [d for d in _as_list(response.get('data', {}).get('domain')) if isinstance(d, dict)]
+
+    known = index.domain_hashes()
+    listed = set()
+    changed = []
+    with index.transaction():
+        for domain in domains:
+            name = domain.get('name', '')
+            if not name:
+                continue
+            listed.add(name)
+            stored = known.get(name)
+            if full or stored is None or not stored['has_info'] \
+                    or stored['list_hash'] != domain_list_hash(domain):
+                changed.append(name)
+            index.upsert_domain(domain, synced_at=started)
+        removed = index.delete_domains(name for name in known if name not in listed)
+
+    logger.info(f"Index sync: {len(listed)} domain(s), {len(changed)} to refetch, "
+                f"{removed} removed")
+
+    fetched = 0
+    if changed:
+        parent = current_span()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [executor.submit(_fetch_domain_details, client, name, parent)
+                       for name in changed]
+            for future in futures:
+                name, info, dns_rows = future.result()
+                with index.transaction():
+                    index.set_domain_details(name, info, dns_rows, synced_at=started)
+                    if info is None or dns_rows is None:
+                        # Keep the old details but refetch them on the next sync
+                        index.mark_stale(name)
+                if info is not None:
+                    fetched += 1
+
+    stats = {'domains': len(listed), 'refetched': fetched, 'unchanged': len(listed) - len(changed),
+             'removed': removed, 'nssets': 0, 'contacts': 0}
+
+    # NSSET and contact lists are not available on every account; keep old data on failure
+    for command, key in (("nsset-list", 'nsset'), ("contact-list", 'contact')):
+        try:
+            response = client.call(command, {}).get('response', {})
+        except Exception as e:
+            logger.warning(f"{command} failed: {e}")
+            continue
+        if not _is_success(response):
+            logger.warning(f"{command} failed: {response.get('result')} "
+                           f"(code: {response.get('code')})")
+            continue
+        items = [i for i in _as_list(response.get('data', {}).get(key)) if isinstance(i, dict)]
+        with index.transaction():
+            if key == 'nsset':
+                index.replace_nssets(items, synced_at=started)
+                stats['nssets'] = len(items)
+            else:
+                index.replace_contacts([filter_sensitive_contact_data(c) for c in items],
+                                       synced_at=started)
+                stats['contacts'] = len(items)
+
+    with index.transaction():
+        index.set_meta('last_sync', time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)))
+    stats['seconds'] = round(time.time() - started, 2)
+    return stats
+
+
+def cmd_index_sync(args, client: WedosAPIClient) -> int:
+    """Handle index sync command"""
+    logger = get_logger('commands.index')
+    workers = getattr(args, 'workers', None) or DEFAULT_INDEX_WORKERS
+    full = getattr(args, 'full', False) is True
+
+    index = open_index(create=True)
+    try:
+        stats = sync_index(client, index, workers=workers, full=full)
+    finally:
+        index.close()
+
+    logger.info(f"Index synced: {stats}")
+    if not (hasattr(args, 'quiet') and args.quiet is True):
+        print("✅ Local index synced", file=sys.stderr)
+    print(format_output(stats, args.format))
+    return EXIT_SUCCESS
+
+
+def cmd_index_status(args, client: Optional[WedosAPIClient] = None) -> int:
+    """Handle index status command"""
+    index = open_index(create=False)
+    try:
+        stats = index.stats()
+    finally:
+        index.close()
+    print(format_output(stats, args.format))
+    return EXIT_SUCCESS
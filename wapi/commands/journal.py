@@ -0,0 +1,77 @@
+"""
+Request journal commands for WAPI CLI
+
+Handles ``wapi journal list`` and ``wapi journal resolve`` (both offline).
+"""
+
+import sys
+from datetime import datetime
+from typing import Optional
+
+from ..api.client import WedosAPIClient
+from ..api.journal import STATE_APPLIED, STATE_NOT_APPLIED, UNRESOLVED_STATES, RequestJournal
+from ..config import get_journal_path
+from ..constants import EXIT_SUCCESS
+from ..exceptions import WAPIValidationError
+from ..utils.formatters import is_streaming_format, print_output
+from ..utils.logger import get_logger
+
+JOURNAL_HEADERS = ['cltrid', 'time', 'command', 'target', 'state', 'code']
+
+
+def _open_journal() -> RequestJournal:
+    path = get_journal_path()
+    if path is None:
+        print("Error: Request journal is disabled (WAPI_JOURNAL_FILE=off)", file=sys.stderr)
+        raise WAPIValidationError("Request journal is disabled")
+    return RequestJournal(path)
+
+
+def _target(data) -> str:
+    data = data or {}
+    target = data.get('name') or data.get('domain') or ''
+    if data.get('row_id'):
+        target = f"{target}#{data['row_id']}"
+    return str(target)
+
+
+def cmd_journal_list(args, client: Optional[WedosAPIClient] = None) -> int:
+    """Handle journal list command"""
+    journal = _open_journal()
+    entries = journal.list(unresolved_only=getattr(args, 'pending', False) is True)
+    limit = getattr(args, 'limit', None)
+    if isinstance(limit, int) and limit > 0:
+        entries = entries[-limit:]
+    rows = [{
+        'cltrid': e.get('cltrid', ''),
+        'time': datetime.fromtimestamp(e.get('ts', 0)).strftime('%Y-%m-%d %H:%M:%S'),
+        'command': e.get('command', ''),
+        'target': _target(e.get('data')),
+        'state': e.get('state', ''),
+        'code': e.get('code', ''),
+    } for e in entries]
+    get_logger('commands.journal').info(f"Listed {len(rows)} journal entr(y/ies)")
+    if not rows:
+        print("No journal entries", file=sys.stderr)
+    if rows or is_streaming_format(args.format):
+        print_output(rows, args.format, headers=JOURNAL_HEADERS)
+    return EXIT_SUCCESS
+
+
+def cmd_journal_resolve(args, client: Optional[WedosAPIClient] = None) -> int:
+    """Handle journal resolve command"""
+    journal = _open_journal()
+    entry = journal.get(args.cltrid)
+    if entry is None:
+        print(f"Error: No journal entry with clTRID {args.cltrid}", file=sys.stderr)
+        raise WAPIValidationError(f"No journal entry with clTRID {args.cltrid}")
+    if entry.get('state') not in UNRESOLVED_STATES:
+        print(f"Error: {args.cltrid} is already resolved ({entry.get('state')})", file=sys.stderr)
+        raise WAPIValidationError(f"Journal entry {args.cltrid} is already resolved")
+
+    state = STATE_APPLIED if getattr(args, 'applied', False) is True else STATE_NOT_APPLIED
+    journal.record_state(args.cltrid, state, detail='resolved manually')
+    get_logger('commands.journal').info(f"Journal entry {args.cltrid} resolved as {state}")
+    if not (hasattr(args, 'quiet') and args.quiet is True):
+        print(f"✅ {entry.get('command')} {args.cltrid} marked as {state}", file=sys.stderr)
+    return EXIT_SUCCESS
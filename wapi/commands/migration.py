@@ -0,0 +1,402 @@
+"""
+Bulk NSSET migration for WAPI CLI
+
+Handles ``wapi nsset migrate``: move many domains to one target nameserver set.
+
+Instead of creating a new NSSET per domain (what ``domain update-ns
+--nameserver`` does), domains are grouped by TLD and technical contact, one
+canonical NSSET is looked up or created per group, and the domains are then
+reassigned to it concurrently with a single ``domain-update-ns`` each.
+"""
+
+import hashlib
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..api.client import WedosAPIClient
+from ..constants import (
+    EXIT_SUCCESS,
+    DEFAULT_MAX_POLL_ATTEMPTS,
+    DEFAULT_MIGRATE_RATE,
+    DEFAULT_MIGRATE_WORKERS,
+    DEFAULT_NSSET_PREFIX,
+    DEFAULT_POLL_INTERVAL,
+)
+from ..exceptions import WAPIRequestError, WAPITimeoutError, WAPIValidationError
+from ..utils.batch import RateLimiter, poll_many, run_concurrently
+from ..utils.formatters import print_output
+from ..utils.index import contact_handles, nameservers_from_dns
+from ..utils.logger import get_logger
+from ..utils.validators import validate_domain
+from .domain import refresh_index_domain
+from .helpers import open_index
+from .nsset import parse_nameserver_args
+
+MIGRATE_HEADERS = ['domain', 'tld', 'nsset', 'result', 'detail']
+
+Signature = Tuple[Tuple[str, str, str], ...]
+
+
+def _is_success(response: Dict[str, Any]) -> bool:
+    code = response.get('code')
+    return code == '1000' or code == 1000
+
+
+def _is_pending(response: Dict[str, Any]) -> bool:
+    code = response.get('code')
+    return code == '1001' or code == 1001
+
+
+def _failure(response: Dict[str, Any]) -> str:
+    return f"{response.get('result', 'Unknown error')} (code: {response.get('code')})"
+
+
+def nameserver_signature(dns: Any) -> Signature:
+    """
+    Order-independent identity of a nameserver set.
+
+    Args:
+        dns: ``dns`` structure or list of nameserver dictionaries
+
+    Returns:
+        Sorted tuple of (host, ipv4, ipv6)
+    """
+    return tuple(sorted({(ns['host'], ns['ipv4'], ns['ipv6']) for ns in nameservers_from_dns(dns)}))
+
+
+def domain_tld(domain: str) -> str:
+    """Return the TLD of a domain name (lower case)"""
+    return domain.rsplit('.', 1)[-1].lower() if '.' in domain else 'cz'
+
+
+def canonical_nsset_name(prefix: str, tld: str, tech_c: str, signature: Signature) -> str:
+    """
+    Deterministic NSSET name for a group, so repeated migrations reuse it.
+
+    Args:
+        prefix: Name prefix (e.g., "NS")
+        tld: Group TLD
+        tech_c: Group technical contact handle ('' if none)
+        signature: Nameserver signature from nameserver_signature()
+
+    Returns:
+        Name such as ``NS-CZ-1A2B3C4D``
+    """
+    payload = json.dumps([tld.lower(), tech_c.upper(), list(signature)], sort_keys=True)
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:8]
+    return f"{prefix}-{tld}-{digest}".upper()
+
+
+def find_matching_nsset(nssets: List[Dict[str, Any]], tld: str, tech_c: str,
+                        signature: Signature) -> Optional[str]:
+    """
+    Find an existing NSSET with the same nameservers for a group.
+
+    NSSETs whose TLD or technical contact is known and differs are skipped.
+
+    Args:
+        nssets: NSSET records (nsset-list or local index)
+        tld: Group TLD
+        tech_c: Group technical contact handle ('' if none)
+        signature: Target nameserver signature
+
+    Returns:
+        Name of the first matching NSSET, or None
+    """
+    for nsset in nssets:
+        name = nsset.get('name')
+        if not name or nameserver_signature(nsset.get('dns')) != signature:
+            continue
+        if nsset.get('tld') and str(nsset.get('tld')).lower() != tld:
+            continue
+        handles = [h.upper() for h in contact_handles(nsset.get('tech_c'))]
+        if tech_c and handles and tech_c.upper() not in handles:
+            continue
+        return str(name)
+    return None
+
+
+def _read_domain_file(path: str) -> List[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError as e:
+        print(f"Error: Cannot read domain list {path} - {e}", file=sys.stderr)
+        raise WAPIValidationError(f"Cannot read domain list {path}: {e}") from e
+    return [line.split('#', 1)[0].strip() for line in lines]
+
+
+def _collect_domains(args) -> List[str]:
+    """Domains selected by --domain, --file, --from-nsset and --from-ns (deduplicated)"""
+    names = list(getattr(args, 'domain', None) or [])
+    domain_file = getattr(args, 'file', None)
+    if domain_file:
+        names.extend(_read_domain_file(domain_file))
+
+    from_nsset = getattr(args, 'from_nsset', None)
+    from_ns = getattr(args, 'from_ns', None)
+    if from_nsset or from_ns:
+        with open_index() as index:
+            if from_nsset:
+                names.extend(row['domain'] for row in index.refs_nsset(from_nsset))
+            if from_ns:
+                names.extend(row['domain'] for row in index.refs_nameserver(from_ns)
+                             if row.get('domain'))
+
+    domains = []
+    seen = set()
+    for name in names:
+        name = name.strip().rstrip('.').lower()
+        if not name or name in seen:
+            continue
+        is_valid, error = validate_domain(name)
+        if not is_valid:
+            print(f"Error: Invalid domain name {name} - {error}", file=sys.stderr)
+            raise WAPIValidationError(f"Invalid domain name {name}: {error}")
+        seen.add(name)
+        domains.append(name)
+    return domains
+
+
+def _load_domain_details(client: WedosAPIClient, domains: List[str], args,
+                         limiter: RateLimiter, workers: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Current NSSET and owner contact per domain.
+
+    Uses the local index when it knows the domain; domain-info is only called
+    for the rest, and only when the technical contact is not given explicitly.
+    """
+    logger = get_logger('commands.migration')
+    details: Dict[str, Dict[str, Any]] = {}
+    try:
+        with open_index() as index:
+            for name in domains:
+                info = index.get_domain_info(name)
+                if info is not None:
+                    details[name] = info
+    except WAPIRequestError:
+        logger.debug("No local index, reading domain details from the API")
+
+    if getattr(args, 'tech_c', None):
+        return details
+
+    missing = [name for name in domains if name not in details]
+    if not missing:
+        return details
+    logger.info(f"Fetching domain-info for {len(missing)} domain(s)")
+    for name, result, error in run_concurrently(missing, client.domain_info,
+                                                workers=workers, rate_limiter=limiter):
+        response = (result or {}).get('response', {})
+        if error is None and _is_success(response):
+            details[name] = response.get('data', {}).get('domain', {}) or {}
+        else:
+            logger.warning(f"domain-info failed for {name}: {error or response.get('result')}")
+    return details
+
+
+def _list_nssets(client: WedosAPIClient) -> List[Dict[str, Any]]:
+    """Existing NSSETs from nsset-list, falling back to the local index"""
+    logger = get_logger('commands.migration')
+    try:
+        response = client.call("nsset-list", {}).get('response', {})
+        if _is_success(response):
+            nssets = response.get('data', {}).get('nsset', [])
+            nssets = nssets if isinstance(nssets, list) else [nssets]
+            return [n for n in nssets if isinstance(n, dict)]
+        logger.warning(f"nsset-list failed: {response.get('result')} "
+                       f"(code: {response.get('code')})")
+    except WAPIRequestError as e:
+        logger.warning(f"nsset-list failed: {e}")
+    try:
+        with open_index() as index:
+            return list(index.iter_nssets())
+    except WAPIRequestError:
+        return []
+
+
+def _ensure_nsset(client: WedosAPIClient, name: str, tld: str, tech_c: str,
+                  nameservers: List[Dict[str, Any]], args) -> Tuple[bool, str]:
+    """
+    Make sure the canonical NSSET exists, creating it if needed.
+
+    Returns:
+        Tuple of (ok, detail) where detail is 'reused', 'created' or an error
+    """
+    logger = get_logger('commands.migration')
+    response = client.call("nsset-info", {"name": name, "tld": tld}).get('response', {})
+    if _is_success(response):
+        return True, 'reused'
+
+    nsset_data = {"tld": tld, "name": name, "dns": {"server": nameservers}}
+    if tech_c:
+        nsset_data["tech_c"] = tech_c
+    logger.info(f"Creating NSSET {name}")
+    response = client.call("nsset-create", nsset_data).get('response', {})
+    if _is_success(response):
+        return True, 'created'
+    if not _is_pending(response):
+        return False, f"nsset-create failed: {_failure(response)}"
+
+    # Domains cannot be assigned before the NSSET exists
+    final = client.poll_until_complete(
+        "nsset-info", {"name": name, "tld": tld},
+        max_attempts=DEFAULT_MAX_POLL_ATTEMPTS,
+        interval=DEFAULT_POLL_INTERVAL,
+        verbose=getattr(args, 'quiet', False) is not True,
+    ).get('response', {})
+    if _is_success(final):
+        return True, 'created'
+    return False, f"NSSET {name} not available: {final.get('result', 'Timeout or error')}"
+
+
+def _assigned_check(nsset_name: str):
+    """Completion check: domain-info reports the target NSSET"""
+    def is_complete(result: Dict[str, Any]) -> bool:
+        response = result.get('response', {})
+        if not _is_success(response):
+            return False
+        current = response.get('data', {}).get('domain', {}).get('nsset', '')
+        return str(current).upper() == nsset_name.upper()
+    return is_complete
+
+
+def cmd_nsset_migrate(args, client: WedosAPIClient) -> int:
+    """Handle nsset migrate command"""
+    logger = get_logger('commands.migration')
+
+    if not getattr(args, 'nameserver', None):
+        print("Error: At least one nameserver required (--nameserver)", file=sys.stderr)
+        raise WAPIValidationError("At least one nameserver required (--nameserver)")
+    domains = _collect_domains(args)
+    if not domains:
+        print("Error: No domains selected (use --domain, --file, --from-nsset or --from-ns)",
+              file=sys.stderr)
+        raise WAPIValidationError("No domains selected for migration")
+
+    nameservers, discovered, warnings = parse_nameserver_args(
+        args.nameserver, discover_ipv6=getattr(args, 'no_ipv6_discovery', False) is not True
+    )
+    quiet = getattr(args, 'quiet', False) is True
+    if discovered and not quiet:
+        print(f"ℹ️  IPv6 addresses discovered: {', '.join(discovered)}", file=sys.stderr)
+    for warning in warnings:
+        print(f"⚠️  {warning}", file=sys.stderr)
+    signature = nameserver_signature(nameservers)
+
+    rate = getattr(args, 'rate', None)
+    limiter = RateLimiter(DEFAULT_MIGRATE_RATE if rate is None else rate)
+    workers = getattr(args, 'workers', None) or DEFAULT_MIGRATE_WORKERS
+    prefix = getattr(args, 'nsset_prefix', None) or DEFAULT_NSSET_PREFIX
+    dry_run = getattr(args, 'dry_run', False) is True
+
+    details = _load_domain_details(client, domains, args, limiter, workers)
+
+    # Group by (TLD, technical contact)
+    rows = []
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for name in domains:
+        tech_c = getattr(args, 'tech_c', None)
+        if not tech_c:
+            if name not in details:
+                rows.append({'domain': name, 'tld': domain_tld(name), 'nsset': '',
+                             'result': 'failed', 'detail': 'domain-info failed'})
+                continue
+            handles = contact_handles(details[name].get('owner_c'))
+            tech_c = handles[0] if handles else ''
+        groups.setdefault((domain_tld(name), tech_c), []).append(name)
+
+    existing = _list_nssets(client)
+    targets: Dict[Tuple[str, str], Tuple[str, bool, str]] = {}
+    for (tld, tech_c), names in groups.items():
+        match = find_matching_nsset(existing, tld, tech_c, signature)
+        target = match or canonical_nsset_name(prefix, tld, tech_c, signature)
+        if match:
+            targets[(tld, tech_c)] = (target, True, 'reused')
+        elif dry_run:
+            targets[(tld, tech_c)] = (target, True, 'create')
+        else:
+            ok, detail = _ensure_nsset(client, target, tld, tech_c, nameservers, args)
+            targets[(tld, tech_c)] = (target, ok, detail)
+        logger.info(f"Group {tld}/{tech_c or '-'}: {len(names)} domain(s) -> {target} "
+                    f"({targets[(tld, tech_c)][2]})")
+
+    # Domains to reassign
+    updates = []
+    for (tld, tech_c), names in groups.items():
+        target, ok, detail = targets[(tld, tech_c)]
+        for name in names:
+            row = {'domain': name, 'tld': tld, 'nsset': target, 'result': '', 'detail': detail}
+            rows.append(row)
+            current = str((details.get(name) or {}).get('nsset', '') or '')
+            if not ok:
+                row['result'] = 'failed'
+            elif current.upper() == target.upper():
+                row['result'] = 'unchanged'
+            elif dry_run:
+                row['result'] = 'planned'
+                row['detail'] = f"{current or '-'} -> {target} ({detail})"
+            else:
+                updates.append(row)
+
+    if updates:
+        logger.info(f"Reassigning {len(updates)} domain(s) with {workers} worker(s)")
+        outcomes = run_concurrently(
+            updates,
+            lambda row: client.domain_update_ns(row['domain'], nsset_name=row['nsset']),
+            workers=workers, rate_limiter=limiter,
+        )
+        pending = {}
+        for row, result, error in outcomes:
+            response = (result or {}).get('response', {})
+            if error is not None:
+                row['result'], row['detail'] = 'failed', str(error)
+            elif _is_success(response):
+                row['result'] = 'migrated'
+            elif _is_pending(response):
+                row['result'] = 'pending'
+                check = _assigned_check(row['nsset'])
+                pending[row['domain']] = ("domain-info", {"name": row['domain']}, check)
+            else:
+                row['result'] = 'failed'
+                row['detail'] = _failure(response)
+
+        if pending and getattr(args, 'wait', False) is True:
+            print(f"Waiting for {len(pending)} asynchronous update(s)...", file=sys.stderr)
+            final = poll_many(
+                client, pending,
+                max_attempts=DEFAULT_MAX_POLL_ATTEMPTS,
+                interval=DEFAULT_POLL_INTERVAL,
+                workers=workers,
+                rate_limiter=limiter,
+                verbose=not quiet,
+            )
+            for row in updates:
+                if row['domain'] not in final:
+                    continue
+                response = final[row['domain']].get('response', {})
+                if _is_success(response):
+                    row['result'] = 'migrated'
+                elif str(response.get('code')) == '9998':
+                    row['result'], row['detail'] = 'timeout', response.get('result', '')
+                else:
+                    row['result'] = 'failed'
+                    row['detail'] = _failure(response)
+
+        # Let the next index sync refetch what changed (no extra domain-info here)
+        for row in updates:
+            if row['result'] in ('migrated', 'pending'):
+                refresh_index_domain(client, row['domain'], completed=False)
+
+    rows.sort(key=lambda row: row['domain'])
+    print_output(rows, args.format, headers=MIGRATE_HEADERS)
+
+    failed = [r for r in rows if r['result'] == 'failed']
+    timed_out = [r for r in rows if r['result'] == 'timeout']
+    logger.info(f"NSSET migration finished: {len(rows) - len(failed) - len(timed_out)} ok, "
+                f"{len(failed)} failed, {len(timed_out)} timed out")
+    if failed:
+        raise WAPIRequestError(f"{len(failed)} of {len(rows)} domain(s) failed to migrate")
+    if timed_out:
+        raise WAPITimeoutError(f"Polling timeout for {len(timed_out)} domain(s)")
+    return EXIT_SUCCESS
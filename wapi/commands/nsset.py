@@ -5,7 +5,7 @@ Handles all NSSET-related operations.
 """
 
 import sys
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..api.client import WedosAPIClient
 from ..constants import (
@@ -18,27 +18,33 @@ from ..exceptions import (
     WAPITimeoutError,
 )
 from ..utils.dns_lookup import enhance_nameserver_with_ipv6
-from ..utils.formatters import format_output
+from ..utils.formatters import format_output, print_output
 from ..utils.logger import get_logger
 from ..utils.validators import validate_nameserver
+from .helpers import CountingIterator, open_index, use_index
 
 
-def cmd_nsset_create(args, client: WedosAPIClient) -> int:
-    """Handle nsset create command"""
-    logger = get_logger('commands.nsset')
-    logger.info(f"Creating NSSET: {args.name}")
-    
-    # Validate nameservers
-    if not args.nameserver:
-        logger.error("No nameservers provided")
-        print("Error: At least one nameserver required (--nameserver)", file=sys.stderr)
-        raise WAPIValidationError("At least one nameserver required (--nameserver)")
+def parse_nameserver_args(values: List[str], discover_ipv6: bool = True
+                          ) -> Tuple[List[Dict[str, Any]], List[str], List[str]]:
+    """
+    Parse --nameserver values, optionally discovering missing IPv6 addresses.
     
+    Args:
+        values: Nameserver strings (name:ipv4:ipv6 or name:ipv4)
+        discover_ipv6: Look up IPv6 for nameservers given with IPv4 only
+        
+    Returns:
+        Tuple of (nameservers, discovered IPv6 messages, discovery warnings)
+        
+    Raises:
+        WAPIValidationError: If a nameserver string is invalid
+    """
+    logger = get_logger('commands.nsset')
     nameservers = []
     ipv6_discovery_warnings = []
     ipv6_discovery_success = []
     
-    for ns_string in args.nameserver:
+    for ns_string in values:
         is_valid, parsed, error = validate_nameserver(ns_string)
         if not is_valid:
             logger.warning(f"Invalid nameserver format: {ns_string} - {error}")
@@ -46,7 +52,7 @@ def cmd_nsset_create(args, client: WedosAPIClient) -> int:
             raise WAPIValidationError(f"Invalid nameserver format: {error}")
         
         # Enhance with IPv6 if missing and discovery is enabled
-        if not args.no_ipv6_discovery and parsed.get('addr_ipv4') and not parsed.get('addr_ipv6'):
+        if discover_ipv6 and parsed.get('addr_ipv4') and not parsed.get('addr_ipv6'):
             logger.info(f"Attempting to find IPv6 for nameserver {parsed.get('name')}")
             enhanced, found, warning = enhance_nameserver_with_ipv6(parsed)
             if found:
@@ -56,11 +62,29 @@ def cmd_nsset_create(args, client: WedosAPIClient) -> int:
             elif warning:
                 ipv6_discovery_warnings.append(warning)
                 logger.debug(warning)
-        elif args.no_ipv6_discovery and parsed.get('addr_ipv4') and not parsed.get('addr_ipv6'):
+        elif not discover_ipv6 and parsed.get('addr_ipv4') and not parsed.get('addr_ipv6'):
             logger.debug(f"IPv6 discovery disabled, skipping lookup for {parsed.get('name')}")
         
         nameservers.append(parsed)
     
+    return nameservers, ipv6_discovery_success, ipv6_discovery_warnings
+
+
+def cmd_nsset_create(args, client: WedosAPIClient) -> int:
+    """Handle nsset create command"""
+    logger = get_logger('commands.nsset')
+    logger.info(f"Creating NSSET: {args.name}")
+    
+    # Validate nameservers
+    if not args.nameserver:
+        logger.error("No nameservers provided")
+        print("Error: At least one nameserver required (--nameserver)", file=sys.stderr)
+        raise WAPIValidationError("At least one nameserver required (--nameserver)")
+    
+    nameservers, ipv6_discovery_success, ipv6_discovery_warnings = parse_nameserver_args(
+        args.nameserver, discover_ipv6=not args.no_ipv6_discovery
+    )
+    
     # Print informative messages
     if ipv6_discovery_success:
         print(f"ℹ️  IPv6 addresses discovered: {', '.join(ipv6_discovery_success)}", file=sys.stderr)
@@ -209,6 +233,14 @@ def cmd_nsset_info(args, client: WedosAPIClient) -> int:
 def cmd_nsset_list(args, client: WedosAPIClient) -> int:
     """Handle nsset list command"""
     logger = get_logger('commands.nsset')
+    
+    if use_index(args):
+        with open_index() as index:
+            nssets = CountingIterator(index.iter_nssets())
+            print_output(nssets, args.format)
+        logger.info(f"Listed {nssets.count} NSSET(s) from local index")
+        return EXIT_SUCCESS
+    
     result = client.call("nsset-list", {})
     response = result.get('response', {})
     code = response.get('code')
@@ -217,7 +249,7 @@ def cmd_nsset_list(args, client: WedosAPIClient) -> int:
         nssets = response.get('data', {}).get('nsset', [])
         if not isinstance(nssets, list):
             nssets = [nssets]
-        print(format_output(nssets, args.format))
+        print_output(nssets, args.format)
         logger.info(f"Listed {len(nssets)} NSSET(s)")
         return EXIT_SUCCESS
     
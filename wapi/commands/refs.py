@@ -0,0 +1,52 @@
+"""
+Reverse-reference commands for WAPI CLI
+
+Answers "what uses this?" from the local index: nameserver -> NSSETs ->
+domains, contact handle -> domains and NSSET -> domains.
+"""
+
+import sys
+from typing import Any, Dict, List, Optional
+
+from ..api.client import WedosAPIClient
+from ..constants import EXIT_SUCCESS
+from ..utils.formatters import is_streaming_format, print_output
+from ..utils.logger import get_logger
+from .helpers import open_index
+
+
+def _print_refs(args, rows: List[Dict[str, Any]], headers: List[str], what: str):
+    logger = get_logger('commands.refs')
+    logger.info(f"Found {len(rows)} reference(s) to {what}")
+    if not rows:
+        print(f"No references to {what} in local index", file=sys.stderr)
+    if rows or is_streaming_format(args.format):
+        print_output(rows, args.format, headers=headers)
+
+
+def cmd_refs_ns(args, client: Optional[WedosAPIClient] = None) -> int:
+    """Handle refs ns command"""
+    with open_index() as index:
+        rows = index.refs_nameserver(args.host)
+    _print_refs(args, rows, ['nameserver', 'ipv4', 'ipv6', 'nsset', 'domain'], args.host)
+    return EXIT_SUCCESS
+
+
+def cmd_refs_contact(args, client: Optional[WedosAPIClient] = None) -> int:
+    """Handle refs contact command"""
+    with open_index() as index:
+        rows = index.refs_contact(args.handle)
+    _print_refs(args, rows, ['handle', 'role', 'domain'], args.handle)
+    return EXIT_SUCCESS
+
+
+def cmd_refs_nsset(args, client: Optional[WedosAPIClient] = None) -> int:
+    """Handle refs nsset command"""
+    with open_index() as index:
+        rows = index.refs_nsset(args.name)
+        nameservers = index.nsset_nameservers(args.name)
+    if nameservers and getattr(args, 'quiet', False) is not True:
+        hosts = ', '.join(ns['host'] for ns in nameservers)
+        print(f"{args.name}: {hosts}", file=sys.stderr)
+    _print_refs(args, rows, ['nsset', 'domain', 'status', 'expiration'], args.name)
+    return EXIT_SUCCESS
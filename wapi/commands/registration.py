@@ -0,0 +1,342 @@
+"""
+Bulk domain registration for WAPI CLI
+
+Handles ``domain create --from-file orders.csv``: every order row is
+validated before any API call, availability is checked in batched
+``domains-availability`` requests, ``domain-create`` calls run concurrently
+under a rate limit and asynchronous (1001) registrations are awaited in one
+shared polling phase. Each outcome is appended to a JSON-lines results
+file as soon as it is known, so an interrupted run can be restarted with
+the same command and skips the orders that were already submitted. An
+order whose create call failed in transit is recorded as ``unknown`` and
+is looked up with ``domain-info`` on the next run instead of being sent
+again.
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+from ..api.client import WedosAPIClient
+from ..constants import (
+    EXIT_SUCCESS,
+    DEFAULT_CREATE_RATE,
+    DEFAULT_CREATE_WORKERS,
+    DEFAULT_MAX_POLL_ATTEMPTS,
+    DEFAULT_POLL_INTERVAL,
+    MAX_REGISTRATION_PERIOD,
+)
+from ..exceptions import (
+    WAPICircuitOpenError,
+    WAPIConnectionError,
+    WAPIRejectedError,
+    WAPIRequestError,
+    WAPIThrottledError,
+    WAPITimeoutError,
+    WAPIValidationError,
+)
+from ..utils.batch import RateLimiter, poll_many, run_concurrently
+from ..utils.formatters import print_output
+from ..utils.logger import get_logger
+from ..utils.validators import validate_domain
+from .search import interpret_api_availability
+
+# Order file columns; only ``domain`` is required (headers may use - or _)
+ORDER_COLUMNS = ('domain', 'period', 'owner_c', 'admin_c', 'nsset', 'keyset', 'auth_info')
+
+CREATE_HEADERS = ['domain', 'result', 'detail']
+
+# Results that mean the order was (or may have been) submitted and must not be sent again
+SUBMITTED_RESULTS = ('created', 'pending', 'unknown')
+
+
+def _column(header: str) -> str:
+    return header.strip().lower().replace('-', '_')
+
+
+def _parse_period(value: str, default: int) -> Optional[int]:
+    if not value:
+        return default
+    try:
+        period = int(value)
+    except ValueError:
+        return None
+    return period if 1 <= period <= MAX_REGISTRATION_PERIOD else None
+
+
+def load_orders(path: str, default_period: int = 1) -> List[Dict[str, Any]]:
+    """
+    Read and validate a registration order file.
+
+    Blank rows and rows whose domain starts with ``#`` are ignored. All
+    problems are collected and reported together, so a file is either
+    accepted completely or rejected before anything is registered.
+
+    Args:
+        path: CSV file with a header row (see ORDER_COLUMNS)
+        default_period: Period used when a row leaves it empty
+
+    Returns:
+        Orders with ``domain`` (lower-case), ``period`` (int) and the
+        optional handles that are set
+
+    Raises:
+        WAPIValidationError: The file cannot be read or has invalid rows
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            rows = list(reader)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"Error: Cannot read order file {path} - {e}", file=sys.stderr)
+        raise WAPIValidationError(f"Cannot read order file {path}: {e}") from e
+
+    columns = [_column(h) for h in header or []]
+    unknown = [c for c in columns if c not in ORDER_COLUMNS]
+    if 'domain' not in columns or unknown:
+        detail = f"unknown column(s) {', '.join(unknown)}" if unknown else "missing 'domain' column"
+        print(f"Error: Invalid order file {path} - {detail}", file=sys.stderr)
+        raise WAPIValidationError(f"Invalid order file {path}: {detail}")
+
+    orders: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    seen = set()
+    for line, values in enumerate(rows, start=2):
+        row = {column: value.strip() for column, value in zip(columns, values)}
+        domain = row.get('domain', '').rstrip('.').lower()
+        if not domain or domain.startswith('#'):
+            continue
+        is_valid, error = validate_domain(domain)
+        if not is_valid:
+            errors.append(f"line {line}: invalid domain name {domain} - {error}")
+            continue
+        if domain in seen:
+            errors.append(f"line {line}: duplicate order for {domain}")
+            continue
+        seen.add(domain)
+        period = _parse_period(row.get('period', ''), default_period)
+        if period is None:
+            errors.append(f"line {line}: invalid period '{row['period']}' for {domain} "
+                          f"(1-{MAX_REGISTRATION_PERIOD} years)")
+            continue
+        order = {'domain': domain, 'period': period}
+        order.update({column: row[column] for column in ORDER_COLUMNS[2:] if row.get(column)})
+        orders.append(order)
+
+    if errors:
+        for error in errors:
+            print(f"Error: {path} {error}", file=sys.stderr)
+        raise WAPIValidationError(f"{len(errors)} invalid row(s) in order file {path}")
+    return orders
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Last recorded outcome per domain from a results file.
+
+    A missing file means a fresh run; unreadable lines (such as a line cut
+    short by an interrupted write) are ignored.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return results
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get('domain'):
+                    results[str(record['domain']).lower()] = record
+    except OSError as e:
+        print(f"Error: Cannot read results file {path} - {e}", file=sys.stderr)
+        raise WAPIValidationError(f"Cannot read results file {path}: {e}") from e
+    return results
+
+
+class ResultsLog:
+    """Append-only JSON-lines log of order outcomes, shared by worker threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, row: Dict[str, Any]):
+        """Append one outcome and flush it to disk"""
+        line = json.dumps(row, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def _outcome_unknown(error: Exception) -> bool:
+    """Whether a failed create may still have been applied (the journal's UNKNOWN)"""
+    if isinstance(error, (WAPIThrottledError, WAPIRejectedError, WAPICircuitOpenError)):
+        return False
+    return isinstance(error, (WAPITimeoutError, WAPIConnectionError, WAPIRequestError))
+
+
+def _create_row(domain: str, result: Optional[Dict[str, Any]],
+                error: Optional[Exception]) -> Dict[str, Any]:
+    if error is not None:
+        outcome = 'unknown' if _outcome_unknown(error) else 'failed'
+        return {'domain': domain, 'result': outcome, 'detail': str(error)}
+    response = (result or {}).get('response', {})
+    code = response.get('code')
+    if code == '1000' or code == 1000:
+        return {'domain': domain, 'result': 'created', 'detail': response.get('result', '')}
+    if code == '1001' or code == 1001:
+        return {'domain': domain, 'result': 'pending', 'detail': response.get('result', '')}
+    return {'domain': domain, 'result': 'failed',
+            'detail': f"{response.get('result', 'Unknown error')} (code: {code})"}
+
+
+def cmd_domain_create_bulk(args, client: WedosAPIClient) -> int:
+    """Handle domain create --from-file command"""
+    logger = get_logger('commands.registration')
+
+    order_file = args.from_file
+    orders = load_orders(order_file, default_period=getattr(args, 'period', None) or 1)
+    if not orders:
+        print("Nothing to register", file=sys.stderr)
+        return EXIT_SUCCESS
+
+    results_file = getattr(args, 'results', None)
+    if not isinstance(results_file, str):
+        results_file = f"{order_file}.results.jsonl"
+    previous = load_results(results_file)
+    wait = getattr(args, 'wait', False) is True
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    todo = []
+    for order in orders:
+        record = previous.get(order['domain'])
+        if record is not None and record.get('result') in SUBMITTED_RESULTS:
+            rows[order['domain']] = {'domain': order['domain'], 'result': record['result'],
+                                     'detail': record.get('detail', '')}
+        else:
+            todo.append(order)
+    if len(todo) < len(orders):
+        print(f"Skipping {len(orders) - len(todo)} order(s) already submitted (see {results_file})",
+              file=sys.stderr)
+
+    if todo and getattr(args, 'force', False) is not True:
+        print(f"⚠️  WARNING: This will register {len(todo)} domain(s) (paid operation)",
+              file=sys.stderr)
+        print("Use --force to proceed.", file=sys.stderr)
+        raise WAPIValidationError("Bulk registration requires --force flag for confirmation")
+
+    results = ResultsLog(results_file)
+    rate = getattr(args, 'rate', None)
+    limiter = RateLimiter(DEFAULT_CREATE_RATE if rate is None else rate)
+    workers = getattr(args, 'workers', None) or DEFAULT_CREATE_WORKERS
+
+    unknown = [domain for domain, row in rows.items() if row['result'] == 'unknown']
+    if unknown:
+        # Settle earlier creates that failed in transit before anything is ordered
+        logger.info(f"Looking up {len(unknown)} order(s) with an unknown outcome")
+
+        def _info(domain):
+            return client.call("domain-info", {"name": domain})
+
+        lookups = run_concurrently(unknown, _info, workers=workers, rate_limiter=limiter)
+        for domain, info, error in lookups:
+            response = (info or {}).get('response', {})
+            if error is None and str(response.get('code')) == '1000':
+                status = response.get('data', {}).get('domain', {}).get('status', '')
+                rows[domain] = {'domain': domain, 'result': 'created', 'detail': status}
+                results.write(rows[domain])
+
+    if todo:
+        logger.info(f"Checking availability of {len(todo)} domain(s)")
+        availability = client.domains_availability([order['domain'] for order in todo])
+        available = []
+        for order in todo:
+            domain = order['domain']
+            api_result = availability.get(domain)
+            if api_result is not None and interpret_api_availability(api_result, domain) is False:
+                rows[domain] = {'domain': domain, 'result': 'unavailable',
+                                'detail': 'Domain is registered'}
+                results.write(rows[domain])
+            else:
+                available.append(order)
+
+        def _create(order):
+            try:
+                result = client.domain_create(
+                    order['domain'],
+                    period=order['period'],
+                    owner_c=order.get('owner_c'),
+                    admin_c=order.get('admin_c'),
+                    nsset=order.get('nsset'),
+                    keyset=order.get('keyset'),
+                    auth_info=order.get('auth_info'),
+                )
+                row = _create_row(order['domain'], result, None)
+            except Exception as e:
+                logger.error(f"Registration failed for {order['domain']}: {e}")
+                row = _create_row(order['domain'], None, e)
+            results.write(row)
+            return row
+
+        logger.info(f"Registering {len(available)} domain(s) with {workers} worker(s)")
+        created = run_concurrently(available, _create, workers=workers, rate_limiter=limiter)
+        for order, row, _ in created:
+            rows[order['domain']] = row
+
+    pending = {domain: ("domain-info", {"name": domain}, None)
+               for domain, row in rows.items() if row['result'] == 'pending'}
+    if pending and wait:
+        print(f"Waiting for {len(pending)} asynchronous registration(s)...", file=sys.stderr)
+        final = poll_many(
+            client, pending,
+            max_attempts=DEFAULT_MAX_POLL_ATTEMPTS,
+            interval=DEFAULT_POLL_INTERVAL,
+            workers=workers,
+            rate_limiter=limiter,
+            verbose=getattr(args, 'quiet', False) is not True,
+        )
+        for domain, result in final.items():
+            response = result.get('response', {})
+            code = response.get('code')
+            if code == '1000' or code == 1000:
+                status = response.get('data', {}).get('domain', {}).get('status', '')
+                rows[domain] = {'domain': domain, 'result': 'created', 'detail': status}
+                results.write(rows[domain])
+            elif str(code) == '9998':
+                # Still pending: a rerun waits for it again instead of re-registering
+                rows[domain]['result'] = 'timeout'
+                rows[domain]['detail'] = response.get('result', '')
+            else:
+                detail = f"{response.get('result', 'Unknown error')} (code: {code})"
+                rows[domain] = {'domain': domain, 'result': 'failed', 'detail': detail}
+                results.write(rows[domain])
+
+    ordered = [rows[order['domain']] for order in orders]
+    print_output(ordered, args.format, headers=CREATE_HEADERS)
+
+    failed = [r for r in ordered if r['result'] in ('failed', 'unavailable')]
+    unknown = [r for r in ordered if r['result'] == 'unknown']
+    timed_out = [r for r in ordered if r['result'] == 'timeout']
+    ok = len(ordered) - len(failed) - len(unknown) - len(timed_out)
+    logger.info(f"Registration finished: {ok} ok, {len(failed)} failed, "
+                f"{len(unknown)} unknown, {len(timed_out)} timed out")
+    if unknown:
+        print(f"{len(unknown)} order(s) have an unknown outcome and are not sent again; "
+              "a rerun looks them up with domain-info. To order one anyway, remove its lines "
+              f"from {results_file}", file=sys.stderr)
+    if failed:
+        raise WAPIRequestError(
+            f"{len(failed)} of {len(ordered)} registration(s) failed or unavailable")
+    if unknown:
+        raise WAPIRequestError(f"{len(unknown)} registration(s) have an unknown outcome")
+    if timed_out:
+        raise WAPITimeoutError(f"Polling timeout for {len(timed_out)} registration(s)")
+    return EXIT_SUCCESS
@@ -0,0 +1,305 @@
+"""
+Expiration and renewal planning commands for WAPI CLI
+
+Handles ``domain expiring``, ``domain renew-plan`` and ``domain renew-apply``.
+"""
+
+import json
+import sys
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from ..api.client import WedosAPIClient
+from ..constants import (
+    EXIT_SUCCESS,
+    DEFAULT_MAX_POLL_ATTEMPTS,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_RENEW_RATE,
+    DEFAULT_RENEW_WORKERS,
+)
+from ..exceptions import WAPIRequestError, WAPITimeoutError, WAPIValidationError
+from ..utils.batch import RateLimiter, poll_many, run_concurrently
+from ..utils.formatters import print_output
+from ..utils.logger import get_logger
+from ..utils.validators import validate_duration_days
+from .helpers import open_index, use_index
+
+# (upper bound in days, bucket label); domains beyond the last bound are "later"
+EXPIRATION_BUCKETS = (
+    (-1, 'expired'),
+    (7, '7d'),
+    (30, '30d'),
+    (60, '60d'),
+    (90, '90d'),
+    (365, '1y'),
+)
+
+PLAN_HEADERS = ['name', 'expiration', 'days_left', 'bucket', 'period']
+
+
+def days_until(expiration: Any, today: Optional[date] = None) -> Optional[int]:
+    """
+    Days from today until an expiration date (negative when already expired).
+
+    Args:
+        expiration: Date string starting with YYYY-MM-DD
+        today: Reference date (default: today)
+
+    Returns:
+        Number of days, or None if the date cannot be parsed
+    """
+    try:
+        expires = datetime.strptime(str(expiration)[:10], '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    return (expires - (today or date.today())).days
+
+
+def expiration_bucket(days_left: Optional[int]) -> str:
+    """Return the bucket label for a number of days until expiration"""
+    if days_left is None:
+        return 'unknown'
+    for bound, label in EXPIRATION_BUCKETS:
+        if days_left <= bound:
+            return label
+    return 'later'
+
+
+def build_expiration_report(domains: List[Dict[str, Any]], within_days: int,
+                            today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Select domains expiring within a window, soonest first.
+
+    Args:
+        domains: List-level domain records (name, status, expiration)
+        within_days: Window size in days (expired domains are included)
+        today: Reference date (default: today)
+
+    Returns:
+        Rows with name, status, expiration, days_left and bucket
+    """
+    rows = []
+    for domain in domains:
+        days_left = days_until(domain.get('expiration'), today)
+        if days_left is None or days_left > within_days:
+            continue
+        rows.append({
+            'name': domain.get('name', ''),
+            'status': domain.get('status', ''),
+            'expiration': str(domain.get('expiration', ''))[:10],
+            'days_left': days_left,
+            'bucket': expiration_bucket(days_left),
+        })
+    rows.sort(key=lambda row: (row['days_left'], row['name']))
+    return rows
+
+
+def build_renew_plan(domains: List[Dict[str, Any]], within_days: int, period: int = 1,
+                     today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Compute the renewal set for a window.
+
+    Args:
+        domains: List-level domain records
+        within_days: Renew domains expiring within this many days
+        period: Renewal period in years
+        today: Reference date (default: today)
+
+    Returns:
+        Plan dictionary (serializable to JSON for ``renew-apply --plan``)
+    """
+    report = build_expiration_report(domains, within_days, today)
+    return {
+        'generated': (today or date.today()).isoformat(),
+        'within_days': within_days,
+        'period': period,
+        'domains': [dict(row, period=period) for row in report],
+    }
+
+
+def _parse_within(args) -> int:
+    within = getattr(args, 'within', None) or '60d'
+    is_valid, days, error = validate_duration_days(within)
+    if not is_valid:
+        print(f"Error: Invalid --within value - {error}", file=sys.stderr)
+        raise WAPIValidationError(f"Invalid --within value: {error}")
+    return days
+
+
+def _load_domains(args, client: Optional[WedosAPIClient]) -> List[Dict[str, Any]]:
+    """Load list-level domain records from the local index or one domains-list call"""
+    tld = getattr(args, 'tld', None)
+    if use_index(args):
+        with open_index() as index:
+            return list(index.iter_domains(tld=tld))
+
+    result = client.call("domains-list", {})
+    response = result.get('response', {})
+    code = response.get('code')
+    if not (code == '1000' or code == 1000):
+        error_msg = response.get('result', 'Unknown error')
+        print(f"Error ({code}): {error_msg}", file=sys.stderr)
+        raise WAPIRequestError(f"Failed to list domains: {error_msg} (code: {code})")
+    domains = response.get('data', {}).get('domain', [])
+    if not isinstance(domains, list):
+        domains = [domains]
+    domains = [d for d in domains if isinstance(d, dict)]
+    if tld:
+        suffix = f".{tld.lower().lstrip('.')}"
+        domains = [d for d in domains if str(d.get('name', '')).lower().endswith(suffix)]
+    return domains
+
+
+def _print_bucket_summary(rows: List[Dict[str, Any]]):
+    counts: Dict[str, int] = {}
+    for row in rows:
+        counts[row['bucket']] = counts.get(row['bucket'], 0) + 1
+    order = [label for _, label in EXPIRATION_BUCKETS] + ['later']
+    summary = ', '.join(f"{label}: {counts[label]}" for label in order if label in counts)
+    print(f"{len(rows)} domain(s) - {summary or 'none'}", file=sys.stderr)
+
+
+def cmd_domain_expiring(args, client: WedosAPIClient) -> int:
+    """Handle domain expiring command"""
+    logger = get_logger('commands.renewal')
+    within_days = _parse_within(args)
+    rows = build_expiration_report(_load_domains(args, client), within_days)
+    logger.info(f"{len(rows)} domain(s) expiring within {within_days} days")
+    print_output(rows, args.format, headers=['name', 'status', 'expiration', 'days_left', 'bucket'])
+    if getattr(args, 'quiet', False) is not True:
+        _print_bucket_summary(rows)
+    return EXIT_SUCCESS
+
+
+def cmd_domain_renew_plan(args, client: WedosAPIClient) -> int:
+    """Handle domain renew-plan command"""
+    logger = get_logger('commands.renewal')
+    within_days = _parse_within(args)
+    period = getattr(args, 'period', None) or 1
+    plan = build_renew_plan(_load_domains(args, client), within_days, period=period)
+    logger.info(f"Renewal plan: {len(plan['domains'])} domain(s) within {within_days} days")
+
+    output = getattr(args, 'output', None)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, indent=2)
+        print(f"Plan written to {output}", file=sys.stderr)
+
+    print_output(plan['domains'], args.format, headers=PLAN_HEADERS)
+    if getattr(args, 'quiet', False) is not True:
+        _print_bucket_summary(plan['domains'])
+    return EXIT_SUCCESS
+
+
+def _load_plan(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot read renewal plan {path} - {e}", file=sys.stderr)
+        raise WAPIValidationError(f"Cannot read renewal plan {path}: {e}") from e
+    if not isinstance(plan, dict) or not isinstance(plan.get('domains'), list):
+        raise WAPIValidationError(f"Invalid renewal plan {path}: missing 'domains' list")
+    return plan
+
+
+def _renewed_check(original_expiration: str):
+    """Completion check: domain-info succeeds and the expiration date moved"""
+    def is_complete(result: Dict[str, Any]) -> bool:
+        response = result.get('response', {})
+        if response.get('code') not in ['1000', 1000]:
+            return False
+        expiration = response.get('data', {}).get('domain', {}).get('expiration')
+        if not original_expiration or not expiration:
+            return True
+        return str(expiration)[:10] != str(original_expiration)[:10]
+    return is_complete
+
+
+def cmd_domain_renew_apply(args, client: WedosAPIClient) -> int:
+    """Handle domain renew-apply command"""
+    logger = get_logger('commands.renewal')
+
+    plan_file = getattr(args, 'plan', None)
+    if plan_file:
+        plan = _load_plan(plan_file)
+    else:
+        plan = build_renew_plan(_load_domains(args, client), _parse_within(args),
+                                period=getattr(args, 'period', None) or 1)
+    entries = [e for e in plan['domains'] if isinstance(e, dict) and e.get('name')]
+    if not entries:
+        print("Nothing to renew", file=sys.stderr)
+        return EXIT_SUCCESS
+
+    if getattr(args, 'force', False) is not True:
+        print(f"⚠️  WARNING: This will renew {len(entries)} domain(s) (paid operation)",
+              file=sys.stderr)
+        print("Review with 'wapi domain renew-plan' and use --force to proceed.", file=sys.stderr)
+        raise WAPIValidationError("Bulk renewal requires --force flag for confirmation")
+
+    rate = getattr(args, 'rate', None)
+    limiter = RateLimiter(DEFAULT_RENEW_RATE if rate is None else rate)
+    workers = getattr(args, 'workers', None) or DEFAULT_RENEW_WORKERS
+    default_period = plan.get('period', 1)
+
+    def _renew(entry):
+        return client.domain_renew(entry['name'], period=entry.get('period') or default_period,
+                                   expiration=entry.get('expiration') or None)
+
+    logger.info(f"Renewing {len(entries)} domain(s) with {workers} worker(s)")
+    outcomes = run_concurrently(entries, _renew, workers=workers, rate_limiter=limiter)
+
+    rows = []
+    pending = {}
+    for entry, result, error in outcomes:
+        name = entry['name']
+        response = (result or {}).get('response', {})
+        code = response.get('code')
+        if error is not None:
+            rows.append({'name': name, 'result': 'failed', 'detail': str(error)})
+        elif code == '1000' or code == 1000:
+            rows.append({'name': name, 'result': 'renewed', 'detail': response.get('result', '')})
+        elif code == '1001' or code == 1001:
+            rows.append({'name': name, 'result': 'pending', 'detail': response.get('result', '')})
+            check = _renewed_check(entry.get('expiration', ''))
+            pending[name] = ("domain-info", {"name": name}, check)
+        else:
+            rows.append({'name': name, 'result': 'failed',
+                         'detail': f"{response.get('result', 'Unknown error')} (code: {code})"})
+
+    if pending and getattr(args, 'wait', False) is True:
+        print(f"Waiting for {len(pending)} asynchronous renewal(s)...", file=sys.stderr)
+        final = poll_many(
+            client, pending,
+            max_attempts=DEFAULT_MAX_POLL_ATTEMPTS,
+            interval=DEFAULT_POLL_INTERVAL,
+            workers=workers,
+            rate_limiter=limiter,
+            verbose=getattr(args, 'quiet', False) is not True,
+        )
+        for row in rows:
+            if row['name'] not in final:
+                continue
+            response = final[row['name']].get('response', {})
+            code = response.get('code')
+            if code == '1000' or code == 1000:
+                row['result'] = 'renewed'
+                row['detail'] = response.get('data', {}).get('domain', {}).get('expiration', '')
+            elif str(code) == '9998':
+                row['result'] = 'timeout'
+                row['detail'] = response.get('result', '')
+            else:
+                row['result'] = 'failed'
+                row['detail'] = f"{response.get('result', 'Unknown error')} (code: {code})"
+
+    print_output(rows, args.format, headers=['name', 'result', 'detail'])
+
+    failed = [r for r in rows if r['result'] == 'failed']
+    timed_out = [r for r in rows if r['result'] == 'timeout']
+    logger.info(f"Renewal finished: {len(rows) - len(failed) - len(timed_out)} ok, "
+                f"{len(failed)} failed, {len(timed_out)} timed out")
+    if failed:
+        raise WAPIRequestError(f"{len(failed)} of {len(rows)} renewal(s) failed")
+    if timed_out:
+        raise WAPITimeoutError(f"Polling timeout for {len(timed_out)} renewal(s)")
+    return EXIT_SUCCESS
@@ -1,22 +1,52 @@
 """
 Domain availability search and WHOIS lookup command.
 
-Provides a single `wapi search <domain>` entry point that:
-1) Tries to check availability via WAPI (`domains-availability`).
-2) If registered or undetermined, fetches WHOIS data.
+Provides a `wapi search <domain>` entry point (or `--file` for many names,
+checked with batched `domains-availability` calls; `wapi search variants
+<name>` for look-alikes of a brand) that:
+1) Optionally (`--dns-prefilter`) reports names delegated in their parent
+   zone as registered without asking WAPI or WHOIS.
+2) Tries to check availability via WAPI (`domains-availability`).
+3) If registered or undetermined, fetches registration data over RDAP
+   (pooled HTTPS), falling back to port-43 WHOIS.
 """
 
 import socket
+import sqlite3
 import sys
-from typing import Any, Dict, Iterable, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from ..api.capabilities import FormatCapabilities
 from ..api.client import WedosAPIClient
-from ..constants import EXIT_SUCCESS
+from ..constants import (
+    API_UNKNOWN_COMMAND,
+    DEFAULT_DNS_QUERY_TIMEOUT,
+    DEFAULT_PREFILTER_WORKERS,
+    DEFAULT_SEARCH_WORKERS,
+    EXIT_SUCCESS,
+    MAX_AVAILABILITY_NAMES,
+)
 from ..exceptions import WAPIRequestError, WAPIValidationError
-from ..utils.formatters import format_output
+from ..utils.availability_cache import AvailabilityCache
+from ..utils.batch import read_domains_from_file, run_concurrently
+from ..utils.dns_check import prefilter_delegations
+from ..utils.formatters import format_output, print_output
 from ..utils.logger import get_logger
-from ..utils.validators import validate_domain
-from ..config import get_config
+from ..utils.rdap import RDAPBootstrap, RDAPClient
+from ..utils.tracing import start_span
+from ..utils.validators import validate_age_seconds, validate_domain
+from ..utils.variants import generate_variants, split_brand
+from ..utils.whois import WHOIS_FIELDS, parse_whois
+from ..config import (
+    get_availability_cache_path,
+    get_capabilities_path,
+    get_config,
+    get_rdap_bootstrap_path,
+)
+from .helpers import CountingIterator
 
 # Common WHOIS servers by TLD for faster lookups
 DEFAULT_WHOIS_SERVERS = {
@@ -29,31 +59,14 @@ DEFAULT_WHOIS_SERVERS = {
     "info": "whois.afilias.net",
 }
 
-# Phrases indicating availability in WHOIS responses (case-insensitive)
-AVAILABLE_PATTERNS = (
-    "no match",
-    "not found",
-    "no entries found",
-    "available",
-    "status: free",
-    "status: available",
-    "status: unassigned",
-)
+# Columns of `wapi search --file` output
+SEARCH_HEADERS = ["domain", "available", "source", "registrar", "expires", "nameservers", "error"]
+VARIANT_HEADERS = ["domain", "kind", "source", "registrar", "registered", "expires", "nameservers",
+                   "status", "error"]
 
-# Phrases indicating the domain is registered
-REGISTERED_PATTERNS = (
-    "domain name:",
-    "domain:",  # CZ.NIC format
-    "registrar:",
-    "creation date",
-    "registered:",  # CZ.NIC format
-    "expire:",  # CZ.NIC format
-    "expiry date",
-    "status:",
-    "name server",
-    "nsset:",  # CZ.NIC format
-    "admin-c:",  # CZ.NIC format
-)
+# One RDAP client per process so its keep-alive connections are reused
+_rdap_client: Optional[RDAPClient] = None
+_rdap_lock = threading.Lock()
 
 
 def interpret_status_value(value: Any) -> Optional[bool]:
@@ -157,11 +170,42 @@ def get_client(config_file: Optional[str] = None) -> Optional[WedosAPIClient]:
     if not (username and password):
         return None
     try:
-        return WedosAPIClient(username, password, use_json=False)
+        return WedosAPIClient(username, password, use_json=False,
+                              capabilities=FormatCapabilities(get_capabilities_path()))
     except Exception:
         return None
 
 
+def get_rdap_client() -> Optional[RDAPClient]:
+    """
+    Shared RDAP client (bootstrap registry cached in the cache directory).
+
+    Tests patch ``wapi.commands.search.get_rdap_client`` to control RDAP.
+    """
+    global _rdap_client
+    with _rdap_lock:
+        if _rdap_client is None:
+            _rdap_client = RDAPClient(RDAPBootstrap(get_rdap_bootstrap_path()))
+        return _rdap_client
+
+
+def perform_rdap_lookup(domain: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Look up a domain over RDAP.
+
+    Returns:
+        Structured fields (see ``wapi.utils.rdap.parse_rdap``), or None when
+        RDAP is unavailable for the domain's TLD
+
+    Raises:
+        WAPIRequestError: The RDAP server could not be queried
+    """
+    client = get_rdap_client()
+    if client is None:
+        return None
+    return client.lookup(domain, timeout=timeout)
+
+
 def _discover_whois_server(domain: str, timeout: int) -> Optional[str]:
     """
     Ask IANA for the authoritative WHOIS server for the domain's TLD.
@@ -197,35 +241,37 @@ def _query_whois(server: str, domain: str, timeout: int) -> str:
     Returns:
         WHOIS response text
     """
-    # Set socket timeout explicitly to prevent hangs
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(timeout)
-    
-    try:
-        sock.connect((server, 43))
-        sock.sendall(f"{domain}\r\n".encode("utf-8"))
-        
-        chunks = []
-        max_size = 1024 * 1024  # 1MB limit to prevent memory issues
-        total_size = 0
+    with start_span("whois.query", {"whois.server": server, "whois.query": domain}) as span:
+        # Set socket timeout explicitly to prevent hangs
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
         
-        while True:
-            try:
-                data = sock.recv(4096)
-                if not data:
-                    break
-                chunks.append(data)
-                total_size += len(data)
-                if total_size > max_size:
-                    # Truncate if response is too large
+        try:
+            sock.connect((server, 43))
+            sock.sendall(f"{domain}\r\n".encode("utf-8"))
+            
+            chunks = []
+            max_size = 1024 * 1024  # 1MB limit to prevent memory issues
+            total_size = 0
+            
+            while True:
+                try:
+                    data = sock.recv(4096)
+                    if not data:
+                        break
+                    chunks.append(data)
+                    total_size += len(data)
+                    if total_size > max_size:
+                        # Truncate if response is too large
+                        break
+                except socket.timeout:
+                    # Timeout during read - return what we have
                     break
-            except socket.timeout:
-                # Timeout during read - return what we have
-                break
-    finally:
-        sock.close()
-    
-    return b"".join(chunks).decode("utf-8", errors="replace")
+        finally:
+            sock.close()
+        
+        span.set_attribute("whois.response.bytes", total_size)
+        return b"".join(chunks).decode("utf-8", errors="replace")
 
 
 def perform_whois_lookup(domain: str, server: Optional[str] = None, timeout: int = 10) -> str:
@@ -233,7 +279,7 @@ def perform_whois_lookup(domain: str, server: Optional[str] = None, timeout: int
     Perform a WHOIS lookup with sensible fallbacks.
     """
     logger = get_logger("commands.search")
-    target_server = server or DEFAULT_WHOIS_SERVERS.get(domain.rsplit(".", 1)[-1].lower())
+    target_server = whois_server_for(domain, server)
     if not target_server:
         target_server = _discover_whois_server(domain, timeout) or "whois.iana.org"
 
@@ -244,118 +290,516 @@ def perform_whois_lookup(domain: str, server: Optional[str] = None, timeout: int
         raise WAPIRequestError(f"WHOIS lookup failed: {exc}") from exc
 
 
-def infer_availability_from_whois(whois_text: str) -> Optional[bool]:
+def whois_server_for(domain: str, server: Optional[str] = None) -> Optional[str]:
+    """WHOIS server that will answer for a domain, if known without discovery"""
+    return server or DEFAULT_WHOIS_SERVERS.get(domain.rsplit(".", 1)[-1].lower())
+
+
+def infer_availability_from_whois(whois_text: str, server: Optional[str] = None) -> Optional[bool]:
     """
     Infer availability based on WHOIS response content.
-    
-    Checks registered patterns first (higher priority), then available patterns.
+
+    Args:
+        whois_text: WHOIS response
+        server: Server that answered (selects the registry grammar, see ``wapi.utils.whois``)
     """
-    if not whois_text:
-        return None
+    return parse_whois(whois_text, server)["available"]
 
-    text = whois_text.lower()
-    # Check registered patterns first (higher priority)
-    if any(pattern.lower() in text for pattern in REGISTERED_PATTERNS):
-        return False
-    # Then check available patterns
-    if any(pattern.lower() in text for pattern in AVAILABLE_PATTERNS):
-        return True
-    return None
 
+def split_by_delegation(domains: List[str], workers: int = DEFAULT_PREFILTER_WORKERS,
+                        timeout: float = DEFAULT_DNS_QUERY_TIMEOUT
+                        ) -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    DNS pre-filter for availability checks.
 
-def cmd_search(args, client: Optional[WedosAPIClient] = None) -> int:
+    Returns:
+        (delegated, remainder): nameservers of each name delegated in its
+        parent zone (registered), and the names still to be checked with
+        WAPI/WHOIS, in input order
     """
-    Handle `wapi search` command.
+    delegated: Dict[str, List[str]] = {}
+    remainder: List[str] = []
+    for domain, nameservers in prefilter_delegations(domains, workers=workers, timeout=timeout):
+        if nameservers:
+            delegated[domain] = nameservers
+        else:
+            remainder.append(domain)
+    return delegated, remainder
+
+
+def fetch_registration(domain: str, args) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+    """
+    Registration data of a domain: RDAP first, port-43 WHOIS as fallback.
+
+    An explicit ``args.whois_server`` (or ``args.no_rdap``) skips RDAP,
+    since the user asked for that server's answer.
+
+    Returns:
+        (record, whois_text, error): parsed fields (see ``parse_whois``;
+        ``grammar`` is ``rdap`` for RDAP answers), the raw WHOIS text if
+        WHOIS answered, and the error message if no lookup succeeded
     """
     logger = get_logger("commands.search")
-    # Use debug to avoid noisy stdout for normal users; visible with --verbose.
-    logger.debug(f"Searching domain availability for: {args.domain}")
+    whois_server = getattr(args, "whois_server", None)
+    if not whois_server and getattr(args, "no_rdap", False) is not True:
+        try:
+            rdap_record = perform_rdap_lookup(domain, timeout=getattr(args, "whois_timeout", 10))
+        except Exception as exc:
+            rdap_record = None
+            logger.info(f"RDAP lookup failed for {domain}, falling back to WHOIS: {exc}")
+        if rdap_record is not None:
+            return rdap_record, None, None
 
-    is_valid, error = validate_domain(args.domain)
-    if not is_valid:
-        logger.warning(f"Invalid domain name: {args.domain} - {error}")
-        print(f"Error: Invalid domain name - {error}", file=sys.stderr)
-        raise WAPIValidationError(f"Invalid domain name: {error}")
+    try:
+        whois_text = perform_whois_lookup(domain, server=whois_server,
+                                          timeout=getattr(args, "whois_timeout", 10))
+    except Exception as exc:
+        logger.error(f"WHOIS lookup failed for {domain}: {exc}")
+        return {}, None, str(exc)
+    return parse_whois(whois_text, whois_server_for(domain, whois_server)), whois_text, None
+
+
+def registration_result(domain: str, available: bool, source: str, record: Dict[str, Any],
+                        whois_text: Optional[str] = None,
+                        whois_error: Optional[str] = None) -> Dict[str, Any]:
+    """Search result for a domain; registration fields are only included for registered domains"""
+    result: Dict[str, Any] = {"domain": domain, "available": available, "source": source}
+    if record and not available:
+        result.update((field, record[field]) for field in WHOIS_FIELDS
+                      if field in record and field != "domain")
+        if whois_text:
+            result["whois"] = whois_text.strip()
+    if whois_error:
+        result["whois_error"] = whois_error
+    return result
 
+
+def lookup_availability(domain: str, args, client: Optional[WedosAPIClient] = None,
+                        api_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Determine whether a domain is available and fetch its registration data.
+
+    Args:
+        domain: Validated domain name
+        args: Search options (``whois_server``, ``whois_timeout``, ``no_rdap``)
+        client: WAPI client (created from the configuration if None)
+        api_result: domains-availability response already fetched for this
+            domain (e.g. by a batched call); the client is asked otherwise
+
+    Returns:
+        Result with ``domain``, ``available``, ``source`` and, for registered
+        domains, the WHOIS/RDAP fields
+
+    Raises:
+        WAPIRequestError: If availability could not be determined
+    """
+    logger = get_logger("commands.search")
     availability: Optional[bool] = None
     availability_source = None
-    whois_text: Optional[str] = None
-    whois_error: Optional[str] = None
 
-    if client is None:
+    if client is None and api_result is None:
         client = get_client(getattr(args, "config", None))
 
     # First attempt: WAPI availability endpoint
-    if client:
+    if client or api_result is not None:
         try:
-            api_result = client.domain_availability(args.domain)
-            availability = interpret_api_availability(api_result, args.domain)
+            if api_result is None:
+                api_result = client.domain_availability(domain)
+            availability = interpret_api_availability(api_result, domain)
             if availability is not None:
                 availability_source = "wapi"
             else:
-                # If the XML endpoint is not available (e.g., code 2010 Unknown command),
-                # retry once using the JSON endpoint which some deployments enable instead.
+                # The client already tried the other endpoint format when one
+                # answered 2010 (unknown command) and remembers which one works.
+                # If neither knows the command, use the domain-info heuristic.
                 response = api_result.get("response", {}) if isinstance(api_result, dict) else {}
-                code = response.get("code")
-                if str(code) == "2010":
-                    logger.info("Retrying availability via JSON endpoint after 2010 Unknown command")
-                    try:
-                        json_client = WedosAPIClient(
-                            client.username, client.password, use_json=True
-                        )
-                        api_result_json = json_client.domain_availability(args.domain)
-                        availability = interpret_api_availability(api_result_json, args.domain)
-                        if availability is not None:
-                            availability_source = "wapi"
-                        else:
-                            # Fall back to domain-info heuristic: 1000 => registered, 2303 => available
-                            info_result = client.domain_info(args.domain)
-                            info_resp = info_result.get("response", {}) if isinstance(info_result, dict) else {}
-                            info_code = str(info_resp.get("code"))
-                            if info_code == "1000":
-                                availability = False
-                                availability_source = "wapi"
-                            elif info_code == "2303":  # object does not exist
-                                availability = True
-                                availability_source = "wapi"
-                    except Exception as json_exc:  # pragma: no cover - best-effort fallback
-                        logger.warning(f"JSON availability fallback failed: {json_exc}")
+                if str(response.get("code")) == API_UNKNOWN_COMMAND and client:
+                    info_result = client.domain_info(domain)
+                    info_resp = (info_result.get("response", {})
+                                 if isinstance(info_result, dict) else {})
+                    info_code = str(info_resp.get("code"))
+                    if info_code == "1000":
+                        availability = False
+                        availability_source = "wapi"
+                    elif info_code == "2303":  # object does not exist
+                        availability = True
+                        availability_source = "wapi"
         except Exception as exc:
             logger.warning(f"WAPI availability lookup failed: {exc}")
 
-    # WHOIS lookup if registered or undetermined
+    whois_record: Dict[str, Any] = {}
+    whois_text: Optional[str] = None
+    whois_error: Optional[str] = None
     if availability is False or availability is None:
-        try:
-            whois_text = perform_whois_lookup(
-                args.domain,
-                server=getattr(args, "whois_server", None),
-                timeout=getattr(args, "whois_timeout", 10),
-            )
-            inferred = infer_availability_from_whois(whois_text)
-            if availability is None and inferred is not None:
-                availability = inferred
-                availability_source = availability_source or "whois"
-        except Exception as exc:
-            whois_error = str(exc)
-            logger.error(f"WHOIS lookup failed for {args.domain}: {exc}")
+        whois_record, whois_text, whois_error = fetch_registration(domain, args)
+        if availability is None and whois_record.get("available") is not None:
+            availability = whois_record["available"]
+            availability_source = "rdap" if whois_record.get("grammar") == "rdap" else "whois"
 
     if availability is None:
-        logger.error("Could not determine domain availability")
-        print("Error: Could not determine domain availability (WAPI/WHOIS failed)", file=sys.stderr)
+        logger.error(f"Could not determine availability of {domain}")
         raise WAPIRequestError("Could not determine domain availability")
+    return registration_result(domain, availability, availability_source or "whois",
+                               whois_record, whois_text, whois_error)
+
+
+def _max_age(args) -> Optional[int]:
+    value = getattr(args, "max_age", None)
+    if not isinstance(value, (str, int)):
+        return None
+    is_valid, seconds, error = validate_age_seconds(value)
+    if not is_valid:
+        print(f"Error: Invalid --max-age - {error}", file=sys.stderr)
+        raise WAPIValidationError(f"Invalid --max-age: {error}")
+    return seconds
+
+
+def _dns_result(domain: str, nameservers: List[str]) -> Dict[str, Any]:
+    return {"domain": domain, "available": False, "source": "dns", "nameservers": nameservers}
+
+
+def _store(cache: AvailabilityCache, result: Dict[str, Any]):
+    if "whois_error" in result:
+        return
+    try:
+        cache.put(result)
+    except (sqlite3.Error, OSError) as exc:
+        get_logger("commands.search").debug(f"Cannot cache result for {result['domain']}: {exc}")
+
 
-    result_payload: Dict[str, Any] = {
-        "domain": args.domain,
-        "available": availability,
-        "source": availability_source or "whois",
+def _cached(cache: AvailabilityCache, domain: str, args,
+            max_age: Optional[int]) -> Optional[Dict[str, Any]]:
+    if getattr(args, "refresh", False) is True:
+        return None
+    try:
+        return cache.get(domain, max_age=max_age)
+    except (sqlite3.Error, OSError, ValueError) as exc:
+        get_logger("commands.search").debug(f"Availability cache unavailable: {exc}")
+        return None
+
+
+def _search_file_domains(args) -> List[str]:
+    names = [args.domain] if getattr(args, "domain", None) else []
+    try:
+        names.extend(read_domains_from_file(args.file))
+    except OSError as e:
+        print(f"Error: Cannot read domain list {args.file} - {e}", file=sys.stderr)
+        raise WAPIValidationError(f"Cannot read domain list {args.file}: {e}") from e
+    domains = []
+    seen = set()
+    for name in names:
+        name = name.strip().rstrip(".").lower()
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        is_valid, error = validate_domain(name)
+        if not is_valid:
+            print(f"Error: Invalid domain name {name} - {error}", file=sys.stderr)
+            raise WAPIValidationError(f"Invalid domain name {name}: {error}")
+        domains.append(name)
+    return domains
+
+
+def search_domains(domains: List[str], args, client: Optional[WedosAPIClient] = None,
+                   cache: Optional[AvailabilityCache] = None
+                   ) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """
+    Check many domains at once.
+
+    Cached results are used first, then (with ``args.dns_prefilter``)
+    delegated names are classified from DNS. The rest is checked with
+    batched domains-availability calls; registered and undetermined names
+    get their RDAP/WHOIS lookups concurrently.
+
+    Returns:
+        (domain, result, error) in input order
+    """
+    max_age = _max_age(args)
+    results: Dict[str, Dict[str, Any]] = {}
+    if cache is not None:
+        for domain in domains:
+            cached = _cached(cache, domain, args, max_age)
+            if cached is not None:
+                results[domain] = cached
+    todo = [domain for domain in domains if domain not in results]
+
+    fresh: Dict[str, Dict[str, Any]] = {}
+    if todo and getattr(args, "dns_prefilter", False) is True:
+        delegated, todo = split_by_delegation(todo)
+        fresh.update((domain, _dns_result(domain, nameservers))
+                     for domain, nameservers in delegated.items())
+
+    if client is None and todo:
+        client = get_client(getattr(args, "config", None))
+    api_results: Dict[str, Dict[str, Any]] = {}
+    if client and todo:
+        try:
+            api_results = client.domains_availability(todo)
+        except Exception as exc:
+            get_logger("commands.search").warning(f"Batched WAPI availability lookup failed: {exc}")
+
+    errors: Dict[str, Exception] = {}
+    workers = getattr(args, "workers", None)
+    if not isinstance(workers, int) or workers <= 0:
+        workers = DEFAULT_SEARCH_WORKERS
+    for domain, result, error in run_concurrently(
+            todo, lambda d: lookup_availability(d, args, client, api_result=api_results.get(d)),
+            workers=workers):
+        if error is None:
+            fresh[domain] = result
+        else:
+            errors[domain] = error
+
+    if cache is not None:
+        for result in fresh.values():
+            _store(cache, result)
+    results.update(fresh)
+    return [(domain, results.get(domain), errors.get(domain)) for domain in domains]
+
+
+def _search_row(domain: str, result: Optional[Dict[str, Any]],
+                error: Optional[Exception]) -> Dict[str, Any]:
+    result = result or {}
+    return {
+        "domain": domain,
+        "available": result.get("available", ""),
+        "source": result.get("source", ""),
+        "registrar": result.get("registrar", ""),
+        "expires": result.get("expires", ""),
+        "nameservers": " ".join(result.get("nameservers", [])),
+        "error": str(error) if error is not None else result.get("whois_error", ""),
     }
 
-    if whois_text and not availability:
-        # Only include WHOIS output when domain appears registered
-        result_payload["whois"] = whois_text.strip()
-    if whois_error:
-        result_payload["whois_error"] = whois_error
 
-    print(format_output(result_payload, args.format))
+def _cmd_search_file(args, client: Optional[WedosAPIClient]) -> int:
+    """Handle `wapi search --file`"""
+    logger = get_logger("commands.search")
+    domains = _search_file_domains(args)
+    logger.info(f"Searching availability of {len(domains)} domain(s)")
+    cache = AvailabilityCache(get_availability_cache_path())
+    try:
+        outcomes = search_domains(domains, args, client, cache)
+    finally:
+        cache.close()
+
+    rows = [_search_row(domain, result, error) for domain, result, error in outcomes]
+    print_output(rows, args.format, headers=SEARCH_HEADERS)
+
+    failed = [row for row in rows if row["available"] == ""]
+    if failed:
+        raise WAPIRequestError(
+            f"Could not determine availability of {len(failed)} of {len(rows)} domain(s)")
+    return EXIT_SUCCESS
+
+
+def scan_variants(variants: Iterable[Tuple[str, str]], args,
+                  client: Optional[WedosAPIClient] = None,
+                  cache: Optional[AvailabilityCache] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Find the registered names among look-alike candidates.
+
+    Candidates go through a pipeline where each stage only sees what the
+    previous one could not decide: cached results, the DNS delegation
+    pre-filter, batched domains-availability calls, and finally RDAP/WHOIS.
+    ``variants`` is consumed in chunks of one availability request, so a
+    generator is never listed in full. The RDAP/WHOIS lookups (registration
+    details of registered names, and availability of undetermined ones) run
+    concurrently with the following chunks, and results are yielded as they
+    complete.
+
+    Args:
+        variants: (domain, kind) pairs, e.g. from ``generate_variants``
+        args: Search options (``workers``, ``refresh``, ``max_age`` and the
+            RDAP/WHOIS options of ``fetch_registration``)
+        client: WAPI client (availability is left to RDAP/WHOIS if None)
+        cache: Availability result cache
+
+    Yields:
+        Results of registered variants (see ``registration_result``) with
+        ``kind``; undetermined variants are yielded with ``error``
+    """
+    logger = get_logger("commands.search")
+    max_age = _max_age(args)
+    kinds: Dict[str, str] = {}
+    registered: Dict[str, str] = {}
+    undetermined_count = 0
+
+    def _details(domain: str) -> Dict[str, Any]:
+        record, whois_text, whois_error = fetch_registration(domain, args)
+        return registration_result(domain, False, registered[domain], record,
+                                   whois_text, whois_error)
+
+    def _collect(future, domain: str) -> Iterator[Dict[str, Any]]:
+        try:
+            result = future.result()
+        except Exception as exc:
+            logger.warning(f"Could not check variant {domain}: {exc}")
+            yield {"domain": domain, "kind": kinds[domain], "error": str(exc)}
+            return
+        if cache is not None:
+            _store(cache, result)
+        if not result["available"]:
+            yield dict(result, kind=kinds[domain])
+
+    workers = getattr(args, "workers", None)
+    workers = workers if isinstance(workers, int) and workers > 0 else DEFAULT_SEARCH_WORKERS
+    candidates = iter(variants)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for chunk in iter(lambda: list(islice(candidates, MAX_AVAILABILITY_NAMES)), []):
+            pending = []
+            for domain, kind in chunk:
+                if domain in kinds:
+                    continue
+                kinds[domain] = kind
+                cached = _cached(cache, domain, args, max_age) if cache is not None else None
+                if cached is None:
+                    pending.append(domain)
+                elif not cached["available"]:
+                    yield dict(cached, kind=kind)
+
+            delegated, rest = split_by_delegation(pending) if pending else ({}, [])
+            registered.update((domain, "dns") for domain in delegated)
+            api_results: Dict[str, Dict[str, Any]] = {}
+            if client and rest:
+                try:
+                    api_results = client.domains_availability(rest)
+                except Exception as exc:
+                    logger.warning(f"Batched WAPI availability lookup failed: {exc}")
+            for domain in delegated:
+                futures[executor.submit(_details, domain)] = domain
+            for domain in rest:
+                api_result = api_results.get(domain)
+                available = None
+                if api_result is not None:
+                    available = interpret_api_availability(api_result, domain)
+                if available is False:
+                    registered[domain] = "wapi"
+                    futures[executor.submit(_details, domain)] = domain
+                elif available is None:
+                    undetermined_count += 1
+                    future = executor.submit(lookup_availability, domain, args, client, api_result)
+                    futures[future] = domain
+                elif cache is not None:
+                    _store(cache, registration_result(domain, True, "wapi", {}))
+
+            # Hand over what is already finished before the next chunk is checked
+            for future in [future for future in futures if future.done()]:
+                yield from _collect(future, futures.pop(future))
+
+        delegated_count = sum(1 for source in registered.values() if source == "dns")
+        logger.info(f"{len(kinds)} variant(s): {delegated_count} delegated in DNS, "
+                    f"{len(registered) - delegated_count} registered per WAPI, "
+                    f"{undetermined_count} undetermined")
+        for future in as_completed(futures):
+            yield from _collect(future, futures[future])
+
+
+def _variant_row(result: Dict[str, Any]) -> Dict[str, Any]:
+    row = {key: result.get(key, "") for key in VARIANT_HEADERS}
+    row["nameservers"] = " ".join(result.get("nameservers", []))
+    row["status"] = ", ".join(result.get("status", []))
+    row["error"] = result.get("error") or result.get("whois_error", "")
+    return row
+
+
+def cmd_search_variants(args, client: Optional[WedosAPIClient] = None) -> int:
+    """Handle `wapi search variants <name> --tld ...`"""
+    logger = get_logger("commands.search")
+    brand = getattr(args, "name", None)
+    if not brand:
+        print("Error: Give a brand name: wapi search variants <name> --tld ...", file=sys.stderr)
+        raise WAPIValidationError("No brand name given")
+    label, brand_tld = split_brand(brand)
+    tlds = [brand_tld] if brand_tld else []
+    tlds += [tld.lower().lstrip(".") for tld in getattr(args, "tld", None) or []
+             if tld.lower().lstrip(".") not in tlds]
+    if not tlds:
+        print("Error: Give the brand's TLD (acme.cz) or --tld", file=sys.stderr)
+        raise WAPIValidationError("No TLD given")
+    is_valid, error = validate_domain(f"{label}.{tlds[0]}")
+    if not is_valid:
+        print(f"Error: Invalid brand name - {error}", file=sys.stderr)
+        raise WAPIValidationError(f"Invalid brand name: {error}")
+
+    if client is None:
+        client = get_client(getattr(args, "config", None))
+    variants = CountingIterator(generate_variants(label, tlds))
+    logger.info(f"Checking variants of {label}.{tlds[0]}")
+
+    found = []
+    cache = AvailabilityCache(get_availability_cache_path())
+    try:
+        def _rows():
+            for result in scan_variants(variants, args, client, cache):
+                found.append(result)
+                yield _variant_row(result)
+
+        print_output(_rows(), args.format, headers=VARIANT_HEADERS)
+    finally:
+        cache.close()
+
+    if getattr(args, "quiet", False) is not True:
+        registered = sum(1 for result in found if "error" not in result)
+        print(f"{variants.count} variant(s) checked, {registered} registered, "
+              f"{len(found) - registered} undetermined", file=sys.stderr)
     return EXIT_SUCCESS
 
+
+def cmd_search(args, client: Optional[WedosAPIClient] = None) -> int:
+    """
+    Handle `wapi search` command.
+
+    Results are cached (see ``wapi.utils.availability_cache``); ``--refresh``
+    skips the cached result and ``--max-age`` limits how old it may be.
+    With ``--file`` many domains are checked at once (see ``search_domains``);
+    ``wapi search variants <name>`` scans look-alike names (see ``scan_variants``).
+    """
+    logger = get_logger("commands.search")
+    if getattr(args, "domain", None) == "variants":
+        return cmd_search_variants(args, client)
+    if isinstance(getattr(args, "file", None), str):
+        return _cmd_search_file(args, client)
+    if not getattr(args, "domain", None):
+        print("Error: Give a domain name or --file", file=sys.stderr)
+        raise WAPIValidationError("No domain to search")
+    if isinstance(getattr(args, "name", None), str):
+        print(f"Error: Unexpected argument {args.name} "
+              "(search takes one domain; use --file for more)", file=sys.stderr)
+        raise WAPIValidationError(f"Unexpected argument: {args.name}")
+
+    # Use debug to avoid noisy stdout for normal users; visible with --verbose.
+    logger.debug(f"Searching domain availability for: {args.domain}")
+
+    is_valid, error = validate_domain(args.domain)
+    if not is_valid:
+        logger.warning(f"Invalid domain name: {args.domain} - {error}")
+        print(f"Error: Invalid domain name - {error}", file=sys.stderr)
+        raise WAPIValidationError(f"Invalid domain name: {error}")
+    max_age = _max_age(args)
+
+    # The cache only saves lookups; search works without it (e.g. read-only cache directory)
+    cache = AvailabilityCache(get_availability_cache_path())
+    try:
+        result_payload = _cached(cache, args.domain, args, max_age)
+        if result_payload is not None:
+            logger.debug(f"Using cached result for {args.domain} "
+                         f"({result_payload['cached_age']}s old)")
+        else:
+            if getattr(args, "dns_prefilter", False) is True:
+                delegated, _remainder = split_by_delegation([args.domain])
+                if args.domain in delegated:
+                    result_payload = _dns_result(args.domain, delegated[args.domain])
+            if result_payload is None:
+                try:
+                    result_payload = lookup_availability(args.domain, args, client)
+                except WAPIRequestError:
+                    print("Error: Could not determine domain availability (WAPI/WHOIS failed)",
+                          file=sys.stderr)
+                    raise
+            _store(cache, result_payload)
+    finally:
+        cache.close()
+
+    print(format_output(result_payload, args.format))
+    return EXIT_SUCCESS
@@ -8,6 +8,21 @@ import os
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+from .constants import (
+    AVAILABILITY_CACHE_FILE,
+    CACHE_DIR_ENV_VAR,
+    CAPABILITIES_FILE,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_INDEX_FILE,
+    DEFAULT_JOURNAL_FILE,
+    DEFAULT_MAX_RATE,
+    INDEX_FILE_ENV_VAR,
+    JOURNAL_FILE_ENV_VAR,
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_TIMEOUT,
+    RATE_STATE_FILE,
+    RDAP_BOOTSTRAP_FILE,
+)
 from .exceptions import WAPIConfigurationError
 from .utils.logger import get_logger
 
@@ -89,6 +104,39 @@ def get_config(key: str, default: Optional[str] = None, config_file: str = "conf
     return config.get(key, default)
 
 
+def get_network_config(config_file: str = "config.env") -> Dict[str, float]:
+    """
+    Get optional network settings (``WAPI_RETRIES``, ``WAPI_CONNECT_TIMEOUT``,
+    ``WAPI_TIMEOUT``, ``WAPI_MAX_RATE``, ``WAPI_HEDGE_PERCENTILE``).
+    
+    Invalid values are logged and replaced by the defaults.
+    
+    Args:
+        config_file: Path to configuration file
+        
+    Returns:
+        Dictionary with retries, connect_timeout, timeout, max_rate and
+        hedge_percentile (0 when hedging is off)
+    """
+    logger = get_logger('config')
+    settings = {
+        'retries': ('WAPI_RETRIES', DEFAULT_RETRY_ATTEMPTS - 1),
+        'connect_timeout': ('WAPI_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+        'timeout': ('WAPI_TIMEOUT', DEFAULT_TIMEOUT),
+        'max_rate': ('WAPI_MAX_RATE', DEFAULT_MAX_RATE),
+        'hedge_percentile': ('WAPI_HEDGE_PERCENTILE', 0),
+    }
+    result = {}
+    for name, (key, default) in settings.items():
+        value = get_config(key, config_file=config_file)
+        try:
+            result[name] = max(0.0, float(value)) if value not in (None, '') else default
+        except ValueError:
+            logger.warning(f"Ignoring invalid {key}={value!r}, using {default}")
+            result[name] = default
+    return result
+
+
 def validate_config(config_file: str = "config.env") -> Tuple[bool, Optional[str]]:
     logger = get_logger('config')
     logger.debug(f"Validating configuration from: {config_file}")
@@ -116,3 +164,91 @@ def validate_config(config_file: str = "config.env") -> Tuple[bool, Optional[str
     
     logger.debug("Configuration validation successful")
     return True, None
+
+
+def get_cache_dir() -> Path:
+    """
+    Get the directory for local caches (portfolio index, learned state).
+    
+    Resolution order: ``WAPI_CACHE_DIR``, ``$XDG_CACHE_HOME/wapi``, ``~/.cache/wapi``.
+    The directory is not created here.
+    
+    Returns:
+        Cache directory path
+    """
+    cache_dir = os.getenv(CACHE_DIR_ENV_VAR)
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    xdg_cache = os.getenv('XDG_CACHE_HOME')
+    if xdg_cache:
+        return Path(xdg_cache).expanduser() / 'wapi'
+    return Path.home() / '.cache' / 'wapi'
+
+
+def get_index_path() -> Path:
+    """
+    Get the path of the local portfolio index database.
+    
+    Returns:
+        ``WAPI_INDEX_FILE`` if set, otherwise ``index.sqlite3`` in the cache directory
+    """
+    index_file = os.getenv(INDEX_FILE_ENV_VAR)
+    if index_file:
+        return Path(index_file).expanduser()
+    return get_cache_dir() / DEFAULT_INDEX_FILE
+
+
+def get_rate_state_path() -> Path:
+    """
+    Get the path of the file storing learned API request rates.
+    
+    Returns:
+        ``ratelimit.json`` in the cache directory
+    """
+    return get_cache_dir() / RATE_STATE_FILE
+
+
+def get_capabilities_path() -> Path:
+    """
+    Get the path of the learned XML/JSON endpoint capabilities.
+    
+    Returns:
+        ``capabilities.json`` in the cache directory
+    """
+    return get_cache_dir() / CAPABILITIES_FILE
+
+
+def get_rdap_bootstrap_path() -> Path:
+    """
+    Get the path of the cached IANA RDAP bootstrap registry.
+    
+    Returns:
+        ``rdap-bootstrap.json`` in the cache directory
+    """
+    return get_cache_dir() / RDAP_BOOTSTRAP_FILE
+
+
+def get_availability_cache_path() -> Path:
+    """
+    Get the path of the cached availability results of ``wapi search``.
+    
+    Returns:
+        ``availability.sqlite3`` in the cache directory
+    """
+    return get_cache_dir() / AVAILABILITY_CACHE_FILE
+
+
+def get_journal_path() -> Optional[Path]:
+    """
+    Get the path of the journal of mutating API calls.
+    
+    Returns:
+        ``WAPI_JOURNAL_FILE`` if set, otherwise ``journal.jsonl`` in the cache
+        directory; None when journaling is disabled (``WAPI_JOURNAL_FILE=off``)
+    """
+    journal_file = os.getenv(JOURNAL_FILE_ENV_VAR)
+    if journal_file is not None and journal_file.strip().lower() in ('', '0', 'off', 'false', 'no'):
+        return None
+    if journal_file:
+        return Path(journal_file).expanduser()
+    return get_cache_dir() / DEFAULT_JOURNAL_FILE
@@ -17,14 +17,122 @@ EXIT_TIMEOUT_ERROR = 6
 API_SUCCESS = "1000"
 API_ASYNC = "1001"
 API_ERROR = "2000"
+API_UNKNOWN_COMMAND = "2010"  # command not enabled on this endpoint format
+API_OBJECT_NOT_FOUND = "2303"  # object (domain, DNS zone) does not exist
 
 # Default values
 DEFAULT_CONFIG_FILE = "config.env"
-DEFAULT_TIMEOUT = 30
+DEFAULT_TIMEOUT = 30  # HTTP read timeout (seconds)
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_HTTP_POOL_SIZE = 16  # keep-alive connections to the WAPI endpoint per client
 DEFAULT_DNS_LOOKUP_TIMEOUT = 5
+DEFAULT_DNS_QUERY_TIMEOUT = 2.0  # single query to an authoritative nameserver
+DEFAULT_DNS_PORT = 53
+DEFAULT_DNS_VERIFY_TIMEOUT = 300  # seconds to wait for all nameservers to serve a change
+DEFAULT_DNS_VERIFY_INTERVAL = 2.0
+DEFAULT_HEALTH_WORKERS = 32  # concurrent probes in dns health
+DEFAULT_HEALTH_PER_SERVER = 8  # concurrent probes per nameserver address
+DEFAULT_HEALTH_API_WORKERS = 4  # concurrent domain-info calls in dns health
+DEFAULT_PREFILTER_WORKERS = 32  # concurrent delegation lookups in the search pre-filter
+DNS_MAX_REFERRALS = 8  # referral hops when walking from the root to a zone's parent
+
+# IPv4 addresses of DNS root servers (a, c, d, e, f, i, k, l, m), the start of delegation walks
+DNS_ROOT_SERVERS = (
+    "198.41.0.4", "192.33.4.12", "199.7.91.13", "192.203.230.10", "192.5.5.241",
+    "192.36.148.17", "193.0.14.129", "199.7.83.42", "202.12.27.33",
+)
+
+# RDAP (HTTPS) lookups used by search before falling back to port-43 WHOIS
+RDAP_BOOTSTRAP_URL = "https://data.iana.org/rdap/dns.json"
+RDAP_BOOTSTRAP_FILE = "rdap-bootstrap.json"
+RDAP_BOOTSTRAP_TTL = 7 * 24 * 3600  # seconds before the cached IANA registry is refreshed
+DEFAULT_RDAP_TIMEOUT = 10
+DEFAULT_RDAP_POOL_SIZE = 8  # keep-alive connections per RDAP server
+
+# Bulk availability checks (wapi search --file)
+MAX_AVAILABILITY_NAMES = 50  # names packed into one domains-availability request
+# domains-availability codes blaming the request data (a bad name, too many names);
+# a batch rejected with one of these is bisected, any other error applies to all its names
+AVAILABILITY_SPLIT_CODES = ("2100", "2209")
+DEFAULT_SEARCH_WORKERS = 8  # concurrent RDAP/WHOIS lookups
+
+# Cached availability results (wapi search)
+AVAILABILITY_CACHE_FILE = "availability.sqlite3"
+AVAILABILITY_TTL_REGISTERED = 24 * 3600  # seconds a "registered" result is reused
+AVAILABILITY_TTL_AVAILABLE = 15 * 60  # seconds an "available" result is reused
 DEFAULT_POLL_INTERVAL = 5
 DEFAULT_MAX_POLL_ATTEMPTS = 20
 
+# Read-only WAPI commands: safe to coalesce, cache and retry
+READ_ONLY_COMMANDS = frozenset({
+    "ping",
+    "credit-info",
+    "domains-list",
+    "domain-info",
+    "domains-availability",
+    "nsset-info",
+    "nsset-list",
+    "contact-info",
+    "contact-list",
+    "dns-domains-list",
+    "dns-rows-list",
+    "dns-row-detail",
+})
+
+# Retries and circuit breaker for API calls
+DEFAULT_RETRY_ATTEMPTS = 3  # total attempts for read-only commands
+DEFAULT_RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt
+DEFAULT_RETRY_MAX_DELAY = 8.0
+DEFAULT_BREAKER_THRESHOLD = 10  # consecutive failed HTTP attempts before opening
+DEFAULT_BREAKER_RESET = 30.0  # seconds before a recovery probe
+
+# Adaptive (AIMD) client-side rate limiting, shared per WAPI username
+DEFAULT_INITIAL_RATE = 5.0  # requests per second until a safe rate has been learned
+DEFAULT_MAX_RATE = 20.0  # 0 disables adaptive limiting
+DEFAULT_MIN_RATE = 0.2
+DEFAULT_RATE_INCREASE = 0.5  # requests per second gained per second of healthy traffic
+DEFAULT_RATE_DECREASE = 0.5  # rate multiplier applied when throttled
+DEFAULT_RATE_BURST = 5
+THROTTLE_HTTP_STATUSES = frozenset({429, 503})
+RATE_STATE_FILE = "ratelimit.json"
+
+# Learned XML/JSON endpoint support per command
+CAPABILITIES_FILE = "capabilities.json"
+CAPABILITY_TTL = 7 * 24 * 3600  # seconds before an unsupported format is tried again
+
+# Hedged read requests (opt-in): a duplicate is sent when a read is slower
+# than the given percentile of recent latencies
+DEFAULT_HEDGE_PERCENTILE = 95
+DEFAULT_HEDGE_DELAY = 1.0  # seconds, used until enough latencies were sampled
+DEFAULT_HEDGE_MIN_DELAY = 0.2
+DEFAULT_HEDGE_BUDGET = 0.1  # extra requests as a fraction of hedgeable calls
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_WINDOW = 200
+
+# Local cache and portfolio index
+CACHE_DIR_ENV_VAR = "WAPI_CACHE_DIR"
+INDEX_FILE_ENV_VAR = "WAPI_INDEX_FILE"
+DEFAULT_INDEX_FILE = "index.sqlite3"
+DEFAULT_INDEX_WORKERS = 4
+
+# Journal of mutating API calls (set WAPI_JOURNAL_FILE=off to disable)
+JOURNAL_FILE_ENV_VAR = "WAPI_JOURNAL_FILE"
+DEFAULT_JOURNAL_FILE = "journal.jsonl"
+
+# Bulk renewals
+DEFAULT_RENEW_RATE = 2.0  # requests per second
+DEFAULT_RENEW_WORKERS = 4
+
+# Bulk registrations (wapi domain create --from-file)
+DEFAULT_CREATE_RATE = 2.0  # requests per second
+DEFAULT_CREATE_WORKERS = 4
+MAX_REGISTRATION_PERIOD = 10  # years
+
+# Bulk NSSET migration
+DEFAULT_MIGRATE_RATE = 2.0  # requests per second
+DEFAULT_MIGRATE_WORKERS = 4
+DEFAULT_NSSET_PREFIX = "NS"
+
 # Logging
 DEFAULT_LOG_LEVEL = "INFO"
 DEFAULT_LOG_FILE = None
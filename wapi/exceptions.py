@@ -43,3 +43,18 @@ class WAPITimeoutError(WAPIError):
 class WAPIDNSLookupError(WAPIError):
     """Raised when DNS lookup fails"""
     pass
+
+
+class WAPICircuitOpenError(WAPIConnectionError):
+    """Raised without contacting the API while the circuit breaker is open"""
+    pass
+
+
+class WAPIRejectedError(WAPIRequestError):
+    """Raised when the API answers a request with an HTTP client error (not processed)"""
+    pass
+
+
+class WAPIThrottledError(WAPIRequestError):
+    """Raised when the API rejects a request because of its request limits"""
+    pass
@@ -4,7 +4,16 @@ WAPI Utility Functions
 This package contains utility functions for formatting, validation, and other helper operations.
 """
 
-from .formatters import format_output, format_table, format_json, format_xml, format_yaml
+from .formatters import (
+    format_output,
+    format_table,
+    format_json,
+    format_xml,
+    format_yaml,
+    iter_format,
+    print_output,
+    write_output,
+)
 from .validators import (
     validate_domain,
     validate_ipv4,
@@ -34,6 +43,15 @@ from .batch import (
     write_results_to_file,
 )
 from .config_wizard import run_config_wizard
+from .index import PortfolioIndex
+from .codec import get_json_codec, get_xml_codec, set_codecs
+from .tracing import (
+    configure_tracing,
+    configure_tracing_from_spec,
+    disable_tracing,
+    start_span,
+    traced,
+)
 
 __all__ = [
     # Formatters
@@ -42,6 +60,9 @@ __all__ = [
     'format_json',
     'format_xml',
     'format_yaml',
+    'iter_format',
+    'print_output',
+    'write_output',
     # Validators
     'validate_domain',
     'validate_ipv4',
@@ -75,4 +96,16 @@ __all__ = [
     'write_results_to_file',
     # Config Wizard
     'run_config_wizard',
+    # Codecs
+    'get_json_codec',
+    'get_xml_codec',
+    'set_codecs',
+    # Index
+    'PortfolioIndex',
+    # Tracing
+    'configure_tracing',
+    'configure_tracing_from_spec',
+    'disable_tracing',
+    'start_span',
+    'traced',
 ]
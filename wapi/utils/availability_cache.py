@@ -0,0 +1,144 @@
+"""
+Availability result cache for WAPI CLI
+
+Keeps the results of ``wapi search`` in a small SQLite database keyed by
+normalized domain name, so a name checked a few minutes ago is answered
+locally instead of spending a WAPI call and a rate-limited WHOIS/RDAP
+lookup again. "Registered" results rarely change and are kept for
+``AVAILABILITY_TTL_REGISTERED``; "available" ones can go stale as soon as
+someone registers the name and are kept for ``AVAILABILITY_TTL_AVAILABLE``.
+Raw WHOIS text, the bulk of a result, is stored zlib-compressed.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from ..constants import AVAILABILITY_TTL_AVAILABLE, AVAILABILITY_TTL_REGISTERED
+from .logger import get_logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    domain TEXT PRIMARY KEY,
+    available INTEGER NOT NULL,
+    checked_at REAL NOT NULL,
+    payload TEXT NOT NULL,
+    whois BLOB
+);
+"""
+
+
+def normalize_domain(domain: str) -> str:
+    """Cache key of a domain: lower-case, no trailing dot, IDN labels in punycode"""
+    name = domain.strip().rstrip('.').lower()
+    try:
+        return name.encode('idna').decode('ascii')
+    except UnicodeError:
+        return name
+
+
+class AvailabilityCache:
+    """
+    SQLite cache of availability results.
+
+    Use as a context manager. The connection is shared by threads (bulk
+    searches look names up concurrently) and guarded by a lock.
+    """
+
+    def __init__(self, path: Union[str, Path], registered_ttl: float = AVAILABILITY_TTL_REGISTERED,
+                 available_ttl: float = AVAILABILITY_TTL_AVAILABLE):
+        """
+        Args:
+            path: Database file
+            registered_ttl: Seconds a "registered" result stays valid
+            available_ttl: Seconds an "available" result stays valid
+        """
+        self.path = Path(path)
+        self.registered_ttl = registered_ttl
+        self.available_ttl = available_ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.logger = get_logger('utils.availability_cache')
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the database, creating it and dropping expired results"""
+        if self._conn is not None:
+            return self._conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.executescript(_SCHEMA)
+        conn.execute("DELETE FROM results WHERE checked_at < ?",
+                     (time.time() - max(self.registered_ttl, self.available_ttl),))
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self):
+        """Close the database connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def ttl(self, available: bool) -> float:
+        """Seconds a result with this availability stays valid"""
+        return self.available_ttl if available else self.registered_ttl
+
+    def get(self, domain: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return a still valid cached result.
+
+        Args:
+            domain: Domain name
+            max_age: Also reject results older than this many seconds
+
+        Returns:
+            The stored result (with ``whois`` text restored and ``cached_age``
+            in seconds), or None
+        """
+        with self._lock:
+            row = self.connect().execute(
+                "SELECT available, checked_at, payload, whois FROM results WHERE domain = ?",
+                (normalize_domain(domain),)
+            ).fetchone()
+        if row is None:
+            return None
+        available, checked_at, payload, whois = row
+        age = max(0.0, time.time() - checked_at)
+        limit = self.ttl(bool(available))
+        if max_age is not None:
+            limit = min(limit, max_age)
+        if age > limit:
+            return None
+        result = json.loads(payload)
+        if whois is not None:
+            result['whois'] = zlib.decompress(whois).decode('utf-8')
+        result['cached_age'] = int(age)
+        return result
+
+    def put(self, result: Dict[str, Any]):
+        """Store a result (``domain`` and ``available`` are required)"""
+        payload = {key: value for key, value in result.items()
+                   if key not in ('whois', 'cached_age')}
+        whois = result.get('whois')
+        with self._lock:
+            conn = self.connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (domain, available, checked_at, payload, whois) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (normalize_domain(result['domain']), 1 if result['available'] else 0, time.time(),
+                 json.dumps(payload, ensure_ascii=False),
+                 zlib.compress(whois.encode('utf-8')) if whois else None)
+            )
+            conn.commit()
@@ -1,16 +1,22 @@
 """
 Batch operations for WAPI CLI
 
-Provides utilities for performing operations on multiple domains or resources.
+Provides utilities for performing operations on multiple domains or resources,
+including rate-limited concurrent execution and multiplexed polling.
 """
 
 import sys
-from typing import List, Dict, Any, Callable, Optional, TYPE_CHECKING
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Hashable, Iterable, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..api.client import WedosAPIClient
 
+from ..constants import DEFAULT_MAX_POLL_ATTEMPTS, DEFAULT_POLL_INTERVAL
 from ..utils.logger import get_logger
+from ..utils.tracing import current_span, start_span
 
 
 def batch_domain_operation(
@@ -182,3 +188,155 @@ def write_results_to_file(results: Dict[str, Any], filepath: str, format: str =
     except Exception as e:
         logger.error(f"Failed to write results to {filepath}: {e}")
         raise
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting how often requests start.
+
+    Args:
+        rate: Requests per second (0 or less disables limiting)
+        burst: Requests allowed back to back before limiting applies
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may start"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def run_concurrently(
+    items: Iterable[Any],
+    operation: Callable[[Any], Any],
+    workers: int = 4,
+    rate_limiter: Optional[RateLimiter] = None,
+    quiet: bool = False,
+) -> List[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Run an operation for each item on a thread pool.
+
+    Args:
+        items: Items to process
+        operation: Callable taking one item
+        workers: Maximum concurrent operations
+        rate_limiter: Optional limiter applied before each operation starts
+        quiet: Log failures at debug level, for operations expected to fail
+               (e.g. DNS probes of a change that has not propagated yet)
+
+    Returns:
+        List of (item, result, error) tuples in input order; error is None on success
+    """
+    logger = get_logger('batch')
+    parent = current_span()
+
+    def _run(item):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        with start_span("batch.operation", parent=parent):
+            try:
+                return item, operation(item), None
+            except Exception as e:
+                if quiet:
+                    logger.debug(f"Operation failed for {item}: {e}")
+                else:
+                    logger.error(f"Operation failed for {item}: {e}")
+                return item, None, e
+
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as executor:
+        return list(executor.map(_run, items))
+
+
+def poll_many(
+    client: 'WedosAPIClient',
+    checks: Dict[Hashable, Tuple[str, Dict[str, Any], Optional[Callable[[Dict[str, Any]], bool]]]],
+    max_attempts: int = DEFAULT_MAX_POLL_ATTEMPTS,
+    interval: float = DEFAULT_POLL_INTERVAL,
+    workers: int = 4,
+    rate_limiter: Optional[RateLimiter] = None,
+    verbose: bool = False,
+) -> Dict[Hashable, Dict[str, Any]]:
+    """
+    Poll many asynchronous operations in one shared loop.
+
+    Each round checks every pending operation (concurrently, under the rate
+    limit), then sleeps once, so N operations take about as long as the
+    slowest one instead of N sequential polling loops.
+
+    Args:
+        client: WEDOS API client
+        checks: Key -> (check_command, check_data, is_complete) where is_complete
+                may be None to wait for code 1000
+        max_attempts: Maximum polling rounds
+        interval: Seconds between rounds
+        workers: Maximum concurrent checks per round
+        rate_limiter: Optional limiter applied to each check
+        verbose: Print one progress line per round
+
+    Returns:
+        Key -> final result. Operations still pending after the last round get
+        a timeout result with code 9998; 2xxx errors end polling for that key.
+    """
+    logger = get_logger('batch')
+    results: Dict[Hashable, Dict[str, Any]] = {}
+    pending = list(checks)
+
+    def _check(key):
+        command, data, is_complete = checks[key]
+        result = client.call(command, data)
+        if is_complete is not None:
+            done = is_complete(result)
+        else:
+            code = result.get('response', {}).get('code')
+            done = code == '1000' or code == 1000
+        return done, result
+
+    with start_span("batch.poll_many", {"batch.operations": len(pending)}) as span:
+        for attempt in range(1, max_attempts + 1):
+            if not pending:
+                break
+            span.set_attribute("wapi.poll.attempts", attempt)
+            outcomes = run_concurrently(pending, _check, workers=workers, rate_limiter=rate_limiter)
+            still_pending = []
+            for key, outcome, error in outcomes:
+                if error is not None:
+                    results[key] = {'response': {'code': '2000', 'result': str(error)}}
+                    continue
+                done, result = outcome
+                code = str(result.get('response', {}).get('code', ''))
+                if done or code.startswith('2'):
+                    results[key] = result
+                else:
+                    still_pending.append(key)
+            pending = still_pending
+            if verbose:
+                print(f"  Polling round {attempt}/{max_attempts}: "
+                      f"{len(checks) - len(pending)}/{len(checks)} complete", file=sys.stderr)
+            if pending and attempt < max_attempts:
+                time.sleep(interval)
+
+    for key in pending:
+        timeout_msg = (f"Polling timeout after {max_attempts} attempts "
+                       f"({max_attempts * interval} seconds)")
+        logger.warning(f"{timeout_msg}: {key}")
+        results[key] = {'response': {'code': '9998', 'result': timeout_msg}}
+    return results
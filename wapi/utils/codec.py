@@ -0,0 +1,225 @@
+"""
+Pluggable JSON and XML codec backends for WAPI CLI
+
+JSON:
+- ``json``   - standard library (always available)
+- ``orjson`` - used automatically when installed (much faster dumps/loads)
+
+XML (response parsing):
+- ``etree``  - ``xml.etree.ElementTree`` (default)
+- ``lxml``   - opt-in via ``WAPI_CODEC=lxml``. lxml parses faster, but walking
+  its elements from Python is slower, so converting WAPI responses to dicts
+  is faster with ElementTree end to end.
+
+XML requests are always built by the client's template serializer, which is
+faster than building a tree with either backend.
+
+The ``WAPI_CODEC`` environment variable overrides auto-selection with a
+comma-separated list of backend names, e.g. ``WAPI_CODEC=stdlib``,
+``WAPI_CODEC=orjson,lxml`` or ``WAPI_CODEC=json``. ``stdlib`` selects
+``json`` and ``etree``; ``auto`` keeps automatic selection.
+"""
+
+import json
+import os
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, Optional, Tuple
+
+from .logger import get_logger
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    from lxml import etree as lxml_etree
+
+    LXML_AVAILABLE = True
+except ImportError:
+    lxml_etree = None
+    LXML_AVAILABLE = False
+
+# Environment variable overriding backend selection
+CODEC_ENV_VAR = 'WAPI_CODEC'
+
+
+class StdlibJSONCodec:
+    """JSON codec backed by the standard library"""
+
+    name = 'json'
+
+    def dumps(self, data: Any) -> str:
+        """Serialize compactly (request bodies)"""
+        return json.dumps(data)
+
+    def dumps_pretty(self, data: Any, indent: int = 2) -> str:
+        """Serialize for human-readable output"""
+        return json.dumps(data, indent=indent, ensure_ascii=False)
+
+    def loads(self, text) -> Any:
+        """Deserialize from str or bytes"""
+        return json.loads(text)
+
+    def loads_response(self, response) -> Any:
+        """Deserialize a ``requests`` response body"""
+        return response.json()
+
+
+class OrjsonCodec(StdlibJSONCodec):
+    """JSON codec backed by orjson, falling back to stdlib for unsupported input"""
+
+    name = 'orjson'
+
+    def dumps(self, data: Any) -> str:
+        try:
+            return orjson.dumps(data).decode('utf-8')
+        except TypeError:
+            # Non-string keys, big integers or unknown types - stdlib handles these
+            return super().dumps(data)
+
+    def dumps_pretty(self, data: Any, indent: int = 2) -> str:
+        if indent != 2:
+            return super().dumps_pretty(data, indent)
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+        except TypeError:
+            return super().dumps_pretty(data, indent)
+
+    def loads(self, text) -> Any:
+        return orjson.loads(text)
+
+    def loads_response(self, response) -> Any:
+        return orjson.loads(response.content)
+
+
+class ElementTreeXMLCodec:
+    """XML parsing backed by xml.etree.ElementTree"""
+
+    name = 'etree'
+    parse_errors: Tuple[type, ...] = (ET.ParseError,)
+
+    def fromstring(self, text):
+        """Parse a document and return the root element"""
+        return ET.fromstring(text)
+
+
+class LxmlXMLCodec:
+    """XML parsing backed by lxml (comments, PIs and entities are dropped)"""
+
+    name = 'lxml'
+
+    def __init__(self):
+        self.parse_errors: Tuple[type, ...] = (lxml_etree.XMLSyntaxError, ValueError)
+        self._local = threading.local()
+
+    def _parser(self, encoding: Optional[str]):
+        # lxml parsers are not thread-safe; keep one per thread and encoding
+        key = f"parser_{encoding or 'auto'}"
+        parser = getattr(self._local, key, None)
+        if parser is None:
+            parser = lxml_etree.XMLParser(
+                encoding=encoding,
+                remove_comments=True,
+                remove_pis=True,
+                resolve_entities=False,
+                no_network=True,
+                huge_tree=True,
+            )
+            setattr(self._local, key, parser)
+        return parser
+
+    def fromstring(self, text):
+        if isinstance(text, str):
+            # lxml rejects str input with an encoding declaration; re-encode
+            return lxml_etree.fromstring(text.encode('utf-8'), self._parser('utf-8'))
+        return lxml_etree.fromstring(text, self._parser(None))
+
+
+_lock = threading.Lock()
+_json_codec = None
+_xml_codec = None
+
+
+def _select_codecs(spec: Optional[str]):
+    """Resolve the (json, xml) codec pair for a WAPI_CODEC spec"""
+    logger = get_logger('utils.codec')
+    json_name = 'orjson' if ORJSON_AVAILABLE else 'json'
+    xml_name = 'etree'
+
+    for token in (spec or '').replace(';', ',').split(','):
+        token = token.strip().lower()
+        if not token or token == 'auto':
+            continue
+        if token == 'stdlib':
+            json_name, xml_name = 'json', 'etree'
+        elif token in ('json', 'orjson'):
+            json_name = token
+        elif token in ('etree', 'elementtree'):
+            xml_name = 'etree'
+        elif token == 'lxml':
+            xml_name = 'lxml'
+        else:
+            logger.warning(f"Unknown codec backend in {CODEC_ENV_VAR}: {token}")
+
+    if json_name == 'orjson' and not ORJSON_AVAILABLE:
+        logger.warning("orjson requested but not installed, using json")
+        json_name = 'json'
+    if xml_name == 'lxml' and not LXML_AVAILABLE:
+        logger.warning("lxml requested but not installed, using ElementTree")
+        xml_name = 'etree'
+
+    json_codec = OrjsonCodec() if json_name == 'orjson' else StdlibJSONCodec()
+    xml_codec = LxmlXMLCodec() if xml_name == 'lxml' else ElementTreeXMLCodec()
+    logger.debug(f"Selected codecs: json={json_codec.name}, xml={xml_codec.name}")
+    return json_codec, xml_codec
+
+
+def _ensure_codecs():
+    global _json_codec, _xml_codec
+    if _json_codec is None or _xml_codec is None:
+        with _lock:
+            if _json_codec is None or _xml_codec is None:
+                _json_codec, _xml_codec = _select_codecs(os.getenv(CODEC_ENV_VAR))
+
+
+def get_json_codec():
+    """Return the active JSON codec"""
+    _ensure_codecs()
+    return _json_codec
+
+
+def get_xml_codec():
+    """Return the active XML parsing codec"""
+    _ensure_codecs()
+    return _xml_codec
+
+
+def set_codecs(spec: Optional[str] = None):
+    """
+    Select codec backends explicitly.
+
+    Args:
+        spec: Backend list in ``WAPI_CODEC`` syntax (None re-reads the environment)
+
+    Returns:
+        Tuple of (json_codec, xml_codec)
+    """
+    global _json_codec, _xml_codec
+    with _lock:
+        _json_codec, _xml_codec = _select_codecs(
+            spec if spec is not None else os.getenv(CODEC_ENV_VAR)
+        )
+    return _json_codec, _xml_codec
+
+
+def reset_codecs():
+    """Forget the current selection; it is resolved again on next use"""
+    global _json_codec, _xml_codec
+    with _lock:
+        _json_codec = None
+        _xml_codec = None
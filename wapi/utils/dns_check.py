@@ -0,0 +1,701 @@
+"""
+Checks against authoritative nameservers for WAPI CLI
+
+Uses the ``dns_wire`` client to ask a domain's nameservers directly, all of
+them concurrently: whether they serve an expected RRset and a new SOA serial
+(``verify_rrset``), whether a whole portfolio is delegated consistently
+(``scan_health``), whether the parent zone and the child nameservers
+agree with a submitted nameserver set (``check_delegation``), and which
+candidate names are already delegated (``prefilter_delegations``).
+"""
+
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..constants import (
+    DEFAULT_DNS_PORT,
+    DEFAULT_DNS_QUERY_TIMEOUT,
+    DEFAULT_DNS_VERIFY_INTERVAL,
+    DEFAULT_DNS_VERIFY_TIMEOUT,
+    DEFAULT_HEALTH_PER_SERVER,
+    DEFAULT_HEALTH_WORKERS,
+    DEFAULT_PREFILTER_WORKERS,
+    DNS_MAX_REFERRALS,
+    DNS_ROOT_SERVERS,
+)
+from ..exceptions import WAPIDNSLookupError, WAPITimeoutError
+from .batch import run_concurrently
+from .dns_wire import DNSResponse, normalize_name, normalize_rdata, query, serial_newer, soa_serial
+from .logger import get_logger
+from .singleflight import SingleFlight
+from .tracing import current_span, start_span
+
+VERIFY_HEADERS = ['nameserver', 'address', 'status', 'serial', 'elapsed', 'detail']
+HEALTH_HEADERS = ['domain', 'nameserver', 'address', 'status', 'serial', 'latency_ms', 'issues',
+                  'detail']
+DELEGATION_HEADERS = ['source', 'server', 'address', 'status', 'detail']
+NAMESERVER_HEADERS = ['address', 'nameserver', 'probes', 'failures', 'avg_ms', 'p95_ms', 'max_ms']
+
+
+def record_owner(domain: str, name: Optional[str]) -> str:
+    """Fully qualified owner of a WAPI row name (``@``/empty is the zone apex)"""
+    domain = normalize_name(domain)
+    name = normalize_name(name)
+    if name in ('', '@') or name == domain:
+        return domain
+    if name.endswith('.' + domain):
+        return name
+    return f"{name}.{domain}"
+
+
+def resolve_host(host: str) -> List[str]:
+    """Addresses of a nameserver host via getaddrinfo (empty list if it does not resolve)"""
+    try:
+        infos = socket.getaddrinfo(host, 53, proto=socket.IPPROTO_UDP)
+    except (socket.gaierror, OSError, UnicodeError):
+        return []
+    return sorted({info[4][0] for info in infos})
+
+
+class ResolverCache:
+    """
+    Nameserver host -> addresses, shared by all probes of a run.
+
+    A portfolio usually sits on a handful of nameservers; each host is
+    resolved once, and concurrent lookups of the same host share one call.
+    """
+
+    def __init__(self, resolve: Callable[[str], List[str]] = resolve_host):
+        self._resolve = resolve
+        self._lock = threading.Lock()
+        self._addresses: Dict[str, List[str]] = {}
+        self._flight = SingleFlight()
+        self.lookups = 0
+
+    def addresses(self, host: str) -> List[str]:
+        """Return the cached addresses of ``host``, resolving it on first use"""
+        host = normalize_name(host)
+        with self._lock:
+            if host in self._addresses:
+                return self._addresses[host]
+
+        def _lookup():
+            addresses = self._resolve(host)
+            with self._lock:
+                self._addresses[host] = addresses
+                self.lookups += 1
+            return addresses
+
+        return self._flight.do(host, _lookup)[0]
+
+
+def server_targets(nameservers: List[Dict[str, str]],
+                   resolver: Optional[ResolverCache] = None) -> List[Dict[str, str]]:
+    """
+    Expand nameservers to one target per address.
+
+    Args:
+        nameservers: ``{'host', 'ipv4', 'ipv6'}`` records (see ``nameservers_from_dns``);
+                     hosts without addresses are resolved with getaddrinfo
+        resolver: Cache used to resolve hosts (default: resolve without caching)
+
+    Returns:
+        List of ``{'nameserver', 'address'}``; unresolvable hosts get an empty address
+    """
+    targets = []
+    for ns in nameservers:
+        addresses = [a for a in (ns.get('ipv4'), ns.get('ipv6')) if a]
+        if not addresses:
+            addresses = (resolver.addresses(ns['host']) if resolver is not None
+                         else resolve_host(ns['host'])) or ['']
+        targets.extend({'nameserver': ns['host'], 'address': address} for address in addresses)
+    return targets
+
+
+def soa_serials(targets: List[Dict[str, str]], zone: str,
+                timeout: float = DEFAULT_DNS_QUERY_TIMEOUT,
+                port: int = DEFAULT_DNS_PORT) -> Dict[str, Optional[int]]:
+    """Current SOA serial of ``zone`` per target address (None if it did not answer)"""
+    def _serial(target):
+        return soa_serial(query(target['address'], zone, 'SOA', timeout=timeout, port=port), zone)
+
+    reachable = [t for t in targets if t['address']]
+    serials = run_concurrently(reachable, _serial, workers=len(reachable) or 1,
+                               quiet=True)
+    return {target['address']: serial for target, serial, _error in serials}
+
+
+def verify_rrset(
+    targets: List[Dict[str, str]],
+    zone: str,
+    owner: str,
+    rdtype: str,
+    rdata: str,
+    present: bool = True,
+    min_serials: Optional[Dict[str, Optional[int]]] = None,
+    timeout: float = DEFAULT_DNS_VERIFY_TIMEOUT,
+    interval: float = DEFAULT_DNS_VERIFY_INTERVAL,
+    query_timeout: float = DEFAULT_DNS_QUERY_TIMEOUT,
+    port: int = DEFAULT_DNS_PORT,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Wait until every target serves (or no longer serves) a record.
+
+    All pending targets are queried concurrently each round; a target is done
+    once its answer matches and, when a baseline serial is known for it, its
+    SOA serial is newer than that baseline.
+
+    Args:
+        targets: ``{'nameserver', 'address'}`` records (see ``server_targets``)
+        zone: Zone apex (for the SOA query)
+        owner: Fully qualified record owner
+        rdtype: Record type
+        rdata: Expected record data (WAPI or presentation form)
+        present: True to wait for the record, False to wait for its removal
+        min_serials: Baseline SOA serial per address, captured before the change
+        timeout: Seconds before giving up
+        interval: Seconds between rounds
+        query_timeout: Seconds per DNS query
+        port: Nameserver port
+        on_progress: Called with (done, total) after each round
+
+    Returns:
+        One result per target (see VERIFY_HEADERS); status is ``ok``, ``pending`` or ``error``
+    """
+    logger = get_logger('utils.dns_check')
+    expected = normalize_rdata(rdtype, rdata)
+    min_serials = min_serials or {}
+    started = time.monotonic()
+    results = {i: {'nameserver': t['nameserver'], 'address': t['address'], 'status': 'pending',
+                   'serial': '', 'elapsed': '', 'detail': ''} for i, t in enumerate(targets)}
+    for i, target in enumerate(targets):
+        if not target['address']:
+            results[i].update(status='error', detail='cannot resolve nameserver address')
+    pending = [i for i in results if results[i]['status'] == 'pending']
+
+    def _probe(i):
+        address = targets[i]['address']
+        answer = query(address, owner, rdtype, timeout=query_timeout, port=port)
+        if answer.rcode not in (0, 3):
+            raise WAPIDNSLookupError(f"{answer.rcode_name} from {address}")
+        served = {normalize_rdata(rdtype, r) for r in answer.rdatas(rdtype, owner)}
+        if (expected in served) != present:
+            return False, None, 'record not served yet' if present else 'record still served'
+        baseline = min_serials.get(address)
+        if baseline is None:
+            return True, None, ''
+        serial = soa_serial(query(address, zone, 'SOA', timeout=query_timeout, port=port), zone)
+        if serial is None or not serial_newer(serial, baseline):
+            return False, serial, f"serial {serial} not newer than {baseline}"
+        return True, serial, ''
+
+    while pending:
+        for i, outcome, error in run_concurrently(pending, _probe, workers=len(pending),
+                                                  quiet=True):
+            result = results[i]
+            if error is not None:
+                result['detail'] = str(error)
+                continue
+            done, serial, detail = outcome
+            result['serial'] = serial if serial is not None else result['serial']
+            result['detail'] = detail
+            if done:
+                result['status'] = 'ok'
+                result['elapsed'] = f"{time.monotonic() - started:.1f}s"
+        pending = [i for i in pending if results[i]['status'] == 'pending']
+        if on_progress is not None:
+            on_progress(len(targets) - len(pending), len(targets))
+        if not pending or time.monotonic() - started + interval > timeout:
+            break
+        time.sleep(interval)
+
+    logger.info(f"DNS verification of {owner} {rdtype}: "
+                f"{len(targets) - len(pending)}/{len(targets)} nameserver address(es) up to date")
+    return [results[i] for i in sorted(results)]
+
+
+def require_verified(results: List[Dict[str, Any]], owner: str, rdtype: str):
+    """
+    Raise if any target is not up to date.
+
+    Raises:
+        WAPITimeoutError: Listing the lagging nameservers
+    """
+    lagging = [f"{r['nameserver']} ({r['address'] or 'unresolved'})"
+               for r in results if r['status'] != 'ok']
+    if lagging:
+        raise WAPITimeoutError(f"{owner} {rdtype} not served by: {', '.join(lagging)}")
+
+
+def probe_nameserver(address: str, zone: str, timeout: float = DEFAULT_DNS_QUERY_TIMEOUT,
+                     port: int = DEFAULT_DNS_PORT) -> Dict[str, Any]:
+    """
+    Ask one nameserver address for the SOA and NS records of a zone.
+
+    Returns:
+        ``{'status', 'serial', 'latency_ms', 'ns', 'detail'}`` where status is
+        ``ok``, ``lame`` (answers, but not authoritatively for the zone),
+        ``timeout`` or ``error``; ns is the served NS set (None if not read)
+    """
+    result: Dict[str, Any] = {'status': 'ok', 'serial': None, 'latency_ms': None, 'ns': None,
+                              'detail': ''}
+    started = time.monotonic()
+    try:
+        soa = query(address, zone, 'SOA', timeout=timeout, port=port)
+        result['latency_ms'] = round((time.monotonic() - started) * 1000, 1)
+        result['serial'] = soa_serial(soa, zone)
+        if soa.rcode != 0 or not soa.authoritative or result['serial'] is None:
+            result['status'] = 'lame'
+            result['detail'] = soa.rcode_name if soa.rcode != 0 else (
+                'not authoritative' if not soa.authoritative else 'no SOA record')
+            return result
+        ns = query(address, zone, 'NS', timeout=timeout, port=port)
+        result['ns'] = {normalize_name(host) for host in ns.rdatas('NS', zone)}
+    except WAPITimeoutError:
+        result.update(status='timeout', detail='no answer')
+    except WAPIDNSLookupError as e:
+        result.update(status='error', detail=str(e))
+    return result
+
+
+def domain_issues(nameservers: List[Dict[str, str]], probes: List[Dict[str, Any]]) -> List[str]:
+    """
+    Inconsistencies of one domain from its probe results.
+
+    Args:
+        nameservers: Delegated nameservers (``{'host', ...}``)
+        probes: Probe results with ``status``, ``serial`` and ``ns``
+
+    Returns:
+        Sorted issue labels, e.g. ``lame``, ``unreachable``, ``serial-drift``, ``ns-mismatch``
+    """
+    issues = set()
+    if not nameservers:
+        issues.add('no-nameservers')
+    for probe in probes:
+        if probe['status'] == 'lame':
+            issues.add('lame')
+        elif probe['status'] in ('timeout', 'error', 'unresolved'):
+            issues.add('unreachable')
+    if len({p['serial'] for p in probes if p['status'] == 'ok'}) > 1:
+        issues.add('serial-drift')
+    delegated = {normalize_name(ns['host']) for ns in nameservers}
+    if any(p['ns'] is not None and p['ns'] != delegated for p in probes):
+        issues.add('ns-mismatch')
+    return sorted(issues)
+
+
+def scan_health(
+    domains: Iterable[Tuple[str, List[Dict[str, str]]]],
+    workers: int = DEFAULT_HEALTH_WORKERS,
+    per_server: int = DEFAULT_HEALTH_PER_SERVER,
+    timeout: float = DEFAULT_DNS_QUERY_TIMEOUT,
+    port: int = DEFAULT_DNS_PORT,
+    resolver: Optional[ResolverCache] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Probe the nameservers of many domains concurrently.
+
+    Every (domain, nameserver host) pair is one task on a shared pool; hosts
+    are resolved through ``resolver`` and each nameserver address is queried
+    by at most ``per_server`` tasks at a time, so a portfolio on a few shared
+    nameservers does not flood them.
+
+    Args:
+        domains: (domain, nameservers) pairs, nameservers as from ``nameservers_from_dns``
+        workers: Maximum concurrent tasks
+        per_server: Maximum concurrent queries per nameserver address
+        timeout: Seconds per DNS query
+        port: Nameserver port
+        resolver: Host address cache (a new one if None)
+
+    Yields:
+        Rows of one domain (see HEALTH_HEADERS, plus the served ``ns`` set) as
+        soon as all its nameservers have been probed, in completion order
+    """
+    logger = get_logger('utils.dns_check')
+    resolver = resolver or ResolverCache()
+    domains = list(domains)
+    limits: Dict[str, threading.BoundedSemaphore] = {}
+    limits_lock = threading.Lock()
+    parent = current_span()
+
+    def _limit(address: str) -> threading.BoundedSemaphore:
+        with limits_lock:
+            if address not in limits:
+                limits[address] = threading.BoundedSemaphore(max(1, per_server))
+            return limits[address]
+
+    def _probe_host(zone: str, nameserver: Dict[str, str]) -> List[Dict[str, Any]]:
+        rows = []
+        attributes = {"dns.zone": zone, "dns.nameserver": nameserver['host']}
+        with start_span("dns.health.probe", attributes, parent=parent):
+            for target in server_targets([nameserver], resolver):
+                row = {'domain': zone, 'nameserver': target['nameserver'],
+                       'address': target['address']}
+                if not target['address']:
+                    row.update(status='unresolved', serial=None, latency_ms=None, ns=None,
+                               detail='cannot resolve nameserver address')
+                else:
+                    with _limit(target['address']):
+                        row.update(probe_nameserver(target['address'], zone, timeout=timeout,
+                                                    port=port))
+                rows.append(row)
+        return rows
+
+    def _finish(zone: str, nameservers: List[Dict[str, str]], rows: List[Dict[str, Any]]):
+        issues = ', '.join(domain_issues(nameservers, rows))
+        if not rows:
+            rows = [{'domain': zone, 'nameserver': '', 'address': '', 'status': 'error',
+                     'serial': None, 'latency_ms': None, 'ns': None, 'detail': 'no nameservers'}]
+        for row in rows:
+            row['issues'] = issues
+        return rows
+
+    pending: Dict[int, int] = {}
+    collected: Dict[int, Dict[int, List[Dict[str, Any]]]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {}
+        for i, (zone, nameservers) in enumerate(domains):
+            zone = normalize_name(zone)
+            pending[i] = len(nameservers)
+            collected[i] = {}
+            if not nameservers:
+                yield _finish(zone, nameservers, [])
+            for j, nameserver in enumerate(nameservers):
+                futures[executor.submit(_probe_host, zone, nameserver)] = (i, j)
+        for future in as_completed(futures):
+            i, j = futures[future]
+            zone, nameservers = domains[i]
+            try:
+                collected[i][j] = future.result()
+            except Exception as e:
+                logger.error(f"Health probe failed for {zone}: {e}")
+            pending[i] -= 1
+            if pending[i] == 0:
+                by_server = collected.pop(i)
+                # Rows follow the delegation order, whichever server answered first
+                rows = [row for k in sorted(by_server) for row in by_server[k]]
+                yield _finish(normalize_name(zone), nameservers, rows)
+    logger.info(f"DNS health scan of {len(domains)} domain(s) done; "
+                f"{resolver.lookups} nameserver host lookup(s)")
+
+
+def nameserver_summary(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per nameserver address: probe count, failures and latency (avg, p95, max in ms)"""
+    servers: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        if not row.get('address'):
+            continue
+        entry = servers.setdefault(row['address'], {'nameserver': row['nameserver'], 'probes': 0,
+                                                    'failures': 0, 'latencies': []})
+        entry['probes'] += 1
+        if row['status'] in ('timeout', 'error'):
+            entry['failures'] += 1
+        if row.get('latency_ms') is not None:
+            entry['latencies'].append(row['latency_ms'])
+    summary = []
+    for address in sorted(servers):
+        entry = servers[address]
+        latencies = sorted(entry.pop('latencies'))
+        stats = {'avg_ms': '', 'p95_ms': '', 'max_ms': ''}
+        if latencies:
+            stats = {'avg_ms': round(sum(latencies) / len(latencies), 1),
+                     'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                     'max_ms': latencies[-1]}
+        summary.append(dict({'address': address}, **entry, **stats))
+    return summary
+
+
+def _in_bailiwick(host: str, zone: str) -> bool:
+    return host == zone or host.endswith('.' + zone)
+
+
+def _ask_first(servers: List[Dict[str, str]], qname: str, rdtype: str, timeout: float,
+               port: int) -> Tuple[Dict[str, str], DNSResponse]:
+    """Query servers in order until one answers"""
+    last_error: Optional[Exception] = None
+    for server in servers:
+        try:
+            return server, query(server['address'], qname, rdtype, timeout=timeout, port=port)
+        except (WAPITimeoutError, WAPIDNSLookupError) as e:
+            last_error = e
+    raise WAPIDNSLookupError(f"No server answered {qname} {rdtype}: {last_error}")
+
+
+def _referral_targets(response: DNSResponse, owner: str,
+                      resolver: ResolverCache) -> List[Dict[str, str]]:
+    """One address per referred nameserver (IPv4 glue first, resolved when glue is missing)"""
+    targets = []
+    hosts = {normalize_name(h) for h in response.rdatas('NS', owner, section='authority')}
+    for host in sorted(hosts):
+        glue = (response.rdatas('A', host, section='additional')
+                + response.rdatas('AAAA', host, section='additional'))
+        addresses = glue or resolver.addresses(host)
+        if addresses:
+            targets.append({'nameserver': host, 'address': addresses[0]})
+    return targets
+
+
+def find_parent_servers(zone: str, timeout: float = DEFAULT_DNS_QUERY_TIMEOUT,
+                        port: int = DEFAULT_DNS_PORT,
+                        resolver: Optional[ResolverCache] = None,
+                        roots: Iterable[str] = DNS_ROOT_SERVERS) -> List[Dict[str, str]]:
+    """
+    Nameservers of the zone that delegates ``zone`` (e.g. the TLD servers).
+
+    Follows referrals from the root servers with non-recursive NS queries;
+    the servers that answer with a referral to ``zone`` itself are its parent.
+
+    Returns:
+        ``{'nameserver', 'address'}`` records, one address per server
+
+    Raises:
+        WAPIDNSLookupError: If no referral chain to the zone is found
+    """
+    zone = normalize_name(zone)
+    resolver = resolver or ResolverCache()
+    servers = [{'nameserver': '.', 'address': address} for address in roots]
+    for _ in range(DNS_MAX_REFERRALS):
+        _server, response = _ask_first(servers, zone, 'NS', timeout, port)
+        if response.rdatas('NS', zone):
+            # The parent also serves the child zone and answered for it directly
+            return servers
+        owners = {rr.name for rr in response.authority if rr.rdtype == 'NS'}
+        if zone in owners:
+            return servers
+        # Only follow referrals down towards the zone (never upward ones to the root)
+        owners = [o for o in owners if o and _in_bailiwick(zone, o)]
+        if not owners:
+            raise WAPIDNSLookupError(f"No referral towards {zone} ({response.rcode_name})")
+        servers = _referral_targets(response, max(owners, key=len), resolver)
+        if not servers:
+            raise WAPIDNSLookupError(f"Cannot reach the nameservers delegating {zone}")
+    raise WAPIDNSLookupError(f"Too many referrals while looking for the parent of {zone}")
+
+
+def _compare_ns(expected: Dict[str, Dict[str, str]], served: Iterable[str]) -> List[str]:
+    served = {normalize_name(host) for host in served}
+    problems = []
+    missing = sorted(set(expected) - served)
+    extra = sorted(served - set(expected))
+    if missing:
+        problems.append(f"NS missing {', '.join(missing)}")
+    if extra:
+        problems.append(f"NS extra {', '.join(extra)}")
+    return problems
+
+
+def _compare_addresses(host: str, ns: Dict[str, str], served: Dict[str, List[str]],
+                       what: str) -> List[str]:
+    problems = []
+    for rdtype, key in (('A', 'ipv4'), ('AAAA', 'ipv6')):
+        wanted = normalize_rdata(rdtype, ns.get(key, ''))
+        have = {normalize_rdata(rdtype, a) for a in served.get(rdtype, [])}
+        if wanted and wanted not in have:
+            found = ', '.join(sorted(have)) or 'none'
+            problems.append(f"{what} {host} {rdtype} {found} (expected {wanted})")
+    return problems
+
+
+def check_delegation(
+    zone: str,
+    nameservers: List[Dict[str, str]],
+    timeout: float = DEFAULT_DNS_QUERY_TIMEOUT,
+    port: int = DEFAULT_DNS_PORT,
+    resolver: Optional[ResolverCache] = None,
+    roots: Iterable[str] = DNS_ROOT_SERVERS,
+) -> List[Dict[str, Any]]:
+    """
+    Compare a zone's delegation with the nameservers submitted for it.
+
+    The parent servers (see ``find_parent_servers``) are asked for the
+    delegation NS set and glue; every address of every submitted nameserver is
+    asked for the zone's NS set and the addresses of in-zone nameservers. All
+    servers are queried concurrently.
+
+    Args:
+        zone: Domain name
+        nameservers: Submitted nameservers as ``{'host', 'ipv4', 'ipv6'}``
+            (see ``nameservers_from_dns``)
+        timeout: Seconds per DNS query
+        port: Nameserver port
+        resolver: Host address cache
+        roots: Root server addresses to start the referral walk from
+
+    Returns:
+        One row per server (see DELEGATION_HEADERS); status is ``ok``,
+        ``mismatch``, ``lame``, ``timeout`` or ``error``
+    """
+    logger = get_logger('utils.dns_check')
+    zone = normalize_name(zone)
+    resolver = resolver or ResolverCache()
+    expected = {normalize_name(ns['host']): ns for ns in nameservers}
+    in_zone = {host: ns for host, ns in expected.items() if _in_bailiwick(host, zone)}
+
+    rows = []
+    try:
+        parents = find_parent_servers(zone, timeout=timeout, port=port, resolver=resolver,
+                                      roots=roots)
+    except (WAPIDNSLookupError, WAPITimeoutError) as e:
+        rows.append({'source': 'parent', 'server': '', 'address': '', 'status': 'error',
+                     'detail': str(e)})
+        parents = []
+    probes = [('parent', target) for target in parents]
+    probes += [('child', target) for target in server_targets(nameservers, resolver)]
+
+    def _check_parent(target: Dict[str, str]) -> Tuple[str, str]:
+        response = query(target['address'], zone, 'NS', timeout=timeout, port=port)
+        section = 'answer' if response.rdatas('NS', zone) else 'authority'
+        problems = _compare_ns(expected, response.rdatas('NS', zone, section=section))
+        for host, ns in sorted(in_zone.items()):
+            glue = {rdtype: response.rdatas(rdtype, host, section='additional')
+                    for rdtype in ('A', 'AAAA')}
+            problems.extend(_compare_addresses(host, ns, glue, 'glue'))
+        return 'mismatch' if problems else 'ok', '; '.join(problems)
+
+    def _check_child(target: Dict[str, str]) -> Tuple[str, str]:
+        response = query(target['address'], zone, 'NS', timeout=timeout, port=port)
+        if response.rcode != 0 or not response.authoritative:
+            return 'lame', response.rcode_name if response.rcode else 'not authoritative'
+        problems = _compare_ns(expected, response.rdatas('NS', zone))
+        for host, ns in sorted(in_zone.items()):
+            served = {}
+            for rdtype, key in (('A', 'ipv4'), ('AAAA', 'ipv6')):
+                if ns.get(key):
+                    answer = query(target['address'], host, rdtype, timeout=timeout, port=port)
+                    served[rdtype] = answer.rdatas(rdtype, host)
+            problems.extend(_compare_addresses(host, ns, served, 'address of'))
+        return 'mismatch' if problems else 'ok', '; '.join(problems)
+
+    def _check(probe: Tuple[str, Dict[str, str]]) -> Tuple[str, str]:
+        source, target = probe
+        if not target['address']:
+            raise WAPIDNSLookupError('cannot resolve nameserver address')
+        return _check_parent(target) if source == 'parent' else _check_child(target)
+
+    outcomes = run_concurrently(probes, _check, workers=len(probes) or 1, quiet=True)
+    for (source, target), outcome, error in outcomes:
+        row = {'source': source, 'server': target['nameserver'], 'address': target['address']}
+        if isinstance(error, WAPITimeoutError):
+            row.update(status='timeout', detail='no answer')
+        elif error is not None:
+            row.update(status='error', detail=str(error))
+        else:
+            row.update(status=outcome[0], detail=outcome[1])
+        rows.append(row)
+    consistent = sum(1 for r in rows if r['status'] == 'ok')
+    logger.info(f"Delegation check of {zone}: {consistent}/{len(rows)} consistent")
+    return rows
+
+
+def zone_servers(zone: str, timeout: float = DEFAULT_DNS_QUERY_TIMEOUT,
+                 port: int = DEFAULT_DNS_PORT,
+                 resolver: Optional[ResolverCache] = None,
+                 roots: Iterable[str] = DNS_ROOT_SERVERS) -> List[Dict[str, str]]:
+    """
+    Authoritative nameservers of ``zone`` (e.g. a TLD), found from its parent.
+
+    Returns:
+        ``{'nameserver', 'address'}`` records, one address per server
+
+    Raises:
+        WAPIDNSLookupError: If the zone's servers cannot be found
+    """
+    zone = normalize_name(zone)
+    resolver = resolver or ResolverCache()
+    parents = find_parent_servers(zone, timeout=timeout, port=port, resolver=resolver, roots=roots)
+    _server, response = _ask_first(parents, zone, 'NS', timeout, port)
+    targets = _referral_targets(response, zone, resolver)
+    if not targets:
+        # The parent also serves the zone and answered with its NS set
+        for host in sorted({normalize_name(h) for h in response.rdatas('NS', zone)}):
+            addresses = resolver.addresses(host)
+            if addresses:
+                targets.append({'nameserver': host, 'address': addresses[0]})
+    if not targets:
+        raise WAPIDNSLookupError(f"Cannot reach the nameservers of {zone}")
+    return targets
+
+
+def prefilter_delegations(
+    domains: List[str],
+    workers: int = DEFAULT_PREFILTER_WORKERS,
+    timeout: float = DEFAULT_DNS_QUERY_TIMEOUT,
+    port: int = DEFAULT_DNS_PORT,
+    resolver: Optional[ResolverCache] = None,
+    roots: Iterable[str] = DNS_ROOT_SERVERS,
+) -> List[Tuple[str, Optional[List[str]]]]:
+    """
+    Find which candidate names are delegated in their parent zone.
+
+    Each name is asked for with one non-recursive NS query to its parent
+    zone's servers (found once per parent and spread round-robin over its
+    servers). A referral or NS answer means the name is registered. No
+    delegation, a timeout or an error leaves it undetermined: names can be
+    registered without nameservers, so only the positive answer is trusted.
+
+    Args:
+        domains: Candidate domain names
+        workers: Concurrent queries
+        timeout: Seconds per DNS query
+        port: Nameserver port
+        resolver: Host address cache
+        roots: Root server addresses
+
+    Returns:
+        (domain, nameservers) in input order; nameservers is None when no
+        delegation was found
+    """
+    logger = get_logger('utils.dns_check')
+    resolver = resolver or ResolverCache()
+    lock = threading.Lock()
+    parents: Dict[str, List[Dict[str, str]]] = {}
+    flight = SingleFlight()
+
+    def _parent_servers(parent: str) -> List[Dict[str, str]]:
+        with lock:
+            if parent in parents:
+                return parents[parent]
+
+        def _lookup():
+            try:
+                servers = zone_servers(parent, timeout=timeout, port=port, resolver=resolver,
+                                       roots=roots)
+            except (WAPIDNSLookupError, WAPITimeoutError) as e:
+                logger.warning(f"Cannot find the nameservers of {parent}: {e}")
+                servers = []
+            with lock:
+                parents[parent] = servers
+            return servers
+
+        return flight.do(parent, _lookup)[0]
+
+    def _delegation(item: Tuple[int, str]) -> Optional[List[str]]:
+        position, domain = item
+        name = normalize_name(domain)
+        servers = _parent_servers(name.split('.', 1)[1] if '.' in name else '')
+        if not servers:
+            return None
+        start = position % len(servers)
+        try:
+            rotated = servers[start:] + servers[:start]
+            _server, response = _ask_first(rotated, name, 'NS', timeout, port)
+        except WAPIDNSLookupError as e:
+            logger.debug(f"No delegation answer for {name}: {e}")
+            return None
+        hosts = response.rdatas('NS', name, section='authority') or response.rdatas('NS', name)
+        return sorted({normalize_name(h) for h in hosts}) or None
+
+    with start_span("dns.prefilter", {"dns.prefilter.domains": len(domains)}) as span:
+        results = [(domain, nameservers) for (_position, domain), nameservers, _error
+                   in run_concurrently(list(enumerate(domains)), _delegation, workers=workers,
+                                       quiet=True)]
+        delegated = sum(1 for _domain, nameservers in results if nameservers)
+        span.set_attribute("dns.prefilter.delegated", delegated)
+    logger.info(f"DNS pre-filter: {delegated}/{len(results)} name(s) delegated")
+    return results
@@ -11,6 +11,7 @@ from typing import List, Optional, Tuple
 from ..exceptions import WAPIDNSLookupError, WAPITimeoutError
 from ..utils.validators import validate_ipv6
 from .logger import get_logger
+from .tracing import start_span
 
 # Try to import dnspython, fallback to socket if not available
 try:
@@ -58,7 +59,8 @@ def get_ipv6_from_ipv4(ipv4: str, timeout: int = DNS_LOOKUP_TIMEOUT) -> Optional
         
         # Try reverse DNS lookup to get hostname
         try:
-            hostname, _, _ = socket.gethostbyaddr(ipv4)
+            with start_span("dns.reverse", {"dns.address": ipv4}):
+                hostname, _, _ = socket.gethostbyaddr(ipv4)
             logger.debug(f"Reverse DNS for {ipv4}: {hostname}")
         except _SOCKET_ERROR_TYPES as e: # pragma: no cover
             logger.debug(f"Reverse DNS lookup failed for {ipv4}: {e}")
@@ -70,7 +72,8 @@ def get_ipv6_from_ipv4(ipv4: str, timeout: int = DNS_LOOKUP_TIMEOUT) -> Optional
                 resolver = dns.resolver.Resolver()
                 resolver.timeout = timeout
                 resolver.lifetime = timeout
-                answers = resolver.resolve(hostname, 'AAAA')
+                with start_span("dns.resolve", {"dns.qname": hostname, "dns.qtype": "AAAA"}):
+                    answers = resolver.resolve(hostname, 'AAAA')
                 if answers:
                     ipv6 = str(answers[0])
                     # Validate IPv6 address
@@ -90,7 +93,8 @@ def get_ipv6_from_ipv4(ipv4: str, timeout: int = DNS_LOOKUP_TIMEOUT) -> Optional
         
         # Fallback: try socket.getaddrinfo regardless of dnspython availability
         try: # pragma: no cover
-            addrinfo = socket.getaddrinfo(hostname, None, socket.AF_INET6, socket.SOCK_STREAM)
+            with start_span("dns.getaddrinfo", {"dns.qname": hostname, "dns.qtype": "AAAA"}):
+                addrinfo = socket.getaddrinfo(hostname, None, socket.AF_INET6, socket.SOCK_STREAM)
             if addrinfo:
                 ipv6 = addrinfo[0][4][0]
                 # Validate IPv6 address
@@ -138,7 +142,8 @@ def get_ipv6_from_nameserver(ns_name: str, ipv4: str, timeout: int = DNS_LOOKUP_
             resolver = dns.resolver.Resolver()
             resolver.timeout = timeout
             resolver.lifetime = timeout
-            answers = resolver.resolve(ns_name, 'AAAA')
+            with start_span("dns.resolve", {"dns.qname": ns_name, "dns.qtype": "AAAA"}):
+                answers = resolver.resolve(ns_name, 'AAAA')
             if answers:
                 ipv6 = str(answers[0])
                 # Validate IPv6 address
@@ -159,7 +164,8 @@ def get_ipv6_from_nameserver(ns_name: str, ipv4: str, timeout: int = DNS_LOOKUP_
     # Fallback: try socket.getaddrinfo regardless of dnspython availability
     try:
         socket.setdefaulttimeout(timeout)
-        addrinfo = socket.getaddrinfo(ns_name, None, socket.AF_INET6, socket.SOCK_STREAM)
+        with start_span("dns.getaddrinfo", {"dns.qname": ns_name, "dns.qtype": "AAAA"}):
+            addrinfo = socket.getaddrinfo(ns_name, None, socket.AF_INET6, socket.SOCK_STREAM)
         if addrinfo:
             ipv6 = addrinfo[0][4][0]
             # Validate IPv6 address
@@ -0,0 +1,293 @@
+"""
+Minimal DNS wire-protocol client for WAPI CLI
+
+Sends single, non-recursive queries straight to a given nameserver over UDP
+(retrying over TCP when the answer is truncated), so commands can ask a
+domain's authoritative servers what they actually serve instead of trusting
+a recursive resolver or WAPI. Only the standard library is used; rdata of
+common record types is decoded to presentation format.
+"""
+
+import ipaddress
+import random
+import re
+import socket
+import struct
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from ..constants import DEFAULT_DNS_QUERY_TIMEOUT
+from ..exceptions import WAPIDNSLookupError, WAPITimeoutError
+from .tracing import start_span
+
+RDTYPES: Dict[str, int] = {
+    'A': 1, 'NS': 2, 'CNAME': 5, 'SOA': 6, 'PTR': 12, 'MX': 15, 'TXT': 16,
+    'AAAA': 28, 'SRV': 33, 'DS': 43, 'DNSKEY': 48, 'CAA': 257,
+}
+RDTYPE_NAMES: Dict[int, str] = {value: key for key, value in RDTYPES.items()}
+RCODE_NAMES = {0: 'NOERROR', 1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED'}
+CLASS_IN = 1
+NAME_TYPES = ('NS', 'CNAME', 'PTR')
+
+ResourceRecord = namedtuple('ResourceRecord', ['name', 'rdtype', 'ttl', 'rdata'])
+
+
+def normalize_name(name: str) -> str:
+    """Lower-case a domain name and drop the trailing dot"""
+    return str(name or '').strip().rstrip('.').lower()
+
+
+def _encode_name(name: str) -> bytes:
+    out = bytearray()
+    for label in normalize_name(name).split('.') if normalize_name(name) else []:
+        try:
+            encoded = label.encode('ascii')
+        except UnicodeEncodeError:
+            encoded = label.encode('idna')
+        if not 0 < len(encoded) < 64:
+            raise WAPIDNSLookupError(f"Invalid DNS label in {name!r}")
+        out.append(len(encoded))
+        out += encoded
+    out.append(0)
+    return bytes(out)
+
+
+def build_query(qname: str, rdtype: str, query_id: int, recursion_desired: bool = False) -> bytes:
+    """Encode a single-question DNS query"""
+    flags = 0x0100 if recursion_desired else 0
+    header = struct.pack('!HHHHHH', query_id, flags, 1, 0, 0, 0)
+    return header + _encode_name(qname) + struct.pack('!HH', RDTYPES[rdtype.upper()], CLASS_IN)
+
+
+def _read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(data):
+            raise WAPIDNSLookupError("Truncated name in DNS response")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(data) or jumps > 32:
+                raise WAPIDNSLookupError("Invalid compression pointer in DNS response")
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            jumps += 1
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode('ascii', errors='replace'))
+        offset += length
+    return '.'.join(labels).lower(), end if end is not None else offset
+
+
+def _character_strings(rdata: bytes) -> List[str]:
+    strings = []
+    offset = 0
+    while offset < len(rdata):
+        length = rdata[offset]
+        strings.append(rdata[offset + 1:offset + 1 + length].decode('utf-8', errors='replace'))
+        offset += 1 + length
+    return strings
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _decode_rdata(data: bytes, offset: int, length: int, rdtype: int) -> str:
+    rdata = data[offset:offset + length]
+    name = RDTYPE_NAMES.get(rdtype)
+    if name == 'A' and length == 4:
+        return socket.inet_ntoa(rdata)
+    if name == 'AAAA' and length == 16:
+        return str(ipaddress.IPv6Address(rdata))
+    if name in NAME_TYPES:
+        return _read_name(data, offset)[0]
+    if name == 'MX':
+        return f"{struct.unpack('!H', rdata[:2])[0]} {_read_name(data, offset + 2)[0]}"
+    if name == 'TXT':
+        return ' '.join(_quote(s) for s in _character_strings(rdata))
+    if name == 'SOA':
+        mname, pos = _read_name(data, offset)
+        rname, pos = _read_name(data, pos)
+        timers = struct.unpack('!IIIII', data[pos:pos + 20])
+        return ' '.join([mname, rname] + [str(v) for v in timers])
+    if name == 'SRV':
+        priority, weight, port = struct.unpack('!HHH', rdata[:6])
+        return f"{priority} {weight} {port} {_read_name(data, offset + 6)[0]}"
+    if name == 'CAA':
+        tag_length = rdata[1]
+        tag = rdata[2:2 + tag_length].decode('ascii', errors='replace')
+        value = rdata[2 + tag_length:].decode('utf-8', errors='replace')
+        return f"{rdata[0]} {tag} {_quote(value)}"
+    return f"\\# {length} {rdata.hex()}"
+
+
+class DNSResponse:
+    """Decoded DNS response"""
+
+    def __init__(self, query_id: int, rcode: int, authoritative: bool, truncated: bool,
+                 answer: List[ResourceRecord], authority: List[ResourceRecord],
+                 additional: List[ResourceRecord]):
+        self.query_id = query_id
+        self.rcode = rcode
+        self.authoritative = authoritative
+        self.truncated = truncated
+        self.answer = answer
+        self.authority = authority
+        self.additional = additional
+
+    @property
+    def rcode_name(self) -> str:
+        return RCODE_NAMES.get(self.rcode, str(self.rcode))
+
+    def rdatas(self, rdtype: str, name: Optional[str] = None, section: str = 'answer') -> List[str]:
+        """Rdata of the records of one type (and owner name) in a section"""
+        wanted = normalize_name(name) if name is not None else None
+        return [rr.rdata for rr in getattr(self, section)
+                if rr.rdtype == rdtype.upper() and (wanted is None or rr.name == wanted)]
+
+
+def parse_response(data: bytes) -> DNSResponse:
+    """
+    Decode a DNS response message.
+
+    Raises:
+        WAPIDNSLookupError: If the message is malformed
+    """
+    try:
+        query_id, flags, qdcount, ancount, nscount, arcount = struct.unpack('!HHHHHH', data[:12])
+        offset = 12
+        for _ in range(qdcount):
+            offset = _read_name(data, offset)[1] + 4
+        sections = []
+        for count in (ancount, nscount, arcount):
+            records = []
+            for _ in range(count):
+                owner, offset = _read_name(data, offset)
+                rdtype, _rdclass, ttl, length = struct.unpack('!HHIH', data[offset:offset + 10])
+                offset += 10
+                if offset + length > len(data):
+                    raise WAPIDNSLookupError("Truncated record in DNS response")
+                records.append(ResourceRecord(owner, RDTYPE_NAMES.get(rdtype, f"TYPE{rdtype}"), ttl,
+                                              _decode_rdata(data, offset, length, rdtype)))
+                offset += length
+            sections.append(records)
+    except (struct.error, IndexError, ValueError) as e:
+        raise WAPIDNSLookupError(f"Malformed DNS response: {e}") from e
+    return DNSResponse(query_id, flags & 0x000F, bool(flags & 0x0400), bool(flags & 0x0200),
+                       *sections)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = b''
+    while len(chunks) < size:
+        chunk = sock.recv(size - len(chunks))
+        if not chunk:
+            raise WAPIDNSLookupError("Connection closed during DNS response")
+        chunks += chunk
+    return chunks
+
+
+def _family(server: str) -> int:
+    return socket.AF_INET6 if ':' in server else socket.AF_INET
+
+
+def query(server: str, qname: str, rdtype: str, timeout: float = DEFAULT_DNS_QUERY_TIMEOUT,
+          port: int = 53, tcp: bool = False, recursion_desired: bool = False) -> DNSResponse:
+    """
+    Send one query to one nameserver.
+
+    Args:
+        server: Nameserver IP address
+        qname: Name to query
+        rdtype: Record type (e.g. "A", "SOA")
+        timeout: Seconds to wait for the answer
+        port: Nameserver port (tests point this at a local stub)
+        tcp: Use TCP from the start (UDP answers with TC set are retried over TCP)
+        recursion_desired: Set the RD flag (off: ask the server about its own data)
+
+    Returns:
+        Decoded response
+
+    Raises:
+        WAPITimeoutError: If the server does not answer in time
+        WAPIDNSLookupError: On network errors or malformed answers
+    """
+    query_id = random.getrandbits(16)
+    message = build_query(qname, rdtype, query_id, recursion_desired)
+    with start_span("dns.query", {"dns.server": server, "dns.qname": qname, "dns.qtype": rdtype,
+                                  "dns.transport": "tcp" if tcp else "udp"}) as span:
+        sock = socket.socket(_family(server), socket.SOCK_STREAM if tcp else socket.SOCK_DGRAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect((server, port))
+            if tcp:
+                sock.sendall(struct.pack('!H', len(message)) + message)
+                data = _recv_exact(sock, struct.unpack('!H', _recv_exact(sock, 2))[0])
+            else:
+                sock.send(message)
+                while True:
+                    data = sock.recv(65535)
+                    # Ignore stray datagrams that do not answer this query
+                    if len(data) >= 2 and struct.unpack('!H', data[:2])[0] == query_id:
+                        break
+        except socket.timeout as e:
+            raise WAPITimeoutError(f"DNS query to {server} timed out") from e
+        except OSError as e:
+            raise WAPIDNSLookupError(f"DNS query to {server} failed: {e}") from e
+        finally:
+            sock.close()
+        response = parse_response(data)
+        span.set_attribute("dns.rcode", response.rcode_name)
+    if response.query_id != query_id:
+        raise WAPIDNSLookupError(f"DNS response from {server} does not match the query")
+    if response.truncated and not tcp:
+        return query(server, qname, rdtype, timeout, port, tcp=True,
+                     recursion_desired=recursion_desired)
+    return response
+
+
+def soa_serial(response: DNSResponse, zone: Optional[str] = None) -> Optional[int]:
+    """SOA serial from the answer section (or None)"""
+    for rdata in response.rdatas('SOA', zone):
+        try:
+            return int(rdata.split()[2])
+        except (IndexError, ValueError):
+            return None
+    return None
+
+
+def serial_newer(serial: int, than: int) -> bool:
+    """RFC 1982 serial number comparison: True if ``serial`` is newer than ``than``"""
+    return serial != than and ((serial - than) % 2 ** 32) < 2 ** 31
+
+
+def normalize_rdata(rdtype: str, rdata: str) -> str:
+    """
+    Canonical form of rdata for comparisons.
+
+    WAPI rows and DNS answers may differ in case, trailing dots, quoting of
+    TXT strings and IPv6 notation; this maps both to the same string.
+    """
+    rdtype = rdtype.upper()
+    value = str(rdata or '').strip()
+    if rdtype == 'TXT':
+        strings = re.findall(r'"((?:[^"\\]|\\.)*)"', value)
+        if strings:
+            value = ''.join(s.replace('\\"', '"').replace('\\\\', '\\') for s in strings)
+        return value
+    if rdtype in ('A', 'AAAA'):
+        try:
+            return str(ipaddress.ip_address(value))
+        except ValueError:
+            return value.lower()
+    if rdtype == 'CAA':
+        parts = value.split(None, 2)
+        if len(parts) == 3:
+            return ' '.join([parts[0], parts[1].lower(), parts[2].strip('"')])
+        return value
+    return ' '.join(part.rstrip('.') for part in value.lower().split())
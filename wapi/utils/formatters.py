@@ -1,11 +1,22 @@
 """
 Output formatting utilities for WAPI CLI
 
-Supports multiple output formats: table, JSON, XML, YAML
+Supports multiple output formats: table, JSON, XML, YAML, and the streaming
+formats NDJSON, CSV and fixed-width table. XML is also written incrementally.
+
+Streaming formats are produced by generators (``iter_format``) and written
+incrementally by ``write_output``, so rows appear as records are produced
+instead of after the whole result has been formatted.
 """
 
-import json
-from typing import Any, Dict, List
+import csv
+import io
+import itertools
+import re
+import sys
+import types
+from typing import Any, Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape as xml_escape
 
 try:
     import yaml
@@ -21,8 +32,18 @@ try:
 except ImportError:
     TABULATE_AVAILABLE = False
 
+from .codec import get_json_codec
 from .logger import get_logger
 
+# Formats written record by record
+STREAMING_FORMATS = ('ndjson', 'csv', 'fixed', 'xml')
+
+# Number of leading records used to size fixed-width table columns
+TABLE_SAMPLE_SIZE = 100
+
+# Widest column in fixed-width tables; longer cells are truncated
+MAX_COLUMN_WIDTH = 60
+
 
 def format_table(data: Any, headers: List[str] = None) -> str:
     """
@@ -75,43 +96,86 @@ def format_json(data: Any, indent: int = 2) -> str:
     Returns:
         Formatted JSON string
     """
-    return json.dumps(data, indent=indent, ensure_ascii=False)
+    return get_json_codec().dumps_pretty(data, indent=indent)
 
 
-def format_xml(data: Any) -> str:
+_XML_TAG_INVALID = re.compile(r'[^A-Za-z0-9_.-]')
+_XML_END = object()
+
+
+def _xml_tag(key: Any) -> str:
+    """Turn a dict key into a valid XML element name"""
+    tag = _XML_TAG_INVALID.sub('_', str(key))
+    if not tag or not (tag[0].isalpha() or tag[0] == '_'):
+        tag = '_' + tag
+    return tag
+
+
+def _is_xml_sequence(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) or isinstance(value, types.GeneratorType)
+
+
+def iter_xml(data: Any, root: str = 'response', item_tag: str = 'item') -> Iterator[str]:
     """
-    Format data as XML (simplified).
-    
-    Note: This is a basic formatter. For complex XML, use proper XML library.
-    
+    Format data as escaped XML, one line per chunk.
+
+    The document is walked with an explicit stack, so memory use is bounded
+    by nesting depth and records from a generator are written as they are
+    produced. Nested lists become ``<key_list>`` elements with one ``<key>``
+    child per item; a top-level list becomes ``<item>`` children of the root.
+
     Args:
-        data: Data to format
-        
-    Returns:
-        Formatted XML string
+        data: Dict, list or iterable of records
+        root: Root element name
+        item_tag: Element name for top-level list items
+
+    Yields:
+        XML lines terminated by a newline
     """
-    def _to_xml(key, value, indent="  "):
-        spaces = indent
+    if isinstance(data, dict):
+        items = iter(data.items())
+    else:
+        items = zip(itertools.repeat(item_tag), _iter_records(data))
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<{root}>\n'
+    # Each frame: (iterator of (key, value) pairs, closing tag, depth)
+    stack = [(items, root, 0)]
+    while stack:
+        frame_items, closing, depth = stack[-1]
+        pair = next(frame_items, _XML_END)
+        if pair is _XML_END:
+            stack.pop()
+            yield f'{"  " * depth}</{closing}>\n'
+            continue
+
+        key, value = pair
+        tag = _xml_tag(key)
+        pad = '  ' * (depth + 1)
         if isinstance(value, dict):
-            inner = []
-            inner.append(f"{spaces}  <!-- ... -->")
-            for k, v in value.items():
-                inner.append(_to_xml(k, v, indent + "  "))
-            inner_str = "\n".join(inner)
-            return f"{spaces}<{key}>\n{inner_str}\n{spaces}</{key}>"
-        elif isinstance(value, list):
-            inner_items = "\n".join(_to_xml(key, v, indent + "  ") for v in value)
-            inner = f"{spaces}  <!-- ... -->\n{inner_items}"
-            return f"{spaces}<{key}_list>\n{inner}\n{spaces}</{key}_list>"
+            yield f'{pad}<{tag}>\n'
+            stack.append((iter(value.items()), tag, depth + 1))
+        elif _is_xml_sequence(value):
+            yield f'{pad}<{tag}_list>\n'
+            stack.append((zip(itertools.repeat(key), value), f'{tag}_list', depth + 1))
+        elif value is None:
+            yield f'{pad}<{tag} />\n'
         else:
-            return f"{spaces}<{key}>{value}</{key}>"
+            yield f'{pad}<{tag}>{xml_escape(str(value))}</{tag}>\n'
 
-    if isinstance(data, dict):
-        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<response>']
-        for key, value in data.items():
-            lines.append(_to_xml(key, value))
-        lines.append('</response>')
-        return '\n'.join(lines)
+
+def format_xml(data: Any) -> str:
+    """
+    Format data as XML.
+
+    Args:
+        data: Data to format (dict or list of records)
+
+    Returns:
+        Formatted XML string
+    """
+    if isinstance(data, (dict, list, tuple)) or isinstance(data, types.GeneratorType):
+        return ''.join(iter_xml(data)).rstrip('\n')
     return str(data)
 
 
@@ -131,14 +195,227 @@ def format_yaml(data: Any) -> str:
     return yaml.dump(data, default_flow_style=False, allow_unicode=True)
 
 
+def is_streaming_format(format_type: Any) -> bool:
+    """Return True for formats that are written record by record"""
+    return isinstance(format_type, str) and format_type.lower() in STREAMING_FORMATS
+
+
+def _iter_records(data: Any) -> Iterator[Any]:
+    """Yield records from a list/iterable; a single dict is one record"""
+    if data is None:
+        return
+    if isinstance(data, (dict, str, bytes)):
+        yield data
+        return
+    try:
+        iterator = iter(data)
+    except TypeError:
+        yield data
+        return
+    for record in iterator:
+        yield record
+
+
+def _record_headers(record: Any) -> List[str]:
+    if isinstance(record, dict):
+        return [str(key) for key in record.keys()]
+    return ['value']
+
+
+def _record_values(record: Any, headers: List[str]) -> List[Any]:
+    if isinstance(record, dict):
+        return [record.get(h, '') for h in headers]
+    return [record]
+
+
+def _cell_text(value: Any) -> str:
+    """Render a cell value on a single line (nested values as compact JSON)"""
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return get_json_codec().dumps(value)
+    return str(value)
+
+
+def iter_ndjson(records: Iterable[Any]) -> Iterator[str]:
+    """
+    Format records as newline-delimited JSON, one line per record.
+
+    Args:
+        records: Iterable of records (a single dict is one record)
+
+    Yields:
+        JSON lines terminated by a newline
+    """
+    codec = get_json_codec()
+    for record in _iter_records(records):
+        yield codec.dumps(record) + '\n'
+
+
+def iter_csv(records: Iterable[Any], headers: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Format records as CSV, one line per record.
+
+    Args:
+        records: Iterable of records (a single dict is one record)
+        headers: Column names (default: keys of the first record)
+
+    Yields:
+        Header line followed by one CSV line per record
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    def _take():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    columns = list(headers) if headers else None
+    if columns:
+        writer.writerow(columns)
+        yield _take()
+    for record in _iter_records(records):
+        if columns is None:
+            columns = _record_headers(record)
+            writer.writerow(columns)
+            yield _take()
+        writer.writerow([_cell_text(v) for v in _record_values(record, columns)])
+        yield _take()
+
+
+def iter_fixed_table(records: Iterable[Any], headers: Optional[List[str]] = None,
+                     sample_size: int = TABLE_SAMPLE_SIZE,
+                     max_width: int = MAX_COLUMN_WIDTH) -> Iterator[str]:
+    """
+    Format records as a fixed-width table.
+
+    Column widths are computed from the first ``sample_size`` records only,
+    so output starts after a bounded number of records and memory does not
+    grow with the result. Later cells wider than their column are truncated.
+
+    Args:
+        records: Iterable of records (a single dict is one record)
+        headers: Column names (default: keys of the first record)
+        sample_size: Number of leading records used to size columns
+        max_width: Maximum column width
+
+    Yields:
+        Header line, separator line, then one line per record
+    """
+    iterator = _iter_records(records)
+    sample = list(itertools.islice(iterator, max(sample_size, 1)))
+    if headers:
+        columns = list(headers)
+    elif sample:
+        columns = _record_headers(sample[0])
+    else:
+        return
+
+    sample_rows = [
+        [_cell_text(v).replace('\n', ' ') for v in _record_values(record, columns)]
+        for record in sample
+    ]
+    widths = [len(str(column)) for column in columns]
+    for row in sample_rows:
+        for i, cell in enumerate(row):
+            if len(cell) > widths[i]:
+                widths[i] = len(cell)
+    widths = [min(w, max_width) for w in widths]
+
+    def _line(cells: List[str]) -> str:
+        parts = []
+        for cell, width in zip(cells, widths):
+            if len(cell) > width:
+                cell = cell[:max(width - 1, 0)] + '…'
+            parts.append(cell.ljust(width))
+        return '  '.join(parts).rstrip() + '\n'
+
+    yield _line([str(c) for c in columns])
+    yield _line(['-' * w for w in widths])
+    for row in sample_rows:
+        yield _line(row)
+    for record in iterator:
+        yield _line([_cell_text(v).replace('\n', ' ') for v in _record_values(record, columns)])
+
+
+def iter_format(data: Any, format_type: str = "table",
+                headers: List[str] = None) -> Iterator[str]:
+    """
+    Format output incrementally.
+
+    Streaming formats (ndjson, csv, fixed, xml) yield output as records are
+    consumed and accept any iterable, including generators. Other formats
+    need the whole result and yield it as a single chunk.
+
+    Args:
+        data: Records to format (list, generator or single dict)
+        format_type: Output format
+        headers: Optional column headers (csv, fixed, table)
+
+    Yields:
+        Output chunks, each ending with a newline
+    """
+    format_type = format_type.lower()
+    if format_type == 'ndjson':
+        return iter_ndjson(data)
+    if format_type == 'csv':
+        return iter_csv(data, headers)
+    if format_type == 'fixed':
+        return iter_fixed_table(data, headers)
+    if format_type == 'xml':
+        return iter_xml(data)
+    if not isinstance(data, (dict, list)) and data is not None:
+        data = list(_iter_records(data))
+    return iter([format_output(data, format_type, headers) + '\n'])
+
+
+def write_output(data: Any, format_type: str = "table", headers: List[str] = None,
+                 stream=None):
+    """
+    Write formatted output to a stream as it is produced.
+
+    Args:
+        data: Records to format (list, generator or single dict)
+        format_type: Output format
+        headers: Optional column headers
+        stream: Output stream (default: sys.stdout)
+    """
+    stream = stream or sys.stdout
+    for chunk in iter_format(data, format_type, headers):
+        stream.write(chunk)
+    stream.flush()
+
+
+def print_output(data: Any, format_type: str = "table", headers: List[str] = None):
+    """
+    Print command output.
+
+    Streaming formats are written record by record (see ``write_output``);
+    other formats are formatted in one piece, consuming an iterable first.
+
+    Args:
+        data: Records to print (list, generator or single dict)
+        format_type: Output format
+        headers: Optional column headers
+    """
+    if is_streaming_format(format_type):
+        write_output(data, format_type, headers=headers)
+        return
+    if not isinstance(data, (dict, list)) and data is not None:
+        data = list(_iter_records(data))
+    print(format_output(data, format_type, headers=headers))
+
+
 def format_output(data: Any, format_type: str = "table", headers: List[str] = None) -> str:
     """
     Format output based on format type.
     
     Args:
         data: Data to format
-        format_type: Output format (table, json, xml, yaml)
-        headers: Optional headers for table format
+        format_type: Output format (table, json, xml, yaml, ndjson, csv, fixed)
+        headers: Optional headers for table, csv and fixed formats
         
     Returns:
         Formatted string
@@ -155,6 +432,8 @@ def format_output(data: Any, format_type: str = "table", headers: List[str] = No
             result = format_xml(data)
         elif format_type == "yaml":
             result = format_yaml(data)
+        elif format_type in ('ndjson', 'csv', 'fixed'):
+            result = ''.join(iter_format(data, format_type, headers)).rstrip('\n')
         else:  # default to table
             result = format_table(data, headers)
         
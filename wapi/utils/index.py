@@ -0,0 +1,526 @@
+"""
+Local portfolio index for WAPI CLI
+
+Mirrors domains, NSSETs, contacts and DNS rows into an indexed SQLite
+database so list commands can answer offline with ``--from-index``.
+The database is written by ``wapi index sync``.
+
+It also keeps a reverse-reference graph (nameserver host/IP -> NSSET ->
+domains, contact handle -> domains) derived from stored domain and NSSET
+data, queried by ``wapi refs``.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from ..exceptions import WAPIRequestError
+from .logger import get_logger
+
+SCHEMA_VERSION = 2
+
+# Domain fields holding contact handles
+CONTACT_ROLES = (
+    ('owner_c', 'owner'),
+    ('admin_c', 'admin'),
+    ('tech_c', 'tech'),
+    ('bill_c', 'billing'),
+)
+
+# Fields returned by domains-list; a change in any of them triggers a refetch
+DOMAIN_LIST_FIELDS = ('name', 'status', 'expiration', 'nsset')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS domains (
+    name TEXT PRIMARY KEY,
+    tld TEXT NOT NULL,
+    status TEXT,
+    expiration TEXT,
+    nsset TEXT,
+    list_hash TEXT NOT NULL,
+    info TEXT,
+    info_synced_at REAL,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS domains_tld ON domains (tld);
+CREATE INDEX IF NOT EXISTS domains_status ON domains (status);
+CREATE INDEX IF NOT EXISTS domains_expiration ON domains (expiration);
+CREATE INDEX IF NOT EXISTS domains_nsset ON domains (nsset);
+CREATE TABLE IF NOT EXISTS dns_rows (
+    domain TEXT NOT NULL,
+    row_id TEXT NOT NULL,
+    name TEXT,
+    ttl TEXT,
+    type TEXT,
+    rdata TEXT,
+    PRIMARY KEY (domain, row_id)
+);
+CREATE TABLE IF NOT EXISTS nssets (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    handle TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ref_nameservers (
+    owner TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    host TEXT NOT NULL,
+    ipv4 TEXT,
+    ipv6 TEXT,
+    PRIMARY KEY (kind, owner, host)
+);
+CREATE INDEX IF NOT EXISTS ref_nameservers_host ON ref_nameservers (host);
+CREATE INDEX IF NOT EXISTS ref_nameservers_ipv4 ON ref_nameservers (ipv4);
+CREATE INDEX IF NOT EXISTS ref_nameservers_ipv6 ON ref_nameservers (ipv6);
+CREATE TABLE IF NOT EXISTS ref_contacts (
+    handle TEXT NOT NULL,
+    role TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    PRIMARY KEY (handle, role, domain)
+);
+CREATE INDEX IF NOT EXISTS ref_contacts_domain ON ref_contacts (domain);
+"""
+
+
+def normalize_host(host: Any) -> str:
+    """Lower-case a hostname and strip the trailing dot"""
+    return str(host or '').strip().rstrip('.').lower()
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None or value == '':
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def contact_handles(value: Any) -> List[str]:
+    """Extract contact handles from a domain field (string, comma list or list)"""
+    handles = []
+    for item in _as_list(value):
+        if isinstance(item, dict):
+            item = item.get('handle') or item.get('id') or item.get('name') or ''
+        for handle in str(item).replace(';', ',').split(','):
+            handle = handle.strip()
+            if handle and handle != '[HIDDEN]':
+                handles.append(handle)
+    return handles
+
+
+def nameservers_from_dns(dns: Any) -> List[Dict[str, str]]:
+    """Extract (host, ipv4, ipv6) records from a domain/NSSET ``dns`` structure"""
+    servers = dns.get('server', []) if isinstance(dns, dict) else dns
+    result = []
+    for server in _as_list(servers):
+        if isinstance(server, dict) and server.get('name'):
+            result.append({
+                'host': normalize_host(server.get('name')),
+                'ipv4': str(server.get('addr_ipv4') or ''),
+                'ipv6': str(server.get('addr_ipv6') or '').lower(),
+            })
+        elif isinstance(server, str) and server:
+            result.append({'host': normalize_host(server), 'ipv4': '', 'ipv6': ''})
+    return result
+
+
+def domain_list_hash(record: Dict[str, Any]) -> str:
+    """
+    Hash the list-level fields of a domains-list record.
+
+    Args:
+        record: Domain record from domains-list
+
+    Returns:
+        Hex digest that changes when any list-level field changes
+    """
+    fields = {key: str(record.get(key, '') or '') for key in DOMAIN_LIST_FIELDS}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class PortfolioIndex:
+    """
+    SQLite mirror of the account portfolio.
+
+    Use as a context manager; writes made inside ``transaction()`` are
+    committed together.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self.logger = get_logger('utils.index')
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def exists(self) -> bool:
+        """Return True if the index database file exists"""
+        return self.path.exists()
+
+    def connect(self, create: bool = True) -> sqlite3.Connection:
+        """
+        Open the database, creating the schema when needed.
+
+        Args:
+            create: Create the database if it does not exist
+
+        Raises:
+            WAPIRequestError: If the index does not exist and ``create`` is False
+        """
+        if self._conn is not None:
+            return self._conn
+        if not create and not self.exists():
+            raise WAPIRequestError(
+                f"Local index not found at {self.path} (run 'wapi index sync' first)"
+            )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path))
+        conn.row_factory = sqlite3.Row
+        conn.executescript(_SCHEMA)
+        self._conn = conn
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is not None and int(row['value']) < 2:
+            self._rebuild_refs()
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),)
+        )
+        conn.commit()
+        self.logger.debug(f"Opened portfolio index {self.path}")
+        return conn
+
+    def close(self):
+        """Close the database connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.connect()
+
+    def transaction(self):
+        """Return a context manager committing (or rolling back) a write batch"""
+        return self.conn
+
+    # Metadata
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def set_meta(self, key: str, value: Any):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    # Domains
+
+    def domain_hashes(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return stored list hashes keyed by domain name.
+
+        Returns:
+            Dict of name -> {'list_hash': str, 'has_info': bool}
+        """
+        rows = self.conn.execute(
+            "SELECT name, list_hash, info IS NOT NULL AS has_info FROM domains")
+        return {row['name']: {'list_hash': row['list_hash'], 'has_info': bool(row['has_info'])}
+                for row in rows}
+
+    def upsert_domain(self, record: Dict[str, Any], synced_at: Optional[float] = None):
+        """Insert or update the list-level fields of a domain (details are kept)"""
+        name = record.get('name', '')
+        self.conn.execute(
+            """
+            INSERT INTO domains (name, tld, status, expiration, nsset, list_hash, synced_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                tld = excluded.tld, status = excluded.status,
+                expiration = excluded.expiration, nsset = excluded.nsset,
+                list_hash = excluded.list_hash, synced_at = excluded.synced_at
+            """,
+            (
+                name,
+                name.rsplit('.', 1)[-1].lower() if '.' in name else '',
+                record.get('status', ''),
+                record.get('expiration', ''),
+                record.get('nsset', ''),
+                domain_list_hash(record),
+                synced_at or time.time(),
+            )
+        )
+
+    def set_domain_details(self, name: str, info: Optional[Dict[str, Any]],
+                           dns_rows: Optional[List[Dict[str, Any]]],
+                           synced_at: Optional[float] = None):
+        """
+        Store domain-info data and DNS rows for a domain.
+
+        Args:
+            name: Domain name
+            info: Domain data from domain-info (None leaves stored data unchanged)
+            dns_rows: Normalized DNS rows (None leaves stored rows unchanged)
+        """
+        if info is not None:
+            self.conn.execute(
+                "UPDATE domains SET info = ?, info_synced_at = ? WHERE name = ?",
+                (json.dumps(info, ensure_ascii=False), synced_at or time.time(), name)
+            )
+            self._set_domain_refs(name, info)
+        if dns_rows is not None:
+            self.conn.execute("DELETE FROM dns_rows WHERE domain = ?", (name,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dns_rows (domain, row_id, name, ttl, type, rdata) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(name, str(row.get('id', '')), row.get('name', ''), str(row.get('ttl', '')),
+                  row.get('type', ''), row.get('rdata', '')) for row in dns_rows]
+            )
+
+    def mark_stale(self, name: str):
+        """Force the next sync to refetch a domain's details"""
+        self.conn.execute("UPDATE domains SET list_hash = '' WHERE name = ?", (name,))
+
+    def delete_domains(self, names: Iterable[str]) -> int:
+        """Remove domains (and their DNS rows) no longer in the account"""
+        names = list(names)
+        for name in names:
+            self.conn.execute("DELETE FROM dns_rows WHERE domain = ?", (name,))
+            self.conn.execute("DELETE FROM ref_nameservers WHERE kind = 'domain' AND owner = ?",
+                              (name,))
+            self.conn.execute("DELETE FROM ref_contacts WHERE domain = ?", (name,))
+            self.conn.execute("DELETE FROM domains WHERE name = ?", (name,))
+        return len(names)
+
+    def iter_domains(self, tld: Optional[str] = None,
+                     status: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield list-level domain records, optionally filtered.
+
+        Args:
+            tld: Only domains under this TLD
+            status: Only domains with this status
+        """
+        query = "SELECT name, status, expiration, nsset FROM domains"
+        clauses, params = [], []
+        if tld:
+            clauses.append("tld = ?")
+            params.append(tld.lower().lstrip('.'))
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY name"
+        for row in self.conn.execute(query, params):
+            yield {
+                'name': row['name'],
+                'status': row['status'] or '',
+                'expiration': row['expiration'] or '',
+                'nsset': row['nsset'] or '',
+            }
+
+    def get_domain_info(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return stored domain-info data for a domain (None if unknown)"""
+        row = self.conn.execute("SELECT info FROM domains WHERE name = ?", (name,)).fetchone()
+        if row is None or row['info'] is None:
+            return None
+        return json.loads(row['info'])
+
+    def get_dns_rows(self, domain: str) -> List[Dict[str, Any]]:
+        """Return stored DNS rows of a domain"""
+        rows = self.conn.execute(
+            "SELECT row_id, name, ttl, type, rdata FROM dns_rows WHERE domain = ? "
+            "ORDER BY CAST(row_id AS INTEGER), row_id",
+            (domain,)
+        )
+        return [{'id': row['row_id'], 'name': row['name'], 'ttl': row['ttl'],
+                 'type': row['type'], 'rdata': row['rdata']} for row in rows]
+
+    def has_domain(self, name: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM domains WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    # Reverse references
+
+    def _set_nameserver_refs(self, kind: str, owner: str, dns: Any):
+        self.conn.execute("DELETE FROM ref_nameservers WHERE kind = ? AND owner = ?", (kind, owner))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO ref_nameservers (owner, kind, host, ipv4, ipv6) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(owner, kind, ns['host'], ns['ipv4'], ns['ipv6']) for ns in nameservers_from_dns(dns)]
+        )
+
+    def _set_domain_refs(self, name: str, info: Dict[str, Any]):
+        """Replace the nameserver and contact references of one domain"""
+        self._set_nameserver_refs('domain', name, info.get('dns'))
+        self.conn.execute("DELETE FROM ref_contacts WHERE domain = ?", (name,))
+        rows = set()
+        for field, role in CONTACT_ROLES:
+            for handle in contact_handles(info.get(field)):
+                rows.add((handle, role, name))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO ref_contacts (handle, role, domain) VALUES (?, ?, ?)",
+            sorted(rows)
+        )
+        if info.get('nsset'):
+            self.conn.execute("UPDATE domains SET nsset = ? WHERE name = ?",
+                              (str(info['nsset']), name))
+
+    def _rebuild_refs(self):
+        """Derive the reference tables from stored domain and NSSET data"""
+        self.logger.info("Building reference tables from stored index data")
+        query = "SELECT name, info FROM domains WHERE info IS NOT NULL"
+        for row in self.conn.execute(query).fetchall():
+            self._set_domain_refs(row['name'], json.loads(row['info']))
+        for row in self.conn.execute("SELECT name, data FROM nssets").fetchall():
+            self._set_nameserver_refs('nsset', row['name'], json.loads(row['data']).get('dns'))
+
+    def refs_nameserver(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Find NSSETs and domains using a nameserver.
+
+        Args:
+            query: Nameserver hostname, IPv4 or IPv6 address
+
+        Returns:
+            Rows with nameserver, ipv4, ipv6, nsset and domain (sorted)
+        """
+        host = normalize_host(query)
+        rows = self.conn.execute(
+            """
+            SELECT r.kind, r.owner, r.host, r.ipv4, r.ipv6, d.nsset AS domain_nsset
+            FROM ref_nameservers r
+            LEFT JOIN domains d ON r.kind = 'domain' AND d.name = r.owner
+            WHERE r.host = ? OR r.ipv4 = ? OR r.ipv6 = ?
+            """,
+            (host, query.strip(), query.strip().lower())
+        ).fetchall()
+
+        result = {}
+        nssets = set()
+        for row in rows:
+            if row['kind'] == 'domain':
+                key = (row['host'], row['owner'])
+                result[key] = {'nameserver': row['host'], 'ipv4': row['ipv4'] or '',
+                               'ipv6': row['ipv6'] or '', 'nsset': row['domain_nsset'] or '',
+                               'domain': row['owner']}
+            else:
+                nssets.add((row['owner'], row['host'], row['ipv4'] or '', row['ipv6'] or ''))
+        # NSSETs known from nsset data: add every domain assigned to them
+        for nsset, ns_host, ipv4, ipv6 in nssets:
+            domains = [r['name'] for r in self.conn.execute(
+                "SELECT name FROM domains WHERE nsset = ?", (nsset,))]
+            for domain in domains or ['']:
+                key = (ns_host, domain or f"nsset:{nsset}")
+                if key not in result:
+                    result[key] = {'nameserver': ns_host, 'ipv4': ipv4, 'ipv6': ipv6,
+                                   'nsset': nsset, 'domain': domain}
+        return sorted(result.values(), key=lambda r: (r['nsset'], r['domain'], r['nameserver']))
+
+    def refs_contact(self, handle: str) -> List[Dict[str, Any]]:
+        """Find domains referencing a contact handle (case-insensitive)"""
+        rows = self.conn.execute(
+            "SELECT handle, role, domain FROM ref_contacts WHERE handle = ? COLLATE NOCASE "
+            "ORDER BY domain, role",
+            (handle.strip(),)
+        )
+        return [{'handle': row['handle'], 'role': row['role'], 'domain': row['domain']}
+                for row in rows]
+
+    def refs_nsset(self, name: str) -> List[Dict[str, Any]]:
+        """Find domains assigned to an NSSET"""
+        rows = self.conn.execute(
+            "SELECT name, status, expiration FROM domains WHERE nsset = ? COLLATE NOCASE "
+            "ORDER BY name",
+            (name.strip(),)
+        )
+        return [{'nsset': name.strip(), 'domain': row['name'], 'status': row['status'] or '',
+                 'expiration': row['expiration'] or ''} for row in rows]
+
+    def nsset_nameservers(self, name: str) -> List[Dict[str, str]]:
+        """Return the nameservers of an NSSET from NSSET data or its domains"""
+        rows = self.conn.execute(
+            """
+            SELECT DISTINCT r.host, r.ipv4, r.ipv6 FROM ref_nameservers r
+            LEFT JOIN domains d ON r.kind = 'domain' AND d.name = r.owner
+            WHERE (r.kind = 'nsset' AND r.owner = ? COLLATE NOCASE)
+               OR (r.kind = 'domain' AND d.nsset = ? COLLATE NOCASE)
+            ORDER BY r.host
+            """,
+            (name.strip(), name.strip())
+        )
+        seen = {}
+        for row in rows:
+            seen.setdefault(row['host'], {'host': row['host'], 'ipv4': row['ipv4'] or '',
+                                          'ipv6': row['ipv6'] or ''})
+        return list(seen.values())
+
+    # NSSETs and contacts
+
+    def replace_nssets(self, nssets: Iterable[Dict[str, Any]], synced_at: Optional[float] = None):
+        """Replace all stored NSSETs"""
+        synced_at = synced_at or time.time()
+        nssets = [n for n in nssets if isinstance(n, dict)]
+        self.conn.execute("DELETE FROM nssets")
+        self.conn.execute("DELETE FROM ref_nameservers WHERE kind = 'nsset'")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO nssets (name, data, synced_at) VALUES (?, ?, ?)",
+            [(str(n.get('name', '')), json.dumps(n, ensure_ascii=False), synced_at) for n in nssets]
+        )
+        for nsset in nssets:
+            self._set_nameserver_refs('nsset', str(nsset.get('name', '')), nsset.get('dns'))
+
+    def replace_contacts(self, contacts: Iterable[Dict[str, Any]],
+                         synced_at: Optional[float] = None):
+        """Replace all stored contacts"""
+        synced_at = synced_at or time.time()
+        self.conn.execute("DELETE FROM contacts")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO contacts (handle, data, synced_at) VALUES (?, ?, ?)",
+            [(str(c.get('handle') or c.get('id') or c.get('name') or ''),
+              json.dumps(c, ensure_ascii=False), synced_at)
+             for c in contacts if isinstance(c, dict)]
+        )
+
+    def iter_nssets(self) -> Iterator[Dict[str, Any]]:
+        for row in self.conn.execute("SELECT data FROM nssets ORDER BY name"):
+            yield json.loads(row['data'])
+
+    def iter_contacts(self) -> Iterator[Dict[str, Any]]:
+        for row in self.conn.execute("SELECT data FROM contacts ORDER BY handle"):
+            yield json.loads(row['data'])
+
+    # Status
+
+    def stats(self) -> Dict[str, Any]:
+        """Return row counts and sync timestamps"""
+        conn = self.conn
+
+        def _count(query: str) -> int:
+            return conn.execute(query).fetchone()[0]
+
+        return {
+            'path': str(self.path),
+            'domains': _count("SELECT COUNT(*) FROM domains"),
+            'domains_with_details': _count("SELECT COUNT(*) FROM domains WHERE info IS NOT NULL"),
+            'dns_rows': _count("SELECT COUNT(*) FROM dns_rows"),
+            'nssets': _count("SELECT COUNT(*) FROM nssets"),
+            'contacts': _count("SELECT COUNT(*) FROM contacts"),
+            'last_sync': self.get_meta('last_sync') or '',
+        }
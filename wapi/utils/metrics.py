@@ -0,0 +1,51 @@
+"""
+In-process metrics for WAPI CLI
+
+A small thread-safe registry of counters and gauges. The API client records
+request-level events here (e.g. coalesced reads) so batch commands, tests and
+tracing can inspect them without an external metrics backend.
+"""
+
+import threading
+from typing import Any, Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, Any] = {}
+
+
+def increment(name: str, value: float = 1):
+    """Add ``value`` to a counter (created at zero on first use)"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name: str, value: Any):
+    """Set a gauge to its current value"""
+    with _lock:
+        _gauges[name] = value
+
+
+def get_counter(name: str) -> float:
+    """Return the current value of a counter (0 if never incremented)"""
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def get_gauge(name: str, default: Any = None) -> Any:
+    """Return the current value of a gauge"""
+    with _lock:
+        return _gauges.get(name, default)
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Return a copy of all counters and gauges"""
+    with _lock:
+        return {'counters': dict(_counters), 'gauges': dict(_gauges)}
+
+
+def reset_metrics():
+    """Clear all counters and gauges"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
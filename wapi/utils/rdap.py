@@ -0,0 +1,303 @@
+"""
+RDAP lookups for WAPI CLI
+
+RDAP is the HTTPS/JSON successor of port-43 WHOIS. Lookups here reuse one
+keep-alive ``requests.Session`` per RDAP server, so a search over many
+names pays the TCP and TLS handshake once per registry instead of opening
+a fresh socket per query, and the JSON answer needs no per-registry text
+grammar. Results have the same shape as ``wapi.utils.whois.parse_whois``.
+
+The RDAP server of a TLD comes from the IANA bootstrap registry
+(``dns.json``). A small bundled table covers common TLDs without any
+download; for other TLDs the registry is fetched once and cached in the
+cache directory for ``RDAP_BOOTSTRAP_TTL``.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..constants import (
+    DEFAULT_RDAP_POOL_SIZE,
+    DEFAULT_RDAP_TIMEOUT,
+    RDAP_BOOTSTRAP_TTL,
+    RDAP_BOOTSTRAP_URL,
+)
+from ..exceptions import WAPIRequestError
+from .logger import get_logger
+from .tracing import start_span
+from .whois import normalize_date
+
+RDAP_ACCEPT = "application/rdap+json, application/json"
+
+# RDAP base URLs of common TLDs (from the IANA bootstrap registry)
+BUNDLED_RDAP_SERVERS = {
+    "com": "https://rdap.verisign.com/com/v1/",
+    "net": "https://rdap.verisign.com/net/v1/",
+    "org": "https://rdap.publicinterestregistry.org/rdap/",
+    "cz": "https://rdap.nic.cz/",
+    "info": "https://rdap.identitydigital.services/rdap/",
+    "io": "https://rdap.identitydigital.services/rdap/",
+    "app": "https://pubapi.registry.google/rdap/",
+    "dev": "https://pubapi.registry.google/rdap/",
+    "xyz": "https://rdap.centralnic.com/xyz/",
+}
+
+# RDAP event actions -> parse_whois date fields
+_EVENT_FIELDS = {
+    "registration": "registered",
+    "last changed": "updated",
+    "expiration": "expires",
+}
+
+
+def _tld(domain: str) -> str:
+    return domain.strip().rstrip(".").rsplit(".", 1)[-1].lower()
+
+
+def services_from_registry(registry: Dict[str, Any]) -> Dict[str, str]:
+    """TLD -> RDAP base URL from an IANA bootstrap document (first HTTPS URL wins)"""
+    servers: Dict[str, str] = {}
+    for service in registry.get("services", []) if isinstance(registry, dict) else []:
+        if not isinstance(service, list) or len(service) < 2:
+            continue
+        urls = [str(u) for u in service[1]]
+        urls = [u for u in urls if u.startswith("https://")] or urls
+        if not urls:
+            continue
+        base = urls[0] if urls[0].endswith("/") else urls[0] + "/"
+        for tld in service[0]:
+            servers[str(tld).lower()] = base
+    return servers
+
+
+class RDAPBootstrap:
+    """Which RDAP server answers for a TLD"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, url: str = RDAP_BOOTSTRAP_URL,
+                 bundled: Optional[Dict[str, str]] = None, ttl: int = RDAP_BOOTSTRAP_TTL):
+        """
+        Args:
+            path: JSON file caching the IANA registry (nothing is downloaded if None)
+            url: IANA bootstrap registry URL
+            bundled: TLD -> base URL used before (and under) the cached registry
+            ttl: Seconds before the cached registry is fetched again
+        """
+        self.path = Path(path) if path is not None else None
+        self.url = url
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._logger = get_logger("utils.rdap")
+        self._servers = dict(BUNDLED_RDAP_SERVERS if bundled is None else bundled)
+        self._fetched_at = 0.0
+        self._refresh_attempted = False
+        self._load()
+
+    def _load(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                registry = json.load(f)
+            self._servers.update(services_from_registry(registry))
+            self._fetched_at = os.path.getmtime(self.path)
+        except (OSError, ValueError):
+            pass
+
+    def _stale(self) -> bool:
+        return time.time() - self._fetched_at >= self.ttl
+
+    def refresh(self, session: requests.Session, timeout: float = DEFAULT_RDAP_TIMEOUT) -> bool:
+        """
+        Download the IANA registry and cache it.
+
+        Returns:
+            True if the registry was fetched
+        """
+        try:
+            response = session.get(self.url, timeout=timeout,
+                                   headers={"Accept": "application/json"})
+            response.raise_for_status()
+            registry = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self._logger.debug(f"Cannot fetch RDAP bootstrap registry from {self.url}: {e}")
+            return False
+        servers = services_from_registry(registry)
+        if not servers:
+            return False
+        with self._lock:
+            self._servers.update(servers)
+            self._fetched_at = time.time()
+        if self.path is not None:
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(registry, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                self._logger.debug(f"Cannot save RDAP bootstrap registry to {self.path}: {e}")
+        return True
+
+    def server_for(self, domain: str, session: Optional[requests.Session] = None,
+                   timeout: float = DEFAULT_RDAP_TIMEOUT) -> Optional[str]:
+        """
+        RDAP base URL for a domain's TLD.
+
+        An unknown TLD triggers one registry download per process when the
+        cache is missing or stale and a ``session`` is given.
+        """
+        tld = _tld(domain)
+        with self._lock:
+            server = self._servers.get(tld)
+            should_refresh = (server is None and session is not None and self.path is not None
+                              and not self._refresh_attempted and self._stale())
+            if should_refresh:
+                self._refresh_attempted = True
+        if should_refresh and self.refresh(session, timeout):
+            with self._lock:
+                server = self._servers.get(tld)
+        return server
+
+
+def _vcard_name(entity: Dict[str, Any]) -> Optional[str]:
+    vcard = entity.get("vcardArray")
+    if isinstance(vcard, list) and len(vcard) > 1 and isinstance(vcard[1], list):
+        for prop in vcard[1]:
+            if isinstance(prop, list) and len(prop) > 3 and prop[0] == "fn" and prop[3]:
+                return str(prop[3])
+    return None
+
+
+def parse_rdap(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Structured fields of an RDAP domain object.
+
+    Returns:
+        Dict shaped like ``parse_whois`` results (``grammar`` is ``rdap``)
+    """
+    result: Dict[str, Any] = {"available": False, "grammar": "rdap"}
+    name = data.get("ldhName") or data.get("unicodeName")
+    if name:
+        result["domain"] = str(name).lower().rstrip(".")
+
+    for entity in data.get("entities", []) or []:
+        if isinstance(entity, dict) and "registrar" in (entity.get("roles") or []):
+            registrar = _vcard_name(entity) or entity.get("handle")
+            if registrar:
+                result["registrar"] = str(registrar)
+            break
+
+    for event in data.get("events", []) or []:
+        if not isinstance(event, dict):
+            continue
+        field = _EVENT_FIELDS.get(str(event.get("eventAction", "")).lower())
+        if field and field not in result and event.get("eventDate"):
+            result[field] = normalize_date(str(event["eventDate"]))
+
+    status = [str(s) for s in data.get("status", []) or [] if s]
+    if status:
+        result["status"] = status
+
+    # CZ.NIC (FRED) publishes the NSSET handle in a registry extension
+    nsset = data.get("fred_nsset") or data.get("nsset")
+    if isinstance(nsset, dict) and nsset.get("handle"):
+        result["nsset"] = str(nsset["handle"])
+    nameservers: List[str] = []
+    for ns in data.get("nameservers", []) or []:
+        host = str(ns.get("ldhName", "")).lower().rstrip(".") if isinstance(ns, dict) else ""
+        if host and host not in nameservers:
+            nameservers.append(host)
+    if nameservers:
+        result["nameservers"] = nameservers
+    return result
+
+
+class RDAPClient:
+    """RDAP domain lookups over pooled keep-alive HTTPS connections"""
+
+    def __init__(self, bootstrap: Optional[RDAPBootstrap] = None,
+                 timeout: float = DEFAULT_RDAP_TIMEOUT,
+                 pool_size: int = DEFAULT_RDAP_POOL_SIZE):
+        """
+        Args:
+            bootstrap: TLD -> server registry (bundled table only if None)
+            timeout: Seconds per HTTP request
+            pool_size: Keep-alive connections kept per RDAP server
+        """
+        self.bootstrap = bootstrap or RDAPBootstrap()
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._logger = get_logger("utils.rdap")
+
+    def session_for(self, base_url: str) -> requests.Session:
+        """Shared session of one RDAP server (created on first use)"""
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Accept": RDAP_ACCEPT})
+                self._sessions[base_url] = session
+            return session
+
+    def server_for(self, domain: str) -> Optional[str]:
+        """RDAP base URL for a domain, or None when its registry has no RDAP service"""
+        return self.bootstrap.server_for(domain, session=self.session_for(self.bootstrap.url),
+                                         timeout=self.timeout)
+
+    def lookup(self, domain: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a domain.
+
+        Args:
+            domain: Domain name
+            timeout: Seconds for the request (the client's default if None)
+
+        Returns:
+            ``parse_rdap`` fields, ``{'available': True, 'grammar': 'rdap'}``
+            for a 404 answer, or None when no RDAP server is known for the TLD
+
+        Raises:
+            WAPIRequestError: Network error or unexpected answer
+        """
+        base_url = self.server_for(domain)
+        if base_url is None:
+            return None
+        domain = domain.strip().rstrip(".").lower()
+        url = f"{base_url}domain/{domain}"
+        with start_span("rdap.query", {"rdap.server": base_url, "rdap.query": domain}) as span:
+            try:
+                response = self.session_for(base_url).get(url, timeout=timeout or self.timeout)
+            except requests.RequestException as e:
+                raise WAPIRequestError(f"RDAP lookup failed at {base_url}: {e}") from e
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code == 404:
+                return {"available": True, "grammar": "rdap"}
+            if response.status_code != 200:
+                raise WAPIRequestError(
+                    f"RDAP lookup failed at {base_url}: HTTP {response.status_code}")
+            try:
+                data = response.json()
+            except ValueError as e:
+                raise WAPIRequestError(f"Invalid RDAP response from {base_url}: {e}") from e
+        if not isinstance(data, dict) or data.get("objectClassName", "domain") != "domain":
+            raise WAPIRequestError(f"Unexpected RDAP response from {base_url}")
+        return parse_rdap(data)
+
+    def close(self):
+        """Close all pooled connections"""
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
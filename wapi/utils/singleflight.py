@@ -0,0 +1,77 @@
+"""
+Request coalescing for WAPI CLI
+
+``SingleFlight`` runs at most one call per key at a time: callers arriving
+while a call with the same key is in flight wait for it and share its result
+(or exception) instead of issuing their own request.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Flight:
+    """A call in progress and the callers waiting for it"""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Any, _Flight] = {}
+
+    def do(self, key: Any, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``func`` unless a call with the same key is already in flight.
+
+        Args:
+            key: Hashable identity of the call
+            func: Zero-argument callable performing the work
+
+        Returns:
+            Tuple of (result, shared) where shared is True for callers that
+            received the result of another caller's execution
+
+        Raises:
+            Whatever ``func`` raised, in the executing caller and all waiters
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+                leader = True
+            else:
+                flight.waiters += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently being executed"""
+        with self._lock:
+            return len(self._flights)
@@ -0,0 +1,444 @@
+"""
+Lightweight tracing for WAPI CLI
+
+Provides OpenTelemetry-compatible spans for CLI commands, API calls, polling
+and network lookups. Tracing is opt-in: when disabled, ``start_span`` returns a
+shared no-op span so instrumented code pays only a function call.
+
+Spans can be exported:
+- to the console (stderr) or a file as one JSON object per line, using the
+  OTLP/JSON field names (``traceId``, ``spanId``, ``parentSpanId``, ...)
+- to an installed OpenTelemetry SDK (``otel`` mode)
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .logger import get_logger
+
+try:
+    from opentelemetry import trace as otel_trace
+
+    OTEL_AVAILABLE = True
+except ImportError:
+    otel_trace = None
+    OTEL_AVAILABLE = False
+
+# Environment variable enabling tracing: "console", "otel" or a file path
+TRACE_ENV_VAR = 'WAPI_TRACE'
+
+STATUS_UNSET = 'UNSET'
+STATUS_OK = 'OK'
+STATUS_ERROR = 'ERROR'
+
+
+class _NoopSpan:
+    """Span used when tracing is disabled. Every operation is a no-op."""
+
+    __slots__ = ()
+
+    trace_id = None
+    span_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+    def set_status(self, status: str, description: Optional[str] = None):
+        pass
+
+    def record_exception(self, exception: BaseException):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """
+    A single timed operation.
+
+    Spans are context managers: entering makes the span current for the
+    calling thread, leaving ends it and hands it to the exporter.
+    """
+
+    def __init__(self, tracer: 'Tracer', name: str, parent: Optional['Span'] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self._tracer = tracer
+        self.name = name
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.status = STATUS_UNSET
+        self.status_description: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+
+    def __enter__(self):
+        self._tracer._push(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+            self.set_status(STATUS_ERROR, f"{exc_type.__name__}: {exc}")
+        self._tracer._pop(self)
+        self.end()
+        return False
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Span duration in seconds (None while the span is running)"""
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def set_attribute(self, key: str, value: Any):
+        """Set a single span attribute"""
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        """Set several span attributes at once"""
+        self.attributes.update(attributes)
+
+    def set_status(self, status: str, description: Optional[str] = None):
+        """Set span status (UNSET, OK or ERROR)"""
+        self.status = status
+        self.status_description = description
+
+    def record_exception(self, exception: BaseException):
+        """Attach an exception event to the span"""
+        self.events.append({
+            'name': 'exception',
+            'timeUnixNano': int(time.time() * 1e9),
+            'attributes': {
+                'exception.type': type(exception).__name__,
+                'exception.message': str(exception),
+            },
+        })
+
+    def end(self):
+        """End the span and export it (idempotent)"""
+        if self.end_time is not None:
+            return
+        self.end_time = time.time()
+        self._tracer._export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize span using OTLP/JSON field names"""
+        data = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'startTimeUnixNano': int(self.start_time * 1e9),
+            'endTimeUnixNano': int((self.end_time or time.time()) * 1e9),
+            'attributes': self.attributes,
+            'status': {'code': self.status},
+        }
+        if self.status_description:
+            data['status']['message'] = self.status_description
+        if self.events:
+            data['events'] = self.events
+        return data
+
+
+class SpanExporter:
+    """Base exporter. Subclasses implement ``export``."""
+
+    def export(self, span: Span):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """Write finished spans as JSON lines to a stream (stderr by default)"""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            stream = self.stream or sys.stderr
+            stream.write(line + '\n')
+            stream.flush()
+
+
+class FileSpanExporter(SpanExporter):
+    """Append finished spans as JSON lines to a file (works offline)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                log_dir = os.path.dirname(self.path)
+                if log_dir and not os.path.exists(log_dir):
+                    os.makedirs(log_dir, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Collect finished spans in a list (useful for tests and tooling)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+
+class Tracer:
+    """Creates spans and tracks the current span per thread"""
+
+    def __init__(self, exporter: SpanExporter):
+        self.exporter = exporter
+        self._local = threading.local()
+        self._logger = get_logger('utils.tracing')
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def _push(self, span: Span):
+        self._stack().append(span)
+
+    def _pop(self, span: Span):
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        elif span in stack:
+            stack.remove(span)
+
+    def _export(self, span: Span):
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            self._logger.debug(f"Span export failed: {e}")
+
+    def current_span(self) -> Optional[Span]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   parent: Optional[Span] = None) -> Span:
+        if parent is None:
+            parent = self.current_span()
+        return Span(self, name, parent=parent, attributes=attributes)
+
+
+class _OtelSpan:
+    """Adapter exposing the Span API on top of an OpenTelemetry span"""
+
+    def __init__(self, tracer, name: str, attributes: Optional[Dict[str, Any]]):
+        self._cm = tracer.start_as_current_span(name, attributes=attributes)
+        self._span = None
+
+    def __enter__(self):
+        self._span = self._cm.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._cm.__exit__(exc_type, exc, tb)
+
+    @property
+    def trace_id(self):
+        return format(self._span.get_span_context().trace_id, '032x') if self._span else None
+
+    @property
+    def span_id(self):
+        return format(self._span.get_span_context().span_id, '016x') if self._span else None
+
+    def set_attribute(self, key: str, value: Any):
+        if self._span is not None:
+            self._span.set_attribute(key, value)
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def set_status(self, status: str, description: Optional[str] = None):
+        if self._span is not None and status == STATUS_ERROR:
+            self._span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, description))
+
+    def record_exception(self, exception: BaseException):
+        if self._span is not None:
+            self._span.record_exception(exception)
+
+    def end(self):
+        pass
+
+
+class OtelTracer:
+    """Route spans to the globally configured OpenTelemetry tracer provider"""
+
+    def __init__(self):
+        self._tracer = otel_trace.get_tracer('wapi')
+
+    def current_span(self):
+        return None
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   parent=None) -> _OtelSpan:
+        # OpenTelemetry propagates parents through its own context
+        return _OtelSpan(self._tracer, name, attributes)
+
+
+# Active tracer (None means tracing is disabled)
+_tracer = None
+
+
+def configure_tracing(exporter: Optional[SpanExporter] = None, otel: bool = False):
+    """
+    Enable tracing.
+
+    Args:
+        exporter: Span exporter (default: ConsoleSpanExporter on stderr)
+        otel: Route spans to an installed OpenTelemetry SDK instead
+
+    Returns:
+        The active tracer
+    """
+    global _tracer
+    disable_tracing()
+    if otel:
+        if not OTEL_AVAILABLE:
+            get_logger('utils.tracing').warning(
+                "opentelemetry is not installed, falling back to console span export"
+            )
+        else:
+            _tracer = OtelTracer()
+            return _tracer
+    _tracer = Tracer(exporter or ConsoleSpanExporter())
+    return _tracer
+
+
+def configure_tracing_from_spec(spec: Optional[str]):
+    """
+    Enable tracing from a textual spec (CLI ``--trace`` or ``WAPI_TRACE``).
+
+    Args:
+        spec: ``console``/``-``/``stderr`` for stderr, ``otel`` for OpenTelemetry,
+              anything else is treated as a file path. Empty/None disables tracing.
+
+    Returns:
+        The active tracer or None
+    """
+    if not spec:
+        return None
+    spec = spec.strip()
+    if spec.lower() in ('0', 'off', 'false', 'no'):
+        disable_tracing()
+        return None
+    if spec.lower() in ('1', 'on', 'true', 'yes', 'console', 'stderr', '-'):
+        return configure_tracing(ConsoleSpanExporter())
+    if spec.lower() == 'otel':
+        return configure_tracing(otel=True)
+    return configure_tracing(FileSpanExporter(os.path.expanduser(spec)))
+
+
+def disable_tracing():
+    """Disable tracing and shut down the active exporter"""
+    global _tracer
+    if _tracer is not None and isinstance(_tracer, Tracer):
+        try:
+            _tracer.exporter.shutdown()
+        except Exception:  # pragma: no cover - best effort
+            pass
+    _tracer = None
+
+
+def is_tracing_enabled() -> bool:
+    """Return True when spans are being recorded"""
+    return _tracer is not None
+
+
+def get_tracer():
+    """Return the active tracer or None if tracing is disabled"""
+    return _tracer
+
+
+def current_span():
+    """Return the current span of this thread (None when disabled or no span)"""
+    if _tracer is None:
+        return None
+    return _tracer.current_span()
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, parent=None):
+    """
+    Start a span (use as a context manager).
+
+    When tracing is disabled this returns a shared no-op span.
+
+    Args:
+        name: Span name (e.g., "wapi.call", "dns.resolve")
+        attributes: Optional initial attributes
+        parent: Explicit parent span (needed when handing work to other threads)
+
+    Example:
+        >>> with start_span("wapi.call", {"wapi.command": "ping"}) as span:
+        ...     span.set_attribute("wapi.response.code", "1000")
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.start_span(name, attributes=attributes, parent=parent)
+
+
+def traced(name: Optional[str] = None):
+    """
+    Decorator running the wrapped function inside a span.
+
+    Args:
+        name: Span name (default: the function's qualified name)
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with start_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -213,3 +213,64 @@ def validate_email(email: str) -> Tuple[bool, Optional[str]]:
         return False, "Invalid email address format"
     
     return True, None
+
+
+_DURATION_PATTERN = re.compile(r'^\s*(\d+)\s*([dwmy]?)\s*$', re.IGNORECASE)
+_DURATION_DAYS = {'': 1, 'd': 1, 'w': 7, 'm': 30, 'y': 365}
+
+
+def validate_duration_days(value: str) -> Tuple[bool, Optional[int], Optional[str]]:
+    """
+    Parse a duration such as ``60d``, ``8w``, ``3m`` or ``1y`` into days.
+    
+    A bare number is read as days; months count as 30 days, years as 365.
+    
+    Args:
+        value: Duration string
+        
+    Returns:
+        Tuple of (is_valid, days, error_message)
+        
+    Examples:
+        >>> validate_duration_days('60d')
+        (True, 60, None)
+        >>> validate_duration_days('2w')
+        (True, 14, None)
+    """
+    if value is None or str(value).strip() == '':
+        return False, None, "Duration cannot be empty"
+    match = _DURATION_PATTERN.match(str(value))
+    if not match:
+        return False, None, "Duration format: <number>[d|w|m|y] (e.g., 60d, 8w, 3m, 1y)"
+    return True, int(match.group(1)) * _DURATION_DAYS[match.group(2).lower()], None
+
+
+_AGE_PATTERN = re.compile(r'^\s*(\d+)\s*(s|min|h|d|w)?\s*$', re.IGNORECASE)
+_AGE_SECONDS = {None: 1, 's': 1, 'min': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def validate_age_seconds(value: str) -> Tuple[bool, Optional[int], Optional[str]]:
+    """
+    Parse a maximum age such as ``90s``, ``15min``, ``12h`` or ``7d`` into seconds.
+    
+    A bare number is read as seconds.
+    
+    Args:
+        value: Age string
+        
+    Returns:
+        Tuple of (is_valid, seconds, error_message)
+        
+    Examples:
+        >>> validate_age_seconds('15min')
+        (True, 900, None)
+        >>> validate_age_seconds('2h')
+        (True, 7200, None)
+    """
+    if value is None or str(value).strip() == '':
+        return False, None, "Age cannot be empty"
+    match = _AGE_PATTERN.match(str(value))
+    if not match:
+        return False, None, "Age format: <number>[s|min|h|d|w] (e.g., 90s, 15min, 12h, 7d)"
+    unit = match.group(2).lower() if match.group(2) else None
+    return True, int(match.group(1)) * _AGE_SECONDS[unit], None
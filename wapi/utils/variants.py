@@ -0,0 +1,126 @@
+"""
+Look-alike domain generation for WAPI CLI
+
+Produces the typo-squatting permutations of a brand label that ``wapi
+search variants`` checks for registrations: omitted letters, swapped
+neighbours, look-alike characters, inserted hyphens and the same names
+under other TLDs. ``generate_variants`` is a generator that yields every
+distinct, syntactically valid domain once, so callers can start checking
+the first names while later ones are still being produced.
+"""
+
+from typing import Dict, Iterable, Iterator, Tuple
+
+from .validators import validate_domain
+
+# ASCII look-alikes (IDN homographs would need punycode and registry IDN tables)
+HOMOGLYPHS: Dict[str, Tuple[str, ...]] = {
+    'a': ('4',),
+    'b': ('6', 'lb'),
+    'd': ('cl',),
+    'e': ('3',),
+    'g': ('9', 'q'),
+    'i': ('1', 'l'),
+    'l': ('1', 'i'),
+    'm': ('rn', 'nn'),
+    'o': ('0',),
+    'q': ('g',),
+    's': ('5',),
+    't': ('7',),
+    'u': ('v',),
+    'w': ('vv',),
+    'z': ('2',),
+    '0': ('o',),
+    '1': ('l', 'i'),
+}
+
+# Multi-character look-alikes replaced by a single character
+_HOMOGLYPH_PAIRS = {'rn': 'm', 'vv': 'w', 'cl': 'd'}
+
+VARIANT_KINDS = ('omission', 'transposition', 'homoglyph', 'hyphenation', 'tld-swap')
+
+
+def _omissions(label: str) -> Iterator[str]:
+    for i in range(len(label)):
+        yield label[:i] + label[i + 1:]
+
+
+def _transpositions(label: str) -> Iterator[str]:
+    for i in range(len(label) - 1):
+        if label[i] != label[i + 1]:
+            yield label[:i] + label[i + 1] + label[i] + label[i + 2:]
+
+
+def _homoglyphs(label: str) -> Iterator[str]:
+    for i, char in enumerate(label):
+        for replacement in HOMOGLYPHS.get(char, ()):
+            yield label[:i] + replacement + label[i + 1:]
+    for pair, replacement in _HOMOGLYPH_PAIRS.items():
+        start = label.find(pair)
+        while start != -1:
+            yield label[:start] + replacement + label[start + len(pair):]
+            start = label.find(pair, start + 1)
+
+
+def _hyphenations(label: str) -> Iterator[str]:
+    for i in range(1, len(label)):
+        if label[i - 1] != '-' and label[i] != '-':
+            yield label[:i] + '-' + label[i:]
+
+
+_LABEL_PERMUTATIONS = (
+    ('omission', _omissions),
+    ('transposition', _transpositions),
+    ('homoglyph', _homoglyphs),
+    ('hyphenation', _hyphenations),
+)
+
+
+def split_brand(name: str) -> Tuple[str, str]:
+    """Brand label and TLD of ``acme`` / ``acme.cz`` (TLD empty if not given)"""
+    name = name.strip().rstrip('.').lower()
+    label, _, tld = name.partition('.')
+    return label, tld
+
+
+def generate_variants(label: str, tlds: Iterable[str],
+                      kinds: Iterable[str] = VARIANT_KINDS) -> Iterator[Tuple[str, str]]:
+    """
+    Yield look-alike domains of a brand label.
+
+    The brand itself under the first TLD is the original and is never
+    yielded; under the other TLDs it is a ``tld-swap``. Every permuted
+    label is combined with every TLD. Each domain is yielded once (the
+    first permutation producing it names its kind), and names that are not
+    valid domains (e.g. a leading hyphen) are skipped.
+
+    Args:
+        label: Brand label (``acme``)
+        tlds: TLDs to combine with, the brand's own first
+        kinds: Permutation kinds to generate (see VARIANT_KINDS)
+
+    Yields:
+        (domain, kind) pairs
+    """
+    tlds = [tld.strip().lstrip('.').lower() for tld in tlds if tld and tld.strip()]
+    kinds = set(kinds)
+    label = label.strip().lower()
+    seen = {f"{label}.{tlds[0]}"} if tlds else set()
+
+    def _emit(candidate: str, kind: str) -> Iterator[Tuple[str, str]]:
+        for tld in tlds:
+            domain = f"{candidate}.{tld}"
+            if domain in seen:
+                continue
+            seen.add(domain)
+            if validate_domain(domain)[0]:
+                yield domain, kind
+
+    if 'tld-swap' in kinds:
+        yield from _emit(label, 'tld-swap')
+    for kind, permute in _LABEL_PERMUTATIONS:
+        if kind not in kinds:
+            continue
+        for candidate in permute(label):
+            if candidate:
+                yield from _emit(candidate, kind)
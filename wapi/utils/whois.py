@@ -0,0 +1,187 @@
+"""
+Structured WHOIS parsing for WAPI CLI
+
+WHOIS answers are free text whose labels differ per registry. Each
+``WhoisGrammar`` maps one registry's labels to common fields (registrar,
+dates, status, NSSET, nameservers) and knows its "not found" phrasing. The
+response is scanned once with a single compiled line pattern; each
+``label: value`` line is looked up in the grammar's label table, so parsing
+cost does not grow with the number of recognised labels.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Pattern
+
+# "label: value" lines; labels are short and never start with a comment marker
+_LINE_PATTERN = re.compile(r'^[ \t]*([A-Za-z][A-Za-z0-9 /._()-]{0,48}?)'
+                           r'[ \t]*:[ \t]*(.*?)[ \t]*\r?$', re.MULTILINE)
+_ISO_DATE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+_DOTTED_DATE = re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})')
+
+# Fields holding several values (one line each)
+LIST_FIELDS = ('status', 'nameservers')
+DATE_FIELDS = ('registered', 'updated', 'expires')
+WHOIS_FIELDS = ('domain', 'registrar', 'registered', 'updated', 'expires', 'status', 'nsset',
+                'nameservers')
+
+
+class WhoisGrammar:
+    """Label table and "not found" pattern of one registry's WHOIS output"""
+
+    def __init__(self, name: str, servers: List[str], labels: Dict[str, str], not_found: str):
+        """
+        Args:
+            name: Grammar name (reported as ``grammar`` in parse results)
+            servers: WHOIS server hostnames using this grammar
+            labels: Lower-case label -> field (one of WHOIS_FIELDS)
+            not_found: Regular expression matching a "no such domain" answer
+        """
+        self.name = name
+        self.servers = tuple(servers)
+        self.labels = labels
+        self.not_found: Pattern = re.compile(not_found, re.IGNORECASE | re.MULTILINE)
+
+
+# Labels shared by ICANN gTLD registries (RDDS format)
+_ICANN_LABELS = {
+    'domain name': 'domain',
+    'registrar': 'registrar',
+    'creation date': 'registered',
+    'updated date': 'updated',
+    'registry expiry date': 'expires',
+    'registrar registration expiration date': 'expires',
+    'expiration date': 'expires',
+    'domain status': 'status',
+    'name server': 'nameservers',
+}
+
+GRAMMARS = (
+    WhoisGrammar('cznic', ['whois.nic.cz'], {
+        'domain': 'domain',
+        'registrar': 'registrar',
+        'registered': 'registered',
+        'changed': 'updated',
+        'expire': 'expires',
+        'status': 'status',
+        'nsset': 'nsset',
+        'nserver': 'nameservers',
+    }, r'%ERROR:101|no entries found'),
+    WhoisGrammar('verisign', ['whois.verisign-grs.com'], _ICANN_LABELS, r'^No match\b'),
+    WhoisGrammar('pir', ['whois.pir.org', 'whois.publicinterestregistry.org'], _ICANN_LABELS,
+                 r'^(NOT FOUND|Domain not found)'),
+    WhoisGrammar('sknic', ['whois.sk-nic.sk'], {
+        'domain': 'domain',
+        'registrar': 'registrar',
+        'created': 'registered',
+        'updated': 'updated',
+        'valid until': 'expires',
+        'epp status': 'status',
+        'nameserver': 'nameservers',
+    }, r'^Domain not found|^Not found'),
+    WhoisGrammar('denic', ['whois.denic.de'], {
+        'domain': 'domain',
+        'status': 'status',
+        'changed': 'updated',
+        'nserver': 'nameservers',
+    }, r'^Status:\s*free'),
+    WhoisGrammar('eurid', ['whois.eu'], {
+        'domain': 'domain',
+    }, r'^Status:\s*AVAILABLE'),
+)
+
+# Used for servers without a dedicated grammar: ICANN labels plus common ccTLD ones
+GENERIC_GRAMMAR = WhoisGrammar('generic', [], dict({
+    'domain': 'domain',
+    'registered': 'registered',
+    'created': 'registered',
+    'changed': 'updated',
+    'expire': 'expires',
+    'expires': 'expires',
+    'paid-till': 'expires',
+    'status': 'status',
+    'nsset': 'nsset',
+    'nserver': 'nameservers',
+    'nameserver': 'nameservers',
+}, **_ICANN_LABELS), r'no match|not found|no entries found|no data found'
+                     r'|status:\s*(free|available|unassigned)')
+
+_BY_SERVER = {server: grammar for grammar in GRAMMARS for server in grammar.servers}
+
+
+def grammar_for(server: Optional[str]) -> WhoisGrammar:
+    """Grammar for a WHOIS server hostname (the generic one if unknown)"""
+    return _BY_SERVER.get(str(server or '').strip().lower().rstrip('.'), GENERIC_GRAMMAR)
+
+
+def normalize_date(value: str) -> str:
+    """ISO date (YYYY-MM-DD) from common WHOIS date formats; the input if unrecognised"""
+    match = _ISO_DATE.search(value)
+    if match:
+        return '-'.join(match.groups())
+    match = _DOTTED_DATE.search(value)
+    if match:
+        day, month, year = match.groups()
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+    return value
+
+
+def _clean(field: str, value: str) -> str:
+    if field == 'nameservers':
+        # "ns1.example.cz (192.0.2.1, 2001:db8::1)" or "NS1.EXAMPLE.COM"
+        return value.split()[0].rstrip('.').lower() if value.split() else ''
+    if field == 'status':
+        # Drop ICANN explanation links: "clientTransferProhibited https://icann.org/epp#..."
+        return value.split(' http', 1)[0].strip()
+    if field in DATE_FIELDS:
+        return normalize_date(value)
+    if field == 'domain':
+        return value.lower().rstrip('.')
+    return value
+
+
+def parse_whois(text: Optional[str], server: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse a WHOIS response into structured fields.
+
+    Scalar fields keep their first occurrence (registries such as CZ.NIC
+    repeat ``registrar:`` in later contact and NSSET sections); list fields
+    collect every distinct value in order.
+
+    Args:
+        text: WHOIS response
+        server: Server that answered (selects the grammar)
+
+    Returns:
+        Dict with ``available`` (True/False/None), ``grammar`` and the
+        WHOIS_FIELDS found (lists for status and nameservers)
+    """
+    grammar = grammar_for(server)
+    result: Dict[str, Any] = {'available': None, 'grammar': grammar.name}
+    if not text:
+        return result
+
+    labels = grammar.labels
+    for match in _LINE_PATTERN.finditer(text):
+        field = labels.get(match.group(1).lower())
+        if field is None or not match.group(2):
+            continue
+        value = _clean(field, match.group(2))
+        if not value:
+            continue
+        if field in LIST_FIELDS:
+            values = result.setdefault(field, [])
+            if value not in values:
+                values.append(value)
+        elif field not in result:
+            result[field] = value
+
+    registered = any(field in result for field in ('domain', 'registrar', 'registered', 'expires',
+                                                   'nsset', 'nameservers'))
+    if grammar is not GENERIC_GRAMMAR and grammar.not_found.search(text):
+        # Registry-specific "not found" answers may still echo the queried name (DENIC, EURid)
+        result['available'] = True
+    elif registered:
+        result['available'] = False
+    elif grammar.not_found.search(text):
+        result['available'] = True
+    return result